@@ -78,35 +78,23 @@ from myapp.services.pdf_generator import generate_pdf_report
 from myapp.utils.export_utils import export_report_excel
 from myapp.finance.validators import run_sanity_checks
 from myapp.services.email_service import EmailService
-from myapp.utils.chart_utils import save_income_chart
+from myapp.utils.chart_utils import income_chart_path
 from myapp.routes.admin_rules import admin_bp
 from myapp.routes.api_insights import api_insights_bp
 from myapp.routes.api_tasks import api_tasks_bp
+from myapp.routes.api_metrics import api_metrics_bp
+from myapp.routes.api_durations import api_durations_bp
 from myapp.services.response_utils import handle_exception_context
 from myapp.etl.build_report_data import build_report_data
 from myapp.utils.date_utils import parse_date_flex
 from myapp.routes.health import health_bp
 from myapp.routes.auth import auth_bp
+from myapp.services.warmup import start_warmup
 
 
 # --- Logging Setup ---
-log_formatter = logging.Formatter(
-    fmt="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-
-file_handler = logging.FileHandler(
-    "auto_close.log", mode="w"
-)  # 'w' to rewrite on each run
-file_handler.setFormatter(log_formatter)
-
-stream_handler = logging.StreamHandler()
-stream_handler.setFormatter(log_formatter)
-
-log.setLevel(logging.INFO)
-log.addHandler(file_handler)
-log.addHandler(stream_handler)
-log.propagate = False
+# One shared queue-based pipeline (stdout + auto_close.log), see logger_config.
+init_logging()
 
 
 # --- Configuration Class ---
@@ -158,6 +146,8 @@ app.register_blueprint(api_reports_bp)
 app.register_blueprint(admin_bp)
 app.register_blueprint(api_insights_bp)
 app.register_blueprint(api_tasks_bp)
+app.register_blueprint(api_metrics_bp)
+app.register_blueprint(api_durations_bp)
 app.register_blueprint(health_bp, url_prefix="/api")
 app.register_blueprint(auth_bp, url_prefix="/api")
 
@@ -209,11 +199,9 @@ def create_reports(
 
     # --- Generate daily income chart ---
     daily_df = summary_dict.get("daily")
-    ts = datetime.now().strftime("%Y%m%dT%H%M%S")
     if daily_df is not None and not daily_df.empty:
-        chart_path = f"output/charts/income_chart_{ts}.png"
-        save_income_chart(daily_df, Path(chart_path))
-        chart_path_for_pdf: Optional[str] = chart_path
+        chart_path = income_chart_path(daily_df)  # cached, content-addressed PNG
+        chart_path_for_pdf: Optional[str] = str(chart_path) if chart_path else None
     else:
         chart_path_for_pdf = None
 
@@ -667,4 +655,7 @@ limiter.init_app(app)
 # def generate_reports():
 #     ...
 
-init_logging()
+# Warm shared caches (fonts, templates, rules, schema, detectors) – see
+# myapp/services/warmup.py. With AUTOCLOSE_WARMUP=preload and `gunicorn --preload`
+# this runs once in the master and the workers inherit the loaded pages.
+start_warmup(app)
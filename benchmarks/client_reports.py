@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+client_reports.py
+
+Render N client reports (default 500) the old way and the new way and print
+the per-report cost of each.
+
+  before  a new Jinja Environment + FileSystemLoader per report, the
+          stylesheet inlined as <style> and re-parsed by WeasyPrint with
+          fonts resolved per document (what generate_client_pdf used to do)
+  after   the shared template registry (myapp/utils/pdf_templates.py):
+          compiled template, pre-parsed CSS and one FontConfiguration
+
+Usage:
+  python -m benchmarks.client_reports                 # 500 PDFs, both modes
+  python -m benchmarks.client_reports --count 100 --html-only
+  python -m benchmarks.client_reports --output benchmarks/client_reports.json
+
+--html-only times the template step alone (no WeasyPrint needed).
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from benchmarks.synthetic_data import make_job_sheet
+from myapp.utils.pdf_templates import STYLESHEET_ROOT, TEMPLATE_ROOT, render_report_template, write_html_pdf
+
+DEFAULT_COUNT = 500
+TEMPLATE = "client_report.html"
+STYLESHEET = "client_report.css"
+
+log = logging.getLogger("benchmarks")
+
+
+def make_records(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    sheet = make_job_sheet(count, seed=seed)
+    records = []
+    for row in sheet.head(count).to_dict(orient="records"):
+        record = {k: ("" if v != v else v) for k, v in row.items()}  # NaN -> ""
+        for key in ("total", "cash", "credit", "parts", "tech_profit"):
+            try:
+                record[key] = float(record.get(key) or 0)
+            except (TypeError, ValueError):
+                record[key] = 0.0
+        records.append(record)
+    return records
+
+
+def render_before(record: Dict[str, Any]) -> str:
+    env = Environment(loader=FileSystemLoader(TEMPLATE_ROOT), autoescape=select_autoescape())
+    html = env.get_template(TEMPLATE).render(report_data=record, signature_path=None)
+    css = (STYLESHEET_ROOT / STYLESHEET).read_text(encoding="utf-8")
+    return html.replace("</head>", f"<style>{css}</style></head>", 1)
+
+
+def render_after(record: Dict[str, Any]) -> str:
+    return render_report_template(TEMPLATE, report_data=record, signature_path=None)
+
+
+def pdf_before(record: Dict[str, Any], target: Path) -> None:
+    from weasyprint import HTML
+
+    HTML(string=render_before(record), base_url=os.getcwd()).write_pdf(target)
+
+
+def pdf_after(record: Dict[str, Any], target: Path) -> None:
+    write_html_pdf(render_after(record), target, stylesheets=[STYLESHEET])
+
+
+def _time(records: List[Dict[str, Any]], step: Callable[..., Any], workdir: Optional[Path]) -> Dict[str, float]:
+    samples = []
+    started = time.perf_counter()
+    for i, record in enumerate(records):
+        t0 = time.perf_counter()
+        if workdir is None:
+            step(record)
+        else:
+            step(record, workdir / f"report_{i}.pdf")
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "reports": len(samples),
+        "total_s": round(time.perf_counter() - started, 3),
+        "first_ms": round(samples[0], 2),
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(sorted(samples)[int(len(samples) * 0.95) - 1], 2),
+    }
+
+
+def run(count: int, *, html_only: bool = False, seed: int = 0) -> Dict[str, Any]:
+    records = make_records(count, seed=seed)
+    workdir = None if html_only else Path(tempfile.mkdtemp(prefix="autoclose_bench_pdf_"))
+    steps = (render_before, render_after) if html_only else (pdf_before, pdf_after)
+    try:
+        results = {name: _time(records, step, workdir) for name, step in zip(("before", "after"), steps)}
+    finally:
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    results["speedup"] = round(results["before"]["median_ms"] / max(results["after"]["median_ms"], 1e-9), 2)
+    results["mode"] = "html" if html_only else "pdf"
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout, force=True)
+    logging.getLogger("myapp").setLevel(logging.ERROR)
+
+    parser = argparse.ArgumentParser(description="Benchmark client report rendering.")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--html-only", action="store_true", help="time the template step only")
+    parser.add_argument("--output", type=Path, help="write the JSON result here")
+    args = parser.parse_args(argv)
+
+    result = run(args.count, html_only=args.html_only, seed=args.seed)
+    for name in ("before", "after"):
+        r = result[name]
+        log.info(
+            "%-6s %5d reports  %8.2f s  first %8.1f ms  median %7.2f ms  p95 %7.2f ms",
+            name, r["reports"], r["total_s"], r["first_ms"], r["median_ms"], r["p95_ms"],
+        )
+    log.info("⚡ median speedup: %.2fx (%s)", result["speedup"], result["mode"])
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        log.info("📦 Results written to %s", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+run_benchmarks.py
+
+End-to-end benchmark suite for the report pipeline on deterministic synthetic
+job sheets (see benchmarks/synthetic_data.py).
+
+Commands:
+  run      Time every stage at each scenario size and write a JSON result.
+  compare  Same as run, then compare against a baseline JSON and exit 1 when a
+           stage is slower than the baseline by more than --threshold.
+
+Usage:
+  # Record a baseline on main
+  python -m benchmarks.run_benchmarks run --sizes 1k,10k --output benchmarks/baseline.json
+
+  # On a branch: fail if any stage regressed by more than 25%
+  python -m benchmarks.run_benchmarks compare --baseline benchmarks/baseline.json --threshold 0.25
+
+Sizes: 1k, 10k, 100k, 1m (or plain integers). 1m takes several minutes.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import shutil
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stages import STAGES, isolated_manifest, make_inputs
+from benchmarks.synthetic_data import make_job_sheet
+
+# ------------------------------------------------------------------------------
+# CONFIGURATION
+# ------------------------------------------------------------------------------
+
+SIZE_ALIASES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = "1k,10k"
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.25
+# Differences below this are timer noise, never a regression
+MIN_DELTA_MS = 5.0
+
+log = logging.getLogger("benchmarks")
+
+
+def parse_sizes(text: str) -> List[int]:
+    sizes = []
+    for token in text.split(","):
+        token = token.strip().lower()
+        if token:
+            sizes.append(SIZE_ALIASES.get(token) or int(token))
+    return sizes
+
+
+# ------------------------------------------------------------------------------
+# RUN
+# ------------------------------------------------------------------------------
+
+
+def _time_stage(stage: Any, inputs: Any, repeat: int) -> Dict[str, Any]:
+    try:
+        args = stage.prepare(inputs)
+    except Exception as e:
+        return {"status": "error", "error": f"prepare: {type(e).__name__}: {e}"}
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        try:
+            stage.run(args)
+        except Exception as e:
+            return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "status": "ok",
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "repeat": repeat,
+    }
+
+
+def run_suite(
+    sizes: List[int],
+    *,
+    repeat: int = DEFAULT_REPEAT,
+    seed: int = 0,
+    only: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Run every stage at every size; returns the JSON-ready result dict."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for n_rows in sizes:
+        raw = make_job_sheet(n_rows, seed=seed)
+        inputs = make_inputs(raw)
+        scenario: Dict[str, Any] = {}
+        try:
+            with isolated_manifest(inputs.workdir):
+                for stage in STAGES:
+                    if only and stage.name not in only:
+                        continue
+                    if stage.max_rows is not None and n_rows > stage.max_rows:
+                        scenario[stage.name] = {"status": "skipped"}
+                        continue
+                    scenario[stage.name] = outcome = _time_stage(stage, inputs, repeat)
+                    if outcome["status"] == "ok":
+                        log.info("%8d rows  %-24s %10.1f ms", n_rows, stage.name, outcome["min_ms"])
+                    else:
+                        log.warning("%8d rows  %-24s ERROR %s", n_rows, stage.name, outcome["error"])
+        finally:
+            shutil.rmtree(inputs.workdir, ignore_errors=True)
+        results[str(n_rows)] = scenario
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+# ------------------------------------------------------------------------------
+# COMPARE
+# ------------------------------------------------------------------------------
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    *,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_delta_ms: float = MIN_DELTA_MS,
+) -> List[Dict[str, Any]]:
+    """
+    Return one entry per regressed (size, stage): slower than baseline by more
+    than `threshold` (and by at least `min_delta_ms`), or newly erroring.
+    Stages missing from either side are ignored.
+    """
+    regressions = []
+    for size, stages in current.get("results", {}).items():
+        base_stages = baseline.get("results", {}).get(size, {})
+        for name, cur in stages.items():
+            base = base_stages.get(name)
+            if not base or base.get("status") != "ok":
+                continue
+            if cur.get("status") == "error":
+                regressions.append({"size": size, "stage": name, "reason": cur.get("error")})
+                continue
+            if cur.get("status") != "ok":
+                continue
+            ratio = cur["min_ms"] / base["min_ms"] if base["min_ms"] else float("inf")
+            if ratio > 1 + threshold and cur["min_ms"] - base["min_ms"] >= min_delta_ms:
+                regressions.append(
+                    {
+                        "size": size,
+                        "stage": name,
+                        "baseline_ms": base["min_ms"],
+                        "current_ms": cur["min_ms"],
+                        "ratio": round(ratio, 2),
+                    }
+                )
+    return regressions
+
+
+# ------------------------------------------------------------------------------
+# ENTRY POINT
+# ------------------------------------------------------------------------------
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout, force=True)
+    # The pipeline itself logs a lot at INFO; keep only its errors
+    logging.getLogger("myapp").setLevel(logging.ERROR)
+
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("run", "compare"):
+        p = sub.add_parser(name)
+        p.add_argument("--sizes", default=DEFAULT_SIZES, help="e.g. 1k,10k,100k,1m")
+        p.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--stages", default="", help="comma-separated subset of stages")
+        p.add_argument("--output", type=Path, help="write the JSON result here")
+        if name == "compare":
+            p.add_argument("--baseline", type=Path, required=True)
+            p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    only = [s.strip() for s in args.stages.split(",") if s.strip()] or None
+    current = run_suite(parse_sizes(args.sizes), repeat=args.repeat, seed=args.seed, only=only)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(current, indent=2), encoding="utf-8")
+        log.info("📦 Results written to %s", args.output)
+
+    if args.command == "compare":
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_results(baseline, current, threshold=args.threshold)
+        for r in regressions:
+            log.error("❌ Regression: %s", r)
+        if regressions:
+            return 1
+        log.info("✅ No stage regressed beyond %.0f%%", args.threshold * 100)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# benchmarks/stages.py
+
+"""
+Benchmark scenarios: one entry per pipeline stage.
+
+Each stage gets its own prepared input (built outside the timed region), so a
+slow or broken upstream stage doesn't hide the cost of the next one.
+"""
+
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import pandas as pd
+
+from myapp.etl import build_report_data as etl
+from myapp.finance.insights.engine import InsightsEngine
+from myapp.services import report_analyzer
+from myapp.services.pdf_generator import generate_pdf_report
+from myapp.utils import dataframe_utils, manifest
+from myapp.utils.validation_utils import validate_uploaded_df
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    prepare: Callable[["_Inputs"], Any]
+    run: Callable[[Any], Any]
+    max_rows: Optional[int] = None  # skip bigger scenarios (e.g. full PDF layout)
+
+
+class _Inputs:
+    """Memoises the intermediate frames for one scenario size."""
+
+    def __init__(self, raw: pd.DataFrame, workdir: Path) -> None:
+        self.raw = raw
+        self.workdir = workdir
+        self._cache: Dict[str, Any] = {}
+
+    def get(self, key: str, build: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def expanded(self) -> pd.DataFrame:
+        return self.get("expanded", lambda: report_analyzer.expand_multi_tech_jobs(self.raw))
+
+    def enriched(self) -> pd.DataFrame:
+        def build() -> pd.DataFrame:
+            df = dataframe_utils.enrich_financials(self.expanded().copy())
+            for col in ("date", "closed", "created"):
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+            if "payment_method" not in df.columns:
+                df["payment_method"] = "cash"
+            df["tax_collected"] = 0.0
+            return df
+
+        return self.get("enriched", build)
+
+    def csv_path(self) -> Path:
+        def build() -> Path:
+            path = self.workdir / "jobs.csv"
+            self.raw.to_csv(path, index=False)
+            return path
+
+        return self.get("csv", build)
+
+
+def _pdf_path(inputs: "_Inputs") -> str:
+    return str(inputs.workdir / "bench_report.pdf")
+
+
+STAGES = [
+    Stage("loading", lambda i: str(i.csv_path()), report_analyzer.load_jobs_excel),
+    Stage("validate_uploaded_df", lambda i: i.raw, lambda df: validate_uploaded_df(df.copy())),
+    Stage("clean_and_cast", lambda i: i.raw, report_analyzer.clean_and_cast),
+    Stage("expand_multi_tech_jobs", lambda i: i.raw, report_analyzer.expand_multi_tech_jobs),
+    Stage("enrich_financials", lambda i: i.expanded(), lambda df: dataframe_utils.enrich_financials(df.copy())),
+    Stage("summarise", lambda i: i.enriched(), report_analyzer.summarise),
+    Stage("build_report_data", lambda i: i.raw, report_analyzer.build_report_data),
+    Stage("etl_build_report_data", lambda i: i.raw, etl.build_report_data),
+    Stage("insights_generate", lambda i: i.enriched(), lambda df: InsightsEngine().generate(df)),
+    Stage(
+        "generate_pdf_report",
+        lambda i: (i.expanded(), _pdf_path(i)),
+        # memo off: every repeat must render, not copy the first repeat's catalogued PDF
+        lambda args: generate_pdf_report(args[0], output_path=args[1], memo=False),
+        max_rows=10_000,
+    ),
+]
+
+
+def make_inputs(raw: pd.DataFrame) -> _Inputs:
+    return _Inputs(raw, Path(tempfile.mkdtemp(prefix="autoclose_bench_")))
+
+
+@contextmanager
+def isolated_manifest(workdir: Path) -> Iterator[Path]:
+    """Point the report manifest at workdir while the stages run, so benchmark PDFs never reach the real one."""
+    saved = manifest.MANIFEST_PATH
+    manifest.MANIFEST_PATH = Path(workdir) / "manifest.json"
+    try:
+        yield manifest.MANIFEST_PATH
+    finally:
+        manifest.MANIFEST_PATH = saved
+
+
+__all__ = ["Stage", "STAGES", "make_inputs", "isolated_manifest"]
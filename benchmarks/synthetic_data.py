@@ -0,0 +1,100 @@
+# benchmarks/synthetic_data.py
+
+"""
+Deterministic synthetic job sheets for the benchmark suite.
+
+The same (n_rows, seed) always yields the same DataFrame, so timings from two
+runs (or two commits) compare like for like. Columns follow
+validation_utils.REQUIRED_COLUMNS plus `tech`, which the analyzer groups by.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.validation_utils import REQUIRED_COLUMNS
+
+TECHS = ["Avi", "Ben", "Dana", "Eli", "Gal", "Noa", "Omer", "Shir"]
+JOB_TYPES = ["lockout", "rekey", "car key", "safe", "install", "repair"]
+COMPANIES = ["AutoClose", "Keys4U", "LockPro"]
+STREETS = ["Herzl", "Dizengoff", "Allenby", "Ben Yehuda", "Jabotinsky"]
+
+# Every format parse_date_flex understands, mixed row by row like real exports
+DATE_FORMATS = ["%Y-%m-%d %H:%M", "%m/%d/%Y %I:%M %p", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d"]
+
+MULTI_TECH_RATIO = 0.1
+EPOCH = datetime(2025, 1, 1, 8, 0)
+
+
+def _format_dates(stamps: pd.Series, fmt_idx: np.ndarray) -> np.ndarray:
+    out = np.empty(len(stamps), dtype=object)
+    for i, fmt in enumerate(DATE_FORMATS):
+        mask = fmt_idx == i
+        if mask.any():
+            out[mask] = stamps[mask].dt.strftime(fmt).to_numpy()
+    return out
+
+
+def make_job_sheet(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build an upload-shaped DataFrame of `n_rows` jobs.
+
+    - ~10% multi-tech rows ("Avi/Ben") with a single percent share
+    - tech_share as percent strings ("40%"), money columns as plain numbers
+    - created/date/closed in a per-row mix of DATE_FORMATS
+    """
+    rng = np.random.default_rng(seed)
+
+    created = pd.Series(
+        pd.to_datetime(EPOCH)
+        + pd.to_timedelta(rng.integers(0, 180 * 24 * 60, n_rows), unit="m")
+    )
+    closed = created + pd.to_timedelta(rng.integers(15, 8 * 60, n_rows), unit="m")
+    fmt_idx = rng.integers(0, len(DATE_FORMATS), n_rows)
+
+    tech_idx = rng.integers(0, len(TECHS), n_rows)
+    second_idx = (tech_idx + rng.integers(1, len(TECHS), n_rows)) % len(TECHS)
+    techs = np.array(TECHS, dtype=object)
+    tech = techs[tech_idx].copy()
+    multi = rng.random(n_rows) < MULTI_TECH_RATIO
+    tech[multi] = tech[multi] + "/" + techs[second_idx[multi]]
+
+    total = np.round(rng.gamma(2.0, 150.0, n_rows) + 50, 2)
+    parts = np.round(total * rng.uniform(0, 0.3, n_rows), 2)
+    company_parts = np.round(parts * rng.uniform(0, 1, n_rows), 2)
+    tip = np.round(rng.choice([0, 0, 0, 10, 20, 50], n_rows).astype(float), 2)
+
+    # Split each total over one payment method
+    method = rng.integers(0, 4, n_rows)
+    pays = {name: np.where(method == i, total, 0.0) for i, name in enumerate(["cash", "credit", "billing", "check"])}
+
+    df = pd.DataFrame(
+        {
+            "job_id": [f"J{seed:02d}{i:08d}" for i in range(n_rows)],
+            "technician": tech,
+            "tech": tech,
+            "created": _format_dates(created, fmt_idx),
+            "date": _format_dates(created.dt.normalize(), fmt_idx),
+            "closed": _format_dates(closed, fmt_idx),
+            "job_type": np.array(JOB_TYPES, dtype=object)[rng.integers(0, len(JOB_TYPES), n_rows)],
+            "address": [
+                f"{STREETS[s]} {n}, Tel Aviv"
+                for s, n in zip(rng.integers(0, len(STREETS), n_rows), rng.integers(1, 200, n_rows))
+            ],
+            "total": total,
+            **pays,
+            "tech_share": np.char.add(rng.choice([30, 40, 50, 60], n_rows).astype(str), "%"),
+            "tip_amount": tip,
+            "parts": parts,
+            "company_parts": company_parts,
+            "company": np.array(COMPANIES, dtype=object)[rng.integers(0, len(COMPANIES), n_rows)],
+        }
+    )
+    df["tech_share"] = df["tech_share"].astype(object)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    assert not missing, missing
+    return df
+
+
+__all__ = ["make_job_sheet", "DATE_FORMATS", "TECHS"]
@@ -0,0 +1,29 @@
+# gunicorn.conf.py – picked up automatically by `gunicorn app:app`
+
+import os
+
+# AUTOCLOSE_WARMUP=preload imports app.py (and warms its caches) once in the
+# master before forking, so workers share those pages copy-on-write.
+preload_app = os.getenv("AUTOCLOSE_WARMUP", "off").strip().lower() == "preload"
+
+
+def on_starting(server):
+    # PIPELINE_METRICS_DIR holds the workers' /api/metrics histograms
+    # (utils/pipeline_timing.py); a new master starts the counters from zero.
+    folder = os.getenv("PIPELINE_METRICS_DIR", "").strip()
+    if folder and os.path.isdir(folder):
+        for name in os.listdir(folder):
+            if name.startswith("stages_") and name.endswith(".json"):
+                os.remove(os.path.join(folder, name))
+
+
+def post_fork(server, worker):
+    # Kaleido's server thread does not survive a fork, so each worker starts
+    # its own here rather than on its first chart export.
+    try:
+        from myapp.utils.figure_export import get_figure_exporter
+
+        backend = get_figure_exporter().warm()
+        server.log.info("Worker %s: figure export backend %s", worker.pid, backend)
+    except Exception as e:
+        server.log.warning("Worker %s: figure exporter warm-up failed: %s", worker.pid, e)
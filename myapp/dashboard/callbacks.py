@@ -125,7 +125,7 @@ def register_callbacks(dash_app: Dash, full_df: pd.DataFrame):
             # -- Tab: "by_technician"
             elif tab_value == "by_technician":
                 # Group by technician
-                df_count = df.groupby("technician").size().reset_index(name="count")
+                df_count = df.groupby("technician", observed=True).size().reset_index(name="count")
                 bar_fig = px.bar(
                     df_count,
                     x="technician",
@@ -25,8 +25,11 @@ def update_graphs(technicians, start_date, end_date, report_types):
     If the resulting dataframe is empty or invalid, we show a fallback alert
     explaining that there's no data to display under these filters.
     """
-    # 1. Load and filter data
-    df = load_dashboard_data()
+    # 1. Load and filter data (date / technician filters are pushed down to
+    #    the jobs dataset, so only the matching month partitions are read)
+    df = load_dashboard_data(
+        date_from=start_date, date_to=end_date, technicians=technicians
+    )
 
     # If df is empty after load, return a fallback
     if df.empty:
@@ -5,7 +5,8 @@ import pandas as pd
 from dash import Output, Input, callback, dcc, html
 from dash.exceptions import PreventUpdate
 from components.kpi_cards_component import build_kpi_cards
-from myapp.dashboard.data_loader import load_dashboard_data
+from myapp.dashboard.data_loader import get_rollup_kpis, load_dashboard_data
+from myapp.utils.jobs_dataset import read_merged_jobs
 from components.toast_component import build_toast
 from typing import Any
 
@@ -34,11 +35,19 @@ def update_kpi_cards(_: Any) -> Any:
     - Unique active technicians
     - Total service amount (fallback to 0.0 if 'amount' column doesn't exist)
     """
-    # Try to read the merged CSV; if missing or empty, do nothing (PreventUpdate)
+    # Try to read the merged jobs (dataset, else CSV); if missing, fall back to the rollup store
     try:
-        df = pd.read_csv(MERGED_CSV_PATH)
+        df = read_merged_jobs(MERGED_CSV_PATH)
     except FileNotFoundError:
-        raise PreventUpdate("merged_jobs.csv not found – skipping KPI update.")
+        kpis = get_rollup_kpis()
+        if kpis is None:
+            raise PreventUpdate("merged_jobs.csv not found – skipping KPI update.")
+        total_reports, active_technicians, total_amount = kpis
+        return build_kpi_cards(
+            total_reports=total_reports,
+            active_technicians=active_technicians,
+            total_amount=total_amount,
+        )
 
     if df.empty:
         raise PreventUpdate("merged_jobs.csv is empty – skipping KPI update.")
@@ -47,10 +56,13 @@ def update_kpi_cards(_: Any) -> Any:
     total_reports = len(df)
 
     # Calculate unique technicians if column present
-    active_technicians = df["technician"].nunique() if "technician" in df.columns else 0
+    # (the jobs dataset keeps the pipeline's names: tech / total)
+    tech_col = next((c for c in ("technician", "tech") if c in df.columns), None)
+    active_technicians = df[tech_col].nunique() if tech_col else 0
 
     # Calculate total amount if column present
-    total_amount = df["amount"].sum() if "amount" in df.columns else 0.0
+    amount_col = next((c for c in ("amount", "total") if c in df.columns), None)
+    total_amount = df[amount_col].sum() if amount_col else 0.0
 
     # Return updated KPI cards
     return build_kpi_cards(
@@ -6,17 +6,67 @@ import pandas as pd
 from pathlib import Path
 import re
 import logging
-from myapp.utils.file_validator import load_and_clean_data
+from myapp.utils.file_validator import clean_loaded_frame, load_and_clean_data, load_file
+from myapp.finance.rollup_store import get_rollup_store
+from myapp.utils.jobs_dataset import MERGED_CSV_PATH, merged_jobs_available, read_merged_jobs
 
 logger = logging.getLogger("AutoCloseDashboard")
 
 
-def get_kpi_metrics(filepath: str = "output/merged_jobs.csv") -> Tuple[int, int, float]:
+def get_rollup_kpis(
+    date_from: Optional[Any] = None, date_to: Optional[Any] = None
+) -> Optional[Tuple[int, int, float]]:
+    """
+    (jobs, active technicians, total amount) from the rollup store, which
+    holds every upload so far. None when the store has no rows in range.
+    """
+    try:
+        rollups = get_rollup_store().query(date_from, date_to)
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to query rollup store: {e}")
+        return None
+    if rollups.empty:
+        return None
+    return int(rollups["jobs"].sum()), int(rollups["tech"].nunique()), float(rollups["total"].sum())
+
+
+def load_merged_jobs(
+    filepath: str = MERGED_CSV_PATH,
+    *,
+    date_from: Optional[Any] = None,
+    date_to: Optional[Any] = None,
+    technicians: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    load_and_clean_data for the merged jobs table. The default path is served
+    from the partitioned jobs dataset (only the months in range are read, the
+    filters are pushed down); other paths are read as files.
+    """
+    df = read_merged_jobs(
+        filepath,
+        date_from=date_from or None,
+        date_to=date_to or None,
+        techs=technicians or None,
+        reader=load_file,
+    )
+    return clean_loaded_frame(df)
+
+
+def get_kpi_metrics(
+    filepath: str = MERGED_CSV_PATH,
+    date_from: Optional[Any] = None,
+    date_to: Optional[Any] = None,
+) -> Tuple[int, int, float]:
     """
     Returns basic KPI metrics: total reports, active technicians, and total amount.
+    A date range (or a missing merged CSV) is answered from the rollup store.
     """
+    if date_from is not None or date_to is not None or not merged_jobs_available(filepath):
+        kpis = get_rollup_kpis(date_from, date_to)
+        if kpis is not None:
+            return kpis
     try:
-        df = load_and_clean_data(filepath)
+        df = load_merged_jobs(filepath)
         total_reports = len(df)
         active_technicians = (
             df["technician"].nunique() if "technician" in df.columns else 0
@@ -28,9 +78,15 @@ def get_kpi_metrics(filepath: str = "output/merged_jobs.csv") -> Tuple[int, int,
         return 0, 0, 0
 
 
-def load_dashboard_data(path: str = "output/merged_jobs.csv") -> pd.DataFrame:
+def load_dashboard_data(
+    path: str = MERGED_CSV_PATH,
+    *,
+    date_from: Optional[Any] = None,
+    date_to: Optional[Any] = None,
+    technicians: Optional[List[str]] = None,
+) -> pd.DataFrame:
     """
-    Loads dashboard data from CSV. Returns a partially usable DataFrame if optional columns are missing,
+    Loads dashboard data (see load_merged_jobs; the filters are optional). Returns a partially usable DataFrame if optional columns are missing,
     without raising hard errors (except for truly critical failures, like file not found).
 
     Fallback Behavior:
@@ -41,13 +97,15 @@ def load_dashboard_data(path: str = "output/merged_jobs.csv") -> pd.DataFrame:
     """
 
     # Case 1: File does not exist
-    if not os.path.isfile(path):
+    if not merged_jobs_available(path):
         logger.error(f"Dashboard data file not found: {path}")
         return pd.DataFrame()  # Return empty DataFrame safely
 
     # Case 2: Could not read CSV at all
     try:
-        df = load_and_clean_data(path)  # your existing data load + cleanup logic
+        df = load_merged_jobs(
+            path, date_from=date_from, date_to=date_to, technicians=technicians
+        )
     except Exception as e:
         logger.error(f"Failed to read CSV: {e}")
         return pd.DataFrame()
@@ -103,7 +161,7 @@ def get_available_report_ranges(
 
 
 def get_filter_options(
-    filepath: str = "output/merged_jobs.csv",
+    filepath: str = MERGED_CSV_PATH,
 ) -> Tuple[List[dict[str, Any]], List[dict[str, Any]]]:
     """
     Extracts dropdown options from the data for technician and report_type.
@@ -116,7 +174,7 @@ def get_filter_options(
                Each is a list of dicts with "label" and "value".
     """
     try:
-        df = load_and_clean_data(filepath)
+        df = load_merged_jobs(filepath)
 
         # טכנאים
         if "technician" in df.columns:
@@ -149,7 +207,7 @@ def load_kpi_data() -> Tuple[int, int, float]:
         (total_reports, active_technicians, total_amount)
     """
     try:
-        df = load_and_clean_data("output/merged_jobs.csv")
+        df = load_merged_jobs()
 
         total_reports = len(df)
         active_technicians = (
@@ -2,7 +2,7 @@ from myapp.utils.logger_config import get_logger
 
 logger = get_logger(__name__)
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 from .base import MissingColumnError
 
@@ -47,19 +47,9 @@ class ColumnChecker:
         self.case_insensitive = case_insensitive
         self.logger = logger or logging.getLogger(__name__)
 
-    def check(self, df: pd.DataFrame) -> Dict[str, str]:
+    def match(self, df: pd.DataFrame) -> Tuple[Dict[str, str], List[str]]:
         """
-        בודק שכל ה־logical_names קיימים ב־DataFrame (לפחות תחת אחת מהחלופות).
-
-        Args:
-            df: pandas.DataFrame - טבלת הנתונים שיש לבדוק בה עמודות.
-
-        Returns:
-            Dict[str, str]: מיפוי של שם עמודה לוגי → השם האמיתי שנמצא ב־df.
-
-        Raises:
-            MissingColumnError: אם לא נמצא שם עמודה (לא אחת מהחלופות) עבור כל ה־logical_names.
-                ההודעה תכלול את כל השמות הלוגיים החסרים.
+        מחזיר (מיפוי לוגי → שם בפועל, רשימת שמות לוגיים חסרים) בלי לזרוק.
         """
         actual_columns = list(df.columns)
         matched: Dict[str, str] = {}
@@ -67,7 +57,7 @@ class ColumnChecker:
 
         # להכין רשימה של עמודות בפורמט התאם אם צריך
         if self.case_insensitive:
-            normalized_actual = {col.lower(): col for col in actual_columns}
+            normalized_actual = {str(col).lower(): col for col in actual_columns}
         else:
             normalized_actual = {col: col for col in actual_columns}
 
@@ -75,24 +65,50 @@ class ColumnChecker:
             found_name: Optional[str] = None
 
             for alt in alternatives:
-                if self.case_insensitive:
-                    alt_key = alt.lower()
-                    if alt_key in normalized_actual:
-                        found_name = normalized_actual[alt_key]
-                        break
-                else:
-                    if alt in normalized_actual:
-                        found_name = alt
-                        break
+                key = alt.lower() if self.case_insensitive else alt
+                if key in normalized_actual:
+                    found_name = normalized_actual[key]
+                    break
 
             if found_name is None:
                 missing_keys.append(logical_name)
             else:
                 matched[logical_name] = found_name
                 self.logger.debug(
-                    f"Matched logical '{logical_name}' → actual '{found_name}'"
+                    "Matched logical '%s' → actual '%s'", logical_name, found_name
                 )
 
+        return matched, missing_keys
+
+    def find_issues(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        _, missing_keys = self.match(df)
+        return [
+            {
+                "check": "columns",
+                "column": name,
+                "row": None,
+                "value": None,
+                "message": f"Missing required column: '{name}'",
+            }
+            for name in missing_keys
+        ]
+
+    def check(self, df: pd.DataFrame) -> Dict[str, str]:
+        """
+        בודק שכל ה־logical_names קיימים ב־DataFrame (לפחות תחת אחת מהחלופות).
+
+        Args:
+            df: pandas.DataFrame - טבלת הנתונים שיש לבדוק בה עמודות.
+
+        Returns:
+            Dict[str, str]: מיפוי של שם עמודה לוגי → השם האמיתי שנמצא ב־df.
+
+        Raises:
+            MissingColumnError: אם לא נמצא שם עמודה (לא אחת מהחלופות) עבור כל ה־logical_names.
+                ההודעה תכלול את כל השמות הלוגיים החסרים.
+        """
+        matched, missing_keys = self.match(df)
+
         if missing_keys:
             # מצרפים את כל השמות הלוגיים החסרים להודעה אחת
             missing_str = ", ".join(missing_keys)
@@ -101,5 +117,3 @@ class ColumnChecker:
             )
 
         return matched
-
-        return matched
@@ -35,6 +35,46 @@ class DateChecker:
         self.date_format = date_format
         self.logger = logger or logging.getLogger(__name__)
 
+    def find_issues(self, df: pd.DataFrame) -> list[dict[str, Any]]:
+        """
+        מחזיר את כל ערכי התאריך הלא תקינים בבת אחת, בלי לזרוק.
+        ערכי NaN ומחרוזות ללא ספרות (למשל 'billing') מדולגים כמו ב־check.
+        """
+        if self.date_column not in df.columns:
+            return [
+                {
+                    "check": "date",
+                    "column": self.date_column,
+                    "row": None,
+                    "value": None,
+                    "message": f"Date column '{self.date_column}' not found in DataFrame",
+                }
+            ]
+
+        column = df[self.date_column]
+        text = column.astype(str)
+        candidates = column.notna() & (
+            ~column.map(lambda v: isinstance(v, str)) | text.str.contains(r"\d", regex=True)
+        )
+        if not candidates.any():
+            return []
+
+        invalid = ~self._valid_mask(column[candidates])
+        bad = column[candidates][invalid.to_numpy(dtype=bool)]
+        self.logger.debug(
+            "Checked %d values in '%s': %d invalid", int(candidates.sum()), self.date_column, len(bad)
+        )
+        return [
+            {
+                "check": "date",
+                "column": self.date_column,
+                "row": row,
+                "value": value,
+                "message": str(InvalidDateError(value)),
+            }
+            for row, value in bad.items()
+        ]
+
     def check(self, df: pd.DataFrame) -> None:
         """
         בודק שכל ערך בעמודת התאריך ניתן להמרה לתאריך תקני.
@@ -53,29 +93,27 @@ class DateChecker:
                 f"Date column '{self.date_column}' not found in DataFrame"
             )
 
-        for idx, raw_value in df[self.date_column].items():
-            # 1. אם מדובר ב־NaN / None, לדלג
-            if pd.isna(raw_value):
-                self.logger.debug(
-                    f"Row {idx}: Skipping NaN/None in '{self.date_column}'."
-                )
-                continue
-
-            # 2. אם זו מחרוזת וללא שום ספרה, לדלג (למשל 'billing')
-            if isinstance(raw_value, str) and not any(ch.isdigit() for ch in raw_value):
-                self.logger.debug(
-                    f"Row {idx}: Skipping non-numeric string '{raw_value}'."
-                )
-                continue
-
-            # 3. ניסיון המרה
-            if not self._is_valid_date(raw_value):
-                self.logger.error(
-                    f"Row {idx}: Invalid date value '{raw_value}' in column '{self.date_column}'."
-                )
-                raise InvalidDateError(raw_value)
-
-            self.logger.debug(f"Row {idx}: Valid date '{raw_value}'.")
+        issues = self.find_issues(df)
+        if issues:
+            first = issues[0]
+            self.logger.error(
+                f"Row {first['row']}: Invalid date value '{first['value']}' in column '{self.date_column}'."
+            )
+            raise InvalidDateError(first["value"])
+
+    def _valid_mask(self, values: pd.Series) -> pd.Series:
+        """
+        המרה וקטורית של כל העמודה; אם pandas לא מצליח להמיר את המערך כולו
+        (למשל טיפוסים מעורבים), חוזרים לבדיקה ערך־ערך.
+        """
+        try:
+            if self.date_format:
+                parsed = pd.to_datetime(values, format=self.date_format, errors="coerce")
+            else:
+                parsed = pd.to_datetime(values, errors="coerce")
+            return parsed.notna()
+        except Exception:
+            return values.map(self._is_valid_date).astype(bool)
 
     def _is_valid_date(self, value: Any) -> bool:
         """
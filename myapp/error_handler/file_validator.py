@@ -1,12 +1,20 @@
 from myapp.utils.logger_config import get_logger
 from typing import Any
 import pandas as pd
-from .base import FileFormatError
+from .base import (
+    DataSanitizationError,
+    FileFormatError,
+    InvalidDateError,
+    MissingColumnError,
+    ValidationError,
+)
 from .column_checker import ColumnChecker
 from .date_checker import DateChecker
 from .value_sanitizer import ValueSanitizer
 from .xls_converter import XlsConverter
 
+logger = get_logger(__name__)
+
 
 class FileValidator:
     def __init__(self) -> None:
@@ -21,19 +29,51 @@ class FileValidator:
         self.value_sanitizer = ValueSanitizer(["client", "technician"])
         self.xls_converter = XlsConverter()
 
-    def validate(self, file_path: Any) -> pd.DataFrame:
+    def load(self, file_path: Any) -> pd.DataFrame:
         # Convert if needed
         actual_path = self.xls_converter.convert_to_xlsx(file_path)
 
         # Load the DataFrame
         try:
-            df = pd.read_excel(actual_path)
+            return pd.read_excel(actual_path)
         except Exception as e:
             raise FileFormatError(str(e))
 
-        # Perform validations
-        self.column_checker.check(df)
-        self.date_checker.check(df)
-        self.value_sanitizer.check(df)
+    def collect_errors(self, df: pd.DataFrame) -> list[dict[str, Any]]:
+        """
+        Run the column, date and value checks in one pass and return every
+        issue as {"check", "column", "row", "value", "message"}; [] when clean.
+        """
+        errors = self.column_checker.find_issues(df)
+        errors.extend(self.date_checker.find_issues(df))
+        errors.extend(self.value_sanitizer.find_issues(df))
+        if errors:
+            logger.warning("File validation found %d issues", len(errors))
+        return errors
 
+    def validate_with_errors(self, file_path: Any) -> tuple[pd.DataFrame, list[dict[str, Any]]]:
+        df = self.load(file_path)
+        return df, self.collect_errors(df)
+
+    def validate(self, file_path: Any) -> pd.DataFrame:
+        df, errors = self.validate_with_errors(file_path)
+        if errors:
+            error = _first_error_as_exception(errors)
+            error.errors = errors  # type: ignore[attr-defined]
+            raise error
         return df
+
+
+def _first_error_as_exception(errors: list[dict[str, Any]]) -> ValidationError:
+    """Same exception types the individual checkers raise, for existing callers."""
+    missing = [e["column"] for e in errors if e["check"] == "columns"]
+    if missing:
+        return MissingColumnError(
+            f"Missing required columns for logical names: {', '.join(missing)}"
+        )
+    first = errors[0]
+    if first["check"] == "date":
+        if first["row"] is None:
+            return MissingColumnError(first["message"])
+        return InvalidDateError(first["value"])
+    return DataSanitizationError(first["column"], first["value"])
@@ -1,5 +1,6 @@
 from myapp.utils.logger_config import get_logger
 from typing import Any
+import re
 
 logger = get_logger(__name__)
 from .base import DataSanitizationError
@@ -16,12 +17,38 @@ class ValueSanitizer:
     ) -> None:
         self.fields: list[str] = fields_to_check  # רשימה של שמות עמודות לבדיקה
         self.invalid_chars: set[str] = set(invalid_chars)  # קבוצת תווים אסורים
+        # regex אחד מקומפל לכל התווים האסורים – נבדק פעם אחת לכל עמודה
+        # (אין תווים אסורים → אין regex: "[]" אינו ביטוי חוקי)
+        self.pattern = (
+            re.compile("[" + re.escape("".join(sorted(self.invalid_chars))) + "]") if self.invalid_chars else None
+        )
 
-    def check(self, df: Any) -> None:
+    def find_issues(self, df: Any) -> list[dict[str, Any]]:
+        """
+        מחזיר את כל השורות הבעייתיות בבת אחת (str.contains וקטורי לכל עמודה).
+        """
+        issues: list[dict[str, Any]] = []
+        if self.pattern is None:
+            return issues
         for field in self.fields:
             if field not in df.columns:
                 continue  # אם העמודה לא קיימת ב־DataFrame, מדלגים עליה
-            for value in df[field]:
-                # ממירים כל ערך למחרוזת ומחפשים תווים אסורים
-                if any(char in str(value) for char in self.invalid_chars):
-                    raise DataSanitizationError(field, value)
+            column = df[field]
+            mask = column.astype(str).str.contains(self.pattern).to_numpy(dtype=bool)
+            for row, value in column[mask].items():
+                issues.append(
+                    {
+                        "check": "value",
+                        "column": field,
+                        "row": row,
+                        "value": value,
+                        "message": str(DataSanitizationError(field, value)),
+                    }
+                )
+        return issues
+
+    def check(self, df: Any) -> None:
+        issues = self.find_issues(df)
+        if issues:
+            first = issues[0]
+            raise DataSanitizationError(first["column"], first["value"])
@@ -8,6 +8,8 @@ from typing import Union, Optional, Tuple, Any
 from datetime import datetime
 from myapp.utils.column_mapper import load_column_schema
 from myapp.utils.parsers import parse_dates_in_columns
+from myapp.utils.df_diagnostics import log_df
+from myapp.utils.typed_reader import read_jobs_typed
 
 
 def build_report_data(
@@ -24,12 +26,12 @@ def build_report_data(
 
     # Step 1: Load input
     if isinstance(df_or_path, str):
-        log.info(f"📥 Reading Excel from: {df_or_path}")
-        df = pd.read_excel(df_or_path)
+        log.info("📥 Reading Excel from: %s", df_or_path)
+        df = read_jobs_typed(df_or_path, schema_name=schema_name)
     else:
         df = df_or_path.copy()
 
-    log.info(f"🔢 Loaded {len(df)} rows before cleaning")
+    log.info("🔢 Loaded %d rows before cleaning", len(df))
 
     # Step 2: Load schema
     schema = load_column_schema(schema_name)
@@ -43,7 +45,7 @@ def build_report_data(
     # Step 4: Validate required columns
     missing = [col for col in required_cols if col not in df.columns]
     if missing:
-        log.error(f"❌ Missing required columns: {missing}")
+        log.error("❌ Missing required columns: %s", missing)
         raise ValueError(f"Missing required columns: {missing}")
 
     # Step 5: Drop empty rows
@@ -62,13 +64,13 @@ def build_report_data(
     if date_to:
         df = df[df["date"] <= date_to]
 
-    log.info(f"✅ Rows after filtering: {len(df)}")
+    log.info("✅ Rows after filtering: %d", len(df))
 
-    # Step 8: Clean string columns
+    # Step 8: Clean string columns (typed category/date/money columns are skipped)
     for col in df.select_dtypes(include="object").columns:
         df[col] = df[col].astype(str).str.strip()
 
-    print("📊 עמודות DF לפני סיכום:", df.columns.tolist())
+    log_df(log, "📊 DF לפני סיכום", df)
     summary = {
         "rows_after_cleaning": len(df),
         "columns": list(df.columns),
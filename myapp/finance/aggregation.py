@@ -0,0 +1,197 @@
+# myapp/finance/aggregation.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from myapp.utils.categorical_encoding import sort_by_label
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# One grouped pass, many summaries.
+#
+#   cube = summary_cube(df)                  # groupby(day, tech, job_type, payment_method)
+#   cube.rollup(["tech"])                    # per-tech sums, from the cube rows only
+#   cube.daily()                             # calendar days min..max, empty days = 0
+#   cube.totals["total"], cube.jobs          # whole-frame sums
+#
+# The cube has one row per key combination (a few thousand rows at most for a
+# month of jobs), so every roll-up after the first pass is cheap. summarise,
+# get_kpi_summary, get_income_trend_from_df and the CFO report all read from
+# the same cube; summary_cube() memoises it by the content of the columns it
+# reads (one hashing pass, much cheaper than the group-by), so calling
+# several of them on one frame groups the rows once, and a frame edited in
+# place gets a fresh cube.
+
+GROUP_KEYS = ("day", "tech", "job_type", "payment_method")
+MEASURES = ("total", "parts", "net_income", "company_net", "tax_collected")
+
+
+class SummaryCube:
+    def __init__(self, grains: pd.DataFrame, keys: List[str], measures: List[str], jobs: int) -> None:
+        self.grains = grains  # keys + one sum column per measure + total_count + jobs
+        self.keys = keys
+        self.measures = measures
+        self.jobs = jobs
+        self.totals: Dict[str, float] = {m: float(grains[m].sum()) for m in measures}
+
+    @classmethod
+    def from_rollups(cls, rollups: pd.DataFrame) -> "SummaryCube":
+        """
+        A cube over already-aggregated rows (rollup_store.query() output or
+        rollup() results): date/day, tech, job_type, payment_method keys plus
+        jobs, total_count and measure sums.
+        """
+        grains = rollups.rename(columns={"date": "day"}).reset_index(drop=True)
+        keys = [k for k in GROUP_KEYS if k in grains.columns]
+        measures = [m for m in MEASURES if m in grains.columns]
+        return cls(grains, keys, measures, jobs=int(grains["jobs"].sum()))
+
+    def with_history(self, history: pd.DataFrame) -> "SummaryCube":
+        """
+        This cube plus `history` rows from the rollup store (the caller
+        leaves out the days this cube covers and applies its own filters).
+        """
+        own = self.rollup(self.keys)
+        for key in GROUP_KEYS[1:]:
+            if key in own.columns:
+                own[key] = own[key].astype(object)
+        history = history.rename(columns={"date": "day"}).drop(columns=["client_id"], errors="ignore")
+        return SummaryCube.from_rollups(pd.concat([history, own], ignore_index=True))
+
+    def rollup(self, by: Sequence[str], *, dropna: bool = False) -> pd.DataFrame:
+        """Sum the cube up to `by` (a subset of its keys); adds jobs/total_count."""
+        columns = [*self.measures, "total_count", "jobs"]
+        columns = [c for c in columns if c in self.grains.columns]
+        return _group_sum(self.grains, list(by), columns, dropna=dropna)
+
+    def daily(self) -> pd.DataFrame:
+        """
+        One row per calendar day between the first and last dated job (days
+        without jobs are zero), like df.set_index("date").resample("D").
+        """
+        if "day" not in self.keys:
+            return pd.DataFrame(columns=["date", "jobs", *self.measures])
+        per_day = self.rollup(["day"], dropna=True).set_index("day").sort_index()
+        if per_day.empty:
+            return pd.DataFrame(columns=["date", "jobs", *self.measures])
+        calendar = pd.date_range(per_day.index.min(), per_day.index.max(), freq="D", name="date")
+        return per_day.reindex(calendar, fill_value=0).reset_index()
+
+
+def _group_sum(frame: pd.DataFrame, keys: List[str], columns: List[str], *, dropna: bool) -> pd.DataFrame:
+    """
+    frame.groupby(keys)[columns].sum(), with categorical keys grouped on their
+    integer codes: faster, and pandas 1.5 drops the NaN group of a categorical
+    key even with dropna=False.
+    """
+    categories: Dict[str, pd.Index] = {}
+    by: Dict[str, pd.Series] = {}
+    for key in keys:
+        series = frame[key]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories[key] = series.cat.categories
+            series = series.cat.codes
+            if dropna:
+                series = series.where(series >= 0)  # -1 is NaN; let dropna remove it
+        by[key] = series
+    grouped = frame[columns].groupby([by[k] for k in keys], dropna=dropna, sort=False).sum()
+    grouped.index.names = keys
+    out = grouped.reset_index()
+    for key, cats in categories.items():
+        out[key] = pd.Categorical.from_codes(out[key].astype("int64"), categories=cats)  # -1 -> NaN
+    return out
+
+
+def _day_key(dates: pd.Series) -> pd.Series:
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce")
+    return dates.dt.normalize()
+
+
+def build_summary_cube(df: pd.DataFrame) -> SummaryCube:
+    """Group `df` once at the finest grain used by any summary."""
+    frame: Dict[str, pd.Series] = {}
+    if "date" in df.columns:
+        frame["day"] = _day_key(df["date"])
+    for key in GROUP_KEYS[1:]:
+        if key in df.columns:
+            frame[key] = df[key]
+    keys = list(frame)
+    measures = [m for m in MEASURES if m in df.columns]
+    for m in measures:
+        frame[m] = df[m]
+    work = pd.DataFrame(frame, index=df.index)
+    work["jobs"] = 1
+    columns = [*measures, "jobs"]
+    if "total" in measures:
+        work["total_count"] = df["total"].notna().astype("int64")
+        columns.append("total_count")
+
+    if keys:
+        grains = _group_sum(work, keys, columns, dropna=False)
+    else:
+        grains = work[columns].sum().to_frame().T
+    log.debug("Summary cube: %d rows -> %d groups over %s", len(df), len(grains), keys)
+    return SummaryCube(grains, keys, measures, jobs=len(df))
+
+
+def day_span(cube: SummaryCube) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """First and last dated day in the cube, or None."""
+    if "day" not in cube.keys:
+        return None
+    days = cube.grains["day"].dropna()
+    if days.empty:
+        return None
+    return days.min(), days.max()
+
+
+# content key -> cube, most recently used last
+_CUBES: "OrderedDict[str, SummaryCube]" = OrderedDict()
+_CUBES_LOCK = threading.Lock()
+_CUBES_MAX = 8
+
+
+def _content_key(df: pd.DataFrame) -> str:
+    """sha1 over the names, dtypes and values of the columns build_summary_cube reads."""
+    columns = [c for c in ("date", *GROUP_KEYS[1:], *MEASURES) if c in df.columns]
+    digest = hashlib.sha1(repr((len(df), columns, [str(df[c].dtype) for c in columns])).encode("utf-8"))
+    if columns and len(df):
+        digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def summary_cube(df: pd.DataFrame) -> SummaryCube:
+    """build_summary_cube, memoised on the content of the columns it reads."""
+    key = _content_key(df)
+    with _CUBES_LOCK:
+        cube = _CUBES.get(key)
+        if cube is not None:
+            _CUBES.move_to_end(key)
+            return cube
+    cube = build_summary_cube(df)
+    with _CUBES_LOCK:
+        _CUBES[key] = cube
+        while len(_CUBES) > _CUBES_MAX:
+            _CUBES.popitem(last=False)
+    return cube
+
+
+def label_sorted_rollup(cube: SummaryCube, key: str, *, dropna: bool = False) -> pd.DataFrame:
+    """cube.rollup([key]) ordered by label text, as a plain df.groupby(key) would be."""
+    return sort_by_label(cube.rollup([key], dropna=dropna), key)
+
+
+__all__ = [
+    "GROUP_KEYS",
+    "MEASURES",
+    "SummaryCube",
+    "build_summary_cube",
+    "summary_cube",
+    "day_span",
+    "label_sorted_rollup",
+]
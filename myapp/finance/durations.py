@@ -0,0 +1,218 @@
+# myapp/finance/durations.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.file_cache import load_cached_yaml
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Job duration percentiles and SLA breaches per technician / job type.
+#
+#   duration_stats(df, by="tech")                      # p50/p90/p99, mean, breaches per tech
+#   duration_stats(df, by=["tech", "job_type"], date_from="2025-06-01")
+#   duration_overall(df)                               # the same figures for all jobs
+#
+# Durations are the enriched duration_min column (closed - date, minutes);
+# frames without it get it computed the same way. Every table is one
+# groupby: size, count, mean, breach sum and all quantiles come from the
+# same grouper. Percentiles are exact over the rows passed in, so any date
+# range works without pre-aggregated sketches.
+#
+# Results are cached by a fingerprint of the input rows (hash of the key,
+# date and duration values) plus the arguments, so the API and dashboard
+# asking again for unchanged data skip the computation.
+#
+# Env control:
+#   SLA_CONFIG_PATH  SLA limits (default: config/sla.yaml in the repo)
+
+QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_SLA_PATH = Path(__file__).resolve().parents[2] / "config" / "sla.yaml"
+KEY_ALIASES = {"tech": ("tech", "technician"), "job_type": ("job_type", "service_type")}
+_CACHE_SIZE = 64
+
+
+def load_sla(path: str | Path | None = None) -> Tuple[float, Dict[str, float]]:
+    """(default minutes, {job_type: minutes}) from the SLA config."""
+    config = load_cached_yaml(path or os.getenv("SLA_CONFIG_PATH") or DEFAULT_SLA_PATH) or {}
+    per_type = {str(k): float(v) for k, v in (config.get("job_types") or {}).items()}
+    return float(config.get("default_minutes", 240)), per_type
+
+
+def duration_minutes(df: pd.DataFrame) -> pd.Series:
+    """duration_min if present, else (closed - date) in minutes, as enrich_financials computes it."""
+    if "duration_min" in df.columns:
+        return pd.to_numeric(df["duration_min"], errors="coerce")
+    if "closed" not in df.columns or "date" not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return (
+        pd.to_datetime(df["closed"], errors="coerce")
+        .sub(pd.to_datetime(df["date"], errors="coerce"))
+        .dt.total_seconds()
+        .div(60)
+        .round(1)
+    )
+
+
+def _key_column(df: pd.DataFrame, key: str) -> str:
+    for column in KEY_ALIASES.get(key, (key,)):
+        if column in df.columns:
+            return column
+    raise KeyError(f"No column for duration key {key!r}")
+
+
+def _working_frame(
+    df: pd.DataFrame,
+    keys: List[str],
+    date_from,
+    date_to,
+    sla: Tuple[float, Dict[str, float]],
+) -> pd.DataFrame:
+    """keys + minutes + breach (0/1) for the rows of df inside the date range."""
+    frame = pd.DataFrame({key: _key_values(df, key) for key in keys}, index=df.index)
+    frame["minutes"] = duration_minutes(df).astype(float)
+
+    default_minutes, per_type = sla
+    limit = default_minutes
+    if per_type and _has_key(df, "job_type"):
+        job_type = df[_key_column(df, "job_type")].astype(object)
+        limit = job_type.map(per_type).astype(float).fillna(default_minutes)
+    frame["breach"] = (frame["minutes"] > limit).astype("int64")
+
+    if date_from is not None or date_to is not None:
+        dates = pd.to_datetime(df["date"], errors="coerce") if "date" in df.columns else pd.Series(pd.NaT, index=df.index)
+        keep = np.ones(len(df), dtype=bool)
+        if date_from is not None:
+            keep &= (dates >= pd.Timestamp(date_from)).to_numpy()
+        if date_to is not None:
+            keep &= (dates <= pd.Timestamp(date_to)).to_numpy()
+        frame = frame[keep]
+    return frame
+
+
+def _has_key(df: pd.DataFrame, key: str) -> bool:
+    return any(c in df.columns for c in KEY_ALIASES.get(key, (key,)))
+
+
+def _key_values(df: pd.DataFrame, key: str) -> pd.Series:
+    if df.empty and not _has_key(df, key):
+        # an empty dataset has no columns at all: nothing to group, not a missing column
+        return pd.Series(index=df.index, dtype=object)
+    return df[_key_column(df, key)].astype(object)
+
+
+def _summarise(grouped, quantiles: Sequence[float]) -> pd.DataFrame:
+    minutes = grouped["minutes"]
+    out = pd.DataFrame({"jobs": grouped.size(), "timed": minutes.count(), "mean_min": minutes.mean()})
+    q = minutes.quantile(list(quantiles))
+    q = q.unstack() if isinstance(q.index, pd.MultiIndex) else q.to_frame().T
+    # with no rows in range there are no groups and quantile() yields no quantile columns
+    q = q.reindex(columns=list(quantiles))
+    for value in quantiles:
+        out[f"p{value * 100:g}"] = q[value]
+    out["sla_breaches"] = grouped["breach"].sum()
+    out["breach_rate"] = (out["sla_breaches"] / out["timed"].where(out["timed"] > 0)).fillna(0.0)
+    return out
+
+
+def _fingerprint(df: pd.DataFrame, columns: Sequence[str], extra: tuple) -> tuple:
+    """Content hash of the columns the stats read (row order included) + the arguments."""
+    present = [c for c in columns if c in df.columns]
+    digest = hashlib.blake2b(digest_size=16)
+    if present:
+        digest.update(pd.util.hash_pandas_object(df[present], index=False).to_numpy().tobytes())
+    return (len(df), tuple(present), digest.hexdigest(), extra)
+
+
+_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def _cached(key: tuple, compute) -> pd.DataFrame:
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None:
+            _CACHE.move_to_end(key)
+            return hit.copy()
+    result = compute()
+    with _CACHE_LOCK:
+        _CACHE[key] = result
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+    return result.copy()
+
+
+def clear_duration_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def duration_stats(
+    df: pd.DataFrame,
+    by: str | Sequence[str] = "tech",
+    *,
+    date_from=None,
+    date_to=None,
+    quantiles: Sequence[float] = QUANTILES,
+    sla_path: str | Path | None = None,
+) -> pd.DataFrame:
+    """
+    One row per `by` group (rows with a missing key are left out): jobs,
+    timed (jobs with a duration), mean_min, p50/p90/p99 minutes,
+    sla_breaches and breach_rate (breaches / timed).
+    """
+    keys = [by] if isinstance(by, str) else list(by)
+    sla = load_sla(sla_path)
+    source_cols = ["date", "duration_min", "closed", *(c for k in [*keys, "job_type"] for c in KEY_ALIASES.get(k, (k,)))]
+    extra = ("by", tuple(keys), str(date_from), str(date_to), tuple(quantiles), sla[0], tuple(sorted(sla[1].items())))
+
+    def compute() -> pd.DataFrame:
+        frame = _working_frame(df, keys, date_from, date_to, sla)
+        grouped = frame.groupby(keys, sort=True, dropna=True)
+        out = _summarise(grouped, quantiles).reset_index()
+        log.debug("Duration stats by %s: %d rows -> %d groups", keys, len(frame), len(out))
+        return out
+
+    return _cached(_fingerprint(df, list(dict.fromkeys(source_cols)), extra), compute)
+
+
+def duration_overall(
+    df: pd.DataFrame,
+    *,
+    date_from=None,
+    date_to=None,
+    quantiles: Sequence[float] = QUANTILES,
+    sla_path: str | Path | None = None,
+) -> Dict[str, float]:
+    """duration_stats over all rows, as a dict."""
+    sla = load_sla(sla_path)
+    source_cols = ["date", "duration_min", "closed", "job_type", "service_type"]
+    extra = ("overall", str(date_from), str(date_to), tuple(quantiles), sla[0], tuple(sorted(sla[1].items())))
+
+    def compute() -> pd.DataFrame:
+        frame = _working_frame(df, [], date_from, date_to, sla)
+        frame["_all"] = 0
+        return _summarise(frame.groupby("_all"), quantiles).reset_index(drop=True)
+
+    out = _cached(_fingerprint(df, source_cols, extra), compute)
+    if out.empty:
+        return {"jobs": 0, "timed": 0, "mean_min": None, **{f"p{q * 100:g}": None for q in quantiles}, "sla_breaches": 0, "breach_rate": 0.0}
+    return {k: (None if pd.isna(v) else (int(v) if k in ("jobs", "timed", "sla_breaches") else float(v))) for k, v in out.iloc[0].items()}
+
+
+__all__ = [
+    "QUANTILES",
+    "duration_minutes",
+    "duration_stats",
+    "duration_overall",
+    "load_sla",
+    "clear_duration_cache",
+]
@@ -0,0 +1,176 @@
+# myapp/finance/flag_rules.py
+
+import ast
+import operator
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.file_cache import load_cached_yaml
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Row flags as a bitmask: each rule of a rule set owns one bit, every rule is
+# one vectorised expression over whole columns, and labels are only built at
+# the end (once per distinct mask value, not once per row).
+#
+#   rules = load_rule_set("sanity")
+#   mask = rules.evaluate(df)              # int64 per row, bit i = rules.rules[i]
+#   rules.decode(mask)                     # "NEGATIVE_PROFIT,PARTS_EXCEED_TOTAL" / ""
+#
+# Rule sets live in config/flag_rules.yaml:
+#
+#   sanity:
+#     - label: PARTS_EXCEED_TOTAL
+#       when: parts > total
+#
+# `when` is a pandas expression over column names: + - * /, comparisons,
+# & | ~ (and / or / not work too), numbers, strings and isna(col) / notna(col).
+# Optional `column:` gives the rule its own label column (enrich_financials'
+# parts_flag, net_flag ...).
+#
+# Env control:
+#   FLAG_RULES_PATH  rules file (default: config/flag_rules.yaml in the repo)
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parents[2] / "config" / "flag_rules.yaml"
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+}
+_COMPARE = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_CALLS = {"isna": pd.isna, "notna": pd.notna}
+
+Expr = Callable[[pd.DataFrame], object]
+
+
+def _compile_node(node: ast.AST, source: str) -> Expr:
+    if isinstance(node, ast.Name):
+        name = node.id
+        return lambda df: df[name]
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+        value = node.value
+        return lambda df: value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op, left, right = _BINARY[type(node.op)], _compile_node(node.left, source), _compile_node(node.right, source)
+        return lambda df: op(left(df), right(df))
+    if isinstance(node, ast.BoolOp):
+        op = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        parts = [_compile_node(v, source) for v in node.values]
+
+        def boolop(df: pd.DataFrame) -> object:
+            result = parts[0](df)
+            for part in parts[1:]:
+                result = op(result, part(df))
+            return result
+
+        return boolop
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARE:
+        op = _COMPARE[type(node.ops[0])]
+        left, right = _compile_node(node.left, source), _compile_node(node.comparators[0], source)
+        return lambda df: op(left(df), right(df))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+        operand = _compile_node(node.operand, source)
+        return lambda df: ~operand(df)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        operand = _compile_node(node.operand, source)
+        return lambda df: -operand(df)
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _CALLS
+        and len(node.args) == 1
+        and not node.keywords
+    ):
+        fn, arg = _CALLS[node.func.id], _compile_node(node.args[0], source)
+        return lambda df: fn(arg(df))
+    raise ValueError(f"Unsupported expression in flag rule {source!r}: {ast.dump(node)}")
+
+
+def compile_expression(source: str) -> Expr:
+    """Turn a rule's `when` text into a function df -> boolean Series."""
+    return _compile_node(ast.parse(source, mode="eval").body, source)
+
+
+@dataclass
+class FlagRule:
+    label: str
+    when: str
+    column: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self._expr = compile_expression(self.when)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        result = self._expr(df)
+        if np.isscalar(result):
+            return np.full(len(df), bool(result))
+        return np.asarray(result, dtype=bool)
+
+
+class RuleSet:
+    def __init__(self, name: str, rules: List[FlagRule]) -> None:
+        if len(rules) > 63:
+            raise ValueError(f"Flag rule set {name!r} has {len(rules)} rules; at most 63 fit a bitmask")
+        self.name = name
+        self.rules = rules
+
+    def evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        """Bitmask per row (int64): bit i is set when rules[i] holds."""
+        mask = np.zeros(len(df), dtype=np.int64)
+        for bit, rule in enumerate(self.rules):
+            mask |= rule.mask(df).astype(np.int64) << bit
+        return mask
+
+    def _labels_for(self, mask: np.ndarray, bits: List[int]) -> np.ndarray:
+        values, inverse = np.unique(mask, return_inverse=True)
+        labels = np.array(
+            [",".join(self.rules[b].label for b in bits if value >> b & 1) for value in values],
+            dtype=object,
+        )
+        return labels[inverse] if len(mask) else np.array([], dtype=object)
+
+    def decode(self, mask: np.ndarray) -> np.ndarray:
+        """Comma-separated labels per row, in rule order ("" when no bit is set)."""
+        return self._labels_for(np.asarray(mask, dtype=np.int64), list(range(len(self.rules))))
+
+    def label_columns(self, mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """column -> rule label or "" per row, for the rules that declare a column."""
+        mask = np.asarray(mask, dtype=np.int64)
+        return {
+            rule.column: np.where(mask >> bit & 1 == 1, rule.label, "")
+            for bit, rule in enumerate(self.rules)
+            if rule.column
+        }
+
+
+def rules_path() -> Path:
+    return Path(os.getenv("FLAG_RULES_PATH") or DEFAULT_RULES_PATH)
+
+
+def load_rule_set(name: str, path: str | Path | None = None) -> RuleSet:
+    """Rule set `name` from the rules file (parsed once per file change)."""
+    config = load_cached_yaml(path or rules_path())
+    if name not in config:
+        raise KeyError(f"Flag rule set {name!r} not found in {path or rules_path()}")
+    rules = [FlagRule(str(r["label"]), str(r["when"]), r.get("column")) for r in config[name]]
+    return RuleSet(name, rules)
+
+
+__all__ = ["FlagRule", "RuleSet", "compile_expression", "load_rule_set"]
@@ -1,4 +1,5 @@
 from myapp.utils.logger_config import get_logger
+from myapp.utils.file_cache import load_cached_yaml
 
 log = get_logger(__name__)
 import importlib
@@ -7,9 +8,11 @@ import yaml
 from pathlib import Path
 from enum import Enum
 from dataclasses import dataclass
-from typing import List, Any, Optional, Dict
+from typing import List, Any, Optional, Dict, Sequence
 import pandas as pd
 
+from myapp.finance.rollup_store import get_rollup_store
+
 
 class Severity(Enum):
     INFO = "INFO"
@@ -25,6 +28,10 @@ class Insight:
     meta: Optional[dict[str, Any]] = None
 
 
+# Detector classes are discovered once per process and shared by every engine.
+_DETECTOR_CACHE: list[Any] = []
+
+
 class InsightsEngine:
     def __init__(self, rules_path: Optional[Path] = None) -> None:
         self.rules_path = rules_path or Path(__file__).parent / "rules.yml"
@@ -32,10 +39,11 @@ class InsightsEngine:
         self.detectors = self._load_detectors()
 
     def _load_rules(self) -> Any:
-        with open(self.rules_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+        return load_cached_yaml(self.rules_path)
 
     def _load_detectors(self) -> list[Any]:
+        if _DETECTOR_CACHE:
+            return list(_DETECTOR_CACHE)
         detectors = []
         detectors_dir = Path(__file__).parent / "detectors"
         for _, modname, _ in pkgutil.iter_modules([str(detectors_dir)]):
@@ -46,10 +54,32 @@ class InsightsEngine:
                     b.__name__ for b in obj.__bases__
                 ]:
                     detectors.append(obj)
+        if not _DETECTOR_CACHE:
+            _DETECTOR_CACHE.extend(detectors)
         return detectors
 
-    def generate(self, df: pd.DataFrame) -> List[Insight]:
+    def generate(
+        self,
+        df: pd.DataFrame,
+        history_days: Optional[int] = None,
+        *,
+        techs: Optional[Sequence[str]] = None,
+        job_types: Optional[Sequence[str]] = None,
+        client_id: Optional[str] = None,
+    ) -> List[Insight]:
+        """
+        history_days: days of rollup-store history (earlier uploads) put in
+        front of ctx["daily"], so trend detectors can look past the current
+        file. Defaults to rules.yml HISTORY.days (0 = off). Pass the report's
+        techs / job_types / client_id with it, or the history is company-wide.
+        """
         ctx = self._pre_aggregate(df)
+        if history_days is None:
+            history_days = ((self.rules or {}).get("HISTORY") or {}).get("days", 0)
+        if history_days:
+            ctx["daily"] = self._with_history(
+                ctx["daily"], history_days, techs=techs, job_types=job_types, client_id=client_id
+            )
         insights = []
         for Detector in self.detectors:
             detector = Detector(df, self.rules, ctx)
@@ -57,14 +87,48 @@ class InsightsEngine:
         # מיון לפי חומרה
         return sorted(insights, key=lambda i: Severity[i.severity].value, reverse=True)
 
+    def _with_history(
+        self,
+        daily: pd.DataFrame,
+        days: int,
+        *,
+        techs: Optional[Sequence[str]] = None,
+        job_types: Optional[Sequence[str]] = None,
+        client_id: Optional[str] = None,
+    ) -> pd.DataFrame:
+        if daily.empty or "date" not in daily.columns:
+            return daily
+        first = pd.to_datetime(daily["date"], errors="coerce").min()
+        if pd.isna(first):
+            return daily
+        first = first.normalize()
+        history = get_rollup_store().query(
+            first - pd.Timedelta(days=days),
+            first - pd.Timedelta(days=1),
+            techs=techs,
+            job_types=job_types,
+            client_id=client_id,
+        )
+        if history.empty:
+            return daily
+        past = (
+            history.groupby("date", as_index=False)
+            .agg(net_income=("net_income", "sum"), job_id=("jobs", "sum"))
+            .assign(tax_collected=float("nan"))
+        )
+        log.debug("Insights: %d history days before %s", len(past), first.date())
+        return pd.concat([past[daily.columns.intersection(past.columns)], daily], ignore_index=True)
+
     def _pre_aggregate(self, df: pd.DataFrame) -> Dict[str, Any]:
         # ניתן להרחיב: חישובי סיכומים, ממוצעים, קיבוצים
+        if "date" not in df.columns:
+            return {"daily": pd.DataFrame()}
+        # one row per calendar day, like the rollup store's history rows
+        days = pd.to_datetime(df["date"], errors="coerce").dt.normalize().rename("date")
         return {
             "daily": (
-                df.groupby("date")
+                df.groupby(days)
                 .agg({"net_income": "sum", "tax_collected": "sum", "job_id": "count"})
                 .reset_index()
-                if "date" in df.columns
-                else pd.DataFrame()
             )
         }
@@ -0,0 +1,296 @@
+# myapp/finance/rollup_store.py
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Persistent per-day / per-tech / per-job_type aggregates across uploads.
+#
+#   store = get_rollup_store()
+#   store.ingest(detail_df, source="june.xlsx", client_id="acme")   # after a successful upload
+#   store.query(date(2025, 1, 1), date(2025, 6, 30), techs=["Dana"], client_id="acme")
+#
+# Two tables:
+#   job_facts     one row per job line (multi-tech jobs have several), keyed
+#                 by job_id. Re-uploading a job replaces its lines, so totals
+#                 never double count.
+#   daily_rollup  SUMs of job_facts per (day, client_id, tech, job_type,
+#                 payment_method). Only the days touched by an ingest are
+#                 re-aggregated.
+#
+# Missing keys are stored as "" (SQLite treats NULLs in a primary key as
+# distinct) and come back as NaN from query(). A database written before
+# client_id / payment_method existed is migrated on first use (old rows get
+# "" for both and the rollups are rebuilt).
+#
+# Env control:
+#   ROLLUP_DB_PATH  SQLite file (default: output/rollups.sqlite3)
+
+DEFAULT_DB_PATH = "output/rollups.sqlite3"
+MEASURES = ("total", "parts", "net_income", "tech_cut", "company_net")
+ROLLUP_COLUMNS = ("jobs", "total_count", *MEASURES, "flags")
+
+_FACTS_TABLE = """
+CREATE TABLE IF NOT EXISTS job_facts (
+    job_id      TEXT    NOT NULL,
+    line        INTEGER NOT NULL,
+    day         TEXT    NOT NULL,
+    tech        TEXT    NOT NULL,
+    job_type    TEXT    NOT NULL,
+    total       REAL    NOT NULL,
+    total_count INTEGER NOT NULL,
+    parts       REAL    NOT NULL,
+    net_income  REAL    NOT NULL,
+    tech_cut    REAL    NOT NULL,
+    company_net REAL    NOT NULL,
+    flags       INTEGER NOT NULL,
+    source      TEXT,
+    ingested_at TEXT    NOT NULL,
+    client_id   TEXT    NOT NULL DEFAULT '',
+    payment_method TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (job_id, line)
+);
+"""
+_FACTS_INDEX = "CREATE INDEX IF NOT EXISTS job_facts_day ON job_facts (day)"
+_ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    day         TEXT    NOT NULL,
+    client_id   TEXT    NOT NULL,
+    tech        TEXT    NOT NULL,
+    job_type    TEXT    NOT NULL,
+    payment_method TEXT NOT NULL,
+    jobs        INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    total       REAL    NOT NULL,
+    parts       REAL    NOT NULL,
+    net_income  REAL    NOT NULL,
+    tech_cut    REAL    NOT NULL,
+    company_net REAL    NOT NULL,
+    flags       INTEGER NOT NULL,
+    PRIMARY KEY (day, client_id, tech, job_type, payment_method)
+);
+"""
+
+_FACT_COLUMNS = ("job_id", "line", "day", "tech", "job_type", "total", "total_count",
+                 "parts", "net_income", "tech_cut", "company_net", "flags", "client_id", "payment_method")
+ROLLUP_KEYS = ("client_id", "tech", "job_type", "payment_method")
+
+
+def _as_day(value: date | datetime | str | None) -> Optional[str]:
+    if value is None:
+        return None
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _flag_mask(df: pd.DataFrame) -> np.ndarray:
+    """Rows with any flag set (report_analyzer uses 'flag', dataframe_utils 'flags')."""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in ("flags", "flag"):
+        if col in df.columns:
+            text = df[col].astype(object).where(df[col].notna(), "").astype(str).str.strip()
+            mask |= (text != "").to_numpy()
+    return mask
+
+
+def job_facts_frame(df: pd.DataFrame, source: Optional[str] = None, client_id: Optional[str] = None) -> pd.DataFrame:
+    """
+    The rows of an enriched job frame that can be rolled up: a job_id and a
+    parseable date are required. Money columns missing from `df` count as 0.
+    `client_id` applies to every row (else a client_id column, else "").
+    """
+    if "job_id" not in df.columns or "date" not in df.columns:
+        return pd.DataFrame(columns=[*_FACT_COLUMNS, "source"])
+    dates = df["date"] if pd.api.types.is_datetime64_any_dtype(df["date"]) else pd.to_datetime(df["date"], errors="coerce")
+    job_id = df["job_id"].astype(object).where(df["job_id"].notna(), "").astype(str).str.strip()
+    facts = pd.DataFrame({"job_id": job_id, "day": dates.dt.strftime("%Y-%m-%d")}, index=df.index)
+    for key in ("tech", "job_type", "client_id", "payment_method"):
+        if key == "client_id" and client_id is not None:
+            facts[key] = str(client_id).strip()
+        elif key in df.columns:
+            facts[key] = df[key].astype(object).where(df[key].notna(), "").astype(str).str.strip()
+        else:
+            facts[key] = ""
+    for measure in MEASURES:
+        values = pd.to_numeric(df[measure], errors="coerce") if measure in df.columns else pd.Series(np.nan, index=df.index)
+        facts[measure] = values.fillna(0.0).astype(float)
+        if measure == "total":
+            facts["total_count"] = values.notna().astype("int64")
+    facts["flags"] = _flag_mask(df).astype("int64")
+    facts = facts[(facts["job_id"] != "") & facts["day"].notna()].copy()
+    facts["line"] = facts.groupby("job_id", sort=False).cumcount()
+    facts["source"] = source
+    return facts[[*_FACT_COLUMNS, "source"]].reset_index(drop=True)
+
+
+def _rollup_insert(where: str = "") -> str:
+    """INSERT that re-aggregates job_facts (rows matching `where`) into daily_rollup."""
+    keys = ", ".join(("day", *ROLLUP_KEYS))
+    sums = ", ".join(f"SUM({c})" for c in ("total_count", *MEASURES, "flags"))
+    return (
+        f"INSERT INTO daily_rollup ({keys}, jobs, total_count, {', '.join(MEASURES)}, flags) "
+        f"SELECT {keys}, COUNT(*), {sums} FROM job_facts {where} GROUP BY {keys}"
+    )
+
+
+class RollupStore:
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        if not self._initialised:
+            with self._lock:
+                conn.execute("PRAGMA journal_mode=WAL")
+                self._migrate(conn)
+                for ddl in (_FACTS_TABLE, _FACTS_INDEX, _ROLLUP_TABLE):
+                    conn.execute(ddl)
+                self._initialised = True
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Add client_id / payment_method to a store created without them."""
+        fact_columns = {row[1] for row in conn.execute("PRAGMA table_info(job_facts)")}
+        if not fact_columns or {"client_id", "payment_method"} <= fact_columns:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for column in ("client_id", "payment_method"):
+                if column not in fact_columns:
+                    conn.execute(f"ALTER TABLE job_facts ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+            conn.execute("DROP TABLE IF EXISTS daily_rollup")
+            conn.execute(_ROLLUP_TABLE)
+            conn.execute(_rollup_insert())
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        log.info("📚 Rollup store migrated to per-client rollups")
+
+    def ingest(self, df: pd.DataFrame, source: Optional[str] = None, client_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Upsert the jobs of `df` and refresh the affected days. Returns counts:
+        rows (job lines stored), new_jobs, replaced_jobs, skipped (rows
+        without job_id or date).
+        """
+        facts = job_facts_frame(df, source, client_id)
+        stats = {"rows": len(facts), "new_jobs": 0, "replaced_jobs": 0, "skipped": len(df) - len(facts)}
+        if facts.empty:
+            return stats
+        now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        records = [(*row, now) for row in facts.itertuples(index=False, name=None)]
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("CREATE TEMP TABLE incoming AS SELECT * FROM job_facts WHERE 0")
+                conn.executemany(
+                    f"INSERT INTO incoming ({', '.join(_FACT_COLUMNS)}, source, ingested_at) "
+                    f"VALUES ({', '.join('?' * (len(_FACT_COLUMNS) + 2))})",
+                    records,
+                )
+                conn.execute("CREATE TEMP TABLE affected_days AS "
+                             "SELECT DISTINCT day FROM incoming UNION "
+                             "SELECT DISTINCT day FROM job_facts WHERE job_id IN (SELECT job_id FROM incoming)")
+                (replaced,) = conn.execute(
+                    "SELECT COUNT(DISTINCT job_id) FROM job_facts WHERE job_id IN (SELECT job_id FROM incoming)"
+                ).fetchone()
+                (incoming_jobs,) = conn.execute("SELECT COUNT(DISTINCT job_id) FROM incoming").fetchone()
+                conn.execute("DELETE FROM job_facts WHERE job_id IN (SELECT job_id FROM incoming)")
+                conn.execute("INSERT INTO job_facts SELECT * FROM incoming")
+                conn.execute("DELETE FROM daily_rollup WHERE day IN (SELECT day FROM affected_days)")
+                conn.execute(_rollup_insert("WHERE day IN (SELECT day FROM affected_days)"))
+                conn.execute("DROP TABLE incoming")
+                conn.execute("DROP TABLE affected_days")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        stats["replaced_jobs"] = replaced
+        stats["new_jobs"] = incoming_jobs - replaced
+        log.info("📚 Rollup store updated from %s: %s", source or "upload", stats)
+        return stats
+
+    def query(
+        self,
+        start: date | datetime | str | None = None,
+        end: date | datetime | str | None = None,
+        *,
+        techs: Optional[Sequence[str]] = None,
+        job_types: Optional[Sequence[str]] = None,
+        client_id: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Daily rollup rows with start <= date <= end (either bound optional),
+        limited to the given techs / job types / client when those are set.
+        """
+        columns = ["date", *ROLLUP_KEYS, *ROLLUP_COLUMNS]
+        if not self.path.exists():
+            return pd.DataFrame(columns=columns)
+        where, params = [], []
+        if start is not None:
+            where.append("day >= ?")
+            params.append(_as_day(start))
+        if end is not None:
+            where.append("day <= ?")
+            params.append(_as_day(end))
+        for key, values in (("tech", techs), ("job_type", job_types)):
+            if values:
+                values = [str(v).strip() for v in values]
+                where.append(f"{key} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if client_id is not None:
+            where.append("client_id = ?")
+            params.append(str(client_id).strip())
+        keys = ", ".join(ROLLUP_KEYS)
+        sql = f"SELECT day, {keys}, {', '.join(ROLLUP_COLUMNS)} FROM daily_rollup"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql + f" ORDER BY day, {keys}", params).fetchall()
+        frame = pd.DataFrame(rows, columns=columns)
+        frame["date"] = pd.to_datetime(frame["date"])
+        for key in ROLLUP_KEYS:
+            frame[key] = frame[key].replace("", np.nan)
+        return frame
+
+    def coverage(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """(first day, last day) in the store, or None when it is empty."""
+        if not self.path.exists():
+            return None
+        with closing(self._connect()) as conn:
+            first, last = conn.execute("SELECT MIN(day), MAX(day) FROM daily_rollup").fetchone()
+        if first is None:
+            return None
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+
+_STORES: Dict[str, RollupStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_rollup_store(path: str | Path | None = None) -> RollupStore:
+    """Process-wide store for `path` (or ROLLUP_DB_PATH)."""
+    resolved = str(Path(path or os.getenv("ROLLUP_DB_PATH", DEFAULT_DB_PATH)).resolve())
+    with _STORES_LOCK:
+        if resolved not in _STORES:
+            _STORES[resolved] = RollupStore(resolved)
+        return _STORES[resolved]
+
+
+__all__ = ["RollupStore", "get_rollup_store", "job_facts_frame", "ROLLUP_COLUMNS", "ROLLUP_KEYS"]
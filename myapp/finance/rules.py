@@ -1,4 +1,5 @@
 from myapp.utils.logger_config import get_logger
+from myapp.utils.file_cache import load_cached_yaml
 from decimal import Decimal
 from datetime import datetime
 import yaml
@@ -6,8 +7,7 @@ from pathlib import Path
 
 
 def load_commission_rules(path: str = "config/commission_rules.yaml") -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    return load_cached_yaml(path)
 
 
 def commission_for(job_type, tech, amount, scheme="percent_50"):
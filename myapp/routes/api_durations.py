@@ -0,0 +1,71 @@
+from flask import Blueprint, jsonify, request
+import pandas as pd
+
+from myapp.etl.build_report_data import build_report_data
+from myapp.finance.durations import duration_overall, duration_stats, load_sla
+from myapp.utils.date_utils import parse_date_flex
+from myapp.utils.jobs_dataset import read_merged_jobs
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+api_durations_bp = Blueprint("api_durations_bp", __name__)
+
+_GROUP_KEYS = {"tech", "job_type"}
+
+
+@api_durations_bp.route("/api/durations", methods=["GET"])
+def get_durations() -> tuple:
+    """
+    Job duration percentiles (p50/p90/p99, minutes) and SLA breaches.
+    Optional query params:
+        - from / to: date range (YYYY-MM-DD), inclusive
+        - by: tech, job_type or "tech,job_type" (default: tech)
+        - tech: only these technicians (repeatable)
+        - path: an uploaded sheet instead of the merged jobs
+    """
+    from_str = request.args.get("from")
+    to_str = request.args.get("to")
+    by = [k.strip() for k in request.args.get("by", "tech").split(",") if k.strip()]
+    techs = request.args.getlist("tech") or None
+    path = request.args.get("path", "").strip()
+
+    if not by or not set(by) <= _GROUP_KEYS:
+        return jsonify({"error": f"'by' must be one or more of {sorted(_GROUP_KEYS)}"}), 400
+    try:
+        date_from = parse_date_flex(from_str) if from_str else None
+        date_to = parse_date_flex(to_str) if to_str else None
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+    if date_to is not None and len(to_str.strip()) == 10:
+        # a bare YYYY-MM-DD includes the whole day
+        date_to = pd.Timestamp(date_to) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    try:
+        if path:
+            df, _ = build_report_data(path, date_from=date_from, date_to=date_to, tech_filter=techs)
+        else:
+            df = read_merged_jobs(date_from=date_from, date_to=date_to, techs=techs)
+    except FileNotFoundError:
+        return jsonify({"error": "No job data available"}), 404
+    except Exception as e:
+        log.exception("❌ Failed to load jobs for duration analytics")
+        return jsonify({"error": str(e)}), 500
+
+    try:
+        stats = duration_stats(df, by, date_from=date_from, date_to=date_to)
+        overall = duration_overall(df, date_from=date_from, date_to=date_to)
+    except KeyError as e:
+        return jsonify({"error": f"Missing column: {e}"}), 422
+    default_minutes, per_type = load_sla()
+
+    return jsonify(
+        {
+            "from": from_str,
+            "to": to_str,
+            "by": by,
+            "sla_minutes": {"default": default_minutes, "job_types": per_type},
+            "overall": overall,
+            "groups": stats.astype(object).where(stats.notna(), None).to_dict(orient="records"),
+        }
+    ), 200
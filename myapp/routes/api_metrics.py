@@ -0,0 +1,15 @@
+from flask import Blueprint, Response
+
+from myapp.utils.pipeline_timing import render_prometheus
+
+api_metrics_bp = Blueprint("api_metrics_bp", __name__)
+
+
+@api_metrics_bp.route("/api/metrics", methods=["GET"])
+def metrics() -> Response:
+    """
+    Per-stage pipeline histograms in Prometheus text format. Summed over
+    all worker processes when PIPELINE_METRICS_DIR is set, otherwise only
+    the answering worker's own.
+    """
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
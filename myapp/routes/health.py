@@ -2,6 +2,7 @@ from flask_smorest import Blueprint
 from flask import jsonify
 from marshmallow import Schema, fields
 from pathlib import Path
+from myapp.services.warmup import get_warmup_state
 
 health_bp = Blueprint('health', __name__, url_prefix='/api')
 
@@ -29,4 +30,23 @@ def health_check():
         "status": "ok",
         "build": get_version(),
         "git": get_git_hash(),
-    }
\ No newline at end of file
+    }
+
+class ReadinessResponseSchema(Schema):
+    status = fields.Str(required=True)
+    mode = fields.Str(required=True)
+    steps = fields.Dict(keys=fields.Str(), values=fields.Str())
+    duration_ms = fields.Float(allow_none=True)
+
+@health_bp.route('/health/ready', methods=['GET'])
+@health_bp.response(200, ReadinessResponseSchema)
+def readiness_check():
+    """מוכן לקבל תעבורה רק לאחר שה-warm-up הסתיים"""
+    state = get_warmup_state()
+    body = {
+        "status": "ready" if state["ready"] else "warming",
+        "mode": state["mode"],
+        "steps": state["steps"],
+        "duration_ms": state["duration_ms"],
+    }
+    return body, (200 if state["ready"] else 503)
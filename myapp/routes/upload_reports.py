@@ -40,6 +40,7 @@ from myapp.utils.file_validator import (
 from myapp.utils.report_utils import create_and_email_report
 from myapp.utils.manifest import load_manifest_as_list
 from myapp.utils.logger_config import get_logger
+from myapp.utils.pipeline_timing import span, timing_run
 
 upload_bp = Blueprint("upload_reports", __name__)
 
@@ -193,21 +194,26 @@ def upload_report() -> Response:
                 continue
 
             try:
-                # load DataFrame
-                df = pd.read_csv(filepath) if filename.lower().endswith(".csv") else pd.read_excel(filepath, engine="openpyxl")
-                log.debug("TYPECHECK: %s in upload_report (df loaded from file)", type(df).__name__)
-
-                # prepare params
-                r_type = Path(filename).stem
-                c_id = session.get("client_id", "default_client")
-
-                # save UX info to session
-                session["last_uploaded_filename"] = filename
-
-                # TODO: wrap this call in a background thread or Celery task in the future
-                report_path = create_and_email_report(
-                    df=df, report_type=r_type, tech_name=session.get("tech_name", "אנונימי"), client_id=c_id
-                )
+                # per-stage timings for this file (also stored in the manifest entry)
+                with timing_run() as run:
+                    # load DataFrame
+                    with span("loading") as load_span:
+                        df = pd.read_csv(filepath) if filename.lower().endswith(".csv") else pd.read_excel(filepath, engine="openpyxl")
+                        load_span.rows_out = len(df)
+                    log.debug("TYPECHECK: %s in upload_report (df loaded from file)", type(df).__name__)
+
+                    # prepare params
+                    r_type = Path(filename).stem
+                    c_id = session.get("client_id", "default_client")
+
+                    # save UX info to session
+                    session["last_uploaded_filename"] = filename
+
+                    # TODO: wrap this call in a background thread or Celery task in the future
+                    report_path = create_and_email_report(
+                        df=df, report_type=r_type, tech_name=session.get("tech_name", "אנונימי"), client_id=c_id
+                    )
+                timings = run.breakdown()
 
                 # save report path to session
                 session["last_report_path"] = str(report_path) if report_path else ""
@@ -229,6 +235,7 @@ def upload_report() -> Response:
                             "rows": meta.get("rows", 0),
                             "report_type": r_type,
                             "client_id": c_id,
+                            "timings": timings,
                             "message": "הדוח נוצר ונשלח בהצלחה",
                         }
                     )
@@ -311,7 +318,7 @@ def upload_report() -> Response:
         log.error(f"[UPLOAD] General error: {e}", exc_info=True)
         return make_response(jsonify({"status": "error", "message": "שגיאה כללית בעיבוד הבקשה", "error": str(e)}), 500)
 
-def process_upload(file_path: Path) -> str:
+def process_upload(file_path: Path, pages_per_volume: int = 0) -> str:
     logger = logging.getLogger(__name__)
     logger.debug("TYPECHECK: %s in process_upload", type(file_path).__name__)
     if not file_path.exists():
@@ -327,7 +334,8 @@ def process_upload(file_path: Path) -> str:
             df=df,
             report_type=file_path.stem,
             tech_name=df["technician"].iloc[0] if "technician" in df.columns else "",
-            client_id=df["company"].iloc[0] if "company" in df.columns else ""
+            client_id=df["company"].iloc[0] if "company" in df.columns else "",
+            pages_per_volume=pages_per_volume,
         )
         logger.info(f"[PROCESS_UPLOAD] Report generated: {report_path}")
         return report_path
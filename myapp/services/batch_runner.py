@@ -0,0 +1,266 @@
+# myapp/services/batch_runner.py
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from myapp.utils.logger_config import get_logger
+from myapp.utils.pipeline_timing import timing_run
+from myapp.utils.scratch import staged_output
+
+log = get_logger(__name__)
+
+# Many upload files turned into reports in one go, on a process pool.
+#
+#   files = discover_inputs("uploads", ["*.csv"])
+#   summary = run_batch(files, workers=4, since="last")    # -> output/batch_summary.json
+#
+# Every worker process is warmed once by the pool initializer (fonts,
+# commission rules, schema config, insight detectors - services/warmup.py -
+# plus the report templates, the upload pipeline's modules and the figure
+# exporter's Kaleido server) and then
+# runs file after file, so the per-file cost is the report itself rather
+# than the imports and cache loads. The largest files are submitted first
+# so one big upload does not finish alone at the end. With workers=1
+# everything runs in this process, in order.
+#
+# Workers write the same shared files. The report manifest, the category
+# dictionary, the job index's Bloom filter and jobs-dataset compaction each
+# hold a file lock for their read-modify-write (utils/file_lock.py), and the
+# SQLite stores take their write lock with BEGIN IMMEDIATE. So any pool size
+# is safe.
+#
+# `since` skips inputs whose report is already up to date. Either way the
+# previous summary must have a successful run for the input whose output is
+# still there; then
+#   "last"      the input is unchanged (same mtime and size)
+#   ISO time    the input was not modified since then
+#
+# The summary records, per input, the outcome, the output path, the wall
+# time, the worker pid and the stage breakdown of the run.
+#
+# With pages_per_volume (run_full_report --pages-per-volume N) long reports
+# are written as volumes of at most N pages, so a huge upload never holds
+# its whole PDF in memory; "output" is then volume 1 and "volumes" lists
+# every part, as catalogued in the report manifest.
+#
+# Env control:
+#   BATCH_WORKERS   default pool size (default: CPU count)
+#   BATCH_SUMMARY   summary file (default: output/batch_summary.json)
+
+DEFAULT_PATTERNS = ("*.csv",)
+DEFAULT_SUMMARY = "output/batch_summary.json"
+
+Runner = Callable[[Path], Any]
+
+
+def default_workers() -> int:
+    return max(1, int(os.getenv("BATCH_WORKERS", "0")) or os.cpu_count() or 1)
+
+
+def summary_path() -> Path:
+    return Path(os.getenv("BATCH_SUMMARY", DEFAULT_SUMMARY))
+
+
+def discover_inputs(root: str | Path, patterns: Sequence[str] = DEFAULT_PATTERNS) -> List[Path]:
+    """Input files under `root` matching any of `patterns`, each once, in name order."""
+    root = Path(root)
+    found = {p.resolve() for pattern in patterns for p in root.glob(pattern) if p.is_file()}
+    return sorted(found)
+
+
+def load_summary(path: Optional[str | Path] = None) -> Dict[str, Any]:
+    path = Path(path) if path else summary_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _stat(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"input_mtime_ns": st.st_mtime_ns, "input_bytes": st.st_size}
+
+
+def _parse_since(since: str) -> float:
+    moment = datetime.fromisoformat(since)
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.timestamp()
+
+
+def up_to_date(path: Path, since: Optional[str], previous: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    The record to carry over when `path` needs no new report under `since`,
+    None when it has to be run.
+    """
+    if not since:
+        return None
+    record = previous.get(str(path))
+    if not (
+        record
+        and record.get("status") in ("ok", "skipped")
+        and record.get("output")
+        and all(os.path.exists(p) for p in [record["output"], *record.get("volumes", [])])
+    ):
+        return None
+    stat = _stat(path)
+    if since == "last":
+        return record if all(record.get(k) == v for k, v in stat.items()) else None
+    if stat["input_mtime_ns"] / 1e9 < _parse_since(since):
+        return record
+    return None
+
+
+def _default_runner(path: Path, pages_per_volume: int = 0) -> Any:
+    from myapp.routes.upload_reports import process_upload
+
+    return process_upload(path, pages_per_volume=pages_per_volume)
+
+
+def report_volumes(output: str | Path) -> List[str]:
+    """Every volume of the report at `output` (its manifest entry), [] for a single file."""
+    from myapp.utils.manifest import load_manifest_as_list
+
+    for entry in reversed(load_manifest_as_list()):
+        if entry.get("path") == str(output):
+            return [v["path"] for v in entry.get("volumes") or []]
+    return []
+
+
+def _warm_report_templates() -> None:
+    from myapp.utils.pdf_templates import get_report_template, report_environment
+
+    for name in report_environment().list_templates(extensions=["html"]):
+        get_report_template(name)
+
+
+def init_worker() -> None:
+    """Pool initializer: load the shared read-only caches once per worker."""
+    from myapp.services.warmup import warm_up
+
+    warm_up()
+    try:
+        _warm_report_templates()
+        # the upload pipeline's modules (pandas I/O, charts, PDF) load on first import
+        import myapp.routes.upload_reports  # noqa: F401
+        from myapp.utils.figure_export import get_figure_exporter
+
+        get_figure_exporter().warm()  # this worker's Kaleido server, if that is the backend
+    except Exception as e:
+        log.warning("Batch worker warm-up incomplete: %s", e)
+
+
+def run_one(path: Path, runner: Optional[Runner] = None) -> Dict[str, Any]:
+    """Run one input and describe the outcome (never raises)."""
+    runner = runner or _default_runner
+    record: Dict[str, Any] = {"input": str(path), **_stat(path), "pid": os.getpid()}
+    started = time.perf_counter()
+    with timing_run() as run:
+        try:
+            output = runner(path)
+            record.update(status="ok", output=str(output) if output else None)
+            volumes = report_volumes(output) if output else []
+            if volumes:
+                record["volumes"] = volumes
+        except Exception as e:
+            log.exception("❌ Batch input failed: %s", path)
+            record.update(status="error", output=None, error=f"{type(e).__name__}: {e}")
+    record["duration_s"] = round(time.perf_counter() - started, 3)
+    record["stages"] = run.breakdown()
+    return record
+
+
+def _write_summary(summary: Dict[str, Any], path: Path) -> None:
+    with staged_output(path) as staged:
+        staged.write_text(json.dumps(summary, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+
+
+def run_batch(
+    files: Iterable[str | Path],
+    *,
+    workers: Optional[int] = None,
+    since: Optional[str] = None,
+    runner: Optional[Runner] = None,
+    summary_file: Optional[str | Path] = None,
+    pages_per_volume: int = 0,
+) -> Dict[str, Any]:
+    """
+    Turn every input in `files` into a report and write the JSON summary.
+    `runner(path)` makes one report (default: the upload pipeline's
+    process_upload) and must be importable by the worker processes; with
+    `pages_per_volume` > 0 it is called as runner(path, pages_per_volume=N).
+    """
+    workers = workers or default_workers()
+    if pages_per_volume > 0:
+        runner = partial(runner or _default_runner, pages_per_volume=pages_per_volume)
+    summary_file = Path(summary_file) if summary_file else summary_path()
+    previous = {r["input"]: r for r in load_summary(summary_file).get("files", []) if "input" in r}
+
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    records: Dict[str, Dict[str, Any]] = {}
+    todo: List[Path] = []
+    for path in (Path(f).resolve() for f in files):
+        carried = up_to_date(path, since, previous)
+        if carried is not None:
+            records[str(path)] = {"input": str(path), **_stat(path), "status": "skipped", "output": carried.get("output")}
+            if carried.get("volumes"):
+                records[str(path)]["volumes"] = carried["volumes"]
+        else:
+            todo.append(path)
+    # biggest first, so the pool is not left waiting on one large file at the end
+    todo.sort(key=lambda p: p.stat().st_size, reverse=True)
+    log.info("🗂️ Batch: %d input(s) to run, %d up to date, %d worker(s)", len(todo), len(records), workers)
+
+    if workers == 1 or len(todo) <= 1:
+        if todo:
+            init_worker()
+        for path in todo:
+            records[str(path)] = run_one(path, runner)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo)), initializer=init_worker) as pool:
+            futures = {pool.submit(run_one, path, runner): path for path in todo}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    records[str(path)] = future.result()
+                except Exception as e:  # the worker itself died
+                    log.error("❌ Batch worker failed on %s: %s", path, e)
+                    records[str(path)] = {"input": str(path), "status": "error", "output": None, "error": repr(e)}
+                log.info("📄 %s → %s", path.name, records[str(path)]["status"])
+
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    for record in records.values():
+        counts[record["status"]] += 1
+    summary = {
+        "started_at": started_at.isoformat().replace("+00:00", "Z"),
+        "duration_s": round(time.perf_counter() - started, 3),
+        "workers": workers,
+        "since": since,
+        "counts": counts,
+        "files": [records[k] for k in sorted(records)],
+    }
+    _write_summary(summary, summary_file)
+    log.info("✅ Batch done in %.1f s: %s → %s", summary["duration_s"], counts, summary_file)
+    return summary
+
+
+__all__ = [
+    "discover_inputs",
+    "run_batch",
+    "run_one",
+    "report_volumes",
+    "init_worker",
+    "up_to_date",
+    "load_summary",
+    "default_workers",
+    "DEFAULT_PATTERNS",
+]
@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 import smtplib
 from email.message import EmailMessage
 from myapp.utils.logger_config import get_logger
+from myapp.utils.pipeline_timing import timed
 
 load_dotenv()
 
@@ -15,6 +16,7 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
 log = get_logger(__name__)
 
 
+@timed("email")
 def send_report_by_email(
     to_email: str,
     subject: str,
@@ -1,15 +1,17 @@
 import os
 import pandas as pd
 import plotly.express as px
-import plotly.io as pio
 from datetime import datetime
 from fpdf import FPDF
 from fpdf.enums import XPos, YPos
+from io import BytesIO
 import logging
 from pathlib import Path
 from typing import Optional, Dict, Any
 from myapp.utils.logger_config import get_logger
 from myapp.config_shortcuts import EXPORT_DIR
+from myapp.utils.figure_export import get_figure_exporter
+from myapp.utils.scratch import staged_output
 
 log = get_logger(__name__)
 
@@ -37,6 +39,8 @@ class PDFReportExporter:
     -------
     generate_plot_image(image_path)
         Creates a Plotly histogram, saves it as a PNG image.
+    plot_image_bytes() -> bytes
+        The same histogram as PNG bytes (embedded in the PDF from memory).
     export(filename: str = None) -> str
         Builds the PDF with header, date, image, and table. Returns the PDF filename.
     export_overview(kpi: dict, summary: dict, df: pd.DataFrame, output_path: Path)
@@ -57,15 +61,23 @@ class PDFReportExporter:
             self.filename = f"{title.replace(' ', '_')}.pdf"
             self.full_path = str(self.export_dir / self.filename)
 
-    def generate_plot_image(self, image_path: str) -> None:
-        """Generate a histogram plot image using Plotly."""
-        fig = px.histogram(
+    def _plot_figure(self):
+        return px.histogram(
             self.df,
             x="tech",
             title="Technician Job Distribution",
             labels={"tech": "Technician", "count": "Count of Reports"},
         )
-        pio.write_image(fig, image_path, format="png", scale=2)
+
+    def generate_plot_image(self, image_path: str) -> None:
+        """Generate a histogram plot image using Plotly."""
+        Path(image_path).write_bytes(self.plot_image_bytes())
+
+    def plot_image_bytes(self) -> bytes:
+        """The histogram as PNG bytes, without touching the disk."""
+        # the shared exporter keeps one Kaleido browser per worker (or redraws
+        # the histogram with matplotlib when Chrome is not installed)
+        return get_figure_exporter().to_png(self._plot_figure(), scale=2)
 
     def export(self, filename: Optional[str] = None) -> str:
         """
@@ -96,15 +108,10 @@ class PDFReportExporter:
             new_y=YPos.NEXT,
         )
 
-        # Generate the Plotly histogram image
-        image_path = str(Path(self.full_path).with_suffix(".png"))
-        self.generate_plot_image(image_path)
-
-        # Insert the image into the PDF
+        # Generate the Plotly histogram image and insert it from memory
+        # (no PNG next to the PDF that a concurrent export could clobber)
         # w=180 to make it nicely wide on A4, respecting margins
-        pdf.image(image_path, w=180)
-        # Remove the PNG file after insertion
-        os.remove(image_path)
+        pdf.image(BytesIO(self.plot_image_bytes()), w=180)
 
         # Table heading
         pdf.ln(5)  # a bit of vertical spacing before the table
@@ -137,8 +144,9 @@ class PDFReportExporter:
                     0, 5, text="[render error]", new_x=XPos.LMARGIN, new_y=YPos.NEXT
                 )
 
-        # Save the final PDF
-        pdf.output(self.full_path)
+        # Save the final PDF (staged, renamed into place when complete)
+        with staged_output(self.full_path) as staged_pdf:
+            pdf.output(str(staged_pdf))
 
         # Log the file size after saving
         log.info(
@@ -243,7 +251,8 @@ class PDFReportExporter:
                     0, 5, text="[render error]", new_x=XPos.LMARGIN, new_y=YPos.NEXT
                 )
         # Save the PDF
-        pdf.output(str(output_path))
+        with staged_output(output_path) as staged_pdf:
+            pdf.output(str(staged_pdf))
         log.info(
             f"📁 Overview PDF saved: {output_path} | Size: {output_path.stat().st_size} bytes"
         )
@@ -1,19 +1,29 @@
 from myapp.utils.logger_config import get_logger
 from myapp.utils.manifest import add_report_to_manifest
 from myapp.utils.report_validation import validate_report_integrity
-from myapp.utils.chart_utils import save_income_chart
+from myapp.utils.report_metrics import compute_report_metrics, pdf_checksum
+from myapp.utils import render_memo
+from myapp.utils.chart_utils import income_chart_png
+from myapp.utils.chart_service import get_chart_service
+from myapp.utils.df_diagnostics import log_df
+from myapp.utils.pipeline_timing import span
+from myapp.utils.scratch import staged_output
+from myapp.services.table_layout import plan_table_layout
 from myapp.utils.dataframe_utils import append_totals_row, format_currency_columns, enrich, format_report_columns, coerce_dates, enrich_financials
 from pandas import DataFrame, Series
 import logging
 
 log = logging.getLogger(__name__)
+import hashlib
 import os
+import uuid
 from datetime import datetime
-from typing import List, Optional, Any
+from io import BytesIO
+from typing import List, Optional, Any, Tuple
 import pandas as pd
 from pathlib import Path
-import matplotlib.pyplot as plt
 from myapp.finance.insights.engine import InsightsEngine
+from myapp.finance.aggregation import summary_cube
 from myapp.tasks.task_engine import create_action_item
 
 # אם אין לך כבר:
@@ -31,9 +41,18 @@ MAX_COLS_PORTRAIT = 8
 LOGO_DEFAULT_WIDTH = 30  # מ"מ
 PAGE_MARGIN = 10  # מ"מ שול
 PAGE_BOTTOM_MARGIN = 15  # שול תחתון ברירת מחדל
-LONG_COLUMN_FACTOR = 1.5  # כמה עמודות 'ארוכות' יקבלו יותר מקום
 MAX_COLS_PER_TABLE = 15
 
+# Volume mode (generate_pdf_report(pages_per_volume=N), only for callers that
+# handle the list of files, e.g. run_full_report --pages-per-volume): huge
+# detailed reports are written as several files of at most N pages each, one
+# FPDF in memory at a time
+MERGE_VOLUMES = os.getenv("PDF_MERGE_VOLUMES", "0") == "1"
+REPORT_FONT = ("DejaVu", "static/fonts/DejaVuSans.ttf")
+# Bump when the detailed report's layout changes, so memoized renders
+# (utils/render_memo.py) of the old layout are not handed out again
+PDF_LAYOUT_VERSION = 2
+
 MIN_PDF_SIZE_BYTES = 10_000  # 10 KB
 MIN_DATA_ROWS = 1            # excluding totals row
 MIN_TOTAL_SUM = 0.01         # strictly positive
@@ -76,30 +95,6 @@ def _add_logo(
         pdf.set_xy(PAGE_MARGIN, 15)
 
 
-def _calculate_col_widths(
-    columns: list[str], total_width: float, max_cols: int
-) -> list[float]:
-    """
-    מחשבת את רוחב כל עמודה בהתאם לאורך שם העמודה/תוכן.
-    אם סה"כ הרוחב חורג מהעמוד, נעשה scale down.
-    """
-    base_width = total_width / max_cols
-    col_widths = []
-    for col in columns:
-        # בדיקה גסה אם זה עמודה 'ארוכה'
-        if len(col) > 12 or col.lower() in {"description", "remarks", "notes"}:
-            col_widths.append(base_width * LONG_COLUMN_FACTOR)
-        else:
-            col_widths.append(base_width)
-
-    total = sum(col_widths)
-    if total > total_width:
-        scale = total_width / total
-        col_widths = [w * scale for w in col_widths]
-
-    return col_widths
-
-
 def _print_table_header(pdf: FPDF, columns: list[str], col_widths: list[float], font_name: str) -> None:
     """
     מדפיס כותרת טבלה (שורת ה-Header) בפונט מודגש, עם גבולות.
@@ -186,32 +181,181 @@ def _print_full_table(pdf: FPDF, df: pd.DataFrame, col_widths: list[float], font
         start = next_start
 
 
-def _split_columns_if_needed(df: pd.DataFrame) -> list[pd.DataFrame]:
+def _register_report_font(pdf: FPDF) -> str:
+    family, path = REPORT_FONT
+    pdf.add_font(family, '', path, uni=True)
+    return family
+
+
+def volume_path(output_path: str | Path, number: int) -> Path:
+    """<stem>_vol001.pdf next to the requested output path."""
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}_vol{number:03d}{output_path.suffix}")
+
+
+class _VolumeWriter:
     """
-    אופציונלי: מחלק DataFrame לעוד DataFrames אם יש המון עמודות (נגיד מעל 15).
-    כל מקטע יקבל עד MAX_COLS_PER_TABLE עמודות.
-    מחזיר רשימה של DataFrame-ים מפוצלים.
+    Lays a report out across volumes of at most `pages_per_volume` pages.
+    Each full volume is written out and dropped before the next FPDF is
+    started, so only one volume's pages are ever held in memory.
     """
-    all_cols = list(df.columns)
-    if len(all_cols) <= MAX_COLS_PER_TABLE:
-        return [df]
 
-    # פיצול
-    chunks = []
-    for i in range(0, len(all_cols), MAX_COLS_PER_TABLE):
-        cols_chunk = all_cols[i : i + MAX_COLS_PER_TABLE]
-        chunk_df = df[cols_chunk].copy()
-        chunks.append(chunk_df)
-    return chunks
+    def __init__(
+        self,
+        output_path: str | Path,
+        pages_per_volume: int,
+        orientation: str,
+        title: str,
+        client_id: Optional[str] = None,
+        creation_date: Optional[datetime] = None,
+    ) -> None:
+        self.output_path = Path(output_path)
+        self.creation_date = creation_date
+        self.client_id = client_id
+        self.pages_per_volume = max(1, pages_per_volume)
+        self.orientation = orientation
+        self.title = title
+        self.volumes: List[Path] = []
+        self.pages: List[int] = []
+        self.checksums: List[str] = []
+        self.sizes: List[int] = []
+        # running checksum over every volume, in order, taken before each is written
+        self.digest = hashlib.sha256()
+        self.pdf = self._start()
+
+    def _start(self) -> FPDF:
+        pdf = FPDF(orientation=self.orientation, unit="mm", format="A4")
+        if self.creation_date:
+            pdf.set_creation_date(self.creation_date)
+        pdf.set_auto_page_break(auto=False)
+        self.font = _register_report_font(pdf)
+        pdf.add_page()
+        if self.client_id and not self.volumes:
+            _add_logo(pdf, self.client_id)
+        else:
+            pdf.set_xy(PAGE_MARGIN, 15)
+        pdf.set_font(self.font, '', 16)
+        suffix = f" - volume {len(self.volumes) + 1}" if self.volumes else ""
+        pdf.cell(0, 15, f"{self.title}{suffix}", ln=True, align="C")
+        pdf.ln(5)
+        return pdf
+
+    def _flush(self, path: Path) -> None:
+        data = bytes(self.pdf.output())
+        with staged_output(path) as staged_pdf:
+            staged_pdf.write_bytes(data)
+        self.digest.update(data)
+        self.checksums.append(pdf_checksum(data))
+        self.sizes.append(len(data))
+        self.volumes.append(path)
+        self.pages.append(self.pdf.page)
+        log.debug("📚 Volume %d written: %s (%d pages)", len(self.volumes), path, self.pdf.page)
+        self.pdf = None
+
+    def new_page(self) -> FPDF:
+        if self.pdf.page >= self.pages_per_volume:
+            self._flush(volume_path(self.output_path, len(self.volumes) + 1))
+            self.pdf = self._start()
+        else:
+            self.pdf.add_page()
+            self.pdf.set_xy(PAGE_MARGIN, 15)
+        return self.pdf
+
+    def table(self, df: pd.DataFrame, col_widths: list[float], heading: Optional[str] = None) -> None:
+        line_height = 8
+        columns = list(df.columns)
+        pdf = self.pdf
+        if heading:
+            pdf.set_font(self.font, '', 14)
+            pdf.cell(0, 10, heading, ln=True, align="L")
+            pdf.ln(5)
+        _print_table_header(pdf, columns, col_widths, font_name=self.font)
+        page_height_limit = pdf.h - PAGE_BOTTOM_MARGIN
+        for values in df.itertuples(index=False, name=None):
+            if pdf.get_y() + line_height * 2 > page_height_limit:
+                pdf = self.new_page()
+                _print_table_header(pdf, columns, col_widths, font_name=self.font)
+            _print_single_row(pdf, dict(zip(columns, values)), columns, col_widths, line_height, self.font)
+
+    def close(self) -> List[Path]:
+        """Write the last volume; a report that fit in one volume keeps the plain output name."""
+        self._flush(volume_path(self.output_path, len(self.volumes) + 1) if self.volumes else self.output_path)
+        return self.volumes
+
+
+def volume_entries(writer: _VolumeWriter) -> List[dict]:
+    """Manifest records for the volumes of one report."""
+    return [
+        {"volume": i, "filename": path.name, "path": str(path), "pages": n_pages, "bytes": size, "sha256": checksum}
+        for i, (path, n_pages, size, checksum) in enumerate(
+            zip(writer.volumes, writer.pages, writer.sizes, writer.checksums), start=1
+        )
+    ]
+
+
+def merge_volumes(volumes: List[Path], output_path: str | Path) -> Optional[Tuple[str, int]]:
+    """
+    Concatenate the volumes into one PDF at output_path (pypdf, see
+    requirements.txt) and return its (sha256, size); returns None and keeps
+    the volumes when pypdf is missing. pypdf streams the pages into the
+    staged file, but it holds every volume's page objects while merging, so
+    a merged report gives up the one-volume memory bound.
+    """
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        log.warning("⚠️ pypdf not installed – keeping %d separate volumes", len(volumes))
+        return None
+    writer = PdfWriter()
+    for path in volumes:
+        writer.append(str(path))
+    digest = hashlib.sha256()
+    with staged_output(output_path) as staged_pdf:
+        writer.write(str(staged_pdf))
+        writer.close()
+        with open(staged_pdf, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        size = staged_pdf.stat().st_size
+    return digest.hexdigest(), size
+
+
+def _write_volumes(
+    df_for_pdf: pd.DataFrame,
+    output_path: str,
+    *,
+    pages_per_volume: int,
+    orientation: str,
+    title: str,
+    chart_png: Optional[bytes],
+    client_id: Optional[str] = None,
+    creation_date: Optional[datetime] = None,
+) -> _VolumeWriter:
+    writer = _VolumeWriter(output_path, pages_per_volume, orientation, title, client_id, creation_date)
+    layout = plan_table_layout(
+        writer.pdf, df_for_pdf, writer.pdf.w - 2 * PAGE_MARGIN, font=writer.font, max_cols_per_table=MAX_COLS_PER_TABLE
+    )
+    for idx, (columns, col_widths) in enumerate(layout.groups):
+        if idx > 0:
+            writer.new_page()
+        writer.table(df_for_pdf[columns], col_widths, heading=f"Table {idx+1}" if idx > 0 else None)
+    if chart_png:
+        pdf = writer.new_page()
+        pdf.set_font(writer.font, '', 14)
+        pdf.cell(0, 10, "Daily Income Chart", ln=True, align="C")
+        pdf.ln(5)
+        pdf.image(BytesIO(chart_png), w=180)
+    writer.close()
+    return writer
 
 
 def _prepare_pdf_dataframe(df: pd.DataFrame, format_columns: bool | list[str] = True) -> pd.DataFrame:
-    log.debug(f"[PREPARE] Columns at start: {df.columns.tolist()}")
+    log_df(log, "[PREPARE] at start", df)
 
     # 1. המרת תאריכים
     date_cols = [c for c in ("date","closed") if c in df.columns]
     if date_cols:
-        log.debug(f"[PREPARE] Coercing date cols {date_cols}")
+        log.debug("[PREPARE] Coercing date cols %s", date_cols)
         df = coerce_dates(df, date_cols)
 
     # 2. חישובי פיננסים: מתווים net_income, tech_cut, company_net, duration_min, flags
@@ -224,10 +368,10 @@ def _prepare_pdf_dataframe(df: pd.DataFrame, format_columns: bool | list[str] =
 
     # 4. עיצוב עמודות כספיות
     if format_columns:
-        log.debug(f"[PREPARE] Formatting currency columns {format_columns}")
+        log.debug("[PREPARE] Formatting currency columns %s", format_columns)
         df = format_currency_columns(df, format_columns)
 
-    log.debug(f"[PREPARE] Columns at end: {df.columns.tolist()}")
+    log_df(log, "[PREPARE] at end", df)
     return df
 
 
@@ -255,8 +399,34 @@ def generate_pdf_report(
     format_columns: list[str] | None = None,
     ensure_enriched: bool = True,
     share: float = 0.5,
+    pages_per_volume: int = 0,
+    merge: Optional[bool] = None,
+    deterministic: Optional[bool] = None,
+    memo: Optional[bool] = None,
 ) -> str:
-    log.debug(f"[TYPECHECK] {__name__}.generate_pdf_report → got {type(df).__name__} with shape {getattr(df, 'shape', 'N/A')}")
+    """
+    Detailed report PDF. With `pages_per_volume` > 0 the document is written
+    as volumes of at most that many pages, <name>_vol001.pdf, ..., each built
+    and written before the next starts; `merge` (default $PDF_MERGE_VOLUMES)
+    concatenates them into output_path afterwards. The manifest records every
+    volume under one report_id. Returns the report path - the first volume
+    when unmerged, so only pass pages_per_volume when you take the other
+    volumes from the manifest entry.
+
+    With `memo` (default $RENDER_MEMO) a report already catalogued for the
+    same prepared data and options is returned (copied to output_path if
+    one was asked for) instead of being rendered again. `deterministic`
+    (default $PDF_DETERMINISTIC) pins the PDF creation date and derives the
+    default file name and report_id from the input hash, so the same input
+    gives a byte-identical file.
+    """
+    if merge is None:
+        merge = MERGE_VOLUMES
+    if deterministic is None:
+        deterministic = render_memo.PDF_DETERMINISTIC
+    if memo is None:
+        memo = render_memo.RENDER_MEMO
+    log.debug("[TYPECHECK] %s.generate_pdf_report → got %s with shape %s", __name__, type(df).__name__, getattr(df, "shape", "N/A"))
     log.info("🚀 Starting generate_pdf_report stage")
     try:
         if not isinstance(df, DataFrame):
@@ -270,13 +440,37 @@ def generate_pdf_report(
         if ensure_enriched and "tech_profit" not in df.columns:
             df = enrich(df, share=share)
         df_for_pdf = _prepare_pdf_dataframe(df, format_columns=format_columns)
+        # concat (totals row) drops attrs; keep the upload annotations for the manifest
+        df_for_pdf.attrs.update(df.attrs)
         # הגנה: ודא שיש לפחות 2 שורות אמיתיות (לא רק totals)
         if df_for_pdf.empty or df_for_pdf["job_id"].nunique() <= 1:
-            log.debug("🧾 df_for_pdf.head():\n%s", df_for_pdf.head().to_string())
+            log_df(log, "🧾 df_for_pdf", df_for_pdf, head=5)
             raise ValueError("Generated PDF will be empty – skipping")
+        # rows and total counted once; validation and the manifest reuse them
+        metrics = compute_report_metrics(df_for_pdf)
+        logo_path = _find_logo_path(extra["client_id"]) if extra.get("client_id") else None
+        input_hash = render_memo.render_key(
+            df_for_pdf,
+            version=PDF_LAYOUT_VERSION,
+            report_type=report_type,
+            title=title,
+            extra=extra,
+            pages_per_volume=pages_per_volume,
+            merge=merge,
+            logo=(logo_path, os.path.getmtime(logo_path)) if logo_path else None,
+        )
+        if memo:
+            entry = render_memo.find_rendered(input_hash)
+            reused = render_memo.reuse_rendered(entry, output_path) if entry else None
+            if reused:
+                log.info("♻️ Render memo hit %s… → %s", input_hash[:12], reused)
+                return str(reused)
+        creation_date = render_memo.DETERMINISTIC_CREATION_DATE if deterministic else None
         # הכנת גרף הכנסות יומי לשילוב בדוח
+        # (PNG bytes from the chart service, embedded from memory: no chart
+        # file is written next to the report, identical charts render once)
+        chart_png = None
         try:
-            chart_path = Path("output/temp/daily_income_chart.png")
             df_for_chart = df_for_pdf.copy()
             if "date" not in df_for_chart.columns:
                 log.warning("No 'date' column found – inserting today's date for chart")
@@ -289,97 +483,132 @@ def generate_pdf_report(
                 .rename(columns={"total": "income"})
             )
             try:
-                df_for_chart["income"] = df_for_chart["income"].astype(str)
-                save_income_chart(df_for_chart, chart_path)
+                chart_png = income_chart_png(df_for_chart)
             except Exception as e:
                 log.warning(f"⚠️ Failed to generate daily income chart: {e}")
         except Exception as e:
             log.warning("Failed to generate daily income chart: %s", e)
-            chart_path = None
+            chart_png = None
         if df_for_pdf.empty:
             raise PDFReportError("DataFrame ריק - אין נתונים ליצירת דוח.")
-        n_cols = len(df_for_pdf.columns)
-        orientation = "P"
-        max_cols = MAX_COLS_PORTRAIT
-        if n_cols > MAX_COLS_PORTRAIT:
-            orientation = "L"
-            max_cols = n_cols
-        if output_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            os.makedirs(OUTPUT_DIR, exist_ok=True)
-            output_path = os.path.join(OUTPUT_DIR, f"{report_type}_report_{timestamp}.pdf")
-        pdf = FPDF(orientation=orientation, unit="mm", format="A4")
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=False)
-        # --- פונט Unicode ---
-        pdf.add_font('DejaVu', '', 'static/fonts/DejaVuSans.ttf', uni=True)
-        pdf.set_font('DejaVu', '', 14)
-        log.debug("PDF FONT: %s loaded from %s", pdf.font_family, 'static/fonts/DejaVuSans.ttf')
-        client_id = extra.get("client_id")
-        if client_id:
-            _add_logo(pdf, client_id)
-        else:
-            pdf.set_xy(PAGE_MARGIN, 15)
-        if not title:
-            title = f"{report_type.capitalize()} Report"
-        pdf.set_font('DejaVu', '', 16)
-        pdf.cell(0, 15, title, ln=True, align="C")
-        pdf.ln(5)
-        df_chunks = _split_columns_if_needed(df_for_pdf)
-        for idx, chunk_df in enumerate(df_chunks):
-            if idx > 0:
+        with span("pdf_layout", rows_in=len(df_for_pdf)) as layout_span:
+            n_cols = len(df_for_pdf.columns)
+            orientation = "P"
+            if n_cols > MAX_COLS_PORTRAIT:
+                orientation = "L"
+            if output_path is None:
+                os.makedirs(OUTPUT_DIR, exist_ok=True)
+                if deterministic:
+                    output_path = os.path.join(OUTPUT_DIR, f"{report_type}_report_{input_hash[:16]}.pdf")
+                else:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    # the suffix keeps two reports started in the same second apart
+                    output_path = os.path.join(OUTPUT_DIR, f"{report_type}_report_{timestamp}_{uuid.uuid4().hex[:6]}.pdf")
+            client_id = extra.get("client_id")
+            if not title:
+                title = f"{report_type.capitalize()} Report"
+            report_path = Path(output_path)
+            volumes: List[dict] | None = None
+            if pages_per_volume > 0:
+                # bounded memory: one volume of pages in FPDF at a time
+                writer = _write_volumes(
+                    df_for_pdf,
+                    output_path,
+                    pages_per_volume=pages_per_volume,
+                    orientation=orientation,
+                    title=title,
+                    chart_png=chart_png,
+                    client_id=client_id,
+                    creation_date=creation_date,
+                )
+                report_path = writer.volumes[0]
+                metrics = metrics.rendered(writer.digest.hexdigest(), sum(writer.sizes))
+                merged = merge and len(writer.volumes) > 1 and merge_volumes(writer.volumes, output_path)
+                if merged:
+                    for path in writer.volumes:
+                        path.unlink(missing_ok=True)
+                    report_path = Path(output_path)
+                    metrics = metrics.rendered(*merged)
+                elif len(writer.volumes) > 1:
+                    volumes = volume_entries(writer)
+                log.info("📚 %d volume(s) written for %s", len(volumes or [report_path]), output_path)
+            else:
+                pdf = FPDF(orientation=orientation, unit="mm", format="A4")
+                if creation_date:
+                    pdf.set_creation_date(creation_date)
                 pdf.add_page()
-                pdf.set_xy(PAGE_MARGIN, 15)
+                pdf.set_auto_page_break(auto=False)
+                # --- פונט Unicode ---
+                pdf.add_font('DejaVu', '', 'static/fonts/DejaVuSans.ttf', uni=True)
                 pdf.set_font('DejaVu', '', 14)
-                pdf.cell(0, 10, f"Table {idx+1}", ln=True, align="L")
+                log.debug("PDF FONT: %s loaded from %s", pdf.font_family, 'static/fonts/DejaVuSans.ttf')
+                if client_id:
+                    _add_logo(pdf, client_id)
+                else:
+                    pdf.set_xy(PAGE_MARGIN, 15)
+                pdf.set_font('DejaVu', '', 16)
+                pdf.cell(0, 15, title, ln=True, align="C")
                 pdf.ln(5)
-            printable_width = pdf.w - 2 * PAGE_MARGIN
-            columns = list(chunk_df.columns)
-            col_widths = _calculate_col_widths(columns, printable_width, max_cols)
-            _print_table_header(pdf, columns, col_widths, font_name='DejaVu')
-            _print_full_table(pdf, chunk_df, col_widths, font_name='DejaVu')
-        # --- Embed daily income chart if generated ---
-        if chart_path and chart_path.is_file():
-            pdf.add_page()
-            pdf.set_font('DejaVu', '', 14)
-            pdf.cell(0, 10, "Daily Income Chart", ln=True, align="C")
-            pdf.ln(5)
-            pdf.image(str(chart_path), w=180)
-        pdf.output(output_path)
+                # column groups and widths measured from the cell contents
+                layout = plan_table_layout(
+                    pdf, df_for_pdf, pdf.w - 2 * PAGE_MARGIN, font='DejaVu', max_cols_per_table=MAX_COLS_PER_TABLE
+                )
+                for idx, (columns, col_widths) in enumerate(layout.groups):
+                    chunk_df = df_for_pdf[columns]
+                    if idx > 0:
+                        pdf.add_page()
+                        pdf.set_xy(PAGE_MARGIN, 15)
+                        pdf.set_font('DejaVu', '', 14)
+                        pdf.cell(0, 10, f"Table {idx+1}", ln=True, align="L")
+                        pdf.ln(5)
+                    _print_table_header(pdf, columns, col_widths, font_name='DejaVu')
+                    _print_full_table(pdf, chunk_df, col_widths, font_name='DejaVu')
+                # --- Embed daily income chart if generated ---
+                if chart_png:
+                    pdf.add_page()
+                    pdf.set_font('DejaVu', '', 14)
+                    pdf.cell(0, 10, "Daily Income Chart", ln=True, align="C")
+                    pdf.ln(5)
+                    pdf.image(BytesIO(chart_png), w=180)
+                # written in this run's scratch dir, renamed into place when complete;
+                # checksummed from memory so nothing reads the file back
+                data = bytes(pdf.output())
+                with staged_output(output_path) as staged_pdf:
+                    staged_pdf.write_bytes(data)
+                metrics = metrics.rendered(pdf_checksum(data), len(data))
+            layout_span.rows_out = len(df_for_pdf)
         # Debug info before integrity check
-        log.debug("🧾 בדיקה אחרונה לפני validate: columns=%s, rows=%d", df_for_pdf.columns.tolist(), len(df_for_pdf))
+        log_df(log, "🧾 בדיקה אחרונה לפני validate", df_for_pdf)
         try:
-            log.debug("🧪 PDF file size: %s bytes", Path(output_path).stat().st_size)
+            log.debug("🧪 PDF file size: %s bytes", report_path.stat().st_size)
         except Exception as e:
             log.debug("🧪 Could not get PDF file size: %s", e)
-        log.debug("🧪 PDF saved to: %s", output_path)
-        log.debug("🧪 Columns in df_for_pdf: %s", df_for_pdf.columns.tolist())
-        log.debug("🧪 Rows in df_for_pdf: %s", len(df_for_pdf))
+        log.debug("🧪 PDF saved to: %s", report_path)
         # --- Validate report integrity ---
-        validate_report_integrity(Path(output_path), df_for_pdf)
+        validate_report_integrity(report_path, df_for_pdf, metrics=metrics)
         # --- Add to manifest ---
         if not isinstance(df_for_pdf, pd.DataFrame):
             raise TypeError(f"❌ df passed to manifest is {type(df_for_pdf)}, expected DataFrame")
         tech_name = extract_tech_name(df)
         if not tech_name:
             tech_name = extra.get("tech_name", "")
-        log.info(f"📦 PDF Generator: df_for_pdf type = {type(df_for_pdf)}, columns = {getattr(df_for_pdf, 'columns', 'אין')}")
-        print(f"⚠️ DEBUG df_for_pdf type = {type(df_for_pdf)}")
         add_report_to_manifest(
             df=df_for_pdf,
-            report_path=output_path,
-            created_at=datetime.utcnow().isoformat(),
+            report_path=report_path,
             client_id=extra.get("client_id", "unknown"),
             tech_name=extra.get("tech_name", "unknown"),
             report_type=report_type,
+            report_id=input_hash[:32] if deterministic else uuid.uuid4().hex,
+            volumes=volumes,
+            metrics=metrics,
+            input_hash=input_hash,
         )
-        log.info(f"[📄 Manifest] Saved entry for {report_type} → {output_path}")
-        log.info(f"✅ generate_pdf_report complete → {df.shape}")
-        return output_path
+        log.info("[📄 Manifest] Saved entry for %s → %s", report_type, report_path)
+        log.info("✅ generate_pdf_report complete → %s", df.shape)
+        return str(report_path)
     except Exception as e:
-        log.exception(f"[ERROR] Failed inside generate_pdf_report – {e}")
-        log.debug(f"[DF] Columns: {getattr(df, 'columns', [])}")
-        log.debug(f"[DF] Head:\n{getattr(df, 'head', lambda x=3: 'N/A')(3)}")
+        log.exception("[ERROR] Failed inside generate_pdf_report – %s", e)
+        log_df(log, "[DF]", df, head=3)
         raise
 
 
@@ -456,37 +685,38 @@ def generate_cfo_report(
                     )
             pdf.set_text_color(0, 0, 0)
 
-    # Save charts temporarily and embed
-    charts_dir = Path("output/charts")
-    charts_dir.mkdir(parents=True, exist_ok=True)
+    # Charts come from the chart service cache (rendered once per distinct data)
+    # and are embedded from memory
+    charts = get_chart_service()
 
     def plot_and_embed(
-        df: pd.DataFrame, x: str, y: str, chart_title: str, filename: str
+        df: pd.DataFrame, x: str, y: str, chart_title: str
     ) -> None:
-        plt.figure(figsize=(6, 3))
-        plt.bar(df[x], df[y])
-        plt.xticks(rotation=45)
-        plt.title(chart_title)
-        path = charts_dir / filename
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-        pdf.image(str(path), w=180)
+        labels = df[x].dt.strftime("%Y-%m-%d") if pd.api.types.is_datetime64_any_dtype(df[x]) else df[x]
+        png = charts.render(
+            "bar", labels, pd.to_numeric(df[y], errors="coerce").fillna(0.0),
+            title=chart_title, figsize=(6, 3), rotation=45,
+        )
+        pdf.image(BytesIO(png), w=180)
         pdf.ln(5)
 
-    if "daily" in summary_dict:
-        daily_df = summary_dict["daily"]
+    daily_df = summary_dict.get("daily")
+    if detail_df is not None and (daily_df is None or "net_income" not in daily_df.columns):
+        # summarise() only keeps jobs/income per day; net income and tax come
+        # from the same grouped pass over the detail rows
+        daily_df = summary_cube(detail_df).daily()
+
+    if daily_df is not None:
         if "net_income" in daily_df.columns:
             plot_and_embed(
                 daily_df,
                 "date",
                 "net_income",
                 "Daily Net Income",
-                "net_income_chart.png",
             )
         if "tax_collected" in daily_df.columns:
             plot_and_embed(
-                daily_df, "date", "tax_collected", "Daily Tax", "tax_chart.png"
+                daily_df, "date", "tax_collected", "Daily Tax"
             )
 
     if "flags" in summary_dict:
@@ -494,17 +724,12 @@ def generate_cfo_report(
         if not flag_df.empty and "flag_type" in flag_df.columns:
             counts = flag_df["flag_type"].value_counts().reset_index()
             counts.columns = ["flag", "count"]
-            plt.figure(figsize=(4, 4))
-            plt.pie(
-                counts["count"],
-                labels=counts["flag"],
-                autopct="%1.1f%%",
-                startangle=140,
+            png = charts.render(
+                "pie", counts["flag"], counts["count"],
+                figsize=(4, 4), autopct="%1.1f%%", startangle=140, tight_layout=False,
             )
-            path = charts_dir / "flags_pie.png"
-            plt.savefig(path)
-            plt.close()
-            pdf.image(str(path), w=120)
+            pdf.image(BytesIO(png), w=120)
 
-    pdf.output(output_path)
+    with staged_output(output_path) as staged_pdf:
+        pdf.output(str(staged_pdf))
     log.info(f"✅ CFO Report saved to {output_path}")
@@ -31,11 +31,17 @@ from myapp.finance.calculator import resolve_commission
 from myapp.services.pdf_generator import generate_pdf_report
 from myapp.services.email_service import EmailService
 from myapp.utils.logger_config import get_logger
+from myapp.utils.df_diagnostics import log_df
+from myapp.utils.pipeline_timing import timed
 from myapp.utils.dataframe_utils import coerce_dates
 from myapp.utils.decimal_utils import apply_safe_decimal
 from myapp.utils.sanitize_uploaded_dataframe import sanitize_uploaded_dataframe
 from myapp.utils.validation_utils import validate_uploaded_df
 from myapp.utils.date_utils import clean_and_parse_dates
+from myapp.utils.typed_reader import TYPED_ATTR, read_jobs_typed
+from myapp.utils.categorical_encoding import encode_categoricals, sort_by_label
+from myapp.finance.aggregation import SummaryCube, day_span, label_sorted_rollup, summary_cube
+from myapp.finance.rollup_store import get_rollup_store
 
 logger = logging.getLogger(__name__)
 EXPORT_FOLDER = Path("output/reports_exported")
@@ -45,9 +51,12 @@ EXPORT_FOLDER = Path("output/reports_exported")
 # ------------------------------------------------------------------------------
 
 
+@timed("loading")
 def load_jobs_excel(path: str, sheet: Optional[str] = None) -> pd.DataFrame:
     """
-    Read Excel/CSV into DataFrame with raw strings preserved.
+    Read Excel/CSV into a DataFrame typed by schema_config.json (see
+    typed_reader): money as float, dates as datetime64, low-cardinality
+    columns as category. Columns outside the schema keep the parser's type.
     Supported:
         - .xlsx / .xls  (openpyxl)
         - .csv
@@ -55,15 +64,7 @@ def load_jobs_excel(path: str, sheet: Optional[str] = None) -> pd.DataFrame:
     if not os.path.exists(path):
         raise FileNotFoundError(path)
 
-    ext = os.path.splitext(path)[1].lower()
-    if ext in {".xlsx", ".xls"}:
-        df = pd.read_excel(path)
-    elif ext == ".csv":
-        df = pd.read_csv(path, dtype=str)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
-
-    return df
+    return read_jobs_typed(path, sheet=sheet)
 
 
 # ------------------------------------------------------------------------------
@@ -96,6 +97,7 @@ def _to_float(series: pd.Series) -> pd.Series:
     return cleaned.astype(float)
 
 
+@timed("clean_and_cast")
 def clean_and_cast(df: pd.DataFrame) -> pd.DataFrame:
     logger.debug("TYPECHECK: %s in clean_and_cast", type(df).__name__)
     """Casts dates & numerics, trims spaces, standardises column names."""
@@ -104,18 +106,21 @@ def clean_and_cast(df: pd.DataFrame) -> pd.DataFrame:
     # ⇢ Standard column names (lower snake_case)
     df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
 
+    # Columns already parsed by typed_reader are not re-parsed from strings
+    typed = {str(c).strip().lower().replace(" ", "_") for c in df.attrs.get(TYPED_ATTR, [])}
+
     # ⇢ Dates
     for col in _DATE_COLS:
-        if col in df.columns:
+        if col in df.columns and col not in typed:
             df[col] = _to_datetime(df[col])
 
     # ⇢ Numerics
     for col in _FLOAT_COLS:
-        if col in df.columns:
+        if col in df.columns and col not in typed:
             df[col] = _to_float(df[col])
 
     # tech_share "50%" ⇒ 0.5
-    if "tech_share" in df.columns:
+    if "tech_share" in df.columns and "tech_share" not in typed:
         df["tech_share"] = (
             df["tech_share"]
             .astype(str)
@@ -149,17 +154,18 @@ _HIGH_COMM = Decimal("0.75")  # 75 %
 _FLAGS_COLS: List[str] = ["parts_flag", "net_flag", "commission_flag", "duration_flag"]
 
 
+@timed("enrich_financials")
 def enrich_financials(df: pd.DataFrame) -> pd.DataFrame:
     logger.debug("TYPECHECK: %s in enrich_financials", type(df).__name__)
     """
     חישוב רווחים, flag חריגים, וניקוי תאריכים וערכים כספיים – בבטחה.
     """
-    logger.debug("🧾 df.columns: %s", df.columns.tolist())
+    log_df(logger, "🧾 enrich_financials input", df)
 
     # 🕒 ניקוי תאריכים – רק אם קיימים
     date_cols = [col for col in ["date", "closed", "created"] if col in df.columns]
     if date_cols:
-        logger.info(f"🕒 מנקה וממפה עמודות תאריך ב־enrich: {date_cols}")
+        logger.info("🕒 מנקה וממפה עמודות תאריך ב־enrich: %s", date_cols)
         df = clean_and_parse_dates(df, date_cols)
     else:
         logger.warning("⚠️ אין עמודות תאריך זמינות ב־DataFrame בעת enrich")
@@ -200,7 +206,49 @@ def enrich_financials(df: pd.DataFrame) -> pd.DataFrame:
 # ------------------------------------------------------------------------------
 
 
-def summarise(df: pd.DataFrame) -> dict:
+def _with_history(
+    cube: SummaryCube, date_from, date_to, *, techs=None, job_types=None, client_id=None
+) -> SummaryCube:
+    """
+    Add rollup-store days inside [date_from, date_to] that `cube` doesn't
+    cover, narrowed by the same tech / job type / client as the report.
+    """
+    start = pd.Timestamp(date_from).normalize() if date_from is not None else None
+    end = pd.Timestamp(date_to).normalize() if date_to is not None else None
+    covered = day_span(cube)
+    if covered and (start is not None and start >= covered[0]) and (end is not None and end <= covered[1]):
+        return cube
+    history = get_rollup_store().query(start, end, techs=techs, job_types=job_types, client_id=client_id)
+    if covered is not None:
+        history = history[(history["date"] < covered[0]) | (history["date"] > covered[1])]
+    if history.empty:
+        return cube
+    logger.info("📚 summarise: %d history days from the rollup store", history["date"].nunique())
+    return cube.with_history(history)
+
+
+@timed("summarise")
+def summarise(
+    df: pd.DataFrame,
+    *,
+    date_from=None,
+    date_to=None,
+    history: bool = False,
+    techs=None,
+    job_types=None,
+    client_id=None,
+) -> dict:
+    """
+    Summary tables for `df`. With `history` and a date range reaching past
+    the days in `df`, the other days come from the rollup store (earlier
+    uploads), limited to `techs` / `job_types` / `client_id` - pass the
+    filters `df` was cut with, or the history covers everyone.
+    """
+    # Every table below is a roll-up of one grouped pass (finance/aggregation.py)
+    cube = summary_cube(df)
+    if history and (date_from is not None or date_to is not None):
+        cube = _with_history(cube, date_from, date_to, techs=techs, job_types=job_types, client_id=client_id)
+    totals = cube.totals
     summary = {}
     overall = pd.DataFrame(
         {
@@ -212,44 +260,34 @@ def summarise(df: pd.DataFrame) -> dict:
                 "company_net",
             ],
             "value": [
-                len(df),
-                df["total"].sum(),
-                df["parts"].sum(),
-                df["net_income"].sum(),
-                df["company_net"].sum(),
+                cube.jobs,
+                totals["total"],
+                totals["parts"],
+                totals["net_income"],
+                totals["company_net"],
             ],
         }
     )
     summary["overall"] = overall
 
-    if "payment_method" in df.columns:
-        summary["by_payment"] = df.groupby("payment_method", dropna=False)["total"].sum().to_dict()
+    if "payment_method" in cube.keys:
+        by_payment = label_sorted_rollup(cube, "payment_method")
+        summary["by_payment"] = dict(zip(by_payment["payment_method"], by_payment["total"]))
     else:
         summary["by_payment"] = {}
 
-    by_tech = (
-        df.groupby("tech", dropna=False)["total"].sum().rename("total").reset_index()
-    )
-    summary["by_tech"] = by_tech
+    summary["by_tech"] = label_sorted_rollup(cube, "tech")[["tech", "total"]]
 
-    by_service = (
-        df.groupby("job_type", dropna=False)
-        .agg(jobs=("total", "size"), income=("total", "sum"))
-        .reset_index()
-    )
-    summary["by_service"] = by_service
+    by_service = label_sorted_rollup(cube, "job_type")
+    summary["by_service"] = by_service[["job_type", "jobs"]].assign(income=by_service["total"])
 
     # Daily summary with protection
-    if "date" not in df.columns or df["date"].dropna().empty:
+    if day_span(cube) is None:
         logger.warning("⚠️ עמודת 'date' ריקה או לא קיימת – לא ניתן לבצע resample יומי.")
         daily = pd.DataFrame(columns=["date", "total"])
     else:
-        daily = (
-            df.set_index("date")
-            .resample("D")["total"]
-            .agg(jobs=("size"), income=("sum"))
-            .reset_index()
-        )
+        daily = cube.daily()
+        daily = daily[["date", "jobs"]].assign(income=daily["total"])
     summary["daily"] = daily
 
     return summary
@@ -277,26 +315,22 @@ def get_kpi_summary(df: pd.DataFrame) -> dict[str, float | int | list]:
             "technicians": [],
         }
 
-    # Calculate overall metrics
-    total_income = df["total"].sum()
-    total_jobs = len(df)
+    # Overall and per-tech figures come from the same grouped pass as summarise()
+    cube = summary_cube(df)
+    total_income = cube.totals["total"]
+    total_jobs = cube.jobs
     average_per_job = total_income / total_jobs if total_jobs > 0 else 0.0
-    gross_profit = (
-        df["net_income"].sum() if "net_income" in df.columns else total_income
-    )
+    gross_profit = cube.totals.get("net_income", total_income)
 
     # Calculate technician performance
     tech_performance = []
     if "tech" in df.columns:
-        tech_groups = df.groupby("tech")
-        for tech_name, tech_df in tech_groups:
-            tech_income = tech_df["total"].sum()
-            tech_jobs = len(tech_df)
-            tech_profit = (
-                tech_df["net_income"].sum()
-                if "net_income" in tech_df.columns
-                else tech_income
-            )
+        by_tech = label_sorted_rollup(cube, "tech", dropna=True)
+        for tech in by_tech.itertuples(index=False):
+            tech_name = tech.tech
+            tech_income = tech.total
+            tech_jobs = int(tech.jobs)
+            tech_profit = tech.net_income if "net_income" in by_tech.columns else tech_income
             tech_avg = tech_income / tech_jobs if tech_jobs > 0 else 0.0
 
             tech_performance.append(
@@ -323,6 +357,7 @@ def get_kpi_summary(df: pd.DataFrame) -> dict[str, float | int | list]:
 # ------------------------------------------------------------------------------
 
 
+@timed("expand_multi_tech_jobs")
 def expand_multi_tech_jobs(df: pd.DataFrame) -> pd.DataFrame:
     """
     Expands jobs with multiple technicians into separate rows per tech.
@@ -364,21 +399,26 @@ def get_report_dataframe(
     date_to: Optional[datetime] = None,
     tech_filter: Optional[list[str]] = None,
     service_filter: Optional[list[str]] = None,
+    ingest: bool = False,
 ) -> pd.DataFrame:
     """
     Validate, clean and transform uploaded report data before reporting logic.
+    `ingest=True` (the upload pipeline) adds new categorical values to the
+    shared category dictionary; other callers only read it.
     """
     if isinstance(data, pd.DataFrame):
         df = validate_uploaded_df(data.copy())
         df = coerce_dates(df, ["date", "closed", "created_at", "updated_at"])
         df = enrich_financials(df)
-        print("✅ אחרי validate_uploaded_df: ", df.shape)
+        logger.debug("✅ אחרי validate_uploaded_df: %s", df.shape)
     else:
         df = load_jobs_excel(data)
         df = clean_and_cast(df)
         df = expand_multi_tech_jobs(df)
         df = coerce_dates(df, ["date", "closed", "created_at", "updated_at"])
         df = enrich_financials(df)
+    # tech / job_type / payment_method ... -> categoricals with stable codes
+    df = encode_categoricals(df, persist=ingest)
     if date_from:
         df = df[df["date"] >= pd.Timestamp(date_from)]
     if date_to:
@@ -409,8 +449,8 @@ def get_report_summary(
         tech_filter=tech_filter,
         service_filter=service_filter,
     )
-    by_tech = df.groupby("tech", dropna=False).sum(numeric_only=True).reset_index()
-    return by_tech
+    by_tech = df.groupby("tech", dropna=False, observed=True).sum(numeric_only=True).reset_index()
+    return sort_by_label(by_tech, "tech")
 
 
 def build_report_data(
@@ -420,20 +460,37 @@ def build_report_data(
     date_to: Optional[datetime] = None,
     tech_filter: Optional[list[str]] = None,
     service_filter: Optional[list[str]] = None,
+    history: bool = False,
+    client_id: Optional[str] = None,
+    ingest: bool = False,
 ):
+    """
+    (df, summaries) for an upload. `history=True` fills the date range from
+    the rollup store for the same techs / services and `client_id`; see
+    get_report_dataframe for `ingest`.
+    """
     df = get_report_dataframe(
         data,
         date_from=date_from,
         date_to=date_to,
         tech_filter=tech_filter,
         service_filter=service_filter,
+        ingest=ingest,
     )
     required_cols = ["total", "parts", "date", "closed"]
     missing = [c for c in required_cols if c not in df.columns]
     if missing:
         raise ValueError(f"שדות חסרים בקובץ: {missing}")
     # For compatibility, return (df, summaries) if called from report_utils
-    summaries = summarise(df)
+    summaries = summarise(
+        df,
+        date_from=date_from,
+        date_to=date_to,
+        history=history,
+        techs=tech_filter,
+        job_types=service_filter,
+        client_id=client_id,
+    )
     assert isinstance(df, pd.DataFrame), "build_report_data must return a DataFrame as first element"
     return df, summaries
 
@@ -493,11 +550,13 @@ def get_income_trend_from_df(df: pd.DataFrame) -> list[dict[str, str | float]]:
     """
     if df.empty or {"date", "total"} - set(df.columns):
         return []
-    grouped = (
-        df.assign(date=df["date"].dt.strftime("%Y-%m-%d"))
-          .groupby("date", as_index=False)
-          .agg(income=("total", "sum"), jobs=("total", "count"))
-          .round({"income": 2})
+    per_day = summary_cube(df).rollup(["day"], dropna=True).sort_values("day")
+    grouped = pd.DataFrame(
+        {
+            "date": per_day["day"].dt.strftime("%Y-%m-%d"),
+            "income": per_day["total"].round(2),
+            "jobs": per_day["total_count"],
+        }
     )
     return grouped.to_dict("records")
 
@@ -1,12 +1,15 @@
 from myapp.utils.logger_config import get_logger
 
 log = get_logger(__name__)
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import Union
 
-from myapp.utils.file_validator import load_and_clean_data
+from myapp.utils.file_validator import clean_loaded_frame, load_file
+from myapp.utils.jobs_dataset import merged_jobs_available, read_merged_jobs
 from myapp.services.report_generation.job_pdf import JobReportPDF
+from myapp.utils.scratch import staged_output
 
 # Defaults and constants
 OUTPUT_DIR = Path("output/reports_exported")
@@ -39,11 +42,11 @@ def generate_detailed_report(csv_path: Union[str, Path] = CSV_DEFAULT_PATH) -> P
     5. Write PDF to disk and return its Path
     """
     csv_file = Path(csv_path)
-    if not csv_file.is_file():
+    if not merged_jobs_available(csv_file):
         log.error("Report source not found: %s", csv_file)
         raise FileNotFoundError(f"No such file: {csv_file}")
 
-    df = load_and_clean_data(str(csv_file))
+    df = clean_loaded_frame(read_merged_jobs(csv_file, reader=load_file))
     if df.empty:
         log.warning("No data to report in: %s", csv_file)
         raise ValueError("Uploaded file contains no valid data rows.")
@@ -97,11 +100,12 @@ def _export_pdf(pdf: JobReportPDF) -> Path:
     """
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"Detailed_Report_{ts}.pdf"
+    filename = f"Detailed_Report_{ts}_{uuid.uuid4().hex[:6]}.pdf"
     out_path = OUTPUT_DIR / filename
 
     try:
-        pdf.output(str(out_path))
+        with staged_output(out_path) as staged_pdf:
+            pdf.output(str(staged_pdf))
     except Exception as e:
         log.error("Failed to write PDF to %s: %s", out_path, e)
         raise
@@ -0,0 +1,217 @@
+# myapp/services/table_layout.py
+
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from fpdf import FPDF
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Column widths and column groups for the detailed report's tables, planned
+# from what the cells actually contain.
+#
+#   layout = plan_table_layout(pdf, df_for_pdf, pdf.w - 2 * PAGE_MARGIN, font="DejaVu")
+#   for columns, widths in layout.groups:      # one table (page run) per group
+#       _print_table_header(pdf, columns, widths, font_name="DejaVu")
+#
+# A sample of rows is measured with the PDF's own font metrics
+# (FPDF.get_string_width, body and header fonts as printed), so the planner
+# knows how many multi_cell lines every cell wraps to at any width. Widths
+# start at what each header needs and the spare page width goes, a step at a
+# time, to the column where it removes the most wrapped lines; a column
+# never gets more than its widest sampled cell. Wide tables are split into
+# contiguous column groups chosen (dynamic programming over the split
+# points) to minimise the estimated page count, fewer wrapped lines breaking
+# ties - instead of a cut after every MAX_COLS_PER_TABLE columns.
+#
+# Env control:
+#   PDF_LAYOUT_SAMPLE_ROWS  rows measured per table (default: 200, spread evenly)
+
+BODY_FONT_SIZE = 10
+HEADER_FONT_SIZE = 12
+LINE_HEIGHT = 8  # mm per wrapped line, as _print_single_row prints
+HEADER_HEIGHT = 10
+TABLE_TOP = 15  # y of the first row area on a continuation page
+PAGE_BOTTOM_MARGIN = 15
+MIN_COL_WIDTH = 12.0  # mm
+MAX_COLS_PER_TABLE = 15
+WIDTH_STEPS = 48  # resolution of the spare-width hand-out
+SAMPLE_ROWS = int(os.getenv("PDF_LAYOUT_SAMPLE_ROWS", "200"))
+
+
+@dataclass
+class TableLayout:
+    groups: List[Tuple[List[str], List[float]]] = field(default_factory=list)
+    pages: int = 0  # estimated, all groups
+    lines_per_row: float = 0.0  # estimated lines a data row takes, summed over the groups
+
+
+def _sample(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    if len(df) <= n:
+        return df
+    return df.iloc[np.linspace(0, len(df) - 1, n).round().astype(int)]
+
+
+def _measure(pdf: FPDF, values: Sequence[object], cache: Dict[str, float]) -> np.ndarray:
+    widths = np.empty(len(values))
+    for i, value in enumerate(values):
+        text = str(value) if pd.notna(value) else ""
+        width = cache.get(text)
+        if width is None:
+            width = cache[text] = pdf.get_string_width(text)
+        widths[i] = width
+    return widths
+
+
+class _Measurements:
+    """Sampled text widths of one table and the wrap / page estimates built on them."""
+
+    def __init__(self, pdf: FPDF, df: pd.DataFrame, font: str, sample_rows: int) -> None:
+        family, style, size = pdf.font_family, pdf.font_style, pdf.font_size_pt
+        sample = _sample(df, max(1, sample_rows))
+        self.columns = list(df.columns)
+        self.n_rows = len(df)
+        self.padding = 2 * pdf.c_margin
+        self.usable_height = pdf.h - PAGE_BOTTOM_MARGIN - TABLE_TOP - HEADER_HEIGHT
+        try:
+            pdf.set_font(font, "", BODY_FONT_SIZE)
+            cache: Dict[str, float] = {}
+            # (sampled rows, columns) text widths in page units
+            self.text = np.column_stack(
+                [_measure(pdf, sample[col].tolist(), cache) for col in self.columns]
+            ) if self.columns else np.zeros((0, 0))
+            pdf.set_font(font, "B", HEADER_FONT_SIZE)
+            self.header = np.array([pdf.get_string_width(str(col)) + self.padding for col in self.columns])
+        finally:
+            if family:
+                pdf.set_font(family, style, size)
+        widest = self.text.max(axis=0) + self.padding if len(sample) else np.zeros(len(self.columns))
+        self.min_width = np.maximum(self.header, MIN_COL_WIDTH)
+        # past this width a column has nothing left to unwrap
+        self.max_width = np.maximum(widest, self.min_width)
+
+    def lines(self, cols: slice, widths: np.ndarray) -> np.ndarray:
+        """Wrapped lines per sampled row (the tallest cell sets the row height)."""
+        room = np.maximum(widths - self.padding, 1e-6)
+        per_cell = np.maximum(np.ceil(self.text[:, cols] / room - 1e-9), 1)
+        return per_cell.max(axis=1) if per_cell.size else np.ones(len(self.text))
+
+    def excess(self, col: int, width: float) -> float:
+        """How far past one line the column's cells run at `width` (0 when nothing wraps)."""
+        room = max(width - self.padding, 1e-6)
+        return float(np.maximum(self.text[:, col] / room - 1, 0).sum())
+
+    def pages(self, mean_lines: float) -> int:
+        rows_per_page = max(1, int(self.usable_height // (LINE_HEIGHT * mean_lines)))
+        return max(1, math.ceil(self.n_rows / rows_per_page))
+
+
+def _fill(widths: np.ndarray, page_width: float) -> np.ndarray:
+    """Stretch widths proportionally so the table spans the printable width."""
+    total = widths.sum()
+    return widths * (page_width / total) if total > 0 else widths
+
+
+def _solve_widths(
+    m: _Measurements, cols: slice, page_width: float, *, refine: bool = True
+) -> Tuple[np.ndarray, float]:
+    """
+    Widths for one column group that minimise wrapped lines; returns
+    (widths, mean lines per row). Without `refine` the spare width is split
+    in proportion to what each column could still use (the quick estimate
+    used while choosing groups).
+    """
+    lo, hi = m.min_width[cols], m.max_width[cols]
+    spare = page_width - lo.sum()
+    if hi.sum() <= page_width or spare <= 0 or not len(m.text):
+        widths = _fill(hi if hi.sum() <= page_width else lo, page_width)
+        return widths, float(m.lines(cols, widths).mean()) if len(m.text) else 1.0
+    if not refine:
+        widths = lo + spare * (hi - lo) / (hi - lo).sum()
+        return widths, float(m.lines(cols, widths).mean())
+
+    widths = lo.copy()
+    step = spare / WIDTH_STEPS
+    current = m.lines(cols, widths)
+    offset = cols.start or 0
+    for _ in range(WIDTH_STEPS):
+        best, best_gain, best_lines = None, (0.0, 0.0), current
+        for c in np.flatnonzero(widths < hi):
+            trial = widths.copy()
+            trial[c] = min(trial[c] + step, hi[c])
+            lines = m.lines(cols, trial)
+            # whole lines saved first; how much less the column overflows breaks ties
+            gain = (
+                float(current.sum() - lines.sum()),
+                m.excess(offset + c, widths[c]) - m.excess(offset + c, trial[c]),
+            )
+            if best is None or gain > best_gain:
+                best, best_gain, best_lines = c, gain, lines
+        if best is None:
+            break
+        widths[best] = min(widths[best] + step, hi[best])
+        current = best_lines
+    return _fill(widths, page_width), float(current.mean())
+
+
+def plan_table_layout(
+    pdf: FPDF,
+    df: pd.DataFrame,
+    page_width: float,
+    *,
+    font: str,
+    sample_rows: Optional[int] = None,
+    max_cols_per_table: int = MAX_COLS_PER_TABLE,
+) -> TableLayout:
+    """
+    Plan the column groups of `df` and the width of every column so the
+    table prints on as few pages, with as few wrapped lines, as possible.
+    `font` must already be registered on `pdf`; the current font is restored.
+    """
+    m = _Measurements(pdf, df, font, SAMPLE_ROWS if sample_rows is None else sample_rows)
+    n = len(m.columns)
+    if n == 0:
+        return TableLayout()
+
+    # best[j]: (pages, lines) for the first j columns, split[j]: where its last group starts
+    best: List[Tuple[float, float]] = [(0, 0.0)] + [(math.inf, math.inf)] * n
+    split = [0] * (n + 1)
+    for j in range(1, n + 1):
+        for i in range(j - 1, max(-1, j - 1 - max_cols_per_table), -1):
+            cols = slice(i, j)
+            if j - i > 1 and m.min_width[cols].sum() > page_width:
+                break  # a wider group would not even fit its headers
+            if best[i][0] == math.inf:
+                continue
+            _, mean_lines = _solve_widths(m, cols, page_width, refine=False)
+            cost = (best[i][0] + m.pages(mean_lines), best[i][1] + mean_lines)
+            if cost < best[j]:
+                best[j], split[j] = cost, i
+
+    bounds = []
+    j = n
+    while j > 0:
+        bounds.append((split[j], j))
+        j = split[j]
+    layout = TableLayout()
+    line_total = 0.0
+    for i, j in reversed(bounds):
+        widths, mean_lines = _solve_widths(m, slice(i, j), page_width)
+        layout.groups.append((m.columns[i:j], [float(w) for w in widths]))
+        layout.pages += m.pages(mean_lines)
+        line_total += mean_lines
+    layout.lines_per_row = line_total
+    log.debug(
+        "📐 Table layout: %d columns in %d group(s), ~%d page(s), %.2f lines/row",
+        n, len(layout.groups), layout.pages, layout.lines_per_row,
+    )
+    return layout
+
+
+__all__ = ["TableLayout", "plan_table_layout", "MAX_COLS_PER_TABLE"]
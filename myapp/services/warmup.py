@@ -0,0 +1,158 @@
+"""
+Process warm-up for gunicorn workers.
+
+With ``AUTOCLOSE_WARMUP=preload`` and ``gunicorn --preload`` the app module is
+imported once in the master, so everything loaded here (fonts, templates,
+commission rules, schema_config.json, insight detectors) is inherited by every
+forked worker and shared copy-on-write instead of being loaded four times on
+the first requests after a deploy.
+
+Modes (env ``AUTOCLOSE_WARMUP``):
+    off         - default; nothing is preloaded and the app is ready at once.
+    preload     - warm synchronously at import time (master under --preload).
+    background  - warm in a daemon thread inside each worker.
+"""
+
+import gc
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+WARMUP_ENV = "AUTOCLOSE_WARMUP"
+WARMUP_MODES = {"off", "preload", "background"}
+
+_READY = threading.Event()
+_LOCK = threading.Lock()
+_STATE: Dict[str, Any] = {"mode": "off", "steps": {}, "duration_ms": None}
+
+
+def _warm_fonts() -> None:
+    from matplotlib import font_manager
+
+    # Building the font list is the slow part of the first chart render.
+    font_manager.findfont("DejaVu Sans")
+
+
+def _warm_commission_rules() -> None:
+    from myapp.finance.rules import load_commission_rules
+
+    load_commission_rules()
+
+
+def _warm_schema_config() -> None:
+    from myapp.utils.column_mapper import load_column_schema
+
+    load_column_schema()
+
+
+def _warm_detectors() -> None:
+    from myapp.finance.insights.engine import InsightsEngine
+
+    InsightsEngine()
+
+
+def _warm_templates(app: Any) -> None:
+    if app is None:
+        return
+    env = app.jinja_env
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+        except Exception as e:
+            log.warning("Template %s failed to compile during warm-up: %s", name, e)
+
+
+def _steps(app: Any) -> List[Tuple[str, Callable[[], None]]]:
+    return [
+        ("fonts", _warm_fonts),
+        ("templates", lambda: _warm_templates(app)),
+        ("commission_rules", _warm_commission_rules),
+        ("schema_config", _warm_schema_config),
+        ("detectors", _warm_detectors),
+    ]
+
+
+def warm_up(app: Any = None, *, freeze: bool = False) -> Dict[str, Any]:
+    """
+    Load every shared read-only cache and mark the process ready.
+    A failing step is logged and recorded but never blocks readiness.
+    With ``freeze=True`` the surviving objects are moved out of the GC's reach
+    (gc.freeze) so collections in the workers don't dirty the shared pages.
+    """
+    started = time.perf_counter()
+    results: Dict[str, str] = {}
+    for name, step in _steps(app):
+        step_started = time.perf_counter()
+        try:
+            step()
+            results[name] = "ok"
+            log.debug(
+                "Warm-up step %s done in %.1f ms",
+                name,
+                (time.perf_counter() - step_started) * 1000,
+            )
+        except Exception as e:
+            results[name] = f"error: {e}"
+            log.warning("Warm-up step %s failed: %s", name, e)
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    with _LOCK:
+        _STATE["steps"] = results
+        _STATE["duration_ms"] = duration_ms
+    _READY.set()
+    log.info("✅ Warm-up complete in %.1f ms (pid %d): %s", duration_ms, os.getpid(), results)
+    return get_warmup_state()
+
+
+def start_warmup(app: Any = None, mode: Optional[str] = None) -> None:
+    """
+    Entry point called once from app.py; the mode defaults to $AUTOCLOSE_WARMUP.
+    """
+    mode = (mode or os.getenv(WARMUP_ENV, "off")).strip().lower()
+    if mode not in WARMUP_MODES:
+        log.warning("Unknown %s=%r – falling back to 'off'", WARMUP_ENV, mode)
+        mode = "off"
+    with _LOCK:
+        _STATE["mode"] = mode
+
+    if mode == "preload":
+        warm_up(app, freeze=True)
+    elif mode == "background":
+        threading.Thread(
+            target=warm_up, args=(app,), name="autoclose-warmup", daemon=True
+        ).start()
+    else:
+        _READY.set()
+
+
+def is_ready() -> bool:
+    return _READY.is_set()
+
+
+def get_warmup_state() -> Dict[str, Any]:
+    with _LOCK:
+        return {
+            "ready": _READY.is_set(),
+            "mode": _STATE["mode"],
+            "steps": dict(_STATE["steps"]),
+            "duration_ms": _STATE["duration_ms"],
+        }
+
+
+def reset_warmup() -> None:
+    """Forget the warm-up result (tests only)."""
+    _READY.clear()
+    with _LOCK:
+        _STATE.update({"mode": "off", "steps": {}, "duration_ms": None})
+
+
+__all__ = ["start_warmup", "warm_up", "is_ready", "get_warmup_state", "reset_warmup"]
@@ -0,0 +1,174 @@
+# myapp/utils/categorical_encoding.py
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from myapp.utils.file_lock import file_lock
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Low-cardinality text columns (technician, job type, client ...) are stored
+# as pandas categoricals. Their categories come from a persisted, append-only
+# dictionary, so a value keeps the same code across uploads and processes:
+#
+#   df = encode_categoricals(df)                 # after enrich, before summaries
+#   df.groupby("tech", observed=True)            # only the techs in this frame
+#
+# Because the dictionary holds every value ever seen, group-bys on these
+# columns must pass observed=True; otherwise each summary gets one empty row
+# per historical category.
+#
+# Only the ingest path (encode_categoricals(..., persist=True), i.e. the
+# upload pipeline) adds values. It re-reads the file, appends and saves under
+# one file lock, so two processes never hand out the same code. Read paths
+# (persist=False) put values the dictionary does not know after the known
+# ones in that frame only.
+#
+# Env control:
+#   CATEGORY_DICTIONARY_PATH  where the dictionary lives
+#                             (default: output/category_dictionary.json)
+
+CATEGORICAL_COLUMNS = ("tech", "technician", "job_type", "payment_method", "client_id", "company")
+DEFAULT_DICTIONARY_PATH = "output/category_dictionary.json"
+
+
+class CategoryDictionary:
+    """Append-only list of known values per column, persisted as JSON."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._categories: Dict[str, List[str]] = {}
+        self._mtime: Optional[int] = None
+
+    def _reload(self, force: bool = False) -> None:
+        # Another worker may have appended values since we last looked
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime and not force:
+            return
+        try:
+            self._categories = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            log.warning("⚠️ Could not read category dictionary %s: %s", self.path, e)
+            return
+        self._mtime = mtime
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._categories, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._mtime = self.path.stat().st_mtime_ns
+
+    def categories(self, column: str) -> List[str]:
+        with self._lock:
+            self._reload()
+            return list(self._categories.get(column, []))
+
+    def extend(self, column: str, values: Iterable[str]) -> List[str]:
+        """
+        Add unseen values (sorted, at the end), save, and return the full
+        category list. The re-read, append and save happen under the file's lock.
+        """
+        values = set(values)
+        with self._lock:
+            self._reload()
+            if values.issubset(self._categories.get(column, [])):
+                return list(self._categories.get(column, []))
+            with file_lock(self.path):
+                self._reload(force=True)
+                known = self._categories.setdefault(column, [])
+                new = sorted(values.difference(known))
+                if new:
+                    known.extend(new)
+                    self._save()
+            return list(known)
+
+
+_DICTIONARIES: Dict[str, CategoryDictionary] = {}
+_DICTIONARIES_LOCK = threading.Lock()
+
+
+def get_category_dictionary(path: str | Path | None = None) -> CategoryDictionary:
+    """Process-wide dictionary for `path` (or CATEGORY_DICTIONARY_PATH)."""
+    resolved = str(Path(path or os.getenv("CATEGORY_DICTIONARY_PATH", DEFAULT_DICTIONARY_PATH)).resolve())
+    with _DICTIONARIES_LOCK:
+        if resolved not in _DICTIONARIES:
+            _DICTIONARIES[resolved] = CategoryDictionary(resolved)
+        return _DICTIONARIES[resolved]
+
+
+def _string_values(series: pd.Series) -> Optional[List[str]]:
+    """Distinct non-null values when the column is text, else None."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.cat.categories
+    elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        values = series.dropna().unique()
+    else:
+        return None
+    if not all(isinstance(v, str) for v in values):
+        return None
+    return list(values)
+
+
+def encode_categoricals(
+    df: pd.DataFrame,
+    columns: Sequence[str] = CATEGORICAL_COLUMNS,
+    *,
+    dictionary: Optional[CategoryDictionary] = None,
+    persist: bool = True,
+) -> pd.DataFrame:
+    """
+    Convert the text columns in `columns` to categoricals whose categories
+    come from the shared dictionary (modifies and returns df). Numeric or
+    mixed-type columns are left as they are. With persist=False (read paths)
+    unseen values are appended for this frame only, not to the dictionary.
+    """
+    dictionary = dictionary or get_category_dictionary()
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = _string_values(df[column])
+        if values is None:
+            log.debug("Skipping categorical encoding of non-text column %s", column)
+            continue
+        categories = None
+        if persist:
+            try:
+                categories = dictionary.extend(column, values)
+            except OSError as e:
+                log.warning("⚠️ Could not persist category dictionary %s: %s", dictionary.path, e)
+        if categories is None:
+            categories = dictionary.categories(column)
+            known = set(categories)
+            categories += sorted({v for v in values if v not in known})
+        df[column] = df[column].astype(pd.CategoricalDtype(categories))
+    return df
+
+
+def sort_by_label(frame: pd.DataFrame, column: str) -> pd.DataFrame:
+    """
+    Order grouped output by the label text, as an object-dtype group-by would
+    (categorical group-bys follow code order, i.e. first-seen order).
+    """
+    return frame.sort_values(
+        column, key=lambda s: s.astype(object), kind="stable", na_position="last"
+    ).reset_index(drop=True)
+
+
+__all__ = [
+    "CATEGORICAL_COLUMNS",
+    "CategoryDictionary",
+    "get_category_dictionary",
+    "encode_categoricals",
+    "sort_by_label",
+]
@@ -0,0 +1,281 @@
+# myapp/utils/chart_service.py
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from myapp.utils.logger_config import get_logger
+from myapp.utils.pipeline_timing import timed
+
+log = get_logger(__name__)
+
+# Report charts rendered once per distinct content.
+#
+#   charts = get_chart_service()
+#   png = charts.render("bar", labels, values, title="Daily Income", figsize=(8, 4))
+#   path = charts.render_path("pie", labels, values, autopct="%1.1f%%")   # for FPDF
+#   uri = charts.data_uri("bar", labels, values, ...)                     # for HTML templates
+#
+# Figures are built with the object-oriented API (Figure + FigureCanvasAgg),
+# never pyplot, so there is no global "current figure" to share between
+# threads and nothing to plt.close(). The cache key is a SHA-256 of the chart
+# kind, labels, values and every style option (plus the matplotlib version);
+# the PNG is kept in a small in-memory LRU and on disk as <hash>.png, so the
+# same chart in the next report - or another worker - is a file read. Paths
+# returned by render_path() are content-addressed: two reports never write
+# the same file with different charts.
+#
+# The disk tier is pruned least-recently-used first (a disk hit or a
+# render_path() call refreshes the file's mtime) down to CHART_CACHE_MAX_MB,
+# and PNGs unused for CHART_CACHE_MAX_DAYS go too. prune() runs on the first
+# store and every _PRUNE_EVERY stores after it; files used in the last
+# _PRUNE_GRACE_S seconds are never removed, so a path render_path() just
+# handed out survives until the report has embedded it.
+#
+# Env control:
+#   CHART_CACHE_DIR       PNG cache folder (default: output/chart_cache)
+#   CHART_CACHE_ENTRIES   PNGs kept in memory (default: 128)
+#   CHART_CACHE_MAX_MB    disk cache size limit (default: 256)
+#   CHART_CACHE_MAX_DAYS  drop PNGs unused for this long (default: 30)
+
+DEFAULT_CACHE_DIR = "output/chart_cache"
+KINDS = ("bar", "pie")
+_PRUNE_EVERY = 64
+_PRUNE_GRACE_S = 600
+
+_STYLE_DEFAULTS: Dict[str, Any] = {
+    "title": "",
+    "xlabel": "",
+    "ylabel": "",
+    "figsize": (6.4, 4.8),
+    "dpi": 100,
+    "rotation": 0,
+    "ha": "center",
+    "edgecolor": None,
+    "title_fontsize": None,
+    "label_fontsize": None,
+    "title_pad": None,
+    "autopct": None,
+    "startangle": 0,
+    "equal_axis": False,
+    "tight_layout": True,
+}
+
+
+def chart_key(kind: str, labels: Sequence[Any], values: Sequence[float], style: Dict[str, Any]) -> str:
+    """Content hash of everything that affects the rendered PNG."""
+    digest = hashlib.sha256()
+    digest.update(f"{kind}|{matplotlib.__version__}|".encode())
+    digest.update(json.dumps([str(label) for label in labels], ensure_ascii=False).encode())
+    digest.update(np.asarray(values, dtype=np.float64).tobytes())
+    digest.update(json.dumps(style, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _draw(kind: str, labels: Sequence[str], values: np.ndarray, style: Dict[str, Any]) -> bytes:
+    fig = Figure(figsize=style["figsize"], dpi=style["dpi"])
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if kind == "bar":
+        positions = np.arange(len(values))
+        ax.bar(positions, values, edgecolor=style["edgecolor"])
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels, rotation=style["rotation"], ha=style["ha"])
+    else:
+        ax.pie(values, labels=labels, autopct=style["autopct"], startangle=style["startangle"])
+        if style["equal_axis"]:
+            ax.axis("equal")
+    if style["title"]:
+        ax.set_title(style["title"], fontsize=style["title_fontsize"], pad=style["title_pad"])
+    if style["xlabel"]:
+        ax.set_xlabel(style["xlabel"], fontsize=style["label_fontsize"])
+    if style["ylabel"]:
+        ax.set_ylabel(style["ylabel"], fontsize=style["label_fontsize"])
+    if style["tight_layout"]:
+        fig.tight_layout()
+    out = BytesIO()
+    fig.savefig(out, format="png", dpi=style["dpi"])
+    return out.getvalue()
+
+
+class ChartService:
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        memory_entries: int = 128,
+        *,
+        max_bytes: int = 256 * 2**20,
+        max_age_s: float = 30 * 86400,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._stores = 0
+        self.renders = 0  # charts actually drawn by this process
+
+    def _style(self, style: Dict[str, Any]) -> Dict[str, Any]:
+        unknown = set(style) - set(_STYLE_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown chart style options: {sorted(unknown)}")
+        merged = {**_STYLE_DEFAULTS, **style}
+        merged["figsize"] = tuple(merged["figsize"])
+        return merged
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def _remember(self, key: str, png: bytes) -> None:
+        with self._lock:
+            self._memory[key] = png
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+                return png
+        path = self._path_for(key)
+        try:
+            png = path.read_bytes()
+        except OSError:
+            return None
+        _touch(path)
+        self._remember(key, png)
+        return png
+
+    def _store(self, key: str, png: bytes) -> None:
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(png)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning("⚠️ Could not write chart cache %s: %s", path, e)
+        self._remember(key, png)
+        with self._lock:
+            self._stores += 1
+            due = self._stores % _PRUNE_EVERY == 1
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop the least recently used PNGs beyond max_bytes, and any unused for max_age_s; returns how many."""
+        now = time.time()
+        entries = []
+        for path in self.cache_dir.glob("*.png"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort(key=lambda e: e[0], reverse=True)  # most recently used first
+        kept = removed = 0
+        for mtime, size, path in entries:
+            idle = now - mtime
+            if idle < _PRUNE_GRACE_S or (kept + size <= self.max_bytes and idle <= self.max_age_s):
+                kept += size
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                kept += size
+        if removed:
+            log.info("🧹 Chart cache pruned: %d PNG(s) removed, %.1f MB kept", removed, kept / 2**20)
+        return removed
+
+    def _render(self, kind: str, labels: Iterable[Any], values: Iterable[float], style: Dict[str, Any]) -> "tuple[str, bytes]":
+        if kind not in KINDS:
+            raise ValueError(f"Unsupported chart kind: {kind}")
+        labels = [str(label) for label in labels]
+        values = np.asarray(list(values), dtype=np.float64)
+        if len(labels) != len(values):
+            raise ValueError("Chart labels and values differ in length")
+        style = self._style(style)
+        key = chart_key(kind, labels, values, style)
+        png = self._lookup(key)
+        if png is not None:
+            return key, png
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        with key_lock:  # a concurrent request for the same chart waits for this render
+            png = self._lookup(key)
+            if png is None:
+                png = self._draw_timed(kind, labels, values, style)
+                self._store(key, png)
+        with self._lock:
+            self._inflight.pop(key, None)
+        return key, png
+
+    @timed("chart_render")
+    def _draw_timed(self, kind: str, labels: Sequence[str], values: np.ndarray, style: Dict[str, Any]) -> bytes:
+        with self._lock:
+            self.renders += 1
+        return _draw(kind, labels, values, style)
+
+    def render(self, kind: str, labels: Iterable[Any], values: Iterable[float], **style: Any) -> bytes:
+        """PNG bytes of the chart (drawn only if no identical chart is cached)."""
+        return self._render(kind, labels, values, style)[1]
+
+    def render_path(self, kind: str, labels: Iterable[Any], values: Iterable[float], **style: Any) -> Path:
+        """Path of the cached PNG; unique per chart content, safe to share between reports."""
+        key, png = self._render(kind, labels, values, style)
+        path = self._path_for(key)
+        if not _touch(path):  # fresh mtime: prune() leaves it alone while the caller reads it
+            self._store(key, png)
+        return path
+
+    def data_uri(self, kind: str, labels: Iterable[Any], values: Iterable[float], **style: Any) -> str:
+        """data:image/png;base64,... for HTML templates."""
+        png = self.render(kind, labels, values, **style)
+        return "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+
+
+def _touch(path: Path) -> bool:
+    """Mark a cached PNG as just used; False when it is not on disk."""
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+
+_SERVICES: Dict[str, ChartService] = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_chart_service(cache_dir: str | Path | None = None) -> ChartService:
+    """Process-wide service for `cache_dir` (or CHART_CACHE_DIR)."""
+    resolved = str(Path(cache_dir or os.getenv("CHART_CACHE_DIR", DEFAULT_CACHE_DIR)).resolve())
+    with _SERVICES_LOCK:
+        if resolved not in _SERVICES:
+            _SERVICES[resolved] = ChartService(
+                resolved,
+                int(os.getenv("CHART_CACHE_ENTRIES", "128")),
+                max_bytes=int(float(os.getenv("CHART_CACHE_MAX_MB", "256")) * 2**20),
+                max_age_s=float(os.getenv("CHART_CACHE_MAX_DAYS", "30")) * 86400,
+            )
+        return _SERVICES[resolved]
+
+
+__all__ = ["ChartService", "get_chart_service", "chart_key", "KINDS"]
@@ -1,32 +1,67 @@
 from myapp.utils.logger_config import get_logger
 
 log = get_logger(__name__)
-import matplotlib.pyplot as plt
+import os
 import pandas as pd
 from pathlib import Path
+from typing import Optional
+from myapp.utils.chart_service import get_chart_service
 
+_INCOME_STYLE = dict(title="Daily Income", figsize=(8, 4), dpi=150, rotation=45, ha="right")
 
-def save_income_chart(daily_df: pd.DataFrame, out_path: Path) -> None:
-    """
-    Saves a bar chart of daily income to PNG.
-    """
-    log.debug("📊 Creating income chart from chart_utils.py")
+
+def _income_series(daily_df: pd.DataFrame) -> Optional[pd.DataFrame]:
     if "date" not in daily_df.columns or "income" not in daily_df.columns:
         raise ValueError("Missing 'date' or 'income' columns in daily_df.")
 
     if daily_df.empty:
         log.warning("No data provided for income chart.")
-        return
+        return None
 
     # Ensure 'date' is datetime64 for .dt usage
-    if not pd.api.types.is_datetime64_any_dtype(daily_df["date"]):
-        daily_df["date"] = pd.to_datetime(daily_df["date"], errors="coerce")
-
-    plt.figure(figsize=(8, 4))
-    plt.bar(daily_df["date"].dt.strftime("%Y-%m-%d"), daily_df["income"])
-    plt.xticks(rotation=45, ha="right")
-    plt.title("Daily Income")
-    plt.tight_layout()
+    dates = daily_df["date"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce")
+    return pd.DataFrame(
+        {"label": dates.dt.strftime("%Y-%m-%d"), "income": pd.to_numeric(daily_df["income"], errors="coerce").fillna(0.0)}
+    )
+
+
+def income_chart_path(daily_df: pd.DataFrame) -> Optional[Path]:
+    """
+    Daily income bar chart from the chart service cache (rendered once per
+    distinct data); the path is unique to the chart's content.
+    """
+    series = _income_series(daily_df)
+    if series is None:
+        return None
+    log.debug("📊 Creating income chart from chart_utils.py")
+    return get_chart_service().render_path("bar", series["label"], series["income"], **_INCOME_STYLE)
+
+
+def income_chart_png(daily_df: pd.DataFrame) -> Optional[bytes]:
+    """
+    Daily income bar chart as PNG bytes, for embedding straight from memory
+    (FPDF accepts a BytesIO) without a file next to the report.
+    """
+    series = _income_series(daily_df)
+    if series is None:
+        return None
+    log.debug("📊 Creating income chart from chart_utils.py")
+    return get_chart_service().render("bar", series["label"], series["income"], **_INCOME_STYLE)
+
+
+def save_income_chart(daily_df: pd.DataFrame, out_path: Path) -> None:
+    """
+    Saves a bar chart of daily income to PNG.
+    """
+    series = _income_series(daily_df)
+    if series is None:
+        return
+    log.debug("📊 Creating income chart from chart_utils.py")
+    png = get_chart_service().render("bar", series["label"], series["income"], **_INCOME_STYLE)
+    out_path = Path(out_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(out_path, dpi=150)
-    plt.close()
+    tmp = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(png)
+    os.replace(tmp, out_path)
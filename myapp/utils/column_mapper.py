@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 from myapp.utils.logger_config import get_logger
+from myapp.utils.file_cache import load_cached_json
 
 log = get_logger(__name__)
 SCHEMA_PATH = Path(__file__).resolve().parent / "schema_config.json"
@@ -16,8 +17,7 @@ def load_column_schema(report_type: str = "default") -> dict:
         return {}
 
     try:
-        with open(SCHEMA_PATH, encoding="utf-8") as f:
-            config = json.load(f)
+        config = load_cached_json(SCHEMA_PATH)
     except json.JSONDecodeError as e:
         log.error(f"Schema JSON parse error: {e}")
         return {}
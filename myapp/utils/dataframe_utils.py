@@ -19,6 +19,8 @@ from typing import Union
 # Financial enrichment: computes tech_profit, balance_tech
 # —————————————————————————————————————————————————————————————————
 from myapp.utils.calculations import enrich as enrich_calc
+from myapp.utils.pipeline_timing import timed
+from myapp.finance.flag_rules import load_rule_set
 
 def enrich(df: DataFrame, share: Union[str, float] = 0.5) -> DataFrame:
     """
@@ -190,6 +192,7 @@ def prepare_pdf_dataframe(df: DataFrame) -> DataFrame:
     out = format_report_columns(out)
     return out
 
+@timed("enrich_financials")
 def enrich_financials(df: DataFrame) -> DataFrame:
     """
     Enrich a raw financial DataFrame with calculated fields and flags, ensuring data integrity.
@@ -229,21 +232,11 @@ def enrich_financials(df: DataFrame) -> DataFrame:
         .div(60)
         .round(1)
     )
-    flags_definitions = {
-        "parts_flag": np.where(enriched["parts"] > enriched["total"], "PARTS>PRICE", ""),
-        "net_flag": np.where(enriched["company_net"] < 0, "NEGATIVE", ""),
-        "commission_flag": np.where(
-            (enriched["total"] > 0) & (enriched["tech_cut"].div(enriched["total"]) > 0.8),
-            "HIGH",
-            ""
-        ),
-        "duration_flag": np.where(enriched["duration_min"].isna(), "NO_END", ""),
-    }
-    for flag_col, flag_vals in flags_definitions.items():
+    # flag rules: config/flag_rules.yaml -> enrich (one bit per rule)
+    rules = load_rule_set("enrich")
+    mask = rules.evaluate(enriched)
+    for flag_col, flag_vals in rules.label_columns(mask).items():
         enriched[flag_col] = flag_vals
-    enriched["flags"] = (
-        enriched[list(flags_definitions.keys())]
-        .apply(lambda row: ",".join([f for f in row if f]), axis=1)
-    )
+    enriched["flags"] = rules.decode(mask)
     enriched["net_income"] = enriched["net_income"].round(2)
     return enriched
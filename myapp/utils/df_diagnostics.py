@@ -0,0 +1,112 @@
+# myapp/utils/df_diagnostics.py
+
+import itertools
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# Debug detail about DataFrames (columns, dtypes, head rows) is expensive to
+# build. Nothing here touches the DataFrame until a handler actually emits the
+# record, and log_df() skips the whole call when the level is disabled, so
+# runs at INFO pay nothing for it.
+#
+# Env control:
+#   LOG_DF_SAMPLE_EVERY  emit only every Nth log_df() call per label (default 1)
+
+_SAMPLE_ENV = "LOG_DF_SAMPLE_EVERY"
+_COUNTERS: Dict[str, "itertools.count[int]"] = {}
+_COUNTERS_LOCK = threading.Lock()
+
+
+class DataFrameSummary:
+    """
+    Lazy, structured view of a DataFrame for log arguments.
+    The summary is computed in __str__, i.e. only when the record is formatted.
+    """
+
+    __slots__ = ("df", "head", "dtypes")
+
+    def __init__(self, df: Any, *, head: int = 0, dtypes: bool = False) -> None:
+        self.df = df
+        self.head = head
+        self.dtypes = dtypes
+
+    def as_dict(self) -> Dict[str, Any]:
+        df = self.df
+        if not isinstance(df, pd.DataFrame):
+            return {"type": type(df).__name__}
+        info: Dict[str, Any] = {
+            "rows": int(df.shape[0]),
+            "cols": int(df.shape[1]),
+            "columns": [str(c) for c in df.columns],
+        }
+        if self.dtypes:
+            info["dtypes"] = {str(c): str(t) for c, t in df.dtypes.items()}
+        if self.head:
+            info["head"] = df.head(self.head).to_string()
+        return info
+
+    def __str__(self) -> str:
+        info = self.as_dict()
+        if "rows" not in info:
+            return f"<not a DataFrame: {info['type']}>"
+        text = f"rows={info['rows']} cols={info['cols']} columns={info['columns']}"
+        if "dtypes" in info:
+            text += f" dtypes={info['dtypes']}"
+        if "head" in info:
+            text += "\n" + info["head"]
+        return text
+
+    __repr__ = __str__
+
+
+def _sample_every() -> int:
+    try:
+        return max(1, int(os.getenv(_SAMPLE_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+def _sampled(label: str, every: int) -> bool:
+    if every <= 1:
+        return True
+    with _COUNTERS_LOCK:
+        counter = _COUNTERS.setdefault(label, itertools.count())
+    return next(counter) % every == 0
+
+
+def log_df(
+    logger: logging.Logger,
+    label: str,
+    df: Any,
+    *,
+    level: int = logging.DEBUG,
+    head: int = 0,
+    dtypes: bool = False,
+    sample_every: Optional[int] = None,
+) -> None:
+    """
+    Log a structured DataFrame summary under `label` (e.g. "[PDF] df_for_pdf").
+
+    Returns immediately when `level` is disabled for `logger`. With
+    sample_every=N (or $LOG_DF_SAMPLE_EVERY) only every Nth call per label
+    is emitted, which keeps hot loops from flooding DEBUG output.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    every = sample_every if sample_every is not None else _sample_every()
+    if not _sampled(label, every):
+        return
+    logger.log(level, "%s: %s", label, DataFrameSummary(df, head=head, dtypes=dtypes))
+
+
+def reset_sampling() -> None:
+    """Forget the per-label sampling counters (tests only)."""
+    with _COUNTERS_LOCK:
+        _COUNTERS.clear()
+
+
+__all__ = ["DataFrameSummary", "log_df", "reset_sampling"]
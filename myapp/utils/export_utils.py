@@ -54,10 +54,8 @@ def export_monthly_summary_csv(
     start_str = _format_date(start_date)
     end_str = _format_date(end_date)
 
-    print(
-        f"START: {start_date} (type: {type(start_date)}), END: {end_date} (type: {type(end_date)})"
-    )
-    logger.info(f"start_str: {start_str}, end_str: {end_str}")
+    logger.debug("START: %r (type: %s), END: %r (type: %s)", start_date, type(start_date).__name__, end_date, type(end_date).__name__)
+    logger.info("start_str: %s, end_str: %s", start_str, end_str)
 
     # יצירת תיקיית היעד במידת הצורך
     try:
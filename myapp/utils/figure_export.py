@@ -0,0 +1,213 @@
+# myapp/utils/figure_export.py
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from myapp.utils.chart_service import get_chart_service
+from myapp.utils.logger_config import get_logger
+from myapp.utils.pipeline_timing import span
+from myapp.utils.scratch import scratch_workspace
+
+log = get_logger(__name__)
+
+# Plotly figures to PNG without a browser start per image.
+#
+#   exporter = get_figure_exporter()
+#   png = exporter.to_png(fig)                       # bytes, scale 2 by default
+#   pngs = exporter.to_png_many([fig_a, fig_b])      # one Kaleido round-trip
+#
+# Kaleido (v1) drives headless Chrome, and every pio.write_image() without a
+# running Kaleido server launches and tears down a browser - seconds per PDF.
+# The exporter opens Kaleido's sync server once per process on first use (or
+# via warm()) and every later export goes through it; batches are written in
+# a single call. Call warm() inside a worker, never before a fork: the
+# server's thread does not survive into the child. gunicorn.conf.py's
+# post_fork hook and the batch pool's initializer (services/batch_runner.py)
+# do exactly that.
+#
+# Without Kaleido or Chrome (or with FIGURE_EXPORT_BACKEND=matplotlib),
+# single-trace histogram and bar figures are redrawn by the chart service from
+# the same data, titles and pixel size; anything else raises
+# FigureExportError.
+#
+# Each export call is recorded as the "figure_export" stage with rows_in /
+# rows_out = images, so the stage's seconds / rows_out is the per-image cost.
+#
+# Env control:
+#   FIGURE_EXPORT_BACKEND  auto | kaleido | matplotlib (default: auto)
+#   FIGURE_EXPORT_SCALE    default scale factor (default: 2)
+
+BACKENDS = ("auto", "kaleido", "matplotlib")
+_DEFAULT_SIZE = (700, 500)  # plotly's default layout width/height in px
+
+
+class FigureExportError(RuntimeError):
+    pass
+
+
+def kaleido_ready() -> bool:
+    """Kaleido is installed and can find a Chrome/Chromium to drive."""
+    try:
+        import kaleido  # noqa: F401
+        from choreographer.browsers.chromium import Chromium
+
+        return Chromium.find_browser(skip_local=False) is not None
+    except Exception:
+        return False
+
+
+def _title(obj: Any) -> str:
+    try:
+        return obj.title.text or ""
+    except AttributeError:
+        return ""
+
+
+def chart_spec(fig: Any, scale: float) -> Tuple[str, List[str], List[float], Dict[str, Any]]:
+    """(kind, labels, values, style) for redrawing `fig` with the chart service."""
+    traces = list(fig.data)
+    if len(traces) != 1 or traces[0].type not in ("histogram", "bar"):
+        kinds = [t.type for t in traces]
+        raise FigureExportError(f"No matplotlib fallback for traces {kinds}; install Chrome for Kaleido")
+    trace = traces[0]
+    layout = fig.layout
+    ylabel = _title(layout.yaxis)
+
+    if trace.type == "bar":
+        labels = [str(v) for v in (trace.x if trace.x is not None else [])]
+        values = pd.to_numeric(pd.Series(trace.y if trace.y is not None else []), errors="coerce").fillna(0.0).tolist()
+    else:
+        if trace.y is not None or (trace.histfunc or "count") != "count":
+            raise FigureExportError("Only count histograms over x have a matplotlib fallback")
+        x = pd.Series(trace.x if trace.x is not None else [], dtype=object).dropna()
+        numeric = pd.to_numeric(x, errors="coerce")
+        if len(x) and numeric.notna().all():
+            counts, edges = np.histogram(numeric.astype(float), bins=trace.nbinsx or "auto")
+            labels = [f"{lo:g}-{hi:g}" for lo, hi in zip(edges[:-1], edges[1:])]
+            values = counts.astype(float).tolist()
+        else:
+            # categories in order of first appearance, as plotly draws them
+            counts = x.astype(str).value_counts()
+            labels = list(pd.unique(x.astype(str)))
+            values = [float(counts[label]) for label in labels]
+        ylabel = ylabel or "count"
+
+    width = layout.width or _DEFAULT_SIZE[0]
+    height = layout.height or _DEFAULT_SIZE[1]
+    style = {
+        "title": _title(layout),
+        "xlabel": _title(layout.xaxis),
+        "ylabel": ylabel,
+        "figsize": (width / 100, height / 100),
+        "dpi": int(round(100 * scale)),
+        "rotation": 45 if len(labels) > 8 else 0,
+        "ha": "right" if len(labels) > 8 else "center",
+    }
+    return "bar", labels, values, style
+
+
+class FigureExporter:
+    def __init__(self, backend: str = "auto", scale: float = 2.0) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown figure export backend: {backend}")
+        self.requested = backend
+        self.scale = scale
+        self._resolved: Optional[str] = None
+        self._server_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        # Kaleido's sync server answers requests through one shared queue;
+        # concurrent callers must take turns or they read each other's images
+        self._kaleido_lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        """The backend exports actually use in this process."""
+        with self._lock:
+            if self._resolved is None:
+                if self.requested == "auto":
+                    self._resolved = "kaleido" if kaleido_ready() else "matplotlib"
+                    if self._resolved == "matplotlib":
+                        log.info("ℹ️ Kaleido/Chrome not available – exporting figures with matplotlib")
+                else:
+                    self._resolved = self.requested
+            return self._resolved
+
+    def warm(self) -> str:
+        """Start the per-process Kaleido server now instead of on the first export."""
+        if self.backend == "kaleido":
+            self._ensure_server()
+        return self.backend
+
+    def _ensure_server(self) -> None:
+        with self._lock:
+            if self._server_pid == os.getpid():
+                return
+            import kaleido
+
+            kaleido.start_sync_server(silence_warnings=True)
+            self._server_pid = os.getpid()
+            log.info("🚀 Kaleido server started for pid %d", self._server_pid)
+
+    def _kaleido_many(self, figs: Sequence[Any], scale: float) -> List[bytes]:
+        self._ensure_server()
+        with self._kaleido_lock, scratch_workspace("figures") as workspace:
+            files = [workspace.file(".png") for _ in figs]
+            pio.write_images(list(figs), files, format="png", scale=scale)
+            return [path.read_bytes() for path in files]
+
+    def _matplotlib_many(self, figs: Sequence[Any], scale: float) -> List[bytes]:
+        charts = get_chart_service()
+        out = []
+        for fig in figs:
+            kind, labels, values, style = chart_spec(fig, scale)
+            out.append(charts.render(kind, labels, values, **style))
+        return out
+
+    def to_png_many(self, figs: Sequence[Any], *, scale: Optional[float] = None) -> List[bytes]:
+        """PNG bytes for each figure, in order, from one backend call."""
+        figs = list(figs)
+        if not figs:
+            return []
+        scale = scale or self.scale
+        with span("figure_export", rows_in=len(figs)) as s:
+            if self.backend == "kaleido":
+                try:
+                    pngs = self._kaleido_many(figs, scale)
+                except Exception as e:
+                    if self.requested != "auto":
+                        raise FigureExportError(f"Kaleido export failed: {e}") from e
+                    log.warning("⚠️ Kaleido export failed (%s) – switching to matplotlib", e)
+                    with self._lock:
+                        self._resolved = "matplotlib"
+                    pngs = self._matplotlib_many(figs, scale)
+            else:
+                pngs = self._matplotlib_many(figs, scale)
+            s.rows_out = len(pngs)
+        return pngs
+
+    def to_png(self, fig: Any, *, scale: Optional[float] = None) -> bytes:
+        return self.to_png_many([fig], scale=scale)[0]
+
+
+_EXPORTER: Optional[FigureExporter] = None
+_EXPORTER_LOCK = threading.Lock()
+
+
+def get_figure_exporter() -> FigureExporter:
+    """Process-wide exporter configured from FIGURE_EXPORT_BACKEND / FIGURE_EXPORT_SCALE."""
+    global _EXPORTER
+    with _EXPORTER_LOCK:
+        if _EXPORTER is None:
+            _EXPORTER = FigureExporter(
+                os.getenv("FIGURE_EXPORT_BACKEND", "auto").strip().lower(),
+                float(os.getenv("FIGURE_EXPORT_SCALE", "2")),
+            )
+        return _EXPORTER
+
+
+__all__ = ["FigureExporter", "FigureExportError", "get_figure_exporter", "kaleido_ready", "chart_spec", "BACKENDS"]
@@ -0,0 +1,72 @@
+# myapp/utils/file_cache.py
+
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Tuple
+
+import yaml
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# path -> (mtime_ns, parsed content). Filled once per process (or once in the
+# gunicorn master when preloading) and re-read only when the file changes.
+#
+# Every caller gets the one cached object, frozen when it was parsed: mappings
+# are read-only views (MappingProxyType) and lists are tuples, so a hit costs
+# a dict lookup instead of a deep copy. A caller that wants to modify the
+# content copies what it changes, e.g. dict(config) or list(config["x"]).
+_CACHE: Dict[str, Tuple[int, Any]] = {}
+_LOCK = threading.Lock()
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _load_cached(path: str | Path, parser: Callable[[str], Any]) -> Any:
+    p = Path(path)
+    key = str(p.resolve())
+    mtime = p.stat().st_mtime_ns
+    with _LOCK:
+        hit = _CACHE.get(key)
+        if hit is not None and hit[0] == mtime:
+            return hit[1]
+    data = _freeze(parser(p.read_text(encoding="utf-8")))
+    with _LOCK:
+        _CACHE[key] = (mtime, data)
+    log.debug("Loaded config file into cache: %s", key)
+    return data
+
+
+def load_cached_json(path: str | Path) -> Any:
+    """
+    Parse a JSON file once and serve it, read-only, from memory until its
+    mtime changes. Raises FileNotFoundError / json.JSONDecodeError like a
+    plain json.load would.
+    """
+    return _load_cached(path, json.loads)
+
+
+def load_cached_yaml(path: str | Path) -> Any:
+    """
+    Parse a YAML file once and serve it, read-only, from memory until its
+    mtime changes.
+    """
+    return _load_cached(path, yaml.safe_load)
+
+
+def clear_file_cache() -> None:
+    """Drop every cached file (mainly for tests)."""
+    with _LOCK:
+        _CACHE.clear()
+
+
+__all__ = ["load_cached_json", "load_cached_yaml", "clear_file_cache"]
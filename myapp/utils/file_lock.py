@@ -0,0 +1,69 @@
+# myapp/utils/file_lock.py
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Exclusive lock shared by every process and thread working on one file.
+#
+#   with file_lock("output/reports_manifest.json"):
+#       data = load(...)          # read-modify-write without losing updates
+#       save(data)
+#
+# The lock is held on a sibling "<name>.lock" file (created on first use and
+# left in place), never on the data file itself, so the data file can still
+# be os.replace()d while the lock is held. Every `with` opens its own handle:
+# two threads of one process exclude each other just like two processes do.
+# Not reentrant - do not nest two locks on the same path.
+
+
+def lock_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.name}.lock")
+
+
+def _acquire(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError:  # LK_LOCK gives up after ~10 s
+            time.sleep(0.05)
+
+
+def _release(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: str | Path) -> Iterator[None]:
+    """Hold the exclusive lock for `path` (see lock_path) until the block exits."""
+    target = lock_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(target, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        _acquire(fd)
+        try:
+            yield
+        finally:
+            _release(fd)
+    finally:
+        os.close(fd)
+
+
+__all__ = ["file_lock", "lock_path"]
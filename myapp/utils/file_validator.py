@@ -157,7 +157,11 @@ def load_and_clean_data(filepath: str) -> pd.DataFrame:
 
     Returns a cleaned DataFrame.
     """
-    df = load_file(filepath)
+    return clean_loaded_frame(load_file(filepath))
+
+
+def clean_loaded_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Steps 2-5 of load_and_clean_data, for a frame that is already in memory."""
     df = _normalize_column_names(df)
     df = _rename_alias_columns(df)
     df = _fill_missing_columns(df)
@@ -0,0 +1,438 @@
+# myapp/utils/job_index.py
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.file_lock import file_lock
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Persistent index of every job_id seen in an upload, so overlapping
+# re-uploads are not counted twice.
+#
+#   report = check_uploaded_jobs(df)      # bulk: new / duplicate / changed per row
+#   report.counts()                       # {"new": 120, "duplicate": 30, "changed": 2}
+#   df[report.fresh_mask()]               # drop rows already seen unchanged
+#   get_job_index().upsert(report)        # after the upload succeeded
+#
+# Layout:
+#   <path>               SQLite table job_id -> hash of the job's values
+#   <path>.bloom.npy     Bloom filter over all job_ids. Checked first: ids it
+#                        rejects are new for sure and never reach SQLite, so a
+#                        mostly-new upload costs one vectorised hash pass.
+#
+# A job whose id is known but whose values hash differently is "changed";
+# upsert() stores the new hash (the caller replaces the old figures, e.g. the
+# rollup store's own upsert). Callers working on a prepared frame pass
+# value_columns=DEDUP_VALUE_COLUMNS, so only the uploaded source fields are
+# hashed: columns derived from them (net_income, flags, formatting) would
+# mark every job "changed" whenever their computation changes.
+#
+# upsert() holds a file lock on the Bloom file from before the SQLite write
+# until the new bits are on disk, and sets them in the saved filter itself
+# (memory-mapped, so only the touched pages are written) rather than saving
+# this process's copy over it: concurrent workers never drop each other's
+# ids. The whole file is only rewritten when the filter is rebuilt.
+#
+# Env control:
+#   JOB_INDEX_PATH  SQLite file (default: output/job_index.sqlite3)
+
+DEFAULT_INDEX_PATH = "output/job_index.sqlite3"
+NEW, DUPLICATE, CHANGED = "new", "duplicate", "changed"
+
+# the job's source fields as uploaded, under either naming; missing ones are skipped
+DEDUP_VALUE_COLUMNS = (
+    "date", "closed", "tech", "technician", "job_type", "service_type",
+    "client", "client_id", "company", "total", "parts", "company_parts", "tech_share", "tip_amount",
+    "cash", "credit", "billing", "check", "payment_method",
+)
+
+_HASH_KEY = "autoclose-jobids"  # 16 chars, as pandas' hash_array requires
+_SQL_CHUNK = 50_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_index (
+    job_id     TEXT PRIMARY KEY,
+    value_hash INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen  TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1,
+    source     TEXT
+) WITHOUT ROWID;
+"""
+
+
+def normalize_job_ids(series: pd.Series) -> pd.Series:
+    """job_id as stripped text; missing ids become ""."""
+    return series.astype(object).where(series.notna(), "").astype(str).str.strip()
+
+
+def _hash_ids(ids: np.ndarray) -> np.ndarray:
+    return pd.util.hash_array(np.asarray(ids, dtype=object), hash_key=_HASH_KEY)
+
+
+# ------------------------------------------------------------------------------
+# Bloom filter
+# ------------------------------------------------------------------------------
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter with Kirsch-Mitzenmacher double hashing on the
+    two halves of one 64-bit hash (bit i = lo + i * hi mod m).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.n_bits = int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.n_hashes = max(1, int(round(self.n_bits / self.capacity * math.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        lo = (hashes & np.uint64(0xFFFFFFFF)).astype(np.uint64)
+        hi = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (lo[:, None] + steps[None, :] * hi[:, None]) % np.uint64(self.n_bits)
+
+    def add(self, hashes: np.ndarray) -> None:
+        for start in range(0, len(hashes), _SQL_CHUNK):
+            pos = self._positions(hashes[start:start + _SQL_CHUNK]).ravel()
+            np.bitwise_or.at(self.bits, (pos >> np.uint64(3)).astype(np.intp),
+                             (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8)))
+        self.count += len(hashes)
+
+    def might_contain(self, hashes: np.ndarray) -> np.ndarray:
+        out = np.empty(len(hashes), dtype=bool)
+        for start in range(0, len(hashes), _SQL_CHUNK):
+            pos = self._positions(hashes[start:start + _SQL_CHUNK])
+            bytes_ = self.bits[(pos >> np.uint64(3)).astype(np.intp)]
+            hit = (bytes_ >> (pos & np.uint64(7)).astype(np.uint8)) & np.uint8(1)
+            out[start:start + _SQL_CHUNK] = hit.all(axis=1)
+        return out
+
+    @classmethod
+    def _from_parts(cls, capacity: int, error_rate: float, n_bits: int, n_hashes: int, bits, count: int) -> "BloomFilter":
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.error_rate = capacity, error_rate
+        bloom.n_bits, bloom.n_hashes, bloom.bits, bloom.count = n_bits, n_hashes, bits, count
+        return bloom
+
+    def save(self, path: Path) -> None:
+        header = np.array([self.capacity, self.n_bits, self.n_hashes, self.count], dtype=np.int64)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, header)
+            np.save(f, self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, error_rate: float = 0.001) -> "BloomFilter":
+        with open(path, "rb") as f:
+            capacity, n_bits, n_hashes, count = (int(v) for v in np.load(f))
+            bits = np.load(f)
+        return cls._from_parts(capacity, error_rate, n_bits, n_hashes, bits, count)
+
+    @classmethod
+    def open_in_place(cls, path: Path, error_rate: float = 0.001) -> "BloomFilter":
+        """
+        The filter saved at `path`, memory-mapped: add() then flush() write
+        only the pages holding the new bits. Hold the file's lock meanwhile.
+        """
+        with open(path, "rb") as f:
+            header_at, _shape = _array_offset(f)
+            f.seek(header_at)
+            capacity, n_bits, n_hashes, count = (int(v) for v in np.fromfile(f, dtype=np.int64, count=4))
+            bits_at, (n_bytes,) = _array_offset(f)
+        bits = np.memmap(path, dtype=np.uint8, mode="r+", offset=bits_at, shape=(n_bytes,))
+        bloom = cls._from_parts(capacity, error_rate, n_bits, n_hashes, bits, count)
+        bloom._header = np.memmap(path, dtype=np.int64, mode="r+", offset=header_at, shape=(4,))
+        return bloom
+
+    def flush(self) -> None:
+        """Write a filter from open_in_place() back to its file."""
+        self._header[3] = self.count
+        self._header.flush()
+        self.bits.flush()
+
+
+def _array_offset(f) -> Tuple[int, Tuple[int, ...]]:
+    # where the data of the .npy array starting at f's position begins, and its shape
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, _fortran, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, _fortran, dtype = np.lib.format.read_array_header_2_0(f)
+    offset = f.tell()
+    f.seek(offset + int(np.prod(shape)) * dtype.itemsize)
+    return offset, shape
+
+
+# ------------------------------------------------------------------------------
+# Check result
+# ------------------------------------------------------------------------------
+
+
+@dataclass
+class DedupReport:
+    status: pd.Series  # per row of the checked frame: new / duplicate / changed / ""(no id)
+    job_ids: pd.Series  # normalised ids, same index
+    job_hashes: Dict[str, int] = field(default_factory=dict)  # job_id -> value hash
+    source: Optional[str] = None
+
+    def counts(self) -> Dict[str, int]:
+        """Row counts per status (rows without a job_id are not counted)."""
+        counts = self.status.value_counts()
+        return {s: int(counts.get(s, 0)) for s in (NEW, DUPLICATE, CHANGED)}
+
+    def fresh_mask(self) -> pd.Series:
+        """Rows worth (re)processing: new or changed jobs, and rows without an id."""
+        return self.status != DUPLICATE
+
+    def fresh_job_ids(self) -> set:
+        return set(self.job_ids[self.status.isin([NEW, CHANGED])])
+
+    def to_dict(self) -> Dict[str, int]:
+        return {"rows": int(len(self.status)), **self.counts()}
+
+
+# ------------------------------------------------------------------------------
+# Index
+# ------------------------------------------------------------------------------
+
+
+def _value_hashes(df: pd.DataFrame, job_ids: pd.Series, value_columns: Optional[Sequence[str]]) -> pd.Series:
+    """One uint64 per job: hash of its rows' values (order of rows doesn't matter)."""
+    columns = sorted(c for c in (value_columns or df.columns) if c in df.columns and c != "job_id")
+    row_hashes = pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy(dtype=np.uint64)
+    ids = job_ids.to_numpy(dtype=object)
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]) if len(ids) else np.array([], dtype=int)
+    sums = np.add.reduceat(row_hashes[order], starts) if len(ids) else np.array([], dtype=np.uint64)
+    return pd.Series(sums, index=sorted_ids[starts])
+
+
+class JobIndex:
+    def __init__(self, path: str | Path, *, capacity: int = 5_000_000, error_rate: float = 0.001) -> None:
+        self.path = Path(path)
+        self.bloom_path = self.path.with_name(self.path.name + ".bloom.npy")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._bloom_mtime: Optional[int] = None
+        self._initialised = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        if not self._initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._initialised = True
+        return conn
+
+    def _rebuild_bloom(self, conn: sqlite3.Connection) -> BloomFilter:
+        (count,) = conn.execute("SELECT COUNT(*) FROM job_index").fetchone()
+        bloom = BloomFilter(max(self.capacity, count * 2), self.error_rate)
+        cursor = conn.execute("SELECT job_id FROM job_index")
+        while True:
+            rows = cursor.fetchmany(_SQL_CHUNK)
+            if not rows:
+                break
+            bloom.add(_hash_ids(np.array([r[0] for r in rows], dtype=object)))
+        log.info("🧮 Job index Bloom filter rebuilt over %d ids", count)
+        return bloom
+
+    def _current_bloom(self, conn: sqlite3.Connection) -> BloomFilter:
+        # Another worker may have added ids since we loaded the filter
+        try:
+            mtime = self.bloom_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._bloom is None or (mtime is not None and mtime != self._bloom_mtime):
+            if mtime is not None:
+                try:
+                    self._bloom = BloomFilter.load(self.bloom_path, self.error_rate)
+                    self._bloom_mtime = mtime
+                    return self._bloom
+                except (OSError, ValueError) as e:
+                    log.warning("⚠️ Could not load Bloom filter %s: %s", self.bloom_path, e)
+            self._bloom = self._rebuild_bloom(conn)
+            self._bloom_mtime = None
+        return self._bloom
+
+    def _lookup(self, conn: sqlite3.Connection, ids: List[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (job_id TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM lookup")
+        conn.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", ((i,) for i in ids))
+        for job_id, value_hash in conn.execute(
+            "SELECT j.job_id, j.value_hash FROM lookup l JOIN job_index j ON j.job_id = l.job_id"
+        ):
+            found[job_id] = value_hash
+        conn.execute("DELETE FROM lookup")
+        return found
+
+    def check(
+        self,
+        df: pd.DataFrame,
+        *,
+        value_columns: Optional[Sequence[str]] = None,
+        source: Optional[str] = None,
+    ) -> DedupReport:
+        """Classify every row of `df` by its job_id; nothing is written."""
+        job_ids = normalize_job_ids(df["job_id"]) if "job_id" in df.columns else pd.Series("", index=df.index)
+        job_ids = job_ids.mask(job_ids.str.startswith("Totals"), "")  # appended totals row
+        has_id = job_ids != ""
+        hashes = _value_hashes(df[has_id], job_ids[has_id], value_columns)
+        signed = hashes.to_numpy(dtype=np.uint64).view(np.int64)
+        unique_ids = hashes.index.to_numpy(dtype=object)
+
+        maybe = np.zeros(len(unique_ids), dtype=bool)
+        stored: Dict[str, int] = {}
+        if len(unique_ids) and self.path.exists():
+            with self._lock, closing(self._connect()) as conn:
+                bloom = self._current_bloom(conn)
+                maybe = bloom.might_contain(_hash_ids(unique_ids))
+                stored = self._lookup(conn, list(unique_ids[maybe]))
+
+        job_status: Dict[str, str] = {}
+        for job_id, value_hash in zip(unique_ids, signed):
+            old = stored.get(job_id)
+            job_status[job_id] = NEW if old is None else (DUPLICATE if old == value_hash else CHANGED)
+        status = job_ids.map(job_status).fillna("")
+        log.debug(
+            "Job index check: %d ids, %d passed the Bloom filter, %d stored",
+            len(unique_ids), int(maybe.sum()), len(stored),
+        )
+        return DedupReport(
+            status=status,
+            job_ids=job_ids,
+            job_hashes=dict(zip(unique_ids, (int(v) for v in signed))),
+            source=source,
+        )
+
+    def upsert(self, report: DedupReport, job_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Record the checked jobs (or just `job_ids` of them) with their current
+        value hash. Returns how many ids were written.
+        """
+        wanted = report.job_hashes if job_ids is None else {
+            j: report.job_hashes[j] for j in job_ids if j in report.job_hashes
+        }
+        if not wanted:
+            return 0
+        now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        rows = [(job_id, value_hash, now, now, report.source) for job_id, value_hash in wanted.items()]
+        hashes = _hash_ids(np.array(list(wanted), dtype=object))
+        with self._lock, file_lock(self.bloom_path), closing(self._connect()) as conn:
+            # our copy can take the new bits too if nobody changed the file since we loaded it
+            cached = self._bloom if self._bloom_mtime is not None and self._bloom_mtime == _mtime(self.bloom_path) else None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO job_index (job_id, value_hash, first_seen, last_seen, source) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(job_id) DO UPDATE SET value_hash = excluded.value_hash, "
+                    "last_seen = excluded.last_seen, seen_count = seen_count + 1, source = excluded.source",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._bloom = self._add_to_saved_bloom(conn, hashes, cached)
+            self._bloom_mtime = _mtime(self.bloom_path) if self._bloom is not None else None
+        return len(rows)
+
+    def _add_to_saved_bloom(
+        self, conn: sqlite3.Connection, hashes: np.ndarray, cached: Optional[BloomFilter]
+    ) -> Optional[BloomFilter]:
+        # caller holds the Bloom file's lock
+        saved = None
+        if self.bloom_path.exists():
+            try:
+                saved = BloomFilter.open_in_place(self.bloom_path, self.error_rate)
+            except (OSError, ValueError) as e:
+                log.warning("⚠️ Could not open Bloom filter %s: %s", self.bloom_path, e)
+        if saved is None or saved.count + len(hashes) > saved.capacity:
+            # missing, unreadable or full (keeps the false-positive rate down)
+            saved = None
+            bloom = self._rebuild_bloom(conn)  # already holds the committed ids
+            bloom.save(self.bloom_path)
+            return bloom
+        saved.add(hashes)
+        saved.flush()
+        del saved
+        now = time.time_ns()
+        os.utime(self.bloom_path, ns=(now, now))  # writes through the map need not touch the mtime
+        if cached is not None:
+            cached.add(hashes)
+        return cached
+
+    def __len__(self) -> int:
+        if not self.path.exists():
+            return 0
+        with closing(self._connect()) as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM job_index").fetchone()
+        return int(count)
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+_INDEXES: Dict[str, JobIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_job_index(path: str | Path | None = None) -> JobIndex:
+    """Process-wide index for `path` (or JOB_INDEX_PATH)."""
+    resolved = str(Path(path or os.getenv("JOB_INDEX_PATH", DEFAULT_INDEX_PATH)).resolve())
+    with _INDEXES_LOCK:
+        if resolved not in _INDEXES:
+            _INDEXES[resolved] = JobIndex(resolved)
+        return _INDEXES[resolved]
+
+
+def check_uploaded_jobs(
+    df: pd.DataFrame,
+    *,
+    index: Optional[JobIndex] = None,
+    value_columns: Optional[Sequence[str]] = None,
+    source: Optional[str] = None,
+) -> DedupReport:
+    """Bulk-check an upload against the job index (see JobIndex.check)."""
+    return (index or get_job_index()).check(df, value_columns=value_columns, source=source)
+
+
+__all__ = [
+    "NEW",
+    "DUPLICATE",
+    "CHANGED",
+    "DEDUP_VALUE_COLUMNS",
+    "BloomFilter",
+    "DedupReport",
+    "JobIndex",
+    "get_job_index",
+    "check_uploaded_jobs",
+    "normalize_job_ids",
+]
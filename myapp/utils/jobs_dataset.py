@@ -0,0 +1,508 @@
+# myapp/utils/jobs_dataset.py
+
+import importlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.file_lock import file_lock
+from myapp.utils.job_index import normalize_job_ids
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Month-partitioned store of every uploaded job line; replaces re-writing and
+# re-reading output/merged_jobs.csv wholesale.
+#
+#   ds = get_jobs_dataset()
+#   ds.append(detail_df)                               # one new part file per month touched
+#   ds.read(date_from="2025-06-01", techs=["Avi"])     # only month=2025-06.. partitions
+#   ds.compact()                                       # merge parts, latest job_id wins
+#   ds.export_csv("output/merged_jobs.csv")            # compatibility export, on demand
+#
+# Layout:
+#   <root>/month=YYYY-MM/part-<seq>-<id>.<ext>            one file per append
+#   <root>/month=YYYY-MM/compact-<seq>-<id>.<ext>         the merge of ...
+#   <root>/month=YYYY-MM/compact-<seq>-<id>.<ext>.parts   ... exactly these files (JSON list)
+#   <root>/month=unknown/...                              rows without a parseable date
+#
+# Files are written under a dot-name and os.replace()d into place, so readers
+# never see a half-written part. A compact file supersedes the files named in
+# its .parts list (written before the compact file appears): readers ignore
+# them even before compaction deletes them, while a part that landed after
+# the compaction listed the folder stays live whatever its sequence number.
+# Appends take no lock; compactions (and the one-time seeding below) hold a
+# cross-process file lock on <root>/.maintenance. When a job_id shows up in
+# several files, the rows of the newest file win (re-uploaded "changed" jobs
+# replace their old lines).
+#
+# The first upload after switching to the dataset imports the existing
+# output/merged_jobs.csv (seed_from_csv). The CSV is no longer written on
+# every upload; scripts/auto_run.py refreshes it on its schedule.
+#
+# Parquet (pyarrow or fastparquet) is used when installed, with the date /
+# technician filters pushed down to the row-group statistics. Without a
+# Parquet engine, parts are pandas pickles (still one file per append, still
+# pruned by month); both kinds can sit in one dataset.
+#
+# Env control:
+#   JOBS_DATASET_PATH           dataset root (default: output/jobs_dataset)
+#   JOBS_DATASET_FORMAT         parquet | pickle (default: parquet when available)
+#   JOBS_DATASET_COMPACT_AFTER  parts per month before a background compaction (default: 8)
+
+DEFAULT_DATASET_PATH = "output/jobs_dataset"
+MERGED_CSV_PATH = "output/merged_jobs.csv"
+UNKNOWN_MONTH = "unknown"
+TECH_COLUMNS = ("tech", "technician")
+
+_EXTENSIONS = {"parquet": ".parquet", "pickle": ".pkl"}
+_FILE_RE = re.compile(r"^(part|compact)-(\d+)-[0-9a-f]+\.(parquet|pkl)$")
+_SEQ = 0
+_SEQ_LOCK = threading.Lock()
+
+
+def _next_seq() -> int:
+    # time-ordered across processes, strictly increasing within one
+    global _SEQ
+    with _SEQ_LOCK:
+        _SEQ = max(_SEQ + 1, time.time_ns())
+        return _SEQ
+
+
+def parquet_engine() -> Optional[str]:
+    """The installed Parquet engine pandas can use, or None."""
+    for name in ("pyarrow", "fastparquet"):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        return name
+    return None
+
+
+def _month_key(value) -> Optional[str]:
+    return None if value is None else pd.Timestamp(value).strftime("%Y-%m")
+
+
+def _date_column(df: pd.DataFrame) -> Optional[pd.Series]:
+    if "date" not in df.columns:
+        return None
+    dates = df["date"]
+    return dates if pd.api.types.is_datetime64_any_dtype(dates) else pd.to_datetime(dates, errors="coerce")
+
+
+def tech_column(columns: Iterable[str]) -> Optional[str]:
+    columns = set(columns)
+    return next((c for c in TECH_COLUMNS if c in columns), None)
+
+
+def filter_jobs(
+    df: pd.DataFrame,
+    date_from=None,
+    date_to=None,
+    techs: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Rows with date_from <= date <= date_to and a technician in `techs` (all optional)."""
+    mask = np.ones(len(df), dtype=bool)
+    if date_from is not None or date_to is not None:
+        dates = _date_column(df)
+        if dates is None:
+            return df.iloc[0:0]
+        if date_from is not None:
+            mask &= (dates >= pd.Timestamp(date_from)).to_numpy()
+        if date_to is not None:
+            mask &= (dates <= pd.Timestamp(date_to)).to_numpy()
+    if techs:
+        column = tech_column(df.columns)
+        if column is None:
+            return df.iloc[0:0]
+        mask &= df[column].astype(object).isin(list(techs)).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+def _storable(df: pd.DataFrame, fmt: str) -> pd.DataFrame:
+    # Categoricals carry every category the dictionary ever saw; parts store
+    # the labels. Parquet also needs one type per object column.
+    out = df.copy()
+    out.attrs = {}
+    for column in out.columns:
+        series = out[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            out[column] = series.astype(object)
+        elif fmt == "parquet" and pd.api.types.is_object_dtype(series):
+            if pd.api.types.infer_dtype(series, skipna=True).startswith("mixed"):
+                out[column] = series.where(series.isna(), series.astype(str))
+    return out.reset_index(drop=True)
+
+
+class JobsDataset:
+    def __init__(self, path: str | Path, fmt: Optional[str] = None) -> None:
+        self.path = Path(path)
+        engine = parquet_engine()
+        fmt = (fmt or os.getenv("JOBS_DATASET_FORMAT") or ("parquet" if engine else "pickle")).lower()
+        if fmt not in _EXTENSIONS:
+            raise ValueError(f"Unsupported jobs dataset format: {fmt}")
+        if fmt == "parquet" and engine is None:
+            log.warning("⚠️ No Parquet engine installed – jobs dataset falls back to pickle parts")
+            fmt = "pickle"
+        self.fmt = fmt
+        self.engine = engine
+        self._compact_lock = threading.Lock()
+        self._compacting = False
+        self._maintenance = self.path / ".maintenance"
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def partitions(self) -> Dict[str, List[Path]]:
+        """month -> live files, oldest first (parts covered by a compact file are left out)."""
+        result: Dict[str, List[Path]] = {}
+        if not self.path.is_dir():
+            return result
+        for folder in sorted(self.path.glob("month=*")):
+            files = self._live_files(folder)
+            if files:
+                result[folder.name.split("=", 1)[1]] = [f for _seq, f in files]
+        return result
+
+    def _files(self, folder: Path) -> List[Tuple[int, Path]]:
+        files = []
+        for f in folder.iterdir():
+            match = _FILE_RE.match(f.name)
+            if match:
+                files.append((int(match.group(2)), f))
+        return files
+
+    @staticmethod
+    def _covered_by(compact: Path, seq: int, files: List[Tuple[int, Path]]) -> set:
+        try:
+            return set(json.loads(_parts_list(compact).read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            if not compact.exists():
+                return {compact.name}  # removed by a compaction while we listed
+            # written before compact files listed their parts: covers by sequence
+            return {f.name for s, f in files if s <= seq and f != compact}
+
+    def _live_files(self, folder: Path) -> List[Tuple[int, Path]]:
+        files = self._files(folder)
+        covered = set()
+        for seq, f in files:
+            if f.name.startswith("compact-"):
+                covered |= self._covered_by(f, seq, files)
+        return sorted((seq, f) for seq, f in files if f.name not in covered)
+
+    def has_data(self) -> bool:
+        return bool(self.partitions())
+
+    def months(self, date_from=None, date_to=None) -> List[str]:
+        """Partitions overlapping [date_from, date_to]; undated rows only when unbounded."""
+        lo, hi = _month_key(date_from), _month_key(date_to)
+        selected = []
+        for month in self.partitions():
+            if month == UNKNOWN_MONTH:
+                if lo is None and hi is None:
+                    selected.append(month)
+            elif (lo is None or month >= lo) and (hi is None or month <= hi):
+                selected.append(month)
+        return selected
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def _write(self, frame: pd.DataFrame, folder: Path, kind: str, seq: int, covers: Sequence[str] = ()) -> Path:
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"{kind}-{seq:020d}-{uuid.uuid4().hex[:8]}{_EXTENSIONS[self.fmt]}"
+        tmp = folder / f".{name}.tmp"
+        try:
+            if kind == "compact":
+                # the list goes first: once the compact file is visible, so is what it replaces
+                listing = _parts_list(folder / name)
+                tmp.write_text(json.dumps(list(covers)), encoding="utf-8")
+                os.replace(tmp, listing)
+            if self.fmt == "parquet":
+                frame.to_parquet(tmp, engine=self.engine, index=False)
+            else:
+                frame.to_pickle(tmp, compression=None)
+            os.replace(tmp, folder / name)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return folder / name
+
+    def append(self, df: pd.DataFrame) -> Dict[str, int]:
+        """Write `df` as one new part per month it touches. Returns rows per month."""
+        if df.empty:
+            return {}
+        frame = _storable(df, self.fmt)
+        dates = _date_column(frame)
+        if dates is None:
+            months = pd.Series(UNKNOWN_MONTH, index=frame.index)
+        else:
+            frame = frame.assign(date=dates).sort_values("date", kind="stable")
+            months = frame["date"].dt.strftime("%Y-%m").fillna(UNKNOWN_MONTH)
+        seq = _next_seq()
+        written: Dict[str, int] = {}
+        for month, rows in frame.groupby(months, sort=True):
+            self._write(rows.reset_index(drop=True), self.path / f"month={month}", "part", seq)
+            written[month] = len(rows)
+        log.info("🗂️ Jobs dataset: appended %d rows to %s", len(frame), ", ".join(written))
+        return written
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def _read_file(self, path: Path, columns, date_from, date_to, techs) -> pd.DataFrame:
+        if path.suffix == ".pkl":
+            frame = pd.read_pickle(path, compression=None)
+            return frame if columns is None else frame[[c for c in columns if c in frame.columns]]
+        filters = []
+        if self.engine == "pyarrow":
+            import pyarrow.parquet as pq
+
+            names = set(pq.read_schema(path).names)
+            if "date" in names:
+                if date_from is not None:
+                    filters.append(("date", ">=", pd.Timestamp(date_from)))
+                if date_to is not None:
+                    filters.append(("date", "<=", pd.Timestamp(date_to)))
+            column = tech_column(names)
+            if techs and column:
+                filters.append((column, "in", list(techs)))
+            if columns is not None:
+                columns = [c for c in columns if c in names]
+        return pd.read_parquet(path, engine=self.engine, columns=columns, filters=filters or None)
+
+    def _read_files(self, files, columns, date_from, date_to, techs) -> pd.DataFrame:
+        frames, seqs = [], []
+        for seq, path in files:
+            frame = filter_jobs(self._read_file(path, columns, date_from, date_to, techs), date_from, date_to, techs)
+            if not frame.empty:
+                frames.append(frame)
+                seqs.append(np.full(len(frame), seq, dtype=np.int64))
+        if not frames:
+            return pd.DataFrame(columns=list(columns or []))
+        out = pd.concat(frames, ignore_index=True)
+        return _latest_per_job(out, np.concatenate(seqs))
+
+    def _read_once(self, months, columns, date_from, date_to, techs) -> pd.DataFrame:
+        files = [f for month in months for f in self._live_files(self.path / f"month={month}")]
+        return self._read_files(files, columns, date_from, date_to, techs)
+
+    def read(
+        self,
+        date_from=None,
+        date_to=None,
+        techs: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Jobs with date_from <= date <= date_to (inclusive) and a technician in
+        `techs`, reading only the month partitions that overlap the range.
+        """
+        months = self.months(date_from, date_to)
+        if columns is not None:
+            extra = ["job_id", "date", *TECH_COLUMNS]
+            columns = list(dict.fromkeys([*columns, *extra]))
+        for attempt in range(3):
+            try:
+                frame = self._read_once(months, columns, date_from, date_to, techs)
+                break
+            except FileNotFoundError:
+                # a compaction removed a file between listing and reading
+                if attempt == 2:
+                    raise
+        log.debug("Jobs dataset read: months %s -> %d rows", months, len(frame))
+        return frame
+
+    # ------------------------------------------------------------------
+    # Compaction / export
+    # ------------------------------------------------------------------
+
+    def compact(self, months: Optional[Iterable[str]] = None, min_files: int = 2) -> Dict[str, int]:
+        """
+        Merge each month's live files (with at least `min_files`) into one
+        compact file, dropping superseded job lines. Returns rows per month.
+        """
+        done: Dict[str, int] = {}
+        wanted = set(months) if months is not None else None
+        with file_lock(self._maintenance):
+            for month, files in self.partitions().items():
+                if (wanted is not None and month not in wanted) or len(files) < min_files:
+                    continue
+                folder = self.path / f"month={month}"
+                live = self._live_files(folder)
+                try:
+                    merged = self._read_files(live, None, None, None, None)
+                except FileNotFoundError:
+                    log.info("Jobs dataset: %s changed during compaction, skipped", month)
+                    continue
+                if "date" in merged.columns:
+                    merged = merged.sort_values("date", kind="stable")
+                covers = [f.name for _seq, f in live]
+                self._write(_storable(merged, self.fmt), folder, "compact", live[-1][0], covers)
+                for _seq, old in live:
+                    _remove(old)
+                self._remove_leftovers(folder)
+                done[month] = len(merged)
+        if done:
+            log.info("🗜️ Jobs dataset compacted: %s", done)
+        return done
+
+    def _remove_leftovers(self, folder: Path) -> None:
+        # files some compact file already covers, and .parts lists whose
+        # compact file never appeared (an interrupted compaction)
+        live = {f for _seq, f in self._live_files(folder)}
+        for _seq, f in self._files(folder):
+            if f not in live:
+                _remove(f)
+        for listing in folder.glob("compact-*.parts"):
+            if not listing.with_suffix("").exists():
+                listing.unlink(missing_ok=True)
+
+    def seed_from_csv(
+        self,
+        csv_path: str | Path = MERGED_CSV_PATH,
+        reader: Callable[[str], pd.DataFrame] = pd.read_csv,
+    ) -> int:
+        """
+        One-time import of the merged jobs CSV that predates the dataset, so
+        the first append does not hide everything uploaded before it. Only
+        an empty dataset is seeded. Returns the rows imported.
+        """
+        marker = self.path / ".seeded"
+        if marker.exists():
+            return 0
+        with file_lock(self._maintenance):
+            if marker.exists():
+                return 0
+            rows = 0
+            if not self.has_data() and Path(csv_path).is_file():
+                rows = sum(self.append(reader(str(csv_path))).values())
+                log.info("🗂️ Jobs dataset seeded from %s (%d rows)", csv_path, rows)
+            marker.parent.mkdir(parents=True, exist_ok=True)
+            marker.touch()
+        return rows
+
+    def compact_in_background(self, export_csv_to: str | Path | None = None) -> bool:
+        """
+        Compact months with more than JOBS_DATASET_COMPACT_AFTER files (and
+        refresh the CSV export) on a daemon thread. False if one is running.
+        """
+        with self._compact_lock:
+            if self._compacting:
+                return False
+            self._compacting = True
+        threshold = int(os.getenv("JOBS_DATASET_COMPACT_AFTER", "8"))
+
+        def run() -> None:
+            try:
+                crowded = [m for m, files in self.partitions().items() if len(files) >= threshold]
+                if crowded:
+                    self.compact(crowded)
+                if export_csv_to is not None:
+                    self.export_csv(export_csv_to)
+            except Exception as e:
+                log.warning("⚠️ Jobs dataset background compaction failed: %s", e, exc_info=True)
+            finally:
+                with self._compact_lock:
+                    self._compacting = False
+
+        threading.Thread(target=run, name="jobs-dataset-compact", daemon=True).start()
+        return True
+
+    def export_csv(self, path: str | Path = MERGED_CSV_PATH, frame: Optional[pd.DataFrame] = None, **filters) -> Path:
+        """
+        Write the dataset (optionally filtered, see read()) as a single CSV;
+        `frame` is a result of read() the caller already has.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if frame is None:
+            frame = self.read(**filters)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        frame.to_csv(tmp, index=False, encoding="utf-8-sig")
+        os.replace(tmp, path)
+        log.info("📤 Jobs dataset exported to %s (%d rows)", path, len(frame))
+        return path
+
+
+def _parts_list(compact: Path) -> Path:
+    return compact.with_name(f"{compact.name}.parts")
+
+
+def _remove(path: Path) -> None:
+    # data file first: a compact file without its list would cover by sequence
+    path.unlink(missing_ok=True)
+    _parts_list(path).unlink(missing_ok=True)
+
+
+def _latest_per_job(frame: pd.DataFrame, seqs: np.ndarray) -> pd.DataFrame:
+    """Keep, for every job_id, only the rows from the newest file that has it."""
+    if "job_id" not in frame.columns or len(np.unique(seqs)) < 2:
+        return frame
+    ids = normalize_job_ids(frame["job_id"]).to_numpy()
+    newest = pd.Series(seqs).groupby(ids, sort=False).transform("max").to_numpy()
+    keep = (ids == "") | (seqs == newest)
+    return frame if keep.all() else frame[keep].reset_index(drop=True)
+
+
+def read_merged_jobs(
+    csv_path: str | Path = MERGED_CSV_PATH,
+    *,
+    date_from=None,
+    date_to=None,
+    techs: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    reader: Callable[[str], pd.DataFrame] = pd.read_csv,
+) -> pd.DataFrame:
+    """
+    The merged jobs table: from the dataset when `csv_path` is the default
+    export and the dataset has data, otherwise from the CSV via `reader`
+    (filtered the same way). Raises FileNotFoundError when neither exists.
+    """
+    if Path(csv_path).resolve() == Path(MERGED_CSV_PATH).resolve():
+        dataset = get_jobs_dataset()
+        if dataset.has_data():
+            return dataset.read(date_from, date_to, techs, columns)
+    df = filter_jobs(reader(str(csv_path)), date_from, date_to, techs)
+    return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+def merged_jobs_available(csv_path: str | Path = MERGED_CSV_PATH) -> bool:
+    if Path(csv_path).resolve() == Path(MERGED_CSV_PATH).resolve() and get_jobs_dataset().has_data():
+        return True
+    return Path(csv_path).is_file()
+
+
+_DATASETS: Dict[str, JobsDataset] = {}
+_DATASETS_LOCK = threading.Lock()
+
+
+def get_jobs_dataset(path: str | Path | None = None) -> JobsDataset:
+    """Process-wide dataset for `path` (or JOBS_DATASET_PATH)."""
+    resolved = str(Path(path or os.getenv("JOBS_DATASET_PATH", DEFAULT_DATASET_PATH)).resolve())
+    with _DATASETS_LOCK:
+        if resolved not in _DATASETS:
+            _DATASETS[resolved] = JobsDataset(resolved)
+        return _DATASETS[resolved]
+
+
+__all__ = [
+    "JobsDataset",
+    "get_jobs_dataset",
+    "read_merged_jobs",
+    "merged_jobs_available",
+    "filter_jobs",
+    "parquet_engine",
+    "MERGED_CSV_PATH",
+]
@@ -1,89 +1,157 @@
 # utils/logger_config.py
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from typing import Optional
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
 import logging.config
 
+# All application logging funnels through ONE QueueHandler on the root logger.
+# Request threads only enqueue records; a single QueueListener thread formats
+# them and does the stdout / file I/O.
+#
+# Env control:
+#   LOG_LEVEL   root level, default INFO
+#   LOG_LEVELS  per-module overrides, e.g. "myapp.services=DEBUG,werkzeug=WARNING"
+
+_LOCK = threading.RLock()
+_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_sink_handlers: List[logging.Handler] = []
+_file_sinks: Dict[str, logging.Handler] = {}
+
 
 def _get_log_level() -> str:
     """Read LOG_LEVEL from environment, default to INFO."""
     return os.getenv("LOG_LEVEL", "INFO").upper()
 
 
+def _get_module_levels() -> Dict[str, str]:
+    """Parse LOG_LEVELS="name=LEVEL,other=LEVEL" into a dict."""
+    levels: Dict[str, str] = {}
+    for item in os.getenv("LOG_LEVELS", "").split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
 def _create_formatter() -> logging.Formatter:
     """Create and return a standard log formatter."""
     return logging.Formatter(
-        fmt="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        fmt="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
 
 def _create_console_handler(formatter: logging.Formatter) -> logging.Handler:
     """Create a console (stream) handler with the given formatter."""
-    handler = logging.StreamHandler()
+    handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(formatter)
     return handler
 
 
-def get_logger(name: str, log_file: Optional[str] = None) -> logging.Logger:
+def _restart_listener() -> None:
+    """(Re)start the listener thread over the current sink handlers."""
+    global _listener
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+    _listener = QueueListener(_queue, *_sink_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _after_fork_in_child() -> None:
+    # The listener thread does not survive fork (gunicorn workers, process
+    # pools); give the child a fresh queue and its own listener.
+    global _queue, _listener
+    if _queue_handler is None:
+        return
+    _queue = queue.Queue(-1)
+    _queue_handler.queue = _queue
+    _listener = None
+    _restart_listener()
+
+
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+def _apply_levels() -> None:
+    logging.getLogger().setLevel(_get_log_level())
+    for name, level in _get_module_levels().items():
+        logging.getLogger(name).setLevel(level)
+
+
+def _ensure_pipeline() -> None:
+    """Install the root QueueHandler and stdout sink exactly once."""
+    global _queue_handler
+    with _LOCK:
+        if _queue_handler is not None:
+            return
+        _sink_handlers.append(_create_console_handler(_create_formatter()))
+        _queue_handler = QueueHandler(_queue)
+        logging.getLogger().addHandler(_queue_handler)
+        _apply_levels()
+        _restart_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def add_log_file(log_file: str, mode: str = "a") -> None:
     """
-    Set up a logger with console and optional file handlers.
-    Handles both TTY and non-TTY environments.
+    Route every record to `log_file` as well, through the shared listener.
+    Calling it again for the same path is a no-op.
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    _ensure_pipeline()
+    path = os.path.abspath(log_file)
+    with _LOCK:
+        if path in _file_sinks:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        handler = logging.FileHandler(path, mode=mode, encoding="utf-8")
+        handler.setFormatter(_create_formatter())
+        _file_sinks[path] = handler
+        _sink_handlers.append(handler)
+        _restart_listener()
 
-    # Console handler - handle both TTY and non-TTY
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
-    # File handler if log_file is provided
+def get_logger(name: str, log_file: Optional[str] = None) -> logging.Logger:
+    """
+    Return a logger wired to the shared non-blocking pipeline.
+    Safe to call any number of times per module: no handlers are added to the
+    named logger itself, so each record is formatted and written once.
+    """
+    _ensure_pipeline()
     if log_file:
-        file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-
-    return logger
+        add_log_file(log_file)
+    return logging.getLogger(name)
 
 
 def init_logging() -> None:
     """
     Initialize logging configuration for the entire application.
+    Idempotent: the stdout sink is shared and auto_close.log is added once.
     """
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-
-    # Create formatter
-    formatter = logging.Formatter(
-        fmt="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-
-    # File handler
-    file_handler = logging.FileHandler("auto_close.log", mode="w", encoding="utf-8")
-    file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
+    _ensure_pipeline()
+    add_log_file("auto_close.log", mode="w")
+    _apply_levels()
 
-    # Configure werkzeug logger
+    # werkzeug propagates to root; make sure it doesn't keep handlers of its own
     werkzeug_logger = logging.getLogger("werkzeug")
-    werkzeug_logger.setLevel(logging.INFO)
-    werkzeug_logger.addHandler(console_handler)
-    werkzeug_logger.addHandler(file_handler)
+    if "werkzeug" not in _get_module_levels():
+        werkzeug_logger.setLevel(logging.INFO)
+    for handler in list(werkzeug_logger.handlers):
+        werkzeug_logger.removeHandler(handler)
 
 
-__all__ = ["get_logger"]
+__all__ = ["get_logger", "init_logging", "add_log_file"]
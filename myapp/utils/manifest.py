@@ -11,6 +11,10 @@ import logging
 from myapp.utils.logger_config import get_logger
 from myapp.config_shortcuts import MANIFEST_PATH
 from myapp.utils.decimal_utils import apply_safe_decimal
+from myapp.utils.df_diagnostics import log_df
+from myapp.utils.file_lock import file_lock
+from myapp.utils.pipeline_timing import current_breakdown, timed
+from myapp.utils.report_metrics import ReportMetrics
 from decimal import Decimal
 
 log = logging.getLogger(__name__)
@@ -37,107 +41,151 @@ def get_total(df) -> float:
     return df_sum["total"].sum()
 
 
+@timed("manifest_write")
 def add_report_to_manifest(
     *,
     df: pd.DataFrame,
     report_path: str,
     report_type: str,
     client_id: str,
-    tech_name: str
+    tech_name: str,
+    report_id: str | None = None,
+    volumes: List[Dict[str, Any]] | None = None,
+    metrics: ReportMetrics | None = None,
+    input_hash: str | None = None,
 ) -> None:
-    log.debug(f"[TYPECHECK] {__name__}.add_report_to_manifest → got {type(df).__name__} with shape {getattr(df, 'shape', 'N/A')}")
-    # 1. load manifest
-    manifest = []
-    if os.path.isfile(MANIFEST_PATH) and os.path.getsize(MANIFEST_PATH) > 0:
-        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
-            try:
-                manifest = json.load(f)
-            except json.JSONDecodeError:
+    log.debug("[TYPECHECK] %s.add_report_to_manifest → got %s with shape %s", __name__, type(df).__name__, getattr(df, "shape", "N/A"))
+    # One writer at a time (web workers, batch workers): the whole
+    # read-modify-write runs under the manifest's file lock
+    with file_lock(MANIFEST_PATH):
+        # 1. load manifest
+        manifest = []
+        if os.path.isfile(MANIFEST_PATH) and os.path.getsize(MANIFEST_PATH) > 0:
+            with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+                try:
+                    manifest = json.load(f)
+                except json.JSONDecodeError:
+                    raise ValueError("Malformed manifest.json")
+            if not isinstance(manifest, list):
                 raise ValueError("Malformed manifest.json")
-        if not isinstance(manifest, list):
-            raise ValueError("Malformed manifest.json")
 
-    # 2. validate report_path
-    if not isinstance(report_path, Path):
-        raise ValueError(f"report_path must be a pathlib.Path, got {type(report_path).__name__}")
-
-    # 3. skip duplicates
-    report_path_str = str(report_path)
-    if any(entry.get("path") == report_path_str for entry in manifest):
-        log.info("Manifest already contains entry for path %s, skipping", report_path_str)
-        return pd.DataFrame(manifest).shape
-
-    log.info("🚀 Starting add_report_to_manifest stage")
-    try:
-        from pandas import DataFrame
-        func_name = "add_report_to_manifest"
-        if not isinstance(df, DataFrame):
-            log.debug("TYPECHECK: %s in %s", type(df).__name__, func_name)
-            raise TypeError(f"{func_name} expected DataFrame, got {type(df).__name__}")
-        log.debug("TYPECHECK: %s in %s", type(df).__name__, func_name)
-        if isinstance(df, pd.Series):
-            raise TypeError("\u274c df צריך להיות DataFrame – קיבלת Series בטעות!")
-        # 💣 הגנה: לוודא df הוא באמת DataFrame
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError(f"❌ add_report_to_manifest: expected DataFrame, got {type(df)}")
-
-        # בדיקה מפורשת ל-DataFrame ריק
-        if df.empty:
-            raise ValueError("DataFrame is empty")
-
-        # 🧪 בדיקה שהעמודות הקריטיות קיימות
-        required_cols = {"job_id", "total"}
-        missing_cols = required_cols - set(df.columns)
-        if missing_cols:
-            raise ValueError(f"❌ Missing columns in df: {missing_cols}")
-
-        # בדיקת טיפוס ל-report_path
+        # 2. validate report_path
         if not isinstance(report_path, Path):
-            raise ValueError(f"add_report_to_manifest: report_path must be pathlib.Path, got {type(report_path).__name__}")
-
-        # timestamp ב־UTC ISO8601 עם סיומת Z
-        created_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-
-        # ספירת שורות נתונים בלבד (ללא שורת Totals אם קיימת)
-        rows_count = len(df)
-        if "job_id" in df.columns:
-            rows_count = int((~df["job_id"].astype(str).str.startswith("Totals")).sum())
-
-        # סכימת total על שורות הנתונים בלבד
-        total_amount = get_total(df)
-
-        # בנה את הרשומה החדשה
-        manifest_entry = {
-            "created_at": created_at,
-            "updated_at": created_at,  # אופציונלי
-            "filename": os.path.basename(report_path),
-            "path": str(report_path),
-            "rows": rows_count,
-            "total": float(total_amount),
-            "client_id": client_id,
-            "tech_name": tech_name,
-            "report_type": report_type,
-        }
-        # Integrate validation status if present
-        validation = getattr(df, "_autoclose_validation", None)
-        if validation:
-            manifest_entry["validated"] = validation.get("validated")
-            manifest_entry["validation_notes"] = validation.get("validation_notes")
-
-        manifest.append(manifest_entry)
-
-        # שמור בחזרה
-        with open(MANIFEST_PATH, 'w', encoding='utf-8') as f:
+            raise ValueError(f"report_path must be a pathlib.Path, got {type(report_path).__name__}")
+
+        # 3. skip duplicates
+        report_path_str = str(report_path)
+        if any(entry.get("path") == report_path_str for entry in manifest):
+            log.info("Manifest already contains entry for path %s, skipping", report_path_str)
+            return pd.DataFrame(manifest).shape
+
+        log.info("🚀 Starting add_report_to_manifest stage")
+        try:
+            from pandas import DataFrame
+            func_name = "add_report_to_manifest"
+            if not isinstance(df, DataFrame):
+                log.debug("TYPECHECK: %s in %s", type(df).__name__, func_name)
+                raise TypeError(f"{func_name} expected DataFrame, got {type(df).__name__}")
+            log.debug("TYPECHECK: %s in %s", type(df).__name__, func_name)
+            if isinstance(df, pd.Series):
+                raise TypeError("\u274c df צריך להיות DataFrame – קיבלת Series בטעות!")
+            # 💣 הגנה: לוודא df הוא באמת DataFrame
+            if not isinstance(df, pd.DataFrame):
+                raise TypeError(f"❌ add_report_to_manifest: expected DataFrame, got {type(df)}")
+
+            # בדיקה מפורשת ל-DataFrame ריק
+            if df.empty:
+                raise ValueError("DataFrame is empty")
+
+            # 🧪 בדיקה שהעמודות הקריטיות קיימות
+            required_cols = {"job_id", "total"}
+            missing_cols = required_cols - set(df.columns)
+            if missing_cols:
+                raise ValueError(f"❌ Missing columns in df: {missing_cols}")
+
+            # בדיקת טיפוס ל-report_path
+            if not isinstance(report_path, Path):
+                raise ValueError(f"add_report_to_manifest: report_path must be pathlib.Path, got {type(report_path).__name__}")
+
+            # timestamp ב־UTC ISO8601 עם סיומת Z
+            created_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+            if metrics is not None:
+                # counted once while the report was built (utils/report_metrics.py)
+                rows_count = metrics.rows
+                total_amount = metrics.total or 0
+            else:
+                # ספירת שורות נתונים בלבד (ללא שורת Totals אם קיימת)
+                rows_count = len(df)
+                if "job_id" in df.columns:
+                    rows_count = int((~df["job_id"].astype(str).str.startswith("Totals")).sum())
+
+                # סכימת total על שורות הנתונים בלבד
+                total_amount = get_total(df)
+
+            # בנה את הרשומה החדשה
+            manifest_entry = {
+                "created_at": created_at,
+                "updated_at": created_at,  # אופציונלי
+                "filename": os.path.basename(report_path),
+                "path": str(report_path),
+                "rows": rows_count,
+                "total": float(total_amount),
+                "client_id": client_id,
+                "tech_name": tech_name,
+                "report_type": report_type,
+            }
+            if report_id:
+                manifest_entry["report_id"] = report_id
+            if metrics is not None and metrics.sha256:
+                manifest_entry["sha256"] = metrics.sha256
+                manifest_entry["bytes"] = metrics.size_bytes
+            # what the report was rendered from (utils/render_memo.py)
+            if input_hash:
+                manifest_entry["input_hash"] = input_hash
+            # A report split into volumes: `path` is volume 1, every part listed here
+            if volumes:
+                manifest_entry["volumes"] = volumes
+            # Integrate validation status if present
+            validation = df.attrs.get("autoclose_validation") or getattr(df, "_autoclose_validation", None)
+            if validation:
+                manifest_entry["validated"] = validation.get("validated")
+                manifest_entry["validation_notes"] = validation.get("validation_notes")
+                if validation.get("validation_report"):
+                    manifest_entry["validation_report"] = validation["validation_report"]
+            # Rows already seen in earlier uploads (utils/job_index.py)
+            if df.attrs.get("job_dedup"):
+                manifest_entry["job_dedup"] = df.attrs["job_dedup"]
+            # Per-stage timings of this run so far (the manifest write itself is
+            # still in progress and shows up in /api/metrics only)
+            timings = current_breakdown()
+            if timings:
+                manifest_entry["timings"] = timings
+
+            manifest.append(manifest_entry)
+
+            # שמור בחזרה
+            _write_manifest(manifest)
+            # return shape
+            manifest_df = pd.DataFrame(manifest)
+            log.info("✅ add_report_to_manifest complete → total records %d", len(manifest))
+            return manifest_df.shape
+        except Exception as e:
+            log.exception("[ERROR] Failed inside add_report_to_manifest – %s", e)
+            log_df(log, "[DF]", df, head=3)
+            raise
+
+
+def _write_manifest(manifest: List[Dict[str, Any]]) -> None:
+    # readers see the old or the new file, never a truncated one
+    path = Path(MANIFEST_PATH)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
             json.dump(manifest, f, default=str, ensure_ascii=False, indent=2)
-        # return shape
-        manifest_df = pd.DataFrame(manifest)
-        log.info("✅ add_report_to_manifest complete → total records %d", len(manifest))
-        return manifest_df.shape
-    except Exception as e:
-        log.exception(f"[ERROR] Failed inside add_report_to_manifest – {e}")
-        log.debug(f"[DF] Columns: {getattr(df, 'columns', [])}")
-        log.debug(f"[DF] Head:\n{getattr(df, 'head', lambda x=3: 'N/A')(3)}")
-        raise
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
 
 
 def load_manifest_as_list() -> List[Dict]:
@@ -0,0 +1,191 @@
+# myapp/utils/pdf_templates.py
+
+import hashlib
+import mimetypes
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# HTML report templates and their PDF stylesheets, prepared once per process.
+#
+#   html = render_report_template("client_report.html", report_data=record)
+#   write_html_pdf(html, output_path, stylesheets=["client_report.css"])
+#
+# All report templates share one Jinja Environment, so the loader and the
+# compiled templates live as long as the process instead of one call. A
+# FileSystemBytecodeCache keeps the compiled bytecode on disk, so a fresh
+# worker skips parsing the template source too. Stylesheets live under
+# templates/reports/css and are parsed into weasyprint.CSS objects once,
+# against a single FontConfiguration (fonts are resolved once as well), then
+# reused for every document - per PDF, WeasyPrint only parses the HTML and
+# lays it out. An edited .css or template file is picked up by mtime.
+# WeasyPrint itself is imported on the first PDF (it needs the system's
+# pango), so rendering templates never depends on it.
+#
+#   images = ImageHandoff()
+#   html = render_report_template(..., chart=images.add(png_bytes))
+#   write_html_pdf(html, output_path, images=images)
+#
+# Charts and signatures reach WeasyPrint as raw bytes through a url_fetcher
+# (report-image:<hash> URLs) instead of base64 data URIs, so nothing is
+# encoded to text, carried through Jinja and decoded again. Signature files
+# are read once per process and re-read only when they change.
+#
+# Env control:
+#   JINJA_BYTECODE_CACHE  compiled-template cache folder (default: output/jinja_cache;
+#                         empty to keep compiled templates in memory only)
+
+TEMPLATE_ROOT = Path(__file__).resolve().parents[2] / "templates" / "reports"
+STYLESHEET_ROOT = TEMPLATE_ROOT / "css"
+DEFAULT_BYTECODE_CACHE = "output/jinja_cache"
+
+IMAGE_SCHEME = "report-image"
+
+_STYLESHEETS: Dict[Tuple[str, int], Any] = {}
+_STYLESHEETS_LOCK = threading.Lock()
+_IMAGE_FILES: Dict[str, Tuple[int, bytes]] = {}
+_IMAGE_FILES_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def report_environment() -> Environment:
+    """The process-wide Jinja environment for templates/reports."""
+    cache_dir = os.getenv("JINJA_BYTECODE_CACHE", DEFAULT_BYTECODE_CACHE)
+    bytecode_cache = None
+    if cache_dir:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_ROOT),
+        autoescape=select_autoescape(default=True),
+        bytecode_cache=bytecode_cache,
+        cache_size=100,
+    )
+
+
+def get_report_template(name: str) -> Template:
+    return report_environment().get_template(name)
+
+
+def render_report_template(name: str, **context: Any) -> str:
+    return get_report_template(name).render(**context)
+
+
+@lru_cache(maxsize=1)
+def font_config() -> Any:
+    """The one FontConfiguration shared by every stylesheet and document."""
+    from weasyprint.text.fonts import FontConfiguration
+
+    return FontConfiguration()
+
+
+def get_stylesheet(name: str) -> Any:
+    """Parsed weasyprint.CSS for templates/reports/css/<name> (re-parsed only when the file changes)."""
+    from weasyprint import CSS
+
+    path = STYLESHEET_ROOT / name
+    key = (name, path.stat().st_mtime_ns)
+    with _STYLESHEETS_LOCK:
+        sheet = _STYLESHEETS.get(key)
+    if sheet is None:
+        sheet = CSS(filename=str(path), font_config=font_config())
+        with _STYLESHEETS_LOCK:
+            for stale in [k for k in _STYLESHEETS if k[0] == name]:
+                del _STYLESHEETS[stale]
+            _STYLESHEETS[key] = sheet
+        log.debug("🎨 Stylesheet parsed: %s", name)
+    return sheet
+
+
+def _read_image_file(path: str) -> bytes:
+    mtime = os.stat(path).st_mtime_ns
+    with _IMAGE_FILES_LOCK:
+        cached = _IMAGE_FILES.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    data = Path(path).read_bytes()
+    with _IMAGE_FILES_LOCK:
+        _IMAGE_FILES[path] = (mtime, data)
+    return data
+
+
+class ImageHandoff:
+    """In-memory images for a document, served to WeasyPrint by URL."""
+
+    def __init__(self) -> None:
+        self._images: Dict[str, Tuple[bytes, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def add(self, data: bytes, mime_type: str = "image/png") -> str:
+        """Register image bytes; returns the URL to put in the template."""
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self._images[key] = (data, mime_type)
+        return f"{IMAGE_SCHEME}:{key}"
+
+    def add_file(self, path: str | Path) -> str:
+        """Register an image file (read once per process while unchanged)."""
+        path = str(Path(path).resolve())
+        mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return self.add(_read_image_file(path), mime_type)
+
+    def fetch(self, url: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """WeasyPrint url_fetcher: registered images from memory, anything else as usual."""
+        if url.startswith(f"{IMAGE_SCHEME}:"):
+            data, mime_type = self._images[url.split(":", 1)[1]]
+            return {"string": data, "mime_type": mime_type}
+        from weasyprint import default_url_fetcher
+
+        return default_url_fetcher(url, *args, **kwargs)
+
+
+def write_html_pdf(
+    html: str,
+    target: Any,
+    *,
+    stylesheets: Sequence[str] = (),
+    base_url: Optional[str] = None,
+    images: Optional[ImageHandoff] = None,
+    **options: Any,
+) -> None:
+    """
+    Lay out rendered HTML as a PDF at `target` with the cached stylesheets and
+    fonts; report-image: URLs are served from `images`.
+    """
+    from weasyprint import HTML
+
+    fetcher = {"url_fetcher": images.fetch} if images is not None else {}
+    HTML(string=html, base_url=base_url or os.getcwd(), **fetcher).write_pdf(
+        target,
+        stylesheets=[get_stylesheet(name) for name in stylesheets],
+        font_config=font_config(),
+        **options,
+    )
+
+
+def clear_stylesheet_cache() -> None:
+    with _STYLESHEETS_LOCK:
+        _STYLESHEETS.clear()
+
+
+__all__ = [
+    "TEMPLATE_ROOT",
+    "report_environment",
+    "get_report_template",
+    "render_report_template",
+    "font_config",
+    "get_stylesheet",
+    "write_html_pdf",
+    "ImageHandoff",
+    "IMAGE_SCHEME",
+    "clear_stylesheet_cache",
+]
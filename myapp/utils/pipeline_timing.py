@@ -0,0 +1,370 @@
+# myapp/utils/pipeline_timing.py
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+import pandas as pd
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Stage-level timing for the report pipeline.
+#
+#   with timing_run() as run:          # one per report / upload file
+#       with span("loading") as s:
+#           df = pd.read_csv(...)
+#           s.rows_out = len(df)
+#       df = clean_and_cast(df)        # decorated with @timed("clean_and_cast")
+#   run.breakdown()                    # -> list of per-stage dicts
+#
+# Every finished span is also folded into process-wide histograms that
+# /api/metrics renders in Prometheus text format.
+#
+# The histograms live in each process, so under gunicorn -w N a scrape only
+# sees the worker that answered it. With PIPELINE_METRICS_DIR set, every
+# process also saves its histograms to <dir>/stages_<pid>_<id>.json after
+# each stage, and render_prometheus() sums all the files there: every scrape
+# reports all workers, including exited ones, so the counters never go back.
+# gunicorn.conf.py empties the folder when the master starts.
+#
+# Memory: rss_in_mb / rss_out_mb are the process's resident set size when the
+# stage started and ended (Linux; the lifetime peak would say nothing about
+# the stage). peak_alloc_mb is the stage's own tracemalloc peak, nested
+# stages included; a nested span hands its peak back to the enclosing one, so
+# resetting tracemalloc's peak for the inner stage does not hide it.
+#
+# Env control:
+#   PIPELINE_TRACE_MEMORY=1  track per-stage peak Python allocations with
+#                            tracemalloc (noticeably slower; off by default).
+#   PIPELINE_METRICS_DIR     folder shared by the worker processes for the
+#                            /api/metrics histograms (default: unset, per process).
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_TRACE_MEMORY = os.getenv("PIPELINE_TRACE_MEMORY", "0") == "1"
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    wall_ms: float
+    cpu_ms: float
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    rss_in_mb: Optional[float] = None
+    rss_out_mb: Optional[float] = None
+    peak_alloc_mb: Optional[float] = None
+    error: Optional[str] = None
+
+
+class TimingRun:
+    """Collects the stages finished while it is the current run."""
+
+    def __init__(self) -> None:
+        self.stages: List[StageTiming] = []
+        self._lock = threading.Lock()
+
+    def add(self, timing: StageTiming) -> None:
+        with self._lock:
+            self.stages.append(timing)
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {k: v for k, v in asdict(t).items() if v is not None}
+                for t in self.stages
+            ]
+
+
+_CURRENT_RUN: "contextvars.ContextVar[Optional[TimingRun]]" = contextvars.ContextVar(
+    "pipeline_timing_run", default=None
+)
+
+
+@contextmanager
+def timing_run() -> Iterator[TimingRun]:
+    """Start a fresh per-report breakdown; spans inside attach to it."""
+    run = TimingRun()
+    token = _CURRENT_RUN.set(run)
+    try:
+        yield run
+    finally:
+        _CURRENT_RUN.reset(token)
+
+
+def current_breakdown() -> Optional[List[Dict[str, Any]]]:
+    """The stages recorded so far in the current run, or None outside a run."""
+    run = _CURRENT_RUN.get()
+    return run.breakdown() if run is not None else None
+
+
+# ------------------------------------------------------------------------------
+# Process-wide histograms
+# ------------------------------------------------------------------------------
+
+
+class _StageHistogram:
+    __slots__ = ("wall_buckets", "wall_sum", "cpu_sum", "count", "errors", "rows_in", "rows_out")
+
+    def __init__(self) -> None:
+        self.wall_buckets = [0] * len(HISTOGRAM_BUCKETS)
+        self.wall_sum = 0.0
+        self.cpu_sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def observe(self, t: StageTiming) -> None:
+        seconds = t.wall_ms / 1000
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if seconds <= bound:
+                self.wall_buckets[i] += 1
+        self.wall_sum += seconds
+        self.cpu_sum += t.cpu_ms / 1000
+        self.count += 1
+        self.errors += 1 if t.error else 0
+        self.rows_in += t.rows_in or 0
+        self.rows_out += t.rows_out or 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def add(self, data: Dict[str, Any]) -> None:
+        """Fold in another process's histogram (a to_dict() snapshot)."""
+        self.wall_buckets = [a + b for a, b in zip(self.wall_buckets, data["wall_buckets"])]
+        for name in ("wall_sum", "cpu_sum", "count", "errors", "rows_in", "rows_out"):
+            setattr(self, name, getattr(self, name) + data[name])
+
+
+_HISTOGRAMS: Dict[str, _StageHistogram] = {}
+_HIST_LOCK = threading.Lock()
+_HIST_PID = os.getpid()
+_PROCESS_ID = uuid.uuid4().hex[:8]
+
+
+def metrics_dir() -> Optional[Path]:
+    path = os.getenv("PIPELINE_METRICS_DIR", "").strip()
+    return Path(path) if path else None
+
+
+def _save_histograms(folder: Path) -> None:
+    """This process's histograms to its own file in `folder` (called under _HIST_LOCK)."""
+    path = folder / f"stages_{_HIST_PID}_{_PROCESS_ID}.json"
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps({k: h.to_dict() for k, h in _HISTOGRAMS.items()}), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError as e:
+        log.warning("Could not save stage metrics to %s: %s", path, e)
+
+
+def _observe(timing: StageTiming) -> None:
+    global _HIST_PID, _PROCESS_ID
+    with _HIST_LOCK:
+        if os.getpid() != _HIST_PID:
+            # a forked worker: what it inherited is already in the parent's file
+            _HISTOGRAMS.clear()
+            _HIST_PID, _PROCESS_ID = os.getpid(), uuid.uuid4().hex[:8]
+        hist = _HISTOGRAMS.get(timing.stage)
+        if hist is None:
+            hist = _HISTOGRAMS[timing.stage] = _StageHistogram()
+        hist.observe(timing)
+        folder = metrics_dir()
+        if folder is not None:
+            _save_histograms(folder)
+
+
+def _load_shared(folder: Path) -> Dict[str, _StageHistogram]:
+    merged: Dict[str, _StageHistogram] = {}
+    for path in folder.glob("stages_*.json"):
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        for stage, data in snapshot.items():
+            merged.setdefault(stage, _StageHistogram()).add(data)
+    return merged
+
+
+def reset_metrics() -> None:
+    """Drop all aggregated histograms (tests only)."""
+    with _HIST_LOCK:
+        _HISTOGRAMS.clear()
+
+
+def render_prometheus() -> str:
+    """Aggregated stage metrics in Prometheus text exposition format 0.0.4."""
+    folder = metrics_dir()
+    with _HIST_LOCK:
+        # this process's own file is among them: it is saved after every stage
+        items = sorted((_load_shared(folder) if folder is not None else _HISTOGRAMS).items())
+        lines = [
+            "# HELP autoclose_stage_duration_seconds Wall time per report pipeline stage.",
+            "# TYPE autoclose_stage_duration_seconds histogram",
+        ]
+        for stage, h in items:
+            for bound, n in zip(HISTOGRAM_BUCKETS, h.wall_buckets):
+                lines.append(f'autoclose_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {n}')
+            lines.append(f'autoclose_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'autoclose_stage_duration_seconds_sum{{stage="{stage}"}} {h.wall_sum:.6f}')
+            lines.append(f'autoclose_stage_duration_seconds_count{{stage="{stage}"}} {h.count}')
+
+        for name, help_text, attr in (
+            ("autoclose_stage_cpu_seconds_total", "CPU time per report pipeline stage.", "cpu_sum"),
+            ("autoclose_stage_errors_total", "Stages that raised.", "errors"),
+            ("autoclose_stage_rows_in_total", "Rows entering each stage.", "rows_in"),
+            ("autoclose_stage_rows_out_total", "Rows leaving each stage.", "rows_out"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for stage, h in items:
+                value = getattr(h, attr)
+                value = f"{value:.6f}" if isinstance(value, float) else str(value)
+                lines.append(f'{name}{{stage="{stage}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------------------------
+# Spans
+# ------------------------------------------------------------------------------
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 0
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size, from /proc (None where there is none)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(resident_pages * _PAGE_SIZE / 2**20, 1)
+
+
+def _row_count(obj: Any) -> Optional[int]:
+    if isinstance(obj, pd.DataFrame):
+        return len(obj)
+    if isinstance(obj, tuple) and obj and isinstance(obj[0], pd.DataFrame):
+        return len(obj[0])
+    return None
+
+
+class Span:
+    """A single running stage; set rows_in / rows_out while it is open."""
+
+    __slots__ = ("stage", "rows_in", "rows_out", "_alloc_peak")
+
+    def __init__(self, stage: str, rows_in: Optional[int] = None) -> None:
+        self.stage = stage
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self._alloc_peak = 0  # bytes; tracemalloc peaks of finished nested spans
+
+
+_CURRENT_SPAN: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar(
+    "pipeline_timing_span", default=None
+)
+
+
+@contextmanager
+def span(stage: str, *, rows_in: Optional[int] = None) -> Iterator[Span]:
+    """
+    Time one pipeline stage: wall time, CPU time (this thread), rows in/out
+    and peak memory. The result goes to the current run (if any) and to the
+    process-wide histograms; a raising stage is recorded with its error.
+    """
+    current = Span(stage, rows_in)
+    parent = _CURRENT_SPAN.get()
+    if _TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if parent is not None:
+            # the peak so far belongs to the enclosing stage; keep it before resetting
+            parent._alloc_peak = max(parent._alloc_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    token = _CURRENT_SPAN.set(current)
+    rss_in = _rss_mb()
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    error: Optional[str] = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _CURRENT_SPAN.reset(token)
+        alloc_peak = None
+        if _TRACE_MEMORY:
+            alloc_peak = max(current._alloc_peak, tracemalloc.get_traced_memory()[1])
+            if parent is not None:
+                parent._alloc_peak = max(parent._alloc_peak, alloc_peak)
+        timing = StageTiming(
+            stage=stage,
+            wall_ms=round((time.perf_counter() - wall_start) * 1000, 3),
+            cpu_ms=round((time.thread_time() - cpu_start) * 1000, 3),
+            rows_in=current.rows_in,
+            rows_out=current.rows_out,
+            rss_in_mb=rss_in,
+            rss_out_mb=_rss_mb(),
+            peak_alloc_mb=round(alloc_peak / 2**20, 2) if alloc_peak is not None else None,
+            error=error,
+        )
+        run = _CURRENT_RUN.get()
+        if run is not None:
+            run.add(timing)
+        _observe(timing)
+        log.debug("⏱️ %s: %.1f ms wall / %.1f ms cpu", stage, timing.wall_ms, timing.cpu_ms)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """
+    Decorator form of span(). rows_in is taken from the first DataFrame
+    argument and rows_out from a DataFrame (or (DataFrame, ...)) result.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            rows_in = None
+            for arg in (*args, *kwargs.values()):
+                if isinstance(arg, pd.DataFrame):
+                    rows_in = len(arg)
+                    break
+            with span(stage, rows_in=rows_in) as s:
+                result = func(*args, **kwargs)
+                s.rows_out = _row_count(result)
+                return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+__all__ = [
+    "StageTiming",
+    "TimingRun",
+    "timing_run",
+    "current_breakdown",
+    "span",
+    "timed",
+    "render_prometheus",
+    "reset_metrics",
+    "metrics_dir",
+]
@@ -0,0 +1,101 @@
+# myapp/utils/render_memo.py
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from myapp.utils import manifest
+from myapp.utils.logger_config import get_logger
+from myapp.utils.scratch import staged_output
+
+log = get_logger(__name__)
+
+# Reuse of already-rendered reports, keyed by what went into them.
+#
+#   key = render_key(df_for_pdf, version=PDF_LAYOUT_VERSION, report_type=..., title=...)
+#   entry = find_rendered(key)                  # a catalogued PDF for the same input
+#   if entry: return reuse_rendered(entry, output_path)
+#   ...render...
+#   add_report_to_manifest(..., input_hash=key)
+#
+# The key is a sha256 over the prepared report frame (column names, dtypes
+# and pandas' per-row hashes of the values), the layout version and the
+# render options. Resends, re-downloads and re-runs of auto_run for the
+# same month get the catalogued file back instead of re-running layout,
+# charts and validation. An entry is only reused while its files are still
+# on disk with the size the manifest recorded.
+#
+# Deterministic output: the creation date written into the PDF is pinned
+# (fpdf2 derives the document /ID from the bytes and that date), and the
+# default file name and report_id come from the key, so identical inputs
+# give byte-identical files.
+#
+# Env control:
+#   RENDER_MEMO         1 = reuse catalogued reports for identical input (default: 1)
+#   PDF_DETERMINISTIC   1 = fixed creation date / IDs in the PDF (default: 0)
+
+RENDER_MEMO = os.getenv("RENDER_MEMO", "1") == "1"
+PDF_DETERMINISTIC = os.getenv("PDF_DETERMINISTIC", "0") == "1"
+DETERMINISTIC_CREATION_DATE = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def render_key(df: pd.DataFrame, *, version: Any, **options: Any) -> str:
+    """sha256 of a report's input: the frame, the layout version and the options."""
+    digest = hashlib.sha256()
+    header = {
+        "version": version,
+        "columns": [str(c) for c in df.columns],
+        "dtypes": [str(t) for t in df.dtypes],
+        "options": options,
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _intact(entry: Dict[str, Any]) -> bool:
+    parts = entry.get("volumes") or [entry]
+    try:
+        return all(os.path.getsize(part["path"]) == part["bytes"] for part in parts)
+    except (KeyError, TypeError, OSError):
+        return False
+
+
+def find_rendered(key: str) -> Optional[Dict[str, Any]]:
+    """The newest manifest entry rendered from `key` whose files are still intact."""
+    for entry in reversed(manifest.load_manifest_as_list()):
+        if entry.get("input_hash") == key and _intact(entry):
+            return entry
+    return None
+
+
+def reuse_rendered(entry: Dict[str, Any], output_path: Optional[str | Path] = None) -> Optional[Path]:
+    """
+    Path of the catalogued report, copied to `output_path` when the caller
+    asked for a different file. A volume set is only reused in place (None
+    when it would have to be copied).
+    """
+    cached = Path(entry["path"])
+    if output_path is None or Path(output_path) == cached:
+        return cached
+    if entry.get("volumes"):
+        return None
+    with staged_output(output_path) as staged_pdf:
+        shutil.copyfile(cached, staged_pdf)
+    return Path(output_path)
+
+
+__all__ = [
+    "render_key",
+    "find_rendered",
+    "reuse_rendered",
+    "RENDER_MEMO",
+    "PDF_DETERMINISTIC",
+    "DETERMINISTIC_CREATION_DATE",
+]
@@ -0,0 +1,64 @@
+# myapp/utils/report_metrics.py
+
+import hashlib
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# The figures a finished report is checked and catalogued by, computed once.
+#
+#   metrics = compute_report_metrics(df_for_pdf)        # rows + exact total, vectorised
+#   data = bytes(pdf.output())
+#   metrics = metrics.rendered(pdf_checksum(data), len(data))   # before writing it out
+#   validate_report_integrity(path, df_for_pdf, metrics=metrics)   # O(1)
+#   add_report_to_manifest(..., metrics=metrics)        # no second sum
+#
+# Validation and the manifest used to re-count the rows and re-sum `total`
+# (a Decimal(str(v)) loop, then pandas again). The total is kept as integer
+# cents, so it is exact and cheap to compare; the checksum is taken from the
+# bytes while they are in memory, before they are written, so nothing re-reads
+# the PDF.
+
+TOTALS_PREFIX = "Totals"
+
+
+@dataclass(frozen=True)
+class ReportMetrics:
+    rows: int  # data rows, totals row excluded
+    total_cents: Optional[int]  # exact sum of `total` over the data rows (None: no total column)
+    sha256: Optional[str] = None  # of the rendered PDF bytes (all volumes, in order)
+    size_bytes: Optional[int] = None
+
+    @property
+    def total(self) -> Optional[Decimal]:
+        return None if self.total_cents is None else Decimal(self.total_cents) / 100
+
+    def rendered(self, sha256: str, size_bytes: int) -> "ReportMetrics":
+        """A copy carrying the checksum and size of the rendered PDF (or all its volumes)."""
+        return replace(self, sha256=sha256, size_bytes=size_bytes)
+
+
+def pdf_checksum(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _to_cents(values: Iterable[Any]) -> np.ndarray:
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").astype(float)
+    return np.rint(numbers.dropna().to_numpy() * 100).astype(np.int64)
+
+
+def compute_report_metrics(df: pd.DataFrame, *, totals_prefix: str = TOTALS_PREFIX) -> ReportMetrics:
+    """Row count and total in cents, leaving out any 'Totals:<n>' summary row."""
+    if not isinstance(df, pd.DataFrame):
+        raise TypeError(f"compute_report_metrics expected DataFrame, got {type(df).__name__}")
+    data = df
+    if "job_id" in df.columns:
+        data = df[~df["job_id"].astype(str).str.startswith(totals_prefix)]
+    total_cents = int(_to_cents(data["total"]).sum()) if "total" in data.columns else None
+    return ReportMetrics(rows=len(data), total_cents=total_cents)
+
+
+__all__ = ["ReportMetrics", "compute_report_metrics", "pdf_checksum", "TOTALS_PREFIX"]
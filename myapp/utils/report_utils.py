@@ -7,10 +7,6 @@ from myapp.utils.date_utils import parse_date_flex, clean_and_parse_dates
 
 import pandas as pd
 from jinja2 import Template, Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML
-import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
 from werkzeug.utils import secure_filename
 from myapp.services.mail_utils import send_report_by_email
 from flask import current_app
@@ -19,25 +15,23 @@ from myapp.services import report_analyzer
 from myapp.services.pdf_generator import generate_pdf_report
 from myapp.services.email_service import EmailService
 from myapp.utils.logger_config import get_logger
+from myapp.utils.df_diagnostics import log_df
 from myapp.utils.format_utils import format_currency, format_date
 from myapp.utils.validation_utils import validate_uploaded_df
 from myapp.utils.dataframe_utils import prepare_pdf_dataframe
 from myapp.services.report_analyzer import build_report_data
 from myapp.utils.normalizers import normalize_columns
+from myapp.finance.rollup_store import get_rollup_store
+from myapp.utils.job_index import DEDUP_VALUE_COLUMNS, DedupReport, check_uploaded_jobs, get_job_index
+from myapp.utils.jobs_dataset import MERGED_CSV_PATH, get_jobs_dataset
+from myapp.utils.chart_service import get_chart_service
+from myapp.utils.pipeline_timing import span
+from myapp.utils.scratch import scratch_workspace, staged_output
+from myapp.utils.pdf_templates import ImageHandoff, render_report_template, write_html_pdf
 
 # Configure logger
 logger = get_logger(__name__)
 
-# Create console handler if no handlers exist
-if not logger.handlers:
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
 # Shared column order for reports
 COLUMN_ORDER = [
     "job_id",
@@ -115,6 +109,7 @@ def generate_client_pdf(report_data: dict[str, Any], output_path: str) -> None:
         report_data.setdefault(key, 0)
     tech_name = report_data.get("tech") or report_data.get("technician")
     signature_path: Optional[str]
+    images = ImageHandoff()
     if tech_name:
         filename = secure_filename(
             tech_name.split("/")[0].strip().replace(" ", "_") + ".png"
@@ -124,16 +119,14 @@ def generate_client_pdf(report_data: dict[str, Any], output_path: str) -> None:
             signature_path = None
     else:
         signature_path = None
-    template_dir = Path(__file__).resolve().parents[2] / "templates" / "reports"
-    env = Environment(
-        loader=FileSystemLoader(template_dir), autoescape=select_autoescape()
-    )
-    template = env.get_template("client_report.html")
-    rendered_html = template.render(
+    # compiled template, parsed CSS and fonts come from the shared registry
+    rendered_html = render_report_template(
+        "client_report.html",
         report_data=report_data,
-        signature_path=f"file://{signature_path}" if signature_path else None,
+        signature_path=images.add_file(signature_path) if signature_path else None,
     )
-    HTML(string=rendered_html, base_url=os.getcwd()).write_pdf(output_path)
+    with staged_output(output_path) as staged_pdf:
+        write_html_pdf(rendered_html, staged_pdf, stylesheets=["client_report.css"], images=images)
     logger.info(f"✅ PDF saved to: {output_path}")
 
 
@@ -143,12 +136,11 @@ def generate_monthly_summary_pdf(
     if not records:
         raise RuntimeError("אין נתונים ליצירת דוח חודשי.")
     try:
-        template_dir = Path(__file__).resolve().parents[2] / "templates" / "reports"
-        env = Environment(loader=FileSystemLoader(template_dir), autoescape=True)
-        template = env.get_template("monthly_summary_with_graph.html")
-        pie_chart = create_pie_chart(records)
-        tech_bar_chart = create_technician_bar_chart(records)
-        technician_amount_chart = create_technician_amount_bar_chart(records)
+        # chart PNGs go to WeasyPrint as bytes, not base64 data URIs
+        images = ImageHandoff()
+        pie_chart = create_pie_chart(records, images=images)
+        tech_bar_chart = create_technician_bar_chart(records, images=images)
+        technician_amount_chart = create_technician_amount_bar_chart(records, images=images)
         # 🧠 תרגום תאריכים למחרוזות ליצירת שם קובץ
         start_str = start_date.strftime("%Y-%m-%d")
         end_str = end_date.strftime("%Y-%m-%d")
@@ -157,7 +149,8 @@ def generate_monthly_summary_pdf(
         )
         output_dir = os.path.dirname(output_path)
         os.makedirs(output_dir, exist_ok=True)
-        rendered_html = template.render(
+        rendered_html = render_report_template(
+            "monthly_summary_with_graph.html",
             records=records,
             start=start_date,
             end=end_date,
@@ -166,37 +159,37 @@ def generate_monthly_summary_pdf(
             technician_amount_chart=technician_amount_chart,
             now=datetime.now(),
         )
-        HTML(string=rendered_html, base_url=os.getcwd()).write_pdf(output_path)
+        # the same date range always maps to this name: render aside, then swap in
+        with staged_output(output_path) as staged_pdf:
+            write_html_pdf(
+                rendered_html, staged_pdf, stylesheets=["monthly_summary_with_graph.css"], images=images
+            )
         logger.info(f"✅ דוח חודשי שמור בהצלחה ב: {output_path}")
     except Exception as e:
         logger.error(f"❌ שגיאה ביצירת דוח חודשי: {e}", exc_info=True)
         raise
 
 
-def create_pie_chart(records: list[dict[str, Any]]) -> str:
+def _chart_src(images: Optional[ImageHandoff], kind: str, labels: Any, values: Any, **style: Any) -> str:
+    """A handoff URL when rendering a PDF with `images`, else a data URI."""
+    charts = get_chart_service()
+    if images is None:
+        return charts.data_uri(kind, labels, values, **style)
+    return images.add(charts.render(kind, labels, values, **style))
+
+
+def create_pie_chart(records: list[dict[str, Any]], images: Optional[ImageHandoff] = None) -> str:
     from collections import Counter
 
     job_types = [r.get("job_type", "Unknown") for r in records]
     counts = Counter(job_types)
     labels, values = zip(*counts.items())
-    fig, ax = plt.subplots()
-    ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png")
-    buffer.seek(0)
-    encoded = base64.b64encode(buffer.read()).decode("utf-8")
-    plt.close()
-    # Add padding fix for Base64 if needed
-    if len(encoded) % 4:
-        encoded += "=" * (4 - len(encoded) % 4)
-    # בדיקת תקינות base64
-    if not encoded.startswith("iVBOR") and not encoded.startswith("/9j/"):
-        logger.error("⚠️ PNG base64 image may be corrupted.")
-    return f"data:image/png;base64,{encoded}"
-
-
-def create_technician_bar_chart(records: list[dict[str, Any]]) -> str:
+    return _chart_src(
+        images, "pie", labels, values, autopct="%1.1f%%", startangle=90, equal_axis=True, tight_layout=False
+    )
+
+
+def create_technician_bar_chart(records: list[dict[str, Any]], images: Optional[ImageHandoff] = None) -> str:
     try:
         if isinstance(records, list):
             df = pd.DataFrame(records)
@@ -208,26 +201,14 @@ def create_technician_bar_chart(records: list[dict[str, Any]]) -> str:
             )
         if "tech" not in df.columns or df["tech"].isna().all():
             raise ValueError("אין נתוני טכנאי לעיבוד בדוח.")
-        technician_counts = df["tech"].value_counts().sort_values(ascending=False)
-        plt.figure(figsize=(10, 6), dpi=100)
-        ax = technician_counts.plot(kind="bar", edgecolor="black")
-        ax.set_title("Number of Jobs per Technician", fontsize=14, pad=12)
-        ax.set_xlabel("Technician", fontsize=12)
-        ax.set_ylabel("Number of Jobs", fontsize=12)
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        buffer = BytesIO()
-        plt.savefig(buffer, format="png")
-        buffer.seek(0)
-        encoded = base64.b64encode(buffer.read()).decode("utf-8")
-        plt.close()
-        # Add padding fix for Base64 if needed
-        if len(encoded) % 4:
-            encoded += "=" * (4 - len(encoded) % 4)
-        # בדיקת תקינות base64
-        if not encoded.startswith("iVBOR") and not encoded.startswith("/9j/"):
-            logger.error("⚠️ PNG base64 image may be corrupted.")
-        return f"data:image/png;base64,{encoded}"
+        # observed values only (tech may be a categorical with historical categories)
+        technician_counts = df["tech"].value_counts().loc[lambda s: s > 0].sort_values(ascending=False)
+        return _chart_src(
+            images, "bar", technician_counts.index, technician_counts.to_numpy(),
+            title="Number of Jobs per Technician", xlabel="Technician", ylabel="Number of Jobs",
+            figsize=(10, 6), dpi=100, rotation=45, ha="right", edgecolor="black",
+            title_fontsize=14, label_fontsize=12, title_pad=12,
+        )
     except ValueError as ve:
         logger.error(f"❌ create_technician_bar_chart: נתוני טכנאי לא תקינים - {ve}")
         raise
@@ -238,7 +219,7 @@ def create_technician_bar_chart(records: list[dict[str, Any]]) -> str:
         raise
 
 
-def create_technician_amount_bar_chart(records: list[dict[str, Any]]) -> str:
+def create_technician_amount_bar_chart(records: list[dict[str, Any]], images: Optional[ImageHandoff] = None) -> str:
     try:
         if isinstance(records, list):
             df = pd.DataFrame(records)
@@ -251,27 +232,14 @@ def create_technician_amount_bar_chart(records: list[dict[str, Any]]) -> str:
         if "tech" not in df.columns or df["tech"].isna().all():
             raise ValueError("אין נתוני טכנאי לעיבוד בדוח.")
         technician_amounts = (
-            df.groupby("tech")["amount"].sum().sort_values(ascending=False)
+            df.groupby("tech", observed=True)["amount"].sum().sort_values(ascending=False)
+        )
+        return _chart_src(
+            images, "bar", technician_amounts.index, technician_amounts.to_numpy(),
+            title="Total Amount per Technician", xlabel="Technician", ylabel="Total Amount",
+            figsize=(10, 6), dpi=100, rotation=45, ha="right", edgecolor="black",
+            title_fontsize=14, label_fontsize=12, title_pad=12,
         )
-        plt.figure(figsize=(10, 6), dpi=100)
-        ax = technician_amounts.plot(kind="bar", edgecolor="black")
-        ax.set_title("Total Amount per Technician", fontsize=14, pad=12)
-        ax.set_xlabel("Technician", fontsize=12)
-        ax.set_ylabel("Total Amount", fontsize=12)
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        buffer = BytesIO()
-        plt.savefig(buffer, format="png")
-        buffer.seek(0)
-        encoded = base64.b64encode(buffer.read()).decode("utf-8")
-        plt.close()
-        # Add padding fix for Base64 if needed
-        if len(encoded) % 4:
-            encoded += "=" * (4 - len(encoded) % 4)
-        # בדיקת תקינות base64
-        if not encoded.startswith("iVBOR") and not encoded.startswith("/9j/"):
-            logger.error("⚠️ PNG base64 image may be corrupted.")
-        return f"data:image/png;base64,{encoded}"
     except ValueError as ve:
         logger.error(
             f"❌ create_technician_amount_bar_chart: נתוני טכנאי לא תקינים - {ve}"
@@ -347,11 +315,55 @@ def prepare_client_report_context(report_data: dict[str, Any]) -> dict[str, Any]
         return {}
 
 
+@scratch_workspace("report")  # one private temp dir per call, removed when it returns
+def _store_delivered_jobs(
+    detail_df: pd.DataFrame,
+    dedup: Optional[DedupReport],
+    report_type: str,
+    client_id: str,
+) -> None:
+    """Rollup store + jobs dataset get the report's fresh jobs; then the job index marks them seen."""
+    fresh = detail_df
+    if dedup is not None:
+        fresh_ids = dedup.fresh_job_ids()
+        fresh = detail_df[detail_df["job_id"].astype(str).str.strip().isin(fresh_ids)]
+    stored = True
+    try:
+        with span("rollup_update", rows_in=len(fresh)):
+            get_rollup_store().ingest(fresh, source=report_type, client_id=client_id or None)
+    except Exception as e:
+        # History is a nice-to-have; never fail a delivered report over it
+        stored = False
+        logger.warning("⚠️ Rollup store update failed: %s", e, exc_info=True)
+
+    # Same fresh rows into the month-partitioned jobs dataset (the old
+    # merged_jobs.csv, imported on first use); compaction runs off-thread
+    try:
+        dataset = get_jobs_dataset()
+        with span("dataset_append", rows_in=len(fresh)):
+            dataset.seed_from_csv(MERGED_CSV_PATH)
+            dataset.append(fresh)
+        dataset.compact_in_background()
+    except Exception as e:
+        stored = False
+        logger.warning("⚠️ Jobs dataset append failed: %s", e, exc_info=True)
+
+    # Jobs are marked seen only once both stores hold them; after a failed
+    # store they count as fresh again on the next upload (both stores keep
+    # the latest row per job_id, so storing them twice is harmless)
+    if dedup is not None and stored:
+        try:
+            get_job_index().upsert(dedup, fresh_ids)
+        except Exception as e:
+            logger.warning("⚠️ Job index update failed: %s", e, exc_info=True)
+
+
 def create_and_email_report(
     df: pd.DataFrame,
     report_type: str,
     tech_name: str,
-    client_id: str
+    client_id: str,
+    pages_per_volume: int = 0,
 ) -> str:
     """
     Creates a PDF report from the given DataFrame and returns the path.
@@ -361,6 +373,9 @@ def create_and_email_report(
         report_type (str): A label for the type of report (used in filename).
         tech_name (str): The name of the technician.
         client_id (str): The client identifier.
+        pages_per_volume (int): > 0 splits a long report into volumes of at
+            most this many pages (see generate_pdf_report); the manifest
+            entry of the returned path lists them.
 
     Returns:
         str: Full path to the created PDF report.
@@ -380,26 +395,46 @@ def create_and_email_report(
     # Clean and parse date columns safely before analysis
     date_cols = [col for col in ["date", "closed", "created"] if col in df.columns]
     if date_cols:
-        logger.info(f"🕒 מנקה וממפה עמודות תאריך: {date_cols}")
+        logger.info("🕒 מנקה וממפה עמודות תאריך: %s", date_cols)
         df = clean_and_parse_dates(df, date_cols)
     else:
         logger.warning("⚠️ לא נמצאו עמודות תאריך לניקוי ב-DataFrame!")
 
     # Analyze
     df = normalize_columns(df)
-    if "job_id" not in df.columns:
+    # Generated ids are only unique within this file, so such uploads can't be
+    # deduplicated against earlier ones and stay out of the rollup store
+    has_job_ids = "job_id" in df.columns
+    if not has_job_ids:
         df["job_id"] = [f"A{i+1}" for i in range(len(df))]
-    print("🧪 עמודות אחרי normalize_columns:", df.columns.tolist())
-    print(df[["tech", "technician"]].head())
-    detail_df, summaries = build_report_data(df)
+    log_df(logger, "🧪 אחרי normalize_columns", df, head=5)
+
+    # Jobs already delivered in an earlier (overlapping) upload stay in this
+    # report, but are not counted again in the rollups
+    dedup = None
+    if has_job_ids:
+        try:
+            with span("job_dedup", rows_in=len(df)):
+                dedup = check_uploaded_jobs(df, value_columns=DEDUP_VALUE_COLUMNS, source=report_type)
+            logger.info("🔁 Job index: %s", dedup.to_dict())
+        except Exception as e:
+            logger.warning("⚠️ Job index check failed: %s", e, exc_info=True)
+
+    detail_df, summaries = build_report_data(df, ingest=True)
     assert isinstance(detail_df, pd.DataFrame), "build_report_data must return a DataFrame as first element"
+    if dedup is not None:
+        detail_df.attrs["job_dedup"] = dedup.to_dict()
 
     # Generate report
     report_path = generate_pdf_report(
         df=detail_df,
         report_type=report_type,
-        extra={"tech_name": tech_name, "client_id": client_id}
+        extra={"tech_name": tech_name, "client_id": client_id},
+        pages_per_volume=pages_per_volume,
     )
 
     logger.info("✅ דוח נוצר: %s", report_path)
+
+    if report_path and has_job_ids:
+        _store_delivered_jobs(detail_df, dedup, report_type, client_id)
     return str(report_path)
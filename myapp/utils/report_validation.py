@@ -1,25 +1,20 @@
 from pathlib import Path
 import pandas as pd
 import logging
-from decimal import Decimal, InvalidOperation
+from typing import Optional
+from myapp.utils.pipeline_timing import timed
+from myapp.utils.report_metrics import ReportMetrics, compute_report_metrics
 
 logger = logging.getLogger(__name__)
 
-def safe_sum_decimal(series: pd.Series) -> Decimal:
-    total = Decimal("0.00")
-    for val in series.dropna():
-        try:
-            total += Decimal(str(val))
-        except (InvalidOperation, TypeError):
-            continue
-    return total
-
+@timed("validate_report_integrity")
 def validate_report_integrity(
     report_path: Path,
     df: pd.DataFrame,
     *,
     totals_label: str = "Totals:",
-    min_pdf_size: int = 10_000
+    min_pdf_size: int = 10_000,
+    metrics: Optional[ReportMetrics] = None,
 ) -> None:
     """
     Validate that a generated PDF report and its source DataFrame meet integrity standards.
@@ -40,6 +35,9 @@ def validate_report_integrity(
         Identifier prefix for a totals row in 'job_id', by default "Totals:".
     min_pdf_size : int, optional
         Minimum PDF file size in bytes (default 10_000).
+    metrics : ReportMetrics, optional
+        Row count, total and rendered size computed while the report was
+        built; when given, nothing is re-counted and the check is O(1).
 
     Raises
     ------
@@ -52,8 +50,11 @@ def validate_report_integrity(
         logger.error("PDF report not found: %s", report_path)
         raise ValueError(f"PDF report not found: {report_path}")
 
+    if metrics is None:
+        metrics = compute_report_metrics(df, totals_prefix=totals_label)
+
     # Step 2: Verify file size is reasonable
-    size = report_path.stat().st_size
+    size = metrics.size_bytes if metrics.size_bytes is not None else report_path.stat().st_size
     if size < min_pdf_size:
         logger.warning(
             "Generated PDF is too small: %s (%d bytes)", report_path, size
@@ -61,11 +62,7 @@ def validate_report_integrity(
         raise ValueError("Generated PDF seems incomplete or corrupt.")
 
     # Step 3: Check for meaningful data rows (exclude totals)
-    row_count = len(df)
-    if "job_id" in df.columns:
-        first_val = df.iloc[0]["job_id"]
-        if isinstance(first_val, str) and first_val.startswith(totals_label):
-            row_count -= 1
+    row_count = metrics.rows
     if row_count <= 0:
         logger.warning(
             "Report has insufficient data rows (only totals?): %s", report_path
@@ -73,12 +70,12 @@ def validate_report_integrity(
         raise ValueError("Report contains no meaningful data.")
 
     # Step 4: Confirm total sum is positive
-    if "total" not in df.columns:
+    if metrics.total_cents is None:
         logger.error(
             "'total' column missing in DataFrame for report validation."
         )
         raise ValueError("Missing 'total' column in report data.")
-    total_sum = safe_sum_decimal(df["total"])
+    total_sum = metrics.total
     if total_sum <= 0:
         logger.warning(
             "Report total sum is non-positive: %.2f", total_sum
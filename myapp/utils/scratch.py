@@ -0,0 +1,107 @@
+# myapp/utils/scratch.py
+
+import contextvars
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Per-run scratch space for report builds.
+#
+#   with scratch_workspace("pdf") as ws:
+#       tmp_pdf = ws.file(".pdf")              # unique name inside the run's own dir
+#       ...write...
+#       publish(tmp_pdf, final_path)           # atomic rename into place
+#   # the directory and anything left in it are gone here
+#
+#   with staged_output(output_path) as tmp:    # the two steps above in one
+#       pdf.output(str(tmp))
+#
+# Every run gets its own mkdtemp() folder, so two gunicorn workers (or two
+# threads of one) building reports at the same moment never share a file
+# name. Nested calls reuse the outer run's workspace (tracked in a
+# contextvar, so threads and asyncio tasks each see their own). Charts are
+# embedded from memory (BytesIO) and never land here at all.
+#
+# Env control:
+#   SCRATCH_ROOT  parent folder for run workspaces (default: output/tmp)
+
+DEFAULT_SCRATCH_ROOT = "output/tmp"
+
+_CURRENT: "contextvars.ContextVar[Optional[ScratchWorkspace]]" = contextvars.ContextVar(
+    "scratch_workspace", default=None
+)
+
+
+class ScratchWorkspace:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def file(self, suffix: str = "", prefix: str = "") -> Path:
+        """A fresh, not yet existing path inside the workspace."""
+        return self.path / f"{prefix}{uuid.uuid4().hex}{suffix}"
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def current_workspace() -> Optional[ScratchWorkspace]:
+    return _CURRENT.get()
+
+
+@contextmanager
+def scratch_workspace(prefix: str = "run") -> Iterator[ScratchWorkspace]:
+    """A unique temp dir for this run, removed on exit (reused when nested)."""
+    outer = _CURRENT.get()
+    if outer is not None:
+        yield outer
+        return
+    root = Path(os.getenv("SCRATCH_ROOT", DEFAULT_SCRATCH_ROOT))
+    root.mkdir(parents=True, exist_ok=True)
+    workspace = ScratchWorkspace(Path(tempfile.mkdtemp(prefix=f"{prefix}-", dir=root)))
+    token = _CURRENT.set(workspace)
+    try:
+        yield workspace
+    finally:
+        _CURRENT.reset(token)
+        workspace.cleanup()
+        log.debug("🧹 Scratch workspace removed: %s", workspace.path)
+
+
+def publish(tmp_path: str | Path, final_path: str | Path) -> Path:
+    """
+    Move a finished file from the workspace to its final place in one step
+    (os.replace; falls back to a copy + replace across filesystems).
+    """
+    final_path = Path(final_path)
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(tmp_path, final_path)
+    except OSError:
+        staged = final_path.with_name(f".{final_path.name}.{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(tmp_path, staged)
+        os.replace(staged, final_path)
+        Path(tmp_path).unlink(missing_ok=True)
+    return final_path
+
+
+@contextmanager
+def staged_output(final_path: str | Path) -> Iterator[Path]:
+    """
+    Yield a scratch path to write `final_path` to; it is published only when
+    the block succeeds, so readers never see a half-written report.
+    """
+    with scratch_workspace("out") as workspace:
+        staged = workspace.file(Path(final_path).suffix)
+        yield staged
+        publish(staged, final_path)
+
+
+__all__ = ["ScratchWorkspace", "scratch_workspace", "current_workspace", "publish", "staged_output"]
@@ -0,0 +1,145 @@
+# myapp/utils/typed_reader.py
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.column_mapper import load_column_schema
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Schema-driven reader for job sheets: every column is parsed straight into
+# its final type (schema_config.json -> "column_types"), instead of reading
+# everything as str and re-parsing it in clean_and_cast / enrich.
+#
+#   money     -> float64 (C parser; "$1,234.50"-style text cleaned once)
+#   percent   -> float fraction ("50%" -> 0.5), only when every value parses
+#   date      -> datetime64 via the schema "date_formats", in order
+#   category  -> pandas category (tech, job_type, payment_method, company ...)
+#   text      -> str
+#
+# Columns converted here are listed in df.attrs["typed_columns"], so
+# clean_and_cast leaves them alone.
+
+TYPED_ATTR = "typed_columns"
+_PERCENT_RE = r"^\s*-?\d+(?:\.\d+)?\s*%\s*$"
+
+
+def _normalize(name: object) -> str:
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def resolve_column_types(columns, schema: dict) -> Dict[object, str]:
+    """Map each raw column name to its schema kind (unknown columns are skipped)."""
+    types: Dict[str, str] = schema.get("column_types", {})
+    raw_to_canonical = {_normalize(k): v for k, v in schema.get("raw_to_canonical", {}).items()}
+    resolved: Dict[object, str] = {}
+    for col in columns:
+        key = _normalize(col)
+        kind = types.get(key) or types.get(raw_to_canonical.get(key, ""))
+        if kind:
+            resolved[col] = kind
+    return resolved
+
+
+def _to_money(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    cleaned = series.astype("string").str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(cleaned.replace("", pd.NA), errors="coerce").astype(float)
+
+
+def _to_dates(series: pd.Series, formats: List[str]) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    text = series.astype("string").str.strip()
+    result = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    pending = text.notna().to_numpy(dtype=bool)
+    for fmt in formats:
+        if not pending.any():
+            break
+        idx = np.flatnonzero(pending)
+        parsed = pd.to_datetime(text.iloc[idx], format=fmt, errors="coerce")
+        ok = parsed.notna().to_numpy(dtype=bool)
+        result.iloc[idx[ok]] = parsed[ok].to_numpy()
+        pending[idx[ok]] = False
+    return result
+
+
+def _to_percent(series: pd.Series) -> Optional[pd.Series]:
+    # "60%/40%" multi-tech shares are split later, so keep the text unless
+    # every value is a plain percentage
+    if pd.api.types.is_numeric_dtype(series):
+        return None
+    text = series.astype("string")
+    present = text.notna()
+    if not text[present].str.match(_PERCENT_RE).all():
+        return None
+    return pd.to_numeric(text.str.replace("%", "", regex=False).str.strip(), errors="coerce").astype(float) / 100
+
+
+def apply_column_types(df: pd.DataFrame, schema_name: str = "default") -> pd.DataFrame:
+    """Convert the schema columns of an already-loaded frame (modifies and returns df)."""
+    schema = load_column_schema(schema_name)
+    formats = schema.get("date_formats", [])
+    typed: List[str] = list(df.attrs.get(TYPED_ATTR, []))
+    for col, kind in resolve_column_types(df.columns, schema).items():
+        if col in typed:
+            continue
+        if kind == "money":
+            df[col] = _to_money(df[col])
+        elif kind == "date" and formats:
+            df[col] = _to_dates(df[col], formats)
+        elif kind == "percent":
+            converted = _to_percent(df[col])
+            if converted is None:
+                continue
+            df[col] = converted
+        elif kind == "category":
+            df[col] = df[col].astype("category")
+        else:
+            continue
+        typed.append(str(col))
+    df.attrs[TYPED_ATTR] = typed
+    return df
+
+
+def read_jobs_typed(path: str, schema_name: str = "default", sheet: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read an Excel/CSV job sheet with the schema's dtypes applied at read time.
+    Text and category columns are handed to the parser as dtypes; money,
+    percent and date columns are converted once, right after the read.
+    """
+    schema = load_column_schema(schema_name)
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".csv":
+        header = pd.read_csv(path, nrows=0).columns
+    elif ext in {".xlsx", ".xls"}:
+        header = pd.read_excel(path, sheet_name=sheet or 0, nrows=0).columns
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+    kinds = resolve_column_types(header, schema)
+    read_dtypes = {}
+    for col, kind in kinds.items():
+        if kind == "category":
+            read_dtypes[col] = "category"
+        elif kind in {"text", "percent", "date"} and ext == ".csv":
+            read_dtypes[col] = str
+
+    if ext == ".csv":
+        df = pd.read_csv(path, dtype=read_dtypes)
+    else:
+        df = pd.read_excel(path, sheet_name=sheet or 0, dtype=read_dtypes)
+
+    df.attrs[TYPED_ATTR] = [str(c) for c, kind in kinds.items() if kind in {"category", "text"}]
+    df = apply_column_types(df, schema_name)
+    log.debug("Typed read of %s: %d rows, typed columns %s", path, len(df), df.attrs[TYPED_ATTR])
+    return df
+
+
+__all__ = ["read_jobs_typed", "apply_column_types", "resolve_column_types", "TYPED_ATTR"]
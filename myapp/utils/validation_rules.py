@@ -0,0 +1,307 @@
+# myapp/utils/validation_rules.py
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from myapp.utils.logger_config import get_logger
+
+log = get_logger(__name__)
+
+# Declarative column rules, evaluated as vectorized masks.
+#
+#   rules = compile_rules([ColumnRule("total", "numeric", severity="warning"),
+#                          ColumnRule("tech_share", "percent"), ...])
+#   report = rules.evaluate(df)          # never raises; collects every failure
+#   report.to_dict()                     # compact form for manifest.json
+#
+# Each column is converted to its string view once and every rule for that
+# column runs on the same view, so a 100k-row upload is one pass per column
+# instead of one Python call per cell per check.
+
+# Formats accepted by date_utils.parse_date_flex, in the same order
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%MZ",
+    "%Y/%m/%d",
+    "%m/%d/%Y %I:%M %p",
+)
+
+PLACEHOLDER_VALUES = ("n/a", "", "none")
+MAX_REPORT_SAMPLES = 20
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    column: str
+    check: str  # key in CHECKS
+    severity: str = "error"  # "error" fails validation, "warning" is only reported
+    arg: Any = None
+    message: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CellFailure:
+    row: Any
+    column: str
+    check: str
+    severity: str
+    value: Any
+
+
+@dataclass
+class ValidationReport:
+    rows_checked: int = 0
+    missing_columns: List[str] = field(default_factory=list)
+    failures: List[CellFailure] = field(default_factory=list)
+    messages: Dict[str, str] = field(default_factory=dict)  # "column:check" -> message
+
+    @property
+    def errors(self) -> List[CellFailure]:
+        return [f for f in self.failures if f.severity == "error"]
+
+    @property
+    def warnings(self) -> List[CellFailure]:
+        return [f for f in self.failures if f.severity == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing_columns and not self.errors
+
+    def counts(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for f in self.failures:
+            key = f"{f.column}:{f.check}"
+            out[key] = out.get(key, 0) + 1
+        return out
+
+    def first_error_message(self) -> Optional[str]:
+        if self.missing_columns:
+            return f"Missing required columns: {self.missing_columns}"
+        for f in self.failures:
+            if f.severity == "error":
+                return self.messages.get(f"{f.column}:{f.check}") or (
+                    f"{f.column}: {f.check} failed for value {f.value!r} (row {f.row})"
+                )
+        return None
+
+    def to_dict(self, max_samples: int = MAX_REPORT_SAMPLES) -> Dict[str, Any]:
+        """Compact, JSON-safe summary (counts + a few sample cells)."""
+        return {
+            "validated": self.ok,
+            "rows_checked": self.rows_checked,
+            "missing_columns": list(self.missing_columns),
+            "error_count": len(self.errors),
+            "warning_count": len(self.warnings),
+            "by_rule": self.counts(),
+            "samples": [
+                {"row": _json_safe(f.row), "column": f.column, "check": f.check, "value": _json_safe(f.value)}
+                for f in self.failures[:max_samples]
+            ],
+        }
+
+
+class UploadValidationError(ValueError):
+    """Raised by validate_uploaded_df; carries the full ValidationReport."""
+
+    def __init__(self, message: str, report: ValidationReport) -> None:
+        super().__init__(message)
+        self.report = report
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# ------------------------------------------------------------------------------
+# Checks: (series, string view, rule) -> boolean mask of FAILING cells
+# ------------------------------------------------------------------------------
+
+
+def _check_numeric(series: pd.Series, text: pd.Series, rule: ColumnRule) -> pd.Series:
+    # Same verdict as decimal_utils.validate_numeric_column: a non-empty value
+    # that cleans down to 0.00 without literally being "0" / "0.0".
+    cleaned = text.str.replace(",", "", regex=False).str.replace(r"[^\d.\-]", "", regex=True).str.strip()
+    number = pd.to_numeric(cleaned.mask(cleaned == "", "0"), errors="coerce")
+    rounds_to_zero = number.abs() < 0.005
+    return series.notna() & rounds_to_zero & ~text.str.strip().isin(["0", "0.0"])
+
+
+def _check_percent(series: pd.Series, text: pd.Series, rule: ColumnRule) -> pd.Series:
+    return ~text.str.endswith("%")
+
+
+# strptime directive -> the text it accepts (as in CPython's _strptime)
+_DIRECTIVE_PATTERNS = {
+    "Y": r"\d{4}",
+    "m": r"1[0-2]|0[1-9]|[1-9]",
+    "d": r"3[01]|[12]\d|0[1-9]|[1-9]| [1-9]",
+    "H": r"2[0-3]|[0-1]\d|\d",
+    "I": r"1[0-2]|0[1-9]|[1-9]",
+    "M": r"[0-5]\d|\d",
+    "S": r"6[0-1]|[0-5]\d|\d",
+    "f": r"[0-9]{1,6}",
+    "p": r"(?i:am|pm)",
+}
+
+
+@lru_cache(maxsize=None)
+def _format_pattern(fmt: str) -> "re.Pattern[str]":
+    """Full-match regex for the strings datetime.strptime(value, fmt) accepts."""
+    parts, i = [], 0
+    while i < len(fmt):
+        char = fmt[i]
+        if char == "%" and i + 1 < len(fmt):
+            parts.append(f"(?:{_DIRECTIVE_PATTERNS[fmt[i + 1]]})")
+            i += 2
+            continue
+        parts.append(r"\s+" if char.isspace() else re.escape(char))
+        i += 1
+    return re.compile("".join(parts))
+
+
+def _check_date(series: pd.Series, text: pd.Series, rule: ColumnRule) -> pd.Series:
+    # Same acceptance as parse_date_flex: datetime objects, or strings in one
+    # of DATE_FORMATS (after strip). Each format only sees what is still
+    # unparsed, and only strings shaped exactly like it: pandas' ISO fast
+    # path would also take "20250610", "...T14:30:00Z" and the like.
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.Series(False, index=series.index)
+    values = series.to_numpy(dtype=object)
+    is_dt = np.fromiter((isinstance(v, datetime) for v in values), dtype=bool, count=len(values))
+    is_str = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    failing = ~is_dt & ~is_str
+    strings = np.flatnonzero(is_str & ~is_dt)
+    # a sheet repeats its dates: check each distinct string once
+    codes, distinct = pd.factorize(text.str.strip().to_numpy(dtype=object)[strings])
+    candidates = pd.Series(distinct, dtype=object)
+    pending = np.ones(len(distinct), dtype=bool)
+    for fmt in rule.arg or DATE_FORMATS:
+        if not pending.any():
+            break
+        idx = np.flatnonzero(pending)
+        shaped = candidates.iloc[idx].str.fullmatch(_format_pattern(fmt)).to_numpy(dtype=bool)
+        if not shaped.any():
+            continue
+        idx = idx[shaped]
+        parsed = pd.to_datetime(candidates.iloc[idx], format=fmt, errors="coerce")
+        pending[idx[parsed.notna().to_numpy()]] = False
+    failing[strings] = pending[codes]
+    return pd.Series(failing, index=series.index)
+
+
+@lru_cache(maxsize=None)
+def _charset_pattern(allowed: str) -> "re.Pattern[str]":
+    return re.compile(f"[^{allowed}]")
+
+
+def _check_charset(series: pd.Series, text: pd.Series, rule: ColumnRule) -> pd.Series:
+    # arg is the allowed character class body, e.g. "0-9." or "0-9%"
+    return text.str.contains(_charset_pattern(rule.arg), regex=True)
+
+
+def _check_not_placeholder(series: pd.Series, text: pd.Series, rule: ColumnRule) -> pd.Series:
+    return text.str.lower().isin(rule.arg or PLACEHOLDER_VALUES)
+
+
+CHECKS: Dict[str, Callable[[pd.Series, pd.Series, ColumnRule], pd.Series]] = {
+    "numeric": _check_numeric,
+    "percent": _check_percent,
+    "date": _check_date,
+    "charset": _check_charset,
+    "not_placeholder": _check_not_placeholder,
+}
+
+
+# ------------------------------------------------------------------------------
+# Compiled rule set
+# ------------------------------------------------------------------------------
+
+
+class CompiledRules:
+    def __init__(self, rules: Sequence[ColumnRule], required_columns: Iterable[str] = ()) -> None:
+        unknown = sorted({r.check for r in rules} - set(CHECKS))
+        if unknown:
+            raise ValueError(f"Unknown validation checks: {unknown}")
+        self.required_columns = list(required_columns)
+        self.rules = list(rules)
+        # column -> its rules, in declaration order
+        self.by_column: Dict[str, List[ColumnRule]] = {}
+        for rule in self.rules:
+            self.by_column.setdefault(rule.column, []).append(rule)
+
+    def evaluate(self, df: pd.DataFrame, row_mask: Optional[pd.Series] = None) -> ValidationReport:
+        """
+        Run every rule and collect all failing cells. Never raises for bad data.
+        `row_mask` limits the check to some rows (e.g. excluding Totals rows).
+        """
+        report = ValidationReport()
+        report.missing_columns = [c for c in self.required_columns if c not in df.columns]
+        if report.missing_columns:
+            return report
+
+        frame = df if row_mask is None else df[row_mask]
+        report.rows_checked = len(frame)
+
+        # id(rule) -> (column series, positions of failing cells)
+        failing: Dict[int, tuple] = {}
+        for column, rules in self.by_column.items():
+            if column not in frame.columns:
+                continue
+            series = frame[column]
+            text = series.astype(str)  # one string view per column
+            for rule in rules:
+                mask = CHECKS[rule.check](series, text, rule).fillna(False).to_numpy(dtype=bool)
+                if mask.any():
+                    failing[id(rule)] = (series, np.flatnonzero(mask))
+
+        # Report in declaration order so the first error is deterministic
+        for rule in self.rules:
+            if id(rule) not in failing:
+                continue
+            series, positions = failing[id(rule)]
+            rows = series.index[positions]
+            report.failures.extend(
+                CellFailure(row=row, column=rule.column, check=rule.check, severity=rule.severity, value=value)
+                for row, value in zip(rows, series.iloc[positions])
+            )
+            if rule.message:
+                report.messages[f"{rule.column}:{rule.check}"] = rule.message.format(
+                    column=rule.column, rows=rows[:MAX_REPORT_SAMPLES].tolist()
+                )
+        return report
+
+
+def compile_rules(rules: Sequence[ColumnRule], required_columns: Iterable[str] = ()) -> CompiledRules:
+    return CompiledRules(rules, required_columns)
+
+
+__all__ = [
+    "ColumnRule",
+    "CellFailure",
+    "ValidationReport",
+    "UploadValidationError",
+    "CompiledRules",
+    "compile_rules",
+    "CHECKS",
+    "DATE_FORMATS",
+]
@@ -2,8 +2,8 @@
 
 import pandas as pd
 import logging
-from myapp.utils.decimal_utils import validate_numeric_column
-from myapp.utils.date_utils import parse_date_flex
+from myapp.utils.df_diagnostics import log_df
+from myapp.utils.validation_rules import ColumnRule, UploadValidationError, compile_rules
 
 logger = logging.getLogger(__name__)
 
@@ -18,73 +18,59 @@ DATE_COLUMNS = ["created", "date", "closed"]
 PERCENT_COLUMNS = ["tech_share"]
 
 
+# Declarative rules for uploaded job sheets, compiled once at import.
+# "warning" rules are reported (and stored in the manifest) but don't fail the upload.
+UPLOAD_RULES = (
+    [ColumnRule(col, "numeric", severity="warning") for col in NUMERIC_COLUMNS]
+    + [
+        ColumnRule(col, "percent", message="Column {column} must contain percentage strings like '50%'")
+        for col in PERCENT_COLUMNS
+    ]
+    + [ColumnRule(col, "date", message="Date column error: {column}: unsupported date values in rows {rows}") for col in DATE_COLUMNS]
+    + [
+        ColumnRule("total", "charset", arg="0-9.", message="Suspicious values in rows: {rows}"),
+        ColumnRule("tech_share", "charset", arg="0-9%", message="Suspicious values in rows: {rows}"),
+    ]
+    + [ColumnRule(col, "not_placeholder", message="Suspicious values in rows: {rows}") for col in DATE_COLUMNS]
+)
+_COMPILED_UPLOAD_RULES = compile_rules(UPLOAD_RULES, REQUIRED_COLUMNS)
+
+
 def validate_uploaded_df(df: pd.DataFrame) -> pd.DataFrame:
-    logger.debug(f"[TYPECHECK] {__name__}.validate_uploaded_df → got {type(df).__name__} with shape {getattr(df, 'shape', 'N/A')}")
+    """
+    Check an uploaded job sheet against UPLOAD_RULES in a single vectorized
+    pass (Totals rows excluded). Every failing cell is collected; the compact
+    report is attached as df.attrs["autoclose_validation"] for the manifest.
+    Raises UploadValidationError (a ValueError) when any error-level rule fails.
+    """
+    logger.debug("[TYPECHECK] %s.validate_uploaded_df → got %s with shape %s", __name__, type(df).__name__, getattr(df, "shape", "N/A"))
     logger.info("🚀 Starting validate_uploaded_df stage")
-    validation_notes = None
-    validated = True
+    validation = dict(validated=False, validation_notes=None)
     try:
-        # 1. Required columns
-        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-        if missing:
-            logger.error(f"[VALIDATION] Missing required columns: {missing}")
-            validated = False
-            validation_notes = f"Missing columns: {missing}"
-            raise ValueError(f"Missing required columns: {missing}")
-
-        # Exclude Totals rows for field-level validation
-        df_filtered = df[~df["job_id"].astype(str).str.startswith("Totals")].copy()
-        logger.debug("✅ Validating %d operational rows (excluding totals)", len(df_filtered))
-
-        # 2. Numeric columns
-        for col in NUMERIC_COLUMNS:
-            try:
-                validate_numeric_column(df_filtered, col)
-            except Exception as e:
-                logger.error(f"[VALIDATION] Numeric column error: {col}: {e}")
-                validated = False
-                validation_notes = f"Numeric column error: {col}: {e}"
-                raise
-
-        # 3. Percent columns
-        for col in PERCENT_COLUMNS:
-            if not df_filtered[col].astype(str).str.endswith("%").all():
-                logger.error(f"[VALIDATION] Column {col} must contain percentage strings like '50%'")
-                validated = False
-                validation_notes = f"Column {col} must contain percentage strings like '50%'"
-                raise ValueError(f"Column {col} must contain percentage strings like '50%'")
-
-        # 4. Date columns
-        for col in DATE_COLUMNS:
-            try:
-                df_filtered[col] = df_filtered[col].apply(parse_date_flex)
-            except Exception as e:
-                logger.error(f"[VALIDATION] Date column error: {col}: {e}")
-                validated = False
-                validation_notes = f"Date column error: {col}: {e}"
-                raise
+        row_mask = None
+        if "job_id" in df.columns:
+            row_mask = ~df["job_id"].astype(str).str.startswith("Totals")
+        report = _COMPILED_UPLOAD_RULES.evaluate(df, row_mask=row_mask)
+        validation = dict(
+            validated=report.ok,
+            validation_notes=report.first_error_message(),
+            validation_report=report.to_dict(),
+        )
 
-        # 5. Poisoned values
-        bad_rows = df_filtered[
-            df_filtered["total"].astype(str).str.contains(r"[^0-9.]") |
-            df_filtered["tech_share"].astype(str).str.contains(r"[^0-9%]") |
-            df_filtered["created"].astype(str).str.lower().isin(["n/a", "", "none"]) |
-            df_filtered["date"].astype(str).str.lower().isin(["n/a", "", "none"]) |
-            df_filtered["closed"].astype(str).str.lower().isin(["n/a", "", "none"])
-        ]
-        if not bad_rows.empty:
-            logger.warning(f"[VALIDATION] Found {len(bad_rows)} suspicious rows: {bad_rows.index.tolist()}")
-            validated = False
-            validation_notes = f"Suspicious values in rows: {bad_rows.index.tolist()}"
-            raise ValueError(f"Suspicious values in rows: {bad_rows.index.tolist()}")
+        if report.warnings:
+            logger.warning("[VALIDATION] %d warnings: %s", len(report.warnings), report.counts())
+        if not report.ok:
+            logger.error("[VALIDATION] %s (all failures: %s)", validation["validation_notes"], report.counts())
+            raise UploadValidationError(validation["validation_notes"], report)
 
-        logger.info(f"✅ validate_uploaded_df complete → {df.shape}")
+        logger.debug("✅ Validated %d operational rows (excluding totals)", report.rows_checked)
+        logger.info("✅ validate_uploaded_df complete → %s", df.shape)
         return df
     except Exception as e:
-        logger.exception(f"[ERROR] Failed inside validate_uploaded_df – {e}")
-        logger.debug(f"[DF] Columns: {getattr(df, 'columns', [])}")
-        logger.debug(f"[DF] Head:\n{getattr(df, 'head', lambda x=3: 'N/A')(3)}")
+        logger.exception("[ERROR] Failed inside validate_uploaded_df – %s", e)
+        log_df(logger, "[DF]", df, head=3)
         raise
     finally:
         # Attach validation status for manifest
-        df._autoclose_validation = dict(validated=validated, validation_notes=validation_notes)
+        if isinstance(df, pd.DataFrame):
+            df.attrs["autoclose_validation"] = validation
@@ -7,14 +7,12 @@ from pathlib import Path
 
 from myapp.services.pdf_export_service import PDFReportExporter
 from myapp.services.email_service import EmailService
+from myapp.utils.logger_config import add_log_file
+from myapp.utils.jobs_dataset import get_jobs_dataset, merged_jobs_available, read_merged_jobs
 
-# Configure a basic logger that writes to 'output/auto_run.log'
+# Route all logging (including the myapp modules) to 'output/auto_run.log' too
 LOG_FILE_PATH = "output/auto_run.log"
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+add_log_file(LOG_FILE_PATH)
 
 DATA_FILE = "output/merged_jobs.csv"
 EXPORT_DIR = "output/reports_exported"
@@ -23,20 +21,26 @@ EXPORT_DIR = "output/reports_exported"
 def auto_run() -> None:
     """
     Automates the process of:
-      1. Checking if 'merged_jobs.csv' exists and loading the data.
+      1. Loading the merged jobs (jobs dataset, or 'merged_jobs.csv' if there is none)
+         and refreshing the 'merged_jobs.csv' export from the dataset.
       2. Generating a PDF report from the data.
       3. Sending the report via email using EmailService.
       4. Logging each step and any errors to 'auto_run.log'.
     """
     try:
         # 1. Validate data file existence
-        if not os.path.isfile(DATA_FILE):
+        if not merged_jobs_available(DATA_FILE):
             msg = f"❌ Data file not found: {DATA_FILE}"
             logging.warning(msg)
             print(msg)
             return
 
-        df = pd.read_csv(DATA_FILE)
+        df = read_merged_jobs(DATA_FILE)
+
+        # Scheduled refresh of the merged_jobs.csv export (uploads only append to the dataset)
+        dataset = get_jobs_dataset()
+        if dataset.has_data():
+            dataset.export_csv(DATA_FILE, frame=df)
 
         if df.empty:
             logging.info("⚠️ No data to export in %s.", DATA_FILE)
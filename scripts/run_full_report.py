@@ -1,10 +1,56 @@
 #!/usr/bin/env python3
-from scripts.run import main as run_single
-from pathlib import Path
+"""
+Generate the reports for every upload file in parallel.
+
+Usage:
+  python -m scripts.run_full_report                       # uploads/*.csv, one worker per CPU
+  python -m scripts.run_full_report --workers 4 --since last
+  python -m scripts.run_full_report data/ --pattern "*.csv" --pattern "*.xlsx" --since 2025-06-01
+  python -m scripts.run_full_report --pages-per-volume 200   # huge uploads as 200-page volumes
+
+A JSON summary of every file (outcome, output, timing) is written to
+--summary (default $BATCH_SUMMARY or output/batch_summary.json). Exits 1
+when any file failed.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from myapp.services.batch_runner import DEFAULT_PATTERNS, default_workers, discover_inputs, run_batch, summary_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate reports for all upload files.")
+    parser.add_argument("input_dir", nargs="?", default="uploads")
+    parser.add_argument("--pattern", action="append", help=f"glob for input files (default: {' '.join(DEFAULT_PATTERNS)})")
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument(
+        "--since",
+        nargs="?",
+        const="last",
+        help="skip up-to-date inputs: 'last' (the default) = unchanged since the last summary; "
+        "or an ISO date/time = not modified since then",
+    )
+    parser.add_argument("--summary", default=str(summary_path()), help="where to write the JSON summary")
+    parser.add_argument(
+        "--pages-per-volume",
+        type=int,
+        default=0,
+        help="split long reports into volumes of at most this many pages (listed per file in the summary)",
+    )
+    args = parser.parse_args(argv)
+
+    files = discover_inputs(args.input_dir, args.pattern or DEFAULT_PATTERNS)
+    if not files:
+        print(f"❌ No input files in {args.input_dir}")
+        return 1
+    summary = run_batch(
+        files, workers=args.workers, since=args.since, summary_file=args.summary, pages_per_volume=args.pages_per_volume
+    )
+    counts = summary["counts"]
+    print(f"✅ {counts['ok']} ok, ⏭️ {counts['skipped']} up to date, ❌ {counts['error']} failed → {args.summary}")
+    return 1 if counts["error"] else 0
 
-def main():
-    for f in Path("uploads").glob("*.csv"):
-        run_single([str(f)])
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
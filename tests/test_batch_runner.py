@@ -0,0 +1,163 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from myapp.services import batch_runner
+from myapp.utils import manifest
+from scripts import run_full_report
+
+
+def fake_report(path: Path) -> str:
+    if "bad" in path.name:
+        raise ValueError("no technician column")
+    out = path.with_suffix(".pdf")
+    out.write_bytes(b"%PDF " + path.read_bytes())
+    return str(out)
+
+
+def catalogued_report(path: Path) -> str:
+    out = path.with_suffix(".pdf")
+    out.write_bytes(b"%PDF")
+    jobs = pd.DataFrame({"job_id": ["J1", "J2"], "total": [10.0, 20.0]})
+    manifest.add_report_to_manifest(df=jobs, report_path=out, report_type="batch", client_id="c1", tech_name="")
+    return str(out)
+
+
+def volume_report(path: Path, pages_per_volume: int = 0) -> str:
+    from myapp.services import pdf_generator
+
+    n = 600 if "big" in path.name else 20
+    jobs = pd.DataFrame(
+        {
+            "job_id": [f"J{i}" for i in range(n)],
+            "date": ["2024-03-01", "2024-03-02"] * (n // 2),
+            "tech": ["Dana"] * n,
+            "total": [100.0] * n,
+            "parts": [10.0] * n,
+            "cash": [100.0] * n,
+            "credit": [0.0] * n,
+            "job_type": ["rekey"] * n,
+        }
+    )
+    out = path.with_suffix(".pdf")
+    return pdf_generator.generate_pdf_report(jobs, str(out), pages_per_volume=pages_per_volume, memo=False)
+
+
+def _no_warmup():
+    pass
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCRATCH_ROOT", str(tmp_path / "scratch"))
+    monkeypatch.setattr(batch_runner, "init_worker", _no_warmup)
+    root = tmp_path / "uploads"
+    root.mkdir()
+    for name in ("a.csv", "b.csv", "c.csv", "bad.csv"):
+        (root / name).write_text("job_id,total\nJ1,10\n", encoding="utf-8")
+    (root / "notes.txt").write_text("not an upload", encoding="utf-8")
+    return root
+
+
+def test_inputs_run_on_a_pool_and_are_summarised(uploads, tmp_path):
+    files = batch_runner.discover_inputs(uploads)
+    assert [p.name for p in files] == ["a.csv", "b.csv", "bad.csv", "c.csv"]
+
+    summary_file = tmp_path / "summary.json"
+    summary = batch_runner.run_batch(files, workers=2, runner=fake_report, summary_file=summary_file)
+
+    assert summary["counts"] == {"ok": 3, "error": 1, "skipped": 0}
+    assert json.loads(summary_file.read_text(encoding="utf-8")) == summary
+    by_name = {Path(r["input"]).name: r for r in summary["files"]}
+    assert by_name["bad.csv"]["error"] == "ValueError: no technician column"
+    assert Path(by_name["a.csv"]["output"]).is_file()
+    assert all(r["pid"] != os.getpid() for r in summary["files"])
+
+
+def test_since_last_skips_unchanged_inputs(uploads, tmp_path):
+    summary_file = tmp_path / "summary.json"
+    files = batch_runner.discover_inputs(uploads)
+    batch_runner.run_batch(files, workers=1, runner=fake_report, summary_file=summary_file)
+
+    (uploads / "b.csv").write_text("job_id,total\nJ1,10\nJ2,20\n", encoding="utf-8")
+    (uploads / "c.pdf").unlink()
+    summary = batch_runner.run_batch(files, workers=1, since="last", runner=fake_report, summary_file=summary_file)
+
+    status = {Path(r["input"]).name: r["status"] for r in summary["files"]}
+    assert status == {"a.csv": "skipped", "b.csv": "ok", "c.csv": "ok", "bad.csv": "error"}
+    # a skipped input stays skippable on the next run
+    summary = batch_runner.run_batch(files, workers=1, since="last", runner=fake_report, summary_file=summary_file)
+    assert summary["counts"] == {"ok": 0, "error": 1, "skipped": 3}
+
+
+def test_since_a_time_skips_older_inputs_that_have_a_report(uploads, tmp_path):
+    summary_file = tmp_path / "summary.json"
+    files = batch_runner.discover_inputs(uploads)
+    # no previous summary: nothing is known to be reported yet, so everything runs
+    summary = batch_runner.run_batch(files, workers=1, since="2020-01-01", runner=fake_report, summary_file=summary_file)
+    assert summary["counts"] == {"ok": 3, "error": 1, "skipped": 0}
+
+    for name in ("a.csv", "b.csv", "bad.csv"):
+        os.utime(uploads / name, (946684800, 946684800))  # 2000-01-01
+    (uploads / "b.pdf").unlink()
+    summary = batch_runner.run_batch(files, workers=1, since="2020-01-01", runner=fake_report, summary_file=summary_file)
+
+    by_name = {Path(r["input"]).name: r for r in summary["files"]}
+    assert {name: r["status"] for name, r in by_name.items()} == {
+        "a.csv": "skipped", "b.csv": "ok", "c.csv": "ok", "bad.csv": "error",
+    }
+    assert Path(by_name["a.csv"]["output"]).is_file()
+
+
+def test_cli_exits_non_zero_when_a_file_fails(uploads, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_runner, "_default_runner", fake_report)
+    code = run_full_report.main([str(uploads), "--workers", "1", "--summary", str(tmp_path / "s.json")])
+    assert code == 1
+    (uploads / "bad.csv").unlink()
+    assert run_full_report.main([str(uploads), "--workers", "1", "--summary", str(tmp_path / "s.json")]) == 0
+
+
+def test_workers_do_not_lose_each_others_manifest_entries(uploads, tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_PATH", tmp_path / "manifest.json")
+    for i in range(12):
+        (uploads / f"more{i}.csv").write_text("job_id,total\nJ1,10\n", encoding="utf-8")
+    (uploads / "bad.csv").unlink()
+    files = batch_runner.discover_inputs(uploads)
+
+    summary = batch_runner.run_batch(files, workers=4, runner=catalogued_report, summary_file=tmp_path / "s.json")
+
+    assert summary["counts"]["ok"] == len(files) == 15
+    paths = {entry["path"] for entry in manifest.load_manifest_as_list()}
+    assert paths == {str(p.with_suffix(".pdf")) for p in files}
+
+
+def test_cli_pages_per_volume_lists_every_volume_in_the_summary(uploads, tmp_path, monkeypatch):
+    from myapp.services import pdf_generator
+
+    monkeypatch.setattr(pdf_generator, "_register_report_font", lambda pdf: "Helvetica")
+    monkeypatch.setattr(manifest, "MANIFEST_PATH", tmp_path / "manifest.json")
+    monkeypatch.setattr(batch_runner, "_default_runner", volume_report)
+    (uploads / "bad.csv").unlink()
+    (uploads / "big.csv").write_text("job_id,total\nJ1,10\n", encoding="utf-8")
+    summary_file = tmp_path / "s.json"
+
+    assert run_full_report.main([str(uploads), "--workers", "1", "--summary", str(summary_file), "--pages-per-volume", "5"]) == 0
+
+    by_name = {Path(r["input"]).name: r for r in batch_runner.load_summary(summary_file)["files"]}
+    big = by_name["big.csv"]
+    assert len(big["volumes"]) > 1 and big["output"] == big["volumes"][0]
+    assert all(Path(v).is_file() for v in big["volumes"])
+    assert "volumes" not in by_name["a.csv"] and by_name["a.csv"]["output"].endswith("a.pdf")
+
+    # a volume gone missing means the report is no longer up to date
+    Path(big["volumes"][-1]).unlink()
+    summary = batch_runner.run_batch(
+        batch_runner.discover_inputs(uploads), workers=1, since="last", summary_file=summary_file, pages_per_volume=5
+    )
+    assert {Path(r["input"]).name: r["status"] for r in summary["files"]} == {
+        "a.csv": "skipped", "b.csv": "skipped", "c.csv": "skipped", "big.csv": "ok",
+    }
+    assert next(r for r in summary["files"] if r["input"].endswith("big.csv"))["volumes"] == big["volumes"]
@@ -0,0 +1,65 @@
+import pandas as pd
+
+from benchmarks import stages as bench_stages
+from benchmarks.run_benchmarks import compare_results, parse_sizes, run_suite
+from benchmarks.synthetic_data import make_job_sheet
+from myapp.utils import manifest
+from myapp.utils.validation_utils import REQUIRED_COLUMNS
+
+
+def test_synthetic_sheet_is_deterministic_and_complete():
+    first = make_job_sheet(200, seed=3)
+    second = make_job_sheet(200, seed=3)
+    pd.testing.assert_frame_equal(first, second)
+    assert set(REQUIRED_COLUMNS) <= set(first.columns)
+    assert first["tech_share"].str.endswith("%").all()
+    assert first["tech"].str.contains("/").any()
+    assert not make_job_sheet(200, seed=4).equals(first)
+
+
+def test_run_suite_times_selected_stages():
+    result = run_suite([50], repeat=1, only=["clean_and_cast", "generate_pdf_report"])
+    stages = result["results"]["50"]
+    assert set(stages) == {"clean_and_cast", "generate_pdf_report"}
+    assert stages["clean_and_cast"]["status"] == "ok"
+    assert stages["clean_and_cast"]["min_ms"] > 0
+
+
+def test_pdf_stage_renders_every_repeat_into_a_scratch_manifest(monkeypatch):
+    real_manifest = manifest.MANIFEST_PATH
+    calls = []
+
+    def fake_pdf(df, output_path=None, memo=None):
+        calls.append((memo, manifest.MANIFEST_PATH))
+        return output_path
+
+    monkeypatch.setattr(bench_stages, "generate_pdf_report", fake_pdf)
+    result = run_suite([50], repeat=3, only=["generate_pdf_report"])
+
+    assert result["results"]["50"]["generate_pdf_report"]["status"] == "ok"
+    assert [memo for memo, _ in calls] == [False, False, False]
+    assert all(path != real_manifest and path.name == "manifest.json" for _, path in calls)
+    assert manifest.MANIFEST_PATH == real_manifest
+
+
+def test_compare_flags_slowdowns_and_new_errors_only():
+    baseline = {"results": {"1000": {
+        "summarise": {"status": "ok", "min_ms": 100.0},
+        "clean_and_cast": {"status": "ok", "min_ms": 100.0},
+        "loading": {"status": "ok", "min_ms": 100.0},
+        "tiny": {"status": "ok", "min_ms": 1.0},
+        "broken": {"status": "error", "error": "x"},
+    }}}
+    current = {"results": {"1000": {
+        "summarise": {"status": "ok", "min_ms": 140.0},
+        "clean_and_cast": {"status": "ok", "min_ms": 110.0},
+        "loading": {"status": "error", "error": "OSError: gone"},
+        "tiny": {"status": "ok", "min_ms": 3.0},
+        "broken": {"status": "error", "error": "x"},
+    }}}
+    regressions = compare_results(baseline, current, threshold=0.25)
+    assert {r["stage"] for r in regressions} == {"summarise", "loading"}
+
+
+def test_parse_sizes_accepts_aliases():
+    assert parse_sizes("1k, 10k,100k,1m,250") == [1_000, 10_000, 100_000, 1_000_000, 250]
@@ -0,0 +1,75 @@
+import json
+
+import pandas as pd
+
+from myapp.services.report_analyzer import summarise
+from myapp.utils.categorical_encoding import CategoryDictionary, encode_categoricals
+
+
+def _jobs(techs, job_types):
+    n = len(techs)
+    return pd.DataFrame(
+        {
+            "tech": techs,
+            "job_type": job_types,
+            "client_id": list(range(n)),  # numeric -> left alone
+            "total": [100.0] * n,
+            "parts": [10.0] * n,
+            "net_income": [90.0] * n,
+            "company_net": [50.0] * n,
+            "payment_method": ["cash"] * n,
+            "date": pd.to_datetime(["2025-04-01"] * n),
+        }
+    )
+
+
+def test_codes_are_stable_across_uploads(tmp_path):
+    path = tmp_path / "categories.json"
+    first = encode_categoricals(_jobs(["Dana", "Avi"], ["rekey", "lockout"]), dictionary=CategoryDictionary(path))
+    # A fresh process (new dictionary object) reads the persisted order back
+    second = encode_categoricals(_jobs(["Moshe", "Avi"], ["lockout", "rekey"]), dictionary=CategoryDictionary(path))
+
+    assert list(first["tech"].cat.categories) == ["Avi", "Dana"]
+    assert list(second["tech"].cat.categories) == ["Avi", "Dana", "Moshe"]
+    assert first["tech"].cat.codes[1] == second["tech"].cat.codes[1]  # "Avi"
+    assert second["client_id"].dtype == "int64"
+    assert json.loads(path.read_text(encoding="utf-8"))["tech"] == ["Avi", "Dana", "Moshe"]
+
+
+def test_summaries_only_contain_observed_categories(tmp_path):
+    dictionary = CategoryDictionary(tmp_path / "categories.json")
+    dictionary.extend("tech", ["Old Tech", "Zed"])
+    df = _jobs(["Dana", "Avi", "Dana"], ["rekey", "lockout", "rekey"])
+    expected = summarise(df.copy())
+
+    encoded = encode_categoricals(df, dictionary=dictionary)
+    summary = summarise(encoded)
+
+    assert summary["by_tech"]["tech"].astype(str).tolist() == ["Avi", "Dana"]
+    assert summary["by_tech"]["total"].tolist() == expected["by_tech"]["total"].tolist()
+    assert summary["by_service"]["income"].tolist() == expected["by_service"]["income"].tolist()
+    assert summary["by_payment"] == expected["by_payment"]
+
+
+def test_read_paths_leave_the_dictionary_alone(tmp_path):
+    path = tmp_path / "categories.json"
+    encode_categoricals(_jobs(["Dana"], ["rekey"]), dictionary=CategoryDictionary(path))
+
+    dictionary = CategoryDictionary(path)
+    read = encode_categoricals(_jobs(["Zed", "Dana"], ["rekey", "rekey"]), dictionary=dictionary, persist=False)
+
+    assert list(read["tech"].cat.categories) == ["Dana", "Zed"]
+    assert dictionary.categories("tech") == ["Dana"]
+    assert json.loads(path.read_text(encoding="utf-8"))["tech"] == ["Dana"]
+
+
+def test_a_stale_worker_does_not_reuse_a_code_taken_by_another(tmp_path):
+    path = tmp_path / "categories.json"
+    a, b = CategoryDictionary(path), CategoryDictionary(path)
+    a.extend("tech", ["Dana"])
+    assert b.categories("tech") == ["Dana"]
+
+    a.extend("tech", ["Avi"])
+    b._mtime = path.stat().st_mtime_ns  # as if b had read the file just before a's save landed
+    assert b.extend("tech", ["Moshe"]) == ["Dana", "Avi", "Moshe"]
+    assert json.loads(path.read_text(encoding="utf-8"))["tech"] == ["Dana", "Avi", "Moshe"]
@@ -0,0 +1,67 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from myapp.utils.chart_service import ChartService
+from myapp.utils.chart_utils import income_chart_path, save_income_chart
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+def test_identical_charts_render_once(tmp_path):
+    charts = ChartService(tmp_path / "cache")
+
+    first = charts.render("bar", ["Avi", "Dana"], [3, 5], title="Jobs", rotation=45, ha="right")
+    again = charts.render("bar", ["Avi", "Dana"], [3.0, 5.0], title="Jobs", rotation=45, ha="right")
+    other = charts.render("bar", ["Avi", "Dana"], [3, 5], title="Jobs per tech", rotation=45, ha="right")
+
+    assert first.startswith(PNG_MAGIC) and first == again
+    assert other != first
+    assert charts.renders == 2
+
+    # a new process (fresh service, same folder) reads the PNG from disk
+    assert ChartService(tmp_path / "cache").render("bar", ["Avi", "Dana"], [3, 5], title="Jobs", rotation=45, ha="right") == first
+
+
+def test_concurrent_requests_share_one_render(tmp_path):
+    charts = ChartService(tmp_path / "cache")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = set(pool.map(lambda _: charts.render_path("pie", ["a", "b"], [1, 2], autopct="%1.1f%%"), range(16)))
+
+    assert charts.renders == 1
+    assert len(paths) == 1 and next(iter(paths)).read_bytes().startswith(PNG_MAGIC)
+    assert charts.data_uri("pie", ["a", "b"], [1, 2], autopct="%1.1f%%").startswith("data:image/png;base64,iVBOR")
+
+
+def test_income_chart_path_is_content_addressed(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHART_CACHE_DIR", str(tmp_path / "cache"))
+    june = pd.DataFrame({"date": pd.to_datetime(["2025-06-01", "2025-06-02"]), "income": [100.0, 150.0]})
+    july = june.assign(date=pd.to_datetime(["2025-07-01", "2025-07-02"]))
+
+    assert income_chart_path(june) == income_chart_path(june.copy())
+    assert income_chart_path(june) != income_chart_path(july)
+
+    out = tmp_path / "chart.png"
+    save_income_chart(june, out)
+    assert out.read_bytes() == income_chart_path(june).read_bytes()
+
+
+def test_disk_cache_is_pruned_least_recently_used_first(tmp_path):
+    charts = ChartService(tmp_path / "cache", max_bytes=0, max_age_s=3600)
+    old, used, recent = (charts.render_path("bar", ["a"], [v]) for v in (1, 2, 3))
+    an_hour_ago = time.time() - 3600
+    os.utime(old, (an_hour_ago - 10, an_hour_ago - 10))
+    os.utime(used, (an_hour_ago, an_hour_ago))
+
+    ChartService(tmp_path / "cache").render("bar", ["a"], [2])  # a disk hit marks it used
+    assert used.stat().st_mtime > an_hour_ago + 60
+
+    charts.max_bytes = used.stat().st_size + recent.stat().st_size
+    assert charts.prune() == 1
+    assert not old.exists() and used.exists() and recent.exists()
+
+    os.utime(used, (an_hour_ago - 3600, an_hour_ago - 3600))  # unused for longer than max_age_s
+    assert charts.prune() == 1
+    assert not used.exists() and recent.exists()
@@ -0,0 +1,50 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from myapp.utils import df_diagnostics
+from myapp.utils.df_diagnostics import DataFrameSummary, log_df
+
+
+class _ExplodingFrame(pd.DataFrame):
+    """DataFrame whose head() must never be called when DEBUG is off."""
+
+    def head(self, n=5):
+        raise AssertionError("head() evaluated eagerly")
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    df_diagnostics.reset_sampling()
+    yield
+    df_diagnostics.reset_sampling()
+
+
+def test_disabled_level_does_not_touch_dataframe(caplog):
+    log = logging.getLogger("tests.diag.off")
+    df = _ExplodingFrame({"job_id": [1, 2]})
+    with caplog.at_level(logging.INFO, logger="tests.diag.off"):
+        log_df(log, "[DF]", df, head=3)
+    assert caplog.records == []
+
+
+def test_summary_is_structured_and_lazy():
+    df = pd.DataFrame({"job_id": [1, 2, 3], "total": [10.0, 20.0, 30.0]})
+    summary = DataFrameSummary(df, head=2, dtypes=True)
+    info = summary.as_dict()
+    assert info["rows"] == 3
+    assert info["columns"] == ["job_id", "total"]
+    assert info["dtypes"]["total"] == "float64"
+    assert "rows=3 cols=2" in str(summary)
+    assert str(DataFrameSummary(None)) == "<not a DataFrame: NoneType>"
+
+
+def test_sampling_emits_every_nth_call(caplog):
+    log = logging.getLogger("tests.diag.sample")
+    df = pd.DataFrame({"job_id": [1]})
+    with caplog.at_level(logging.DEBUG, logger="tests.diag.sample"):
+        for _ in range(6):
+            log_df(log, "[LOOP]", df, sample_every=3)
+    assert len(caplog.records) == 2
+    assert "[LOOP]: rows=1 cols=1" in caplog.records[0].getMessage()
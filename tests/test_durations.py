@@ -0,0 +1,108 @@
+import flask
+import numpy as np
+import pandas as pd
+import pytest
+
+from myapp.finance import durations
+from myapp.finance.durations import duration_overall, duration_stats
+from myapp.routes.api_durations import api_durations_bp
+from myapp.utils.jobs_dataset import get_jobs_dataset
+
+
+def _jobs(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    date = pd.Timestamp("2025-06-01") + pd.to_timedelta(rng.integers(0, 60 * 24 * 20, n), unit="m")
+    closed = date + pd.to_timedelta(rng.integers(10, 400, n), unit="m")
+    df = pd.DataFrame(
+        {
+            "job_id": [f"J{i}" for i in range(n)],
+            "tech": pd.Categorical(rng.choice(["Avi", "Dana", "Moshe"], n)),
+            "job_type": rng.choice(["lockout", "rekey"], n),
+            "date": date,
+            "closed": closed.where(rng.random(n) > 0.1),
+        }
+    )
+    return df
+
+
+@pytest.fixture(autouse=True)
+def sla_config(tmp_path, monkeypatch):
+    path = tmp_path / "sla.yaml"
+    path.write_text("default_minutes: 200\njob_types:\n  lockout: 60\n", encoding="utf-8")
+    monkeypatch.setenv("SLA_CONFIG_PATH", str(path))
+    durations.clear_duration_cache()
+
+
+def test_percentiles_and_breaches_match_a_per_group_computation():
+    df = _jobs()
+    stats = duration_stats(df, "tech").set_index("tech")
+
+    minutes = (df["closed"] - df["date"]).dt.total_seconds().div(60).round(1)
+    limit = df["job_type"].map({"lockout": 60.0}).fillna(200.0)
+    for tech, group in df.groupby("tech", observed=True):
+        m = minutes[group.index]
+        row = stats.loc[tech]
+        assert row["jobs"] == len(group)
+        assert row["timed"] == m.notna().sum()
+        assert row["p50"] == pytest.approx(m.quantile(0.5))
+        assert row["p99"] == pytest.approx(m.quantile(0.99))
+        assert row["sla_breaches"] == (m > limit[group.index]).sum()
+
+    overall = duration_overall(df)
+    assert overall["jobs"] == len(df)
+    assert overall["p90"] == pytest.approx(minutes.quantile(0.9))
+
+
+def test_results_are_cached_by_input_fingerprint(monkeypatch):
+    df = _jobs()
+    calls = []
+    real = durations._summarise
+    monkeypatch.setattr(durations, "_summarise", lambda *a: calls.append(1) or real(*a))
+
+    first = duration_stats(df, ["tech", "job_type"], date_from="2025-06-05")
+    again = duration_stats(df.copy(), ["tech", "job_type"], date_from="2025-06-05")
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, again)
+
+    changed = df.copy()
+    changed.loc[0, "closed"] = changed.loc[0, "date"] + pd.Timedelta(hours=9)
+    duration_stats(changed, ["tech", "job_type"], date_from="2025-06-05")
+    assert len(calls) == 2
+
+
+def test_api_reads_the_jobs_dataset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JOBS_DATASET_PATH", str(tmp_path / "jobs_dataset"))
+    get_jobs_dataset().append(_jobs())
+    app = flask.Flask(__name__)
+    app.register_blueprint(api_durations_bp)
+
+    response = app.test_client().get("/api/durations?from=2025-06-10&to=2025-06-15&by=tech,job_type&tech=Dana")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert {(g["tech"], g["job_type"]) for g in body["groups"]} == {("Dana", "lockout"), ("Dana", "rekey")}
+    assert body["sla_minutes"] == {"default": 200.0, "job_types": {"lockout": 60.0}}
+    assert app.test_client().get("/api/durations?by=client").status_code == 400
+
+
+def test_empty_range_and_empty_dataset_give_empty_groups_and_zeroed_overall(tmp_path, monkeypatch):
+    df = _jobs()
+    stats = duration_stats(df, ["tech", "job_type"], date_from="2030-01-01")
+    assert stats.empty and {"tech", "job_type", "p50", "p99", "breach_rate"} <= set(stats.columns)
+    zeroed = {"jobs": 0, "timed": 0, "mean_min": None, "p50": None, "p90": None, "p99": None, "sla_breaches": 0, "breach_rate": 0.0}
+    assert duration_overall(df, date_from="2030-01-01") == zeroed
+    assert duration_stats(pd.DataFrame(), "tech").empty
+    assert duration_overall(pd.DataFrame()) == zeroed
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JOBS_DATASET_PATH", str(tmp_path / "jobs_dataset"))
+    get_jobs_dataset().append(df)
+    app = flask.Flask(__name__)
+    app.register_blueprint(api_durations_bp)
+
+    response = app.test_client().get("/api/durations?from=2030-01-01&to=2030-01-31")
+
+    assert response.status_code == 200
+    assert response.get_json()["groups"] == []
+    assert response.get_json()["overall"] == zeroed
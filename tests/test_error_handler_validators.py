@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from myapp.error_handler.base import DataSanitizationError, InvalidDateError
+from myapp.error_handler.date_checker import DateChecker
+from myapp.error_handler.file_validator import FileValidator
+from myapp.error_handler.value_sanitizer import ValueSanitizer
+
+
+def test_value_sanitizer_returns_all_offending_rows():
+    df = pd.DataFrame({"client": ["ok", "bad@", None, "50%"], "technician": ["Avi", "B#n", "Dana", "Eli"]})
+    issues = ValueSanitizer(["client", "technician", "missing"]).find_issues(df)
+    assert [(i["column"], i["row"]) for i in issues] == [("client", 1), ("client", 3), ("technician", 1)]
+
+    with pytest.raises(DataSanitizationError, match="'client': 'bad@'"):
+        ValueSanitizer(["client"]).check(df)
+
+    # no forbidden characters configured: nothing to flag
+    assert ValueSanitizer(["client"], invalid_chars="").find_issues(df) == []
+
+
+def test_date_checker_skips_blank_and_wordy_values():
+    df = pd.DataFrame({"date": ["2025-06-01", None, "billing", "2025-13-45", "06/02/2025"]})
+    issues = DateChecker("date").find_issues(df)
+    assert [(i["row"], i["value"]) for i in issues] == [(3, "2025-13-45")]
+    with pytest.raises(InvalidDateError):
+        DateChecker("date").check(df)
+
+
+def test_file_validator_collects_every_issue_in_one_pass(tmp_path):
+    df = pd.DataFrame(
+        {
+            "job_id": ["1", "2", "3"],
+            "date": ["2025-06-01", "2025-99-99", "2025-06-03"],
+            "technician": ["Avi", "Ben$", "Dana"],
+            "client": ["a", "b", "c*"],
+        }
+    )
+    validator = FileValidator()
+    errors = validator.collect_errors(df)
+    assert [(e["check"], e["row"]) for e in errors] == [("date", 1), ("value", 2), ("value", 1)]
+
+    path = tmp_path / "jobs.xlsx"
+    df.to_excel(path, index=False)
+    with pytest.raises(InvalidDateError) as exc:
+        validator.validate(str(path))
+    assert len(exc.value.errors) == 3
+
+    clean = df.assign(date="2025-06-01", technician="Avi", client="c")
+    assert validator.collect_errors(clean) == []
@@ -0,0 +1,57 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import pytest
+
+from myapp.utils import figure_export
+from myapp.utils.figure_export import FigureExporter, FigureExportError, chart_spec
+from myapp.utils.pipeline_timing import timing_run
+
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture(autouse=True)
+def chart_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHART_CACHE_DIR", str(tmp_path / "charts"))
+    monkeypatch.setenv("SCRATCH_ROOT", str(tmp_path / "scratch"))
+
+
+def _tech_histogram():
+    df = pd.DataFrame({"tech": ["Dana", "Avi", "Dana", "Moshe", "Dana", "Avi"]})
+    return px.histogram(df, x="tech", title="Technician Job Distribution", labels={"tech": "Technician"})
+
+
+def test_histogram_spec_matches_the_plotly_counts():
+    kind, labels, values, style = chart_spec(_tech_histogram(), scale=2)
+    assert kind == "bar"
+    assert labels == ["Dana", "Avi", "Moshe"]
+    assert values == [3.0, 2.0, 1.0]
+    assert style["title"] == "Technician Job Distribution"
+    assert (style["xlabel"], style["ylabel"]) == ("Technician", "count")
+    assert style["figsize"] == (7.0, 5.0) and style["dpi"] == 200
+
+
+def test_matplotlib_backend_exports_a_batch_and_times_it():
+    exporter = FigureExporter("matplotlib")
+    bar = go.Figure(go.Bar(x=["a", "b"], y=[1, 2]), layout={"title": {"text": "Bars"}})
+
+    with timing_run() as run:
+        pngs = exporter.to_png_many([_tech_histogram(), bar])
+
+    assert len(pngs) == 2 and all(p.startswith(PNG_MAGIC) for p in pngs)
+    assert pngs[0] != pngs[1]
+    stage = [s for s in run.breakdown() if s["stage"] == "figure_export"]
+    assert len(stage) == 1 and stage[0]["rows_in"] == stage[0]["rows_out"] == 2
+
+
+def test_auto_falls_back_to_matplotlib_without_chrome(monkeypatch):
+    monkeypatch.setattr(figure_export, "kaleido_ready", lambda: False)
+    exporter = FigureExporter("auto")
+    assert exporter.backend == "matplotlib"
+    assert exporter.to_png(_tech_histogram()).startswith(PNG_MAGIC)
+
+
+def test_unsupported_figures_raise():
+    scatter = px.scatter(x=[1, 2], y=[3, 4])
+    with pytest.raises(FigureExportError):
+        FigureExporter("matplotlib").to_png(scatter)
@@ -0,0 +1,23 @@
+import threading
+import time
+
+from myapp.utils.file_lock import file_lock, lock_path
+
+
+def test_lock_excludes_other_holders(tmp_path):
+    target = tmp_path / "data.json"
+    events = []
+
+    def other():
+        with file_lock(target):
+            events.append("other")
+
+    with file_lock(target):
+        thread = threading.Thread(target=other)
+        thread.start()
+        time.sleep(0.2)
+        events.append("first")
+    thread.join(5)
+
+    assert events == ["first", "other"]
+    assert lock_path(target) == tmp_path / "data.json.lock"
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from myapp.finance.flag_rules import FlagRule, RuleSet, compile_expression, load_rule_set
+from myapp.finance.validators import run_sanity_checks
+
+
+def test_bitmask_decodes_in_rule_order():
+    rules = RuleSet(
+        "t",
+        [
+            FlagRule("LOW", "total < 10", column="low_flag"),
+            FlagRule("NO_PARTS", "isna(parts)"),
+            FlagRule("RATIO", "(total > 0) & (parts / total > 0.5)"),
+        ],
+    )
+    df = pd.DataFrame({"total": [5.0, 100.0, 4.0, 0.0], "parts": [np.nan, 60.0, 3.0, 1.0]})
+
+    mask = rules.evaluate(df)
+
+    assert mask.tolist() == [0b011, 0b100, 0b101, 0b001]
+    assert rules.decode(mask).tolist() == ["LOW,NO_PARTS", "RATIO", "LOW,RATIO", "LOW"]
+    assert rules.label_columns(mask)["low_flag"].tolist() == ["LOW", "", "LOW", "LOW"]
+
+
+def test_expressions_are_limited_to_column_arithmetic():
+    with pytest.raises(ValueError):
+        compile_expression("__import__('os').system('true')")
+    with pytest.raises(ValueError):
+        compile_expression("total.sum() > 0")
+
+
+def test_run_sanity_checks_uses_configured_rules(tmp_path, monkeypatch):
+    df = pd.DataFrame(
+        {
+            "company_net": [-5.0, 10.0, 10.0, 1.0],
+            "parts": [0.0, 50.0, 0.0, 0.0],
+            "total": [100.0, 40.0, 100.0, 100.0],
+            "tech_cut": [95.0, 10.0, 10.0, 50.0],
+        },
+        index=[10, 11, 12, 13],
+    )
+
+    flagged = run_sanity_checks(df)
+    assert flagged.index.tolist() == [10, 11]
+    assert flagged["failed_rules"].tolist() == ["NEGATIVE_PROFIT,EXCESSIVE_COMMISSION", "PARTS_EXCEED_TOTAL"]
+
+    custom = tmp_path / "flag_rules.yaml"
+    custom.write_text("sanity:\n  - label: SMALL_JOB\n    when: total < 50\n", encoding="utf-8")
+    monkeypatch.setenv("FLAG_RULES_PATH", str(custom))
+    assert load_rule_set("sanity").rules[0].label == "SMALL_JOB"
+    assert run_sanity_checks(df)["failed_rules"].tolist() == ["SMALL_JOB"]
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from myapp.utils.job_index import DEDUP_VALUE_COLUMNS, BloomFilter, JobIndex, _hash_ids
+
+
+def _jobs(ids, totals):
+    return pd.DataFrame({"job_id": ids, "tech": ["Dana"] * len(ids), "total": totals})
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    seen = _hash_ids(np.array([f"J{i}" for i in range(10_000)], dtype=object))
+    unseen = _hash_ids(np.array([f"X{i}" for i in range(10_000)], dtype=object))
+    bloom.add(seen)
+
+    assert bloom.might_contain(seen).all()
+    assert bloom.might_contain(unseen).mean() < 0.03
+
+
+def test_check_classifies_new_duplicate_and_changed_rows(tmp_path):
+    index = JobIndex(tmp_path / "jobs.sqlite3", capacity=1_000)
+    first = index.check(_jobs(["J1", "J2", "J2"], [100.0, 50.0, 50.0]))
+    assert first.counts() == {"new": 3, "duplicate": 0, "changed": 0}
+    assert index.upsert(first) == 2
+
+    # Overlapping re-upload: J1 unchanged, J2 corrected, J3 new, plus a totals row
+    second = index.check(_jobs(["J1", "J2", "J2", "J3", "Totals"], [100.0, 50.0, 60.0, 10.0, 220.0]))
+    assert second.status.tolist() == ["duplicate", "changed", "changed", "new", ""]
+    assert second.fresh_mask().tolist() == [False, True, True, True, True]
+    assert second.fresh_job_ids() == {"J2", "J3"}
+    assert second.to_dict() == {"rows": 5, "new": 1, "duplicate": 1, "changed": 2}
+
+
+def test_index_survives_restart_and_missing_bloom_file(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    index = JobIndex(path, capacity=1_000)
+    index.upsert(index.check(_jobs(["J1", "J2"], [1.0, 2.0])))
+
+    reopened = JobIndex(path, capacity=1_000)
+    assert reopened.check(_jobs(["J1", "J9"], [1.0, 9.0])).status.tolist() == ["duplicate", "new"]
+
+    reopened.bloom_path.unlink()  # rebuilt from SQLite on the next check
+    rebuilt = JobIndex(path, capacity=1_000)
+    assert rebuilt.check(_jobs(["J2"], [2.0])).status.tolist() == ["duplicate"]
+    assert len(rebuilt) == 2
+
+
+def test_workers_sharing_the_index_keep_each_others_ids(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    a, b = JobIndex(path, capacity=1_000), JobIndex(path, capacity=1_000)
+    a.upsert(a.check(_jobs(["J1"], [1.0])))
+    b.check(_jobs(["J0"], [0.0]))  # b loads the filter with J1 only
+
+    a.upsert(a.check(_jobs(["J2"], [2.0])))
+    b._bloom_mtime = a.bloom_path.stat().st_mtime_ns  # as if b had loaded just before a's save landed
+    b.upsert(b.check(_jobs(["J3"], [3.0])))  # must not save its stale copy over J2
+
+    fresh = BloomFilter.load(a.bloom_path)
+    assert fresh.might_contain(_hash_ids(np.array(["J1", "J2", "J3"], dtype=object))).all()
+    assert fresh.count == 3
+    assert JobIndex(path, capacity=1_000).check(_jobs(["J2", "J3"], [2.0, 3.0])).counts()["duplicate"] == 2
+
+
+def test_derived_columns_do_not_make_a_job_changed(tmp_path):
+    index = JobIndex(tmp_path / "jobs.sqlite3", capacity=1_000)
+    first = _jobs(["J1", "J2"], [100.0, 50.0]).assign(net_income=[90.0, 45.0], flags=["", ""])
+    index.upsert(index.check(first, value_columns=DEDUP_VALUE_COLUMNS))
+
+    # same upload, enriched by a newer commission rule
+    again = first.assign(net_income=[80.0, 40.0], flags=["low_net", ""])
+    assert index.check(again, value_columns=DEDUP_VALUE_COLUMNS).counts() == {"new": 0, "duplicate": 2, "changed": 0}
+    corrected = again.assign(total=[100.0, 55.0])
+    assert index.check(corrected, value_columns=DEDUP_VALUE_COLUMNS).status.tolist() == ["duplicate", "changed"]
@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+
+from myapp.dashboard.data_loader import load_dashboard_data
+from myapp.utils.jobs_dataset import JobsDataset, get_jobs_dataset, parquet_engine
+
+
+def _upload(job_ids, dates, techs, totals):
+    return pd.DataFrame(
+        {
+            "job_id": job_ids,
+            "date": pd.to_datetime(dates),
+            "tech": pd.Categorical(techs),
+            "total": totals,
+        }
+    )
+
+
+FORMATS = ["pickle", pytest.param("parquet", marks=pytest.mark.skipif(parquet_engine() is None, reason="no Parquet engine"))]
+
+
+@pytest.fixture(params=FORMATS)
+def dataset(request, tmp_path):
+    return JobsDataset(tmp_path / "jobs_dataset", fmt=request.param)
+
+
+def test_append_partitions_by_month_and_reads_only_overlapping_months(dataset):
+    written = dataset.append(_upload(["J1", "J2", "J3"], ["2025-05-30", "2025-06-02", None], ["Dana", "Avi", "Dana"], [1.0, 2.0, 3.0]))
+
+    assert written == {"2025-05": 1, "2025-06": 1, "unknown": 1}
+    assert dataset.months("2025-06-01") == ["2025-06"]
+    assert dataset.months() == ["2025-05", "2025-06", "unknown"]
+
+    june = dataset.read(date_from="2025-06-01", date_to="2025-06-30")
+    assert june["job_id"].tolist() == ["J2"]
+    assert dataset.read(techs=["Dana"])["job_id"].tolist() == ["J1", "J3"]
+    assert len(dataset.read()) == 3
+
+
+def test_newest_upload_of_a_job_wins_and_compaction_keeps_it(dataset):
+    dataset.append(_upload(["J1", "J2"], ["2025-05-01", "2025-05-02"], ["Dana", "Avi"], [100.0, 600.0]))
+    # J2 re-uploaded with a corrected total (two tech lines now), J3 new
+    dataset.append(_upload(["J2", "J2", "J3"], ["2025-05-02"] * 3, ["Avi", "Dana", "Dana"], [100.0, 100.0, 50.0]))
+
+    before = dataset.read().sort_values(["job_id", "tech"]).reset_index(drop=True)
+    assert before["total"].tolist() == [100.0, 100.0, 100.0, 50.0]
+    assert len(dataset.partitions()["2025-05"]) == 2
+
+    assert dataset.compact() == {"2025-05": 4}
+    files = dataset.partitions()["2025-05"]
+    assert len(files) == 1 and files[0].name.startswith("compact-")
+    after = dataset.read().sort_values(["job_id", "tech"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(after, before, check_dtype=False)
+
+    # parts appended after the compaction are read on top of it
+    dataset.append(_upload(["J1"], ["2025-05-01"], ["Dana"], [150.0]))
+    assert dataset.read().set_index("job_id").loc["J1", "total"] == 150.0
+
+
+def test_export_csv_and_dashboard_loader_read_from_dataset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("JOBS_DATASET_PATH", str(tmp_path / "jobs_dataset"))
+    dataset = get_jobs_dataset()
+    dataset.append(_upload(["J1", "J2"], ["2025-05-01", "2025-06-02"], ["Dana", "Avi"], [1.0, 2.0]))
+
+    exported = pd.read_csv(dataset.export_csv(tmp_path / "output" / "merged_jobs.csv"))
+    assert exported["job_id"].tolist() == ["J1", "J2"]
+
+    df = load_dashboard_data(date_from="2025-06-01", technicians=["Avi"])
+    assert df["technician"].tolist() == ["Avi"]
+    assert df["total"].tolist() == [2.0]
+
+
+def test_a_part_renamed_in_after_compaction_listed_the_folder_survives(dataset):
+    dataset.append(_upload(["J1"], ["2025-05-01"], ["Dana"], [1.0]))
+    dataset.append(_upload(["J2"], ["2025-05-02"], ["Dana"], [2.0]))
+    folder = dataset.path / "month=2025-05"
+    read_files = dataset._read_files
+    late = []
+
+    def read_then_late_rename(*args):
+        # another upload took its sequence number earlier but renames its part in now
+        merged = read_files(*args)
+        late.append(dataset._write(_upload(["J3"], ["2025-05-03"], ["Avi"], [3.0]), folder, "part", 1))
+        return merged
+
+    dataset._read_files = read_then_late_rename
+    dataset.compact()
+    del dataset._read_files
+
+    [late] = late
+    assert late.exists()
+    assert sorted(dataset.read()["job_id"]) == ["J1", "J2", "J3"]
+    dataset.compact()
+    assert [f.name.startswith("compact-") for f in dataset.partitions()["2025-05"]] == [True]
+    assert sorted(dataset.read()["job_id"]) == ["J1", "J2", "J3"]
+
+
+def test_first_append_is_seeded_from_the_existing_csv(tmp_path):
+    csv = tmp_path / "merged_jobs.csv"
+    _upload(["J1", "J2"], ["2025-04-01", "2025-05-01"], ["Dana", "Avi"], [1.0, 2.0]).to_csv(csv, index=False)
+    dataset = JobsDataset(tmp_path / "jobs_dataset", fmt="pickle")
+
+    assert dataset.seed_from_csv(csv) == 2
+    dataset.append(_upload(["J3"], ["2025-05-02"], ["Dana"], [3.0]))
+    assert dataset.seed_from_csv(csv) == 0
+    assert sorted(dataset.read()["job_id"]) == ["J1", "J2", "J3"]
@@ -0,0 +1,43 @@
+import logging
+from logging.handlers import QueueHandler
+
+from myapp.utils import logger_config
+from myapp.utils.logger_config import add_log_file, get_logger
+
+
+def _queue_handlers():
+    return [h for h in logging.getLogger().handlers if isinstance(h, QueueHandler)]
+
+
+def test_get_logger_twice_adds_no_handlers():
+    first = get_logger("tests.dedup")
+    second = get_logger("tests.dedup")
+    assert first is second
+    assert first.handlers == []
+    assert len(_queue_handlers()) == 1
+
+
+def test_module_levels_from_env(monkeypatch):
+    monkeypatch.setenv("LOG_LEVELS", "myapp.services=DEBUG, werkzeug=warning,bad")
+    assert logger_config._get_module_levels() == {
+        "myapp.services": "DEBUG",
+        "werkzeug": "WARNING",
+    }
+
+
+def test_add_log_file_is_idempotent_and_writes_once(tmp_path):
+    log_file = tmp_path / "run.log"
+    add_log_file(str(log_file))
+    add_log_file(str(log_file))
+
+    log = get_logger("tests.file_sink")
+    log.warning("written once")
+    logger_config._restart_listener()  # stop() drains the queue
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert sum("written once" in line for line in lines) == 1
+
+    handler = logger_config._file_sinks.pop(str(log_file.resolve()))
+    logger_config._sink_handlers.remove(handler)
+    handler.close()
+    logger_config._restart_listener()
@@ -0,0 +1,72 @@
+import pytest
+
+from myapp.utils import pdf_templates
+from myapp.utils.pdf_templates import get_report_template, render_report_template
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(tmp_path, monkeypatch):
+    monkeypatch.setenv("JINJA_BYTECODE_CACHE", str(tmp_path / "jinja"))
+    pdf_templates.report_environment.cache_clear()
+    yield
+    pdf_templates.report_environment.cache_clear()
+
+
+def test_templates_compile_once_and_are_bytecode_cached(tmp_path):
+    first = get_report_template("client_report.html")
+    assert get_report_template("client_report.html") is first
+    assert list((tmp_path / "jinja").iterdir())
+
+    # a fresh environment (new worker) loads the cached bytecode
+    pdf_templates.report_environment.cache_clear()
+    assert get_report_template("client_report.html") is not first
+
+
+def test_client_report_renders_escaped_and_without_inline_styles():
+    html = render_report_template(
+        "client_report.html",
+        report_data={"customer_name": "<b>Dana</b>", "total": 120.5, "cash": 0, "credit": 0, "parts": 0, "tech_profit": 0},
+        signature_path=None,
+    )
+    assert "&lt;b&gt;Dana&lt;/b&gt;" in html
+    assert "$120.50" in html
+    assert "<style>" not in html
+    assert (pdf_templates.STYLESHEET_ROOT / "client_report.css").is_file()
+
+
+def test_stylesheets_are_parsed_once():
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        pytest.skip(f"WeasyPrint unavailable: {e}")
+    pdf_templates.clear_stylesheet_cache()
+    sheet = pdf_templates.get_stylesheet("client_report.css")
+    assert pdf_templates.get_stylesheet("client_report.css") is sheet
+
+
+def test_image_handoff_serves_bytes_by_url(tmp_path):
+    images = pdf_templates.ImageHandoff()
+    url = images.add(b"\x89PNG-chart")
+    assert url.startswith("report-image:") and images.add(b"\x89PNG-chart") == url and len(images) == 1
+    assert images.fetch(url) == {"string": b"\x89PNG-chart", "mime_type": "image/png"}
+
+    signature = tmp_path / "Dana.png"
+    signature.write_bytes(b"sig-v1")
+    first = images.add_file(signature)
+    assert images.fetch(first)["string"] == b"sig-v1"
+    signature.write_bytes(b"sig-v2-longer")  # a changed file is re-read
+    assert images.fetch(images.add_file(signature))["string"] == b"sig-v2-longer"
+
+
+def test_monthly_charts_are_handed_off_without_base64(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHART_CACHE_DIR", str(tmp_path / "charts"))
+    from myapp.utils.report_utils import create_pie_chart, create_technician_bar_chart
+
+    records = [{"job_type": "lockout", "tech": "Dana"}, {"job_type": "rekey", "tech": "Avi"}]
+    images = pdf_templates.ImageHandoff()
+    pie = create_pie_chart(records, images=images)
+    bars = create_technician_bar_chart(records, images=images)
+
+    assert pie.startswith("report-image:") and bars.startswith("report-image:")
+    assert images.fetch(pie)["string"].startswith(b"\x89PNG")
+    assert create_pie_chart(records).startswith("data:image/png;base64,")
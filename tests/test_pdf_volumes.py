@@ -0,0 +1,71 @@
+import json
+
+import pandas as pd
+import pytest
+
+from myapp.services import pdf_generator
+from myapp.utils import manifest
+
+
+@pytest.fixture(autouse=True)
+def core_font(monkeypatch, tmp_path):
+    # the bundled DejaVu font is not needed to check the volume layout
+    monkeypatch.setattr(pdf_generator, "_register_report_font", lambda pdf: "Helvetica")
+    monkeypatch.setenv("SCRATCH_ROOT", str(tmp_path / "scratch"))
+
+
+def _rows(n):
+    return pd.DataFrame(
+        {
+            "job_id": [f"J{i}" for i in range(n)],
+            "tech": ["Dana", "Avi"] * (n // 2),
+            "total": [100.0 + i for i in range(n)],
+            "notes": ["rekey"] * n,
+        }
+    )
+
+
+def _page_count(path):
+    return path.read_bytes().count(b"/Type /Page\n")
+
+
+def test_large_tables_are_split_into_bounded_volumes(tmp_path):
+    out = tmp_path / "report.pdf"
+    writer = pdf_generator._write_volumes(
+        _rows(400), str(out), pages_per_volume=3, orientation="P", title="Detailed", chart_png=None
+    )
+    volumes, pages = writer.volumes, writer.pages
+
+    assert [p.name for p in volumes[:2]] == ["report_vol001.pdf", "report_vol002.pdf"]
+    assert len(volumes) > 2 and not out.exists()
+    assert all(n <= 3 for n in pages) and pages[:-1] == [3] * (len(pages) - 1)
+    assert [_page_count(p) for p in volumes] == pages
+    assert all(p.read_bytes().startswith(b"%PDF") for p in volumes)
+
+
+def test_a_report_that_fits_one_volume_keeps_its_name(tmp_path):
+    out = tmp_path / "small.pdf"
+    writer = pdf_generator._write_volumes(
+        _rows(10), str(out), pages_per_volume=50, orientation="P", title="Detailed", chart_png=None
+    )
+    assert writer.volumes == [out] and writer.pages == [1]
+
+
+def test_manifest_lists_every_volume_under_one_report_id(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "manifest.json"
+    monkeypatch.setattr(manifest, "MANIFEST_PATH", str(manifest_path))
+    writer = pdf_generator._write_volumes(
+        _rows(200), str(tmp_path / "r.pdf"), pages_per_volume=2, orientation="P", title="D", chart_png=None
+    )
+    volumes, pages = writer.volumes, writer.pages
+
+    manifest.add_report_to_manifest(
+        df=_rows(200), report_path=volumes[0], report_type="detailed", client_id="c", tech_name="t",
+        report_id="abc123", volumes=pdf_generator.volume_entries(writer),
+    )
+
+    entry = json.loads(manifest_path.read_text(encoding="utf-8"))[-1]
+    assert entry["report_id"] == "abc123" and entry["path"] == str(volumes[0])
+    assert [v["filename"] for v in entry["volumes"]] == [p.name for p in volumes]
+    assert sum(v["pages"] for v in entry["volumes"]) == sum(pages)
+    assert [v["bytes"] for v in entry["volumes"]] == [p.stat().st_size for p in volumes]
@@ -0,0 +1,115 @@
+import multiprocessing
+import tracemalloc
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from myapp.routes.api_metrics import api_metrics_bp
+from myapp.utils import pipeline_timing
+from myapp.utils.pipeline_timing import current_breakdown, span, timed, timing_run
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    pipeline_timing.reset_metrics()
+    yield
+    pipeline_timing.reset_metrics()
+
+
+@timed("double_rows")
+def _double_rows(df):
+    return pd.concat([df, df], ignore_index=True)
+
+
+def test_timed_records_rows_and_times_in_current_run():
+    df = pd.DataFrame({"job_id": [1, 2, 3]})
+    with timing_run() as run:
+        _double_rows(df)
+        with span("custom") as s:
+            s.rows_out = 7
+        stages = run.breakdown()
+
+    assert [s["stage"] for s in stages] == ["double_rows", "custom"]
+    assert stages[0]["rows_in"] == 3
+    assert stages[0]["rows_out"] == 6
+    assert stages[0]["wall_ms"] >= 0
+    assert "cpu_ms" in stages[0]
+    assert stages[1]["rows_out"] == 7
+    assert current_breakdown() is None
+
+
+def test_failing_stage_is_recorded_and_reraised():
+    with timing_run() as run:
+        with pytest.raises(ValueError):
+            with span("boom"):
+                raise ValueError("bad")
+    assert run.breakdown()[0]["error"] == "ValueError"
+
+
+def test_metrics_endpoint_renders_prometheus_histograms():
+    with span("loading", rows_in=10) as s:
+        s.rows_out = 10
+
+    app = Flask(__name__)
+    app.register_blueprint(api_metrics_bp)
+    response = app.test_client().get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert "# TYPE autoclose_stage_duration_seconds histogram" in text
+    assert 'autoclose_stage_duration_seconds_count{stage="loading"} 1' in text
+    assert 'autoclose_stage_duration_seconds_bucket{stage="loading",le="+Inf"} 1' in text
+    assert 'autoclose_stage_rows_out_total{stage="loading"} 10' in text
+
+
+def test_nested_spans_do_not_hide_the_outer_peak(monkeypatch):
+    monkeypatch.setattr(pipeline_timing, "_TRACE_MEMORY", True)
+    with timing_run() as run:
+        with span("outer"):
+            big = bytearray(8 * 2**20)
+            del big
+            with span("inner"):
+                small = bytearray(2**20)
+                del small
+        stages = {s["stage"]: s for s in run.breakdown()}
+    tracemalloc.stop()
+
+    assert stages["outer"]["peak_alloc_mb"] >= 8
+    assert 1 <= stages["inner"]["peak_alloc_mb"] < 8
+
+
+def test_rss_is_taken_at_stage_entry_and_exit():
+    with timing_run() as run:
+        with span("grow"):
+            held = bytearray(64 * 2**20)
+            held[::4096] = b"x" * len(held[::4096])  # touch every page
+        stage = run.breakdown()[0]
+    del held
+
+    if "rss_in_mb" not in stage:
+        pytest.skip("no /proc here")
+    assert stage["rss_out_mb"] - stage["rss_in_mb"] >= 32
+
+
+def _worker_stage():
+    with span("loading", rows_in=5) as s:
+        s.rows_out = 5
+
+
+def test_metrics_dir_sums_every_worker(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_METRICS_DIR", str(tmp_path / "metrics"))
+    _worker_stage()
+    worker = multiprocessing.get_context("fork").Process(target=_worker_stage)
+    worker.start()
+    worker.join()
+
+    assert worker.exitcode == 0
+    assert len(list((tmp_path / "metrics").glob("stages_*.json"))) == 2
+    text = pipeline_timing.render_prometheus()
+    assert 'autoclose_stage_duration_seconds_count{stage="loading"} 2' in text
+    assert 'autoclose_stage_rows_out_total{stage="loading"} 10' in text
+
+    monkeypatch.delenv("PIPELINE_METRICS_DIR")
+    assert 'autoclose_stage_duration_seconds_count{stage="loading"} 1' in pipeline_timing.render_prometheus()
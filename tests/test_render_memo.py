@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from myapp.services import pdf_generator
+from myapp.utils import manifest, render_memo
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    # the bundled DejaVu font is not needed; one volume = the plain output file
+    monkeypatch.setattr(pdf_generator, "_register_report_font", lambda pdf: "Helvetica")
+    monkeypatch.setattr(manifest, "MANIFEST_PATH", str(tmp_path / "manifest.json"))
+    monkeypatch.setenv("SCRATCH_ROOT", str(tmp_path / "scratch"))
+    monkeypatch.setenv("CHART_CACHE_DIR", str(tmp_path / "charts"))
+
+
+def _jobs(n=60, price=100.0):
+    return pd.DataFrame(
+        {
+            "job_id": [f"J{i}" for i in range(n)],
+            "date": ["2024-03-01", "2024-03-02"] * (n // 2),
+            "tech": ["Dana"] * n,
+            "total": [price] * n,
+            "parts": [10.0] * n,
+            "cash": [price] * n,
+            "credit": [0.0] * n,
+            "job_type": ["rekey"] * n,
+        }
+    )
+
+
+def _render(df, path, **kwargs):
+    kwargs.setdefault("memo", False)
+    return pdf_generator.generate_pdf_report(df, str(path), pages_per_volume=500, extra={"client_id": "c1"}, **kwargs)
+
+
+def test_deterministic_renders_are_byte_identical(tmp_path):
+    first = _render(_jobs(), tmp_path / "a.pdf", deterministic=True)
+    second = _render(_jobs(), tmp_path / "b.pdf", deterministic=True)
+    assert open(first, "rb").read() == open(second, "rb").read()
+
+
+def test_identical_input_reuses_the_catalogued_pdf(tmp_path, monkeypatch):
+    original = _render(_jobs(), tmp_path / "march.pdf", memo=True)
+
+    def no_render(*args, **kwargs):
+        raise AssertionError("rendered again")
+
+    monkeypatch.setattr(pdf_generator, "_write_volumes", no_render)
+    assert _render(_jobs(), tmp_path / "march.pdf", memo=True) == original
+    resend = _render(_jobs(), tmp_path / "resend.pdf", memo=True)
+    assert open(resend, "rb").read() == open(original, "rb").read()
+
+    # different data is a different report
+    with pytest.raises(AssertionError, match="rendered again"):
+        _render(_jobs(price=120.0), tmp_path / "april.pdf", memo=True)
+
+
+def test_a_missing_or_changed_file_is_not_reused(tmp_path):
+    original = _render(_jobs(), tmp_path / "march.pdf", memo=True)
+    [entry] = manifest.load_manifest_as_list()
+    assert render_memo.find_rendered(entry["input_hash"]) == entry
+
+    with open(original, "ab") as f:
+        f.write(b"%% tampered")
+    assert render_memo.find_rendered(entry["input_hash"]) is None
@@ -0,0 +1,59 @@
+import hashlib
+import json
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from myapp.utils import manifest
+from myapp.utils.report_metrics import ReportMetrics, compute_report_metrics, pdf_checksum
+from myapp.utils.report_validation import validate_report_integrity
+
+
+def _report_df():
+    return pd.DataFrame(
+        {
+            "job_id": ["J1", "J2", "J3", "Totals:3"],
+            "tech": ["Dana", "Avi", "Dana", ""],
+            "total": [0.1, 0.2, "19.99", 20.29],
+        }
+    )
+
+
+def test_metrics_are_exact_and_leave_out_the_totals_row():
+    metrics = compute_report_metrics(_report_df())
+    assert metrics.rows == 3
+    assert metrics.total_cents == 2029 and metrics.total == Decimal("20.29")
+    assert compute_report_metrics(pd.DataFrame({"job_id": ["J1"]})).total_cents is None
+    with pytest.raises(TypeError):
+        compute_report_metrics([1, 2])
+
+
+def test_validation_with_metrics_does_not_rescan_the_dataframe(tmp_path):
+    pdf = tmp_path / "r.pdf"
+    pdf.write_bytes(b"%PDF-1.4 tiny")
+    data = b"%PDF" + b"x" * 20_000
+    metrics = ReportMetrics(rows=3, total_cents=2029).rendered(pdf_checksum(data), len(data))
+
+    # the frame is not looked at: an empty one passes with the precomputed figures
+    validate_report_integrity(pdf, pd.DataFrame(), metrics=metrics)
+    with pytest.raises(ValueError, match="no meaningful data"):
+        validate_report_integrity(pdf, _report_df(), metrics=ReportMetrics(0, 0, size_bytes=20_000))
+
+
+def test_manifest_records_metrics_and_checksum(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "manifest.json"
+    monkeypatch.setattr(manifest, "MANIFEST_PATH", str(manifest_path))
+    monkeypatch.setattr(manifest, "get_total", lambda df: pytest.fail("total re-summed"))
+    data = b"%PDF-1.4 report bytes"
+    metrics = compute_report_metrics(_report_df()).rendered(pdf_checksum(data), len(data))
+
+    manifest.add_report_to_manifest(
+        df=_report_df(), report_path=Path(tmp_path / "r.pdf"), report_type="detailed",
+        client_id="c", tech_name="t", metrics=metrics,
+    )
+
+    entry = json.loads(manifest_path.read_text(encoding="utf-8"))[-1]
+    assert entry["sha256"] == hashlib.sha256(data).hexdigest() and entry["bytes"] == len(data)
+    assert entry["rows"] == 3 and entry["total"] == pytest.approx(20.29)
@@ -4,4 +4,37 @@ from myapp.utils.report_utils import create_and_email_report
 
 def test_create_and_email_report_rejects_series():
     with pytest.raises(TypeError):
-        create_and_email_report(pd.Series([1,2,3]), client="X", tech="Y") 
\ No newline at end of file
+        create_and_email_report(pd.Series([1,2,3]), client="X", tech="Y") 
+
+def test_jobs_are_marked_seen_only_after_both_stores_took_them(tmp_path, monkeypatch):
+    from myapp.utils import report_utils
+    from myapp.utils.job_index import check_uploaded_jobs
+
+    monkeypatch.setenv("JOB_INDEX_PATH", str(tmp_path / "job_index.sqlite3"))
+    monkeypatch.setattr(report_utils, "get_rollup_store", lambda: type("Store", (), {"ingest": lambda *a, **kw: {}})())
+    appended = []
+
+    class Dataset:
+        fail = True
+
+        def seed_from_csv(self, path):
+            pass
+
+        def append(self, df):
+            if Dataset.fail:
+                raise OSError("disk full")
+            appended.append(sorted(df["job_id"]))
+
+        def compact_in_background(self):
+            pass
+
+    monkeypatch.setattr(report_utils, "get_jobs_dataset", Dataset)
+    jobs = pd.DataFrame({"job_id": ["J1", "J2"], "tech": ["Dana", "Avi"], "total": [100.0, 50.0]})
+
+    report_utils._store_delivered_jobs(jobs, check_uploaded_jobs(jobs), "daily", "c1")
+    assert check_uploaded_jobs(jobs).counts()["new"] == 2
+
+    Dataset.fail = False
+    report_utils._store_delivered_jobs(jobs, check_uploaded_jobs(jobs), "daily", "c1")
+    assert appended == [["J1", "J2"]]
+    assert check_uploaded_jobs(jobs).counts()["duplicate"] == 2
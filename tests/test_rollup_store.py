@@ -0,0 +1,142 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from myapp.finance.insights.engine import InsightsEngine
+from myapp.finance.rollup_store import RollupStore
+from myapp.services.report_analyzer import summarise
+
+
+def _upload(job_ids, dates, techs, totals, payment="cash"):
+    n = len(job_ids)
+    return pd.DataFrame(
+        {
+            "job_id": job_ids,
+            "date": pd.to_datetime(dates),
+            "tech": techs,
+            "job_type": ["rekey"] * n,
+            "payment_method": [payment] * n,
+            "total": totals,
+            "parts": [10.0] * n,
+            "net_income": [t - 10.0 for t in totals],
+            "tech_cut": [t / 2 for t in totals],
+            "company_net": [t / 2 - 10.0 for t in totals],
+            "flag": ["HIGH" if t > 500 else "" for t in totals],
+        }
+    )
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = tmp_path / "rollups.sqlite3"
+    monkeypatch.setenv("ROLLUP_DB_PATH", str(path))
+    return RollupStore(path)
+
+
+def test_ingest_is_incremental_and_deduplicated_by_job_id(store):
+    first = store.ingest(_upload(["J1", "J2"], ["2025-05-01", "2025-05-02"], ["Dana", "Avi"], [100.0, 600.0]))
+    # J2 is re-uploaded with a corrected total, J3 is new
+    second = store.ingest(_upload(["J2", "J3"], ["2025-05-02", "2025-05-03"], ["Avi", "Dana"], [200.0, 50.0]))
+
+    assert first == {"rows": 2, "new_jobs": 2, "replaced_jobs": 0, "skipped": 0}
+    assert second == {"rows": 2, "new_jobs": 1, "replaced_jobs": 1, "skipped": 0}
+    rollups = store.query()
+    assert rollups["date"].dt.day.tolist() == [1, 2, 3]
+    assert rollups["total"].tolist() == [100.0, 200.0, 50.0]
+    assert rollups["flags"].tolist() == [0, 0, 0]  # the HIGH flag went away with the correction
+    assert store.query("2025-05-02", "2025-05-02")["jobs"].tolist() == [1]
+    assert store.coverage() == (pd.Timestamp("2025-05-01"), pd.Timestamp("2025-05-03"))
+
+
+def test_rows_without_job_id_or_date_are_skipped(store):
+    df = _upload(["J1", None, "J3"], ["2025-05-01", "2025-05-01", None], ["Dana"] * 3, [1.0, 2.0, 3.0])
+    assert store.ingest(df)["skipped"] == 2
+
+
+def test_summarise_reads_history_for_a_longer_range(store):
+    store.ingest(_upload(["J1", "J2"], ["2025-04-01", "2025-04-02"], ["Dana", "Avi"], [100.0, 300.0]))
+    current = _upload(["J3"], ["2025-05-01"], ["Dana"], [50.0])
+
+    only_file = summarise(current, date_from="2025-04-01", date_to="2025-05-31")  # history is opt-in
+    month_range = summarise(current, date_from="2025-04-01", date_to="2025-05-31", history=True)
+
+    assert dict(zip(only_file["overall"]["metric"], only_file["overall"]["value"]))["jobs"] == 1
+    overall = dict(zip(month_range["overall"]["metric"], month_range["overall"]["value"]))
+    assert overall["jobs"] == 3 and overall["total_income"] == 450.0
+    assert month_range["by_tech"]["total"].tolist() == [300.0, 150.0]
+    assert month_range["daily"]["date"].min() == pd.Timestamp("2025-04-01")
+    assert month_range["daily"]["income"].sum() == 450.0
+    assert sum(month_range["by_payment"].values()) == 450.0
+
+
+def test_history_is_limited_to_the_reports_tech_service_and_client(store):
+    store.ingest(_upload(["J1", "J2"], ["2025-04-01", "2025-04-02"], ["Dana", "Avi"], [100.0, 300.0]), client_id="acme")
+    store.ingest(_upload(["K1"], ["2025-04-03"], ["Dana"], [999.0]), client_id="other")
+    current = _upload(["J3"], ["2025-05-01"], ["Dana"], [50.0])
+
+    summary = summarise(
+        current, date_from="2025-04-01", date_to="2025-05-31", history=True, techs=["Dana"], client_id="acme"
+    )
+
+    overall = dict(zip(summary["overall"]["metric"], summary["overall"]["value"]))
+    assert overall["jobs"] == 2 and overall["total_income"] == 150.0
+    assert summary["by_tech"]["tech"].tolist() == ["Dana"]
+    assert summary["by_payment"] == {"cash": 150.0}
+    assert store.query(job_types=["lockout"]).empty
+
+
+def test_a_store_without_client_columns_is_migrated(tmp_path):
+    path = tmp_path / "old.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE job_facts (job_id TEXT NOT NULL, line INTEGER NOT NULL, day TEXT NOT NULL, "
+            "tech TEXT NOT NULL, job_type TEXT NOT NULL, total REAL NOT NULL, total_count INTEGER NOT NULL, "
+            "parts REAL NOT NULL, net_income REAL NOT NULL, tech_cut REAL NOT NULL, company_net REAL NOT NULL, "
+            "flags INTEGER NOT NULL, source TEXT, ingested_at TEXT NOT NULL, PRIMARY KEY (job_id, line))"
+        )
+        conn.execute("INSERT INTO job_facts VALUES ('J1', 0, '2025-04-01', 'Dana', 'rekey', 100, 1, 10, 90, 50, 40, 0, NULL, 'x')")
+
+    store = RollupStore(path)
+    rollups = store.query()
+    assert rollups["total"].tolist() == [100.0] and rollups["client_id"].isna().all()
+    store.ingest(_upload(["J2"], ["2025-04-01"], ["Avi"], [20.0]), client_id="acme")
+    assert store.query(client_id="acme")["total"].tolist() == [20.0]
+
+
+def test_insights_daily_context_includes_history(store):
+    store.ingest(_upload(["J1", "J2"], ["2025-04-28", "2025-04-29"], ["Dana", "Avi"], [100.0, 300.0]))
+    current = _upload(["J3"], ["2025-05-01"], ["Dana"], [50.0])
+    current["tax_collected"] = 5.0
+
+    engine = InsightsEngine()
+    daily = engine._with_history(engine._pre_aggregate(current)["daily"], days=7)
+
+    assert daily["net_income"].tolist() == [90.0, 290.0, 40.0]
+
+
+def test_insights_history_is_scoped_to_the_reports_tech_and_per_day(store):
+    # company-wide history: Avi's big days must not seed Dana's rolling mean
+    days = [f"2025-04-{d}" for d in range(24, 30)]
+    store.ingest(
+        _upload([f"D{d}" for d in days] + [f"A{d}" for d in days], days * 2, ["Dana"] * 6 + ["Avi"] * 6,
+                [100.0] * 6 + [5000.0] * 6),
+        client_id="acme",
+    )
+    current = _upload(["J1", "J2"], ["2025-05-01 09:15", "2025-05-01 16:40"], ["Dana", "Dana"], [60.0, 60.0])
+    current["tax_collected"] = 5.0
+
+    engine = InsightsEngine()
+    assert engine.rules["HISTORY"]["days"] == 0  # off unless asked for
+    daily = engine._pre_aggregate(current)["daily"]
+    assert daily["date"].tolist() == [pd.Timestamp("2025-05-01")]  # timestamps grouped per day
+
+    scoped = engine._with_history(daily, days=7, techs=["Dana"], client_id="acme")
+    assert scoped["net_income"].tolist() == [90.0] * 6 + [100.0]
+    assert scoped["job_id"].tolist() == [1] * 6 + [2]
+
+    def drops(**scope):
+        return [i for i in engine.generate(current, history_days=7, **scope) if i.code == "INC_DROP"]
+
+    assert drops()  # company-wide history: a false drop
+    assert not drops(techs=["Dana"], client_id="acme")
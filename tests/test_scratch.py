@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from myapp.utils.scratch import current_workspace, scratch_workspace, staged_output
+
+
+@pytest.fixture(autouse=True)
+def scratch_root(tmp_path, monkeypatch):
+    root = tmp_path / "scratch"
+    monkeypatch.setenv("SCRATCH_ROOT", str(root))
+    return root
+
+
+def test_each_run_gets_its_own_dir_and_it_is_removed(scratch_root):
+    with scratch_workspace() as a:
+        a.file(".pdf").write_bytes(b"x")
+        with scratch_workspace() as nested:
+            assert nested is a and current_workspace() is a
+        path_a = a.path
+    with scratch_workspace() as b:
+        assert b.path != path_a
+    assert not path_a.exists() and list(scratch_root.iterdir()) == []
+    assert current_workspace() is None
+
+
+def test_workspace_is_removed_when_the_run_fails(scratch_root):
+    with pytest.raises(RuntimeError):
+        with scratch_workspace() as ws:
+            ws.file(".png").write_bytes(b"png")
+            raise RuntimeError("boom")
+    assert list(scratch_root.iterdir()) == []
+
+
+def test_staged_output_publishes_only_complete_files(tmp_path):
+    final = tmp_path / "reports" / "r.pdf"
+    with staged_output(final) as tmp:
+        assert not final.exists()
+        tmp.write_bytes(b"%PDF-new")
+    assert final.read_bytes() == b"%PDF-new"
+
+    with pytest.raises(ValueError):
+        with staged_output(final) as tmp:
+            tmp.write_bytes(b"%PDF-half")
+            raise ValueError("render failed")
+    assert final.read_bytes() == b"%PDF-new"
+
+
+def test_threads_do_not_share_a_workspace():
+    seen = {}
+    barrier = threading.Barrier(4)
+
+    def run(i):
+        with scratch_workspace("t") as ws:
+            barrier.wait()
+            seen[i] = ws.path
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(seen.values())) == 4
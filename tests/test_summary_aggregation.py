@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from myapp.finance.aggregation import build_summary_cube, summary_cube
+from myapp.services.report_analyzer import get_income_trend_from_df, get_kpi_summary, summarise
+
+
+@pytest.fixture
+def jobs():
+    return pd.DataFrame(
+        {
+            "tech": ["Dana", "Avi", "Dana", None, "Avi"],
+            "job_type": ["rekey", "lockout", "rekey", "lockout", None],
+            "payment_method": ["cash", "credit", "cash", "cash", "credit"],
+            "total": [100.0, 200.0, 50.0, 25.0, np.nan],
+            "parts": [10.0, 20.0, 5.0, 0.0, 0.0],
+            "net_income": [90.0, 180.0, 45.0, 25.0, 0.0],
+            "company_net": [45.0, 90.0, 20.0, 10.0, 0.0],
+            "date": pd.to_datetime(
+                ["2025-04-01 09:00", "2025-04-01 13:30", "2025-04-03 10:00", None, "2025-04-03 18:00"]
+            ),
+        }
+    )
+
+
+def test_summarise_tables_match_direct_groupbys(jobs):
+    summary = summarise(jobs)
+
+    overall = dict(zip(summary["overall"]["metric"], summary["overall"]["value"]))
+    assert overall == {"jobs": 5, "total_income": 375.0, "parts_cost": 35.0, "net_income": 340.0, "company_net": 165.0}
+    assert summary["by_payment"] == {"cash": 175.0, "credit": 200.0}
+    assert summary["by_tech"]["tech"].tolist()[:2] == ["Avi", "Dana"]
+    assert summary["by_tech"]["total"].tolist()[:2] == [200.0, 150.0]
+    assert pd.isna(summary["by_tech"]["tech"].iloc[2])
+    assert summary["by_service"]["jobs"].tolist() == [2, 2, 1]
+    # Calendar days, including the empty 2025-04-02
+    assert summary["daily"]["date"].dt.day.tolist() == [1, 2, 3]
+    assert summary["daily"]["jobs"].tolist() == [2, 0, 2]
+    assert summary["daily"]["income"].tolist() == [300.0, 0.0, 50.0]
+
+
+def test_kpi_and_trend_reuse_the_cube(jobs):
+    kpi = get_kpi_summary(jobs)
+
+    assert kpi["total_jobs"] == 5 and kpi["total_income"] == 375.0
+    assert [t["name"] for t in kpi["technicians"]] == ["Avi", "Dana"]  # NaN tech skipped
+    assert kpi["technicians"][1] == {
+        "name": "Dana", "jobs_count": 2, "income": 150.0, "profit": 135.0, "average_per_job": 75.0,
+    }
+    assert get_income_trend_from_df(jobs) == [
+        {"date": "2025-04-01", "income": 300.0, "jobs": 2},
+        {"date": "2025-04-03", "income": 50.0, "jobs": 1},  # NaN total not counted
+    ]
+    assert summary_cube(jobs) is summary_cube(jobs)
+
+
+def test_cube_keeps_missing_categorical_keys(jobs):
+    encoded = jobs.astype({"tech": "category", "job_type": "category"})
+    cube = build_summary_cube(encoded)
+
+    assert cube.grains["jobs"].sum() == 5
+    assert cube.rollup(["tech"])["total"].sum() == 375.0
+
+
+def test_a_frame_edited_in_place_gets_a_fresh_cube(jobs):
+    before = summary_cube(jobs).totals["total"]
+    jobs.loc[jobs.index[0], "total"] += 1000.0
+
+    assert summary_cube(jobs).totals["total"] == before + 1000.0
+    assert summary_cube(jobs.copy()) is summary_cube(jobs)  # same content, same cube
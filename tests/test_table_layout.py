@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from fpdf import FPDF
+
+from myapp.services import pdf_generator
+from myapp.services.table_layout import plan_table_layout
+
+NOTE = "lockout after hours, customer waited, replaced cylinder and two keys"
+
+
+def _pdf(orientation="P"):
+    pdf = FPDF(orientation=orientation, unit="mm", format="A4")
+    pdf.set_auto_page_break(auto=False)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "", 16)
+    return pdf
+
+
+def _jobs(n, extra_cols=0):
+    data = {
+        "job_id": [f"J{i:05d}" for i in range(n)],
+        "tech": ["Dana", "Moshe Levi-Ben David"] * (n // 2),
+        "notes": [NOTE, "rekey"] * (n // 2),
+        "total": [123.45] * n,
+    }
+    for k in range(extra_cols):
+        data[f"metric_{k}"] = [12.5] * n
+    return pd.DataFrame(data)
+
+
+def _printed_pages(df, groups, orientation):
+    pdf = _pdf(orientation)
+    for idx, (columns, widths) in enumerate(groups):
+        if idx:
+            pdf.add_page()
+        pdf_generator._print_table_header(pdf, columns, widths, "Helvetica")
+        pdf_generator._print_full_table(pdf, df[columns], widths, "Helvetica")
+    return pdf.page
+
+
+def test_widths_follow_the_measured_contents():
+    pdf = _pdf()
+    width = pdf.w - 20
+    layout = plan_table_layout(pdf, _jobs(40), width, font="Helvetica")
+
+    [(columns, widths)] = layout.groups
+    by_name = dict(zip(columns, widths))
+    assert sum(widths) == pytest.approx(width)
+    assert by_name["notes"] > by_name["tech"] > by_name["total"]
+    # the planner leaves the caller's font as it was
+    assert (pdf.font_family, pdf.font_style, pdf.font_size_pt) == ("helvetica", "", 16)
+
+
+def test_wide_tables_are_grouped_to_save_pages():
+    df = _jobs(300, extra_cols=20)
+    pdf = _pdf("L")
+    width = pdf.w - 20
+    layout = plan_table_layout(pdf, df, width, font="Helvetica", max_cols_per_table=15)
+
+    assert [c for columns, _ in layout.groups for c in columns] == list(df.columns)
+    assert all(len(columns) <= 15 and sum(w) == pytest.approx(width) for columns, w in layout.groups)
+
+    # what the report did before: a cut every 15 columns, equal widths
+    fixed = [(list(df.columns[i:i + 15]), [width / 15] * len(df.columns[i:i + 15])) for i in range(0, df.shape[1], 15)]
+    planned = _printed_pages(df, layout.groups, "L")
+    assert planned < _printed_pages(df, fixed, "L")
+    assert abs(layout.pages - planned) <= max(2, planned // 10)
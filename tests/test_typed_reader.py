@@ -0,0 +1,56 @@
+import pandas as pd
+
+from myapp.services.report_analyzer import clean_and_cast, load_jobs_excel
+from myapp.utils.typed_reader import TYPED_ATTR, read_jobs_typed
+
+
+def _write_sheet(tmp_path, share="50%"):
+    df = pd.DataFrame(
+        {
+            "job_id": ["001", "002", "003"],
+            "tech": ["Dana", "Avi", "Dana"],
+            "job_type": ["lockout", "rekey", "lockout"],
+            "date": ["2025-04-01", "04/02/2025 10:15 AM", ""],
+            "total": ["$1,200.50", "300", ""],
+            "parts": ["10", "0", "5.5"],
+            "cash": ["0", "300", "0"],
+            "credit": ["1200.50", "0", "0"],
+            "check": ["0", "0", "0"],
+            "billing": ["0", "0", "0"],
+            "tech_share": [share, "40%", "60%"],
+        }
+    )
+    path = tmp_path / "jobs.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_csv_is_read_into_schema_types(tmp_path):
+    df = read_jobs_typed(str(_write_sheet(tmp_path)))
+
+    assert df["job_id"].tolist() == ["001", "002", "003"]  # text keeps leading zeros
+    assert df["total"].dtype == float and df["total"].iloc[0] == 1200.50
+    assert pd.isna(df["total"].iloc[2])
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert df["date"].iloc[1] == pd.Timestamp("2025-04-02 10:15")
+    assert pd.isna(df["date"].iloc[2])
+    assert isinstance(df["tech"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["job_type"].dtype, pd.CategoricalDtype)
+    assert df["tech_share"].tolist() == [0.5, 0.4, 0.6]
+    assert {"total", "date", "tech", "tech_share"} <= set(df.attrs[TYPED_ATTR])
+
+
+def test_multi_tech_share_stays_text(tmp_path):
+    df = read_jobs_typed(str(_write_sheet(tmp_path, share="60%/40%")))
+
+    assert df["tech_share"].iloc[0] == "60%/40%"
+    assert "tech_share" not in df.attrs[TYPED_ATTR]
+
+
+def test_clean_and_cast_does_not_reparse_typed_columns(tmp_path):
+    df = clean_and_cast(load_jobs_excel(str(_write_sheet(tmp_path))))
+
+    assert df["tech_share"].tolist() == [0.5, 0.4, 0.6]  # not divided by 100 twice
+    assert df["total"].iloc[0] == 1200.50
+    assert df["date"].iloc[0] == pd.Timestamp("2025-04-01")
+    assert df["payment_method"].tolist()[:2] == ["credit", "cash"]
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+from myapp.utils.date_utils import parse_date_flex
+from myapp.utils.validation_rules import ColumnRule, UploadValidationError, _check_date, compile_rules
+from myapp.utils.validation_utils import validate_uploaded_df
+from benchmarks.synthetic_data import make_job_sheet
+
+
+def test_engine_collects_every_failing_cell():
+    df = pd.DataFrame(
+        {
+            "share": ["50%", "40", "x%", None],
+            "when": ["2025-01-02", "02/01/2025 10:00 AM", "31.12.2025", None],
+            "amount": ["10", "0", "abc", "5"],
+        }
+    )
+    rules = compile_rules(
+        [
+            ColumnRule("share", "percent"),
+            ColumnRule("when", "date"),
+            ColumnRule("amount", "numeric", severity="warning"),
+        ],
+        required_columns=["share", "when"],
+    )
+    report = rules.evaluate(df)
+
+    assert report.counts() == {"share:percent": 2, "when:date": 2, "amount:numeric": 1}
+    assert [(f.row, f.column) for f in report.errors] == [(1, "share"), (3, "share"), (2, "when"), (3, "when")]
+    assert report.warnings[0].value == "abc"
+    assert not report.ok
+    assert report.to_dict()["error_count"] == 4
+
+
+def test_missing_columns_short_circuit():
+    report = compile_rules([], required_columns=["job_id"]).evaluate(pd.DataFrame({"a": [1]}))
+    assert report.missing_columns == ["job_id"]
+    assert report.first_error_message() == "Missing required columns: ['job_id']"
+
+
+def test_unknown_check_is_rejected_at_compile_time():
+    with pytest.raises(ValueError, match="Unknown validation checks"):
+        compile_rules([ColumnRule("a", "nope")])
+
+
+def test_validate_uploaded_df_reports_all_issues_and_attaches_report():
+    df = make_job_sheet(300)
+    df.loc[5, "tech_share"] = "50"
+    df.loc[9, "date"] = "31.12.2025"
+    df.loc[11, "total"] = -5.0
+
+    with pytest.raises(UploadValidationError) as exc:
+        validate_uploaded_df(df)
+
+    assert str(exc.value) == "Column tech_share must contain percentage strings like '50%'"
+    counts = exc.value.report.counts()
+    assert counts["tech_share:percent"] == 1
+    assert counts["date:date"] == 1
+    assert counts["total:charset"] == 1
+
+    stored = df.attrs["autoclose_validation"]
+    assert stored["validated"] is False
+    assert stored["validation_report"]["error_count"] == exc.value.report.to_dict()["error_count"]
+
+
+def test_validate_uploaded_df_passes_clean_sheet_and_skips_totals_rows():
+    df = make_job_sheet(200)
+    df.loc[0, "job_id"] = "Totals:"
+    df.loc[0, "date"] = "not a date"
+    assert validate_uploaded_df(df) is df
+    assert df.attrs["autoclose_validation"]["validated"] is True
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["2025-06-10", "20250610", "2025-06-10 14", "2025-06-10 14:30:00.5"],
+        ["2025-06-10T14:30:00+00:00", "2025-06-10T14:30:00Z", "2025-06-10T14:30:00.123Z", "2025-06-10T14:30Z"],
+        ["2025-06-10", "10/06/2025", "06/10/2025 02:30 PM", " 2025/6/1 ", "2025-02-30", "2025-06-10 14:30"],
+        ["2025-06-10", "2025-06-10T14:30:00.5Z", "10/06/2025"],  # the verdict must not depend on neighbours
+    ],
+)
+def test_date_check_accepts_exactly_what_parse_date_flex_accepts(values):
+    def flex_ok(value):
+        try:
+            parse_date_flex(value)
+            return True
+        except ValueError:
+            return False
+
+    series = pd.Series(values, dtype=object)
+    failing = _check_date(series, series.astype(str), ColumnRule("when", "date"))
+    assert (~failing).tolist() == [flex_ok(v) for v in values]
@@ -0,0 +1,81 @@
+import gc
+import os
+
+import pytest
+from flask import Flask
+
+from myapp.routes.health import health_bp
+from myapp.services import warmup
+from myapp.utils.file_cache import load_cached_json, clear_file_cache
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    warmup.reset_warmup()
+    yield
+    warmup.reset_warmup()
+    gc.unfreeze()
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(health_bp, url_prefix="/api")
+    with app.test_client() as client:
+        yield client
+
+
+def test_ready_endpoint_reports_warming_before_warmup(client):
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json["status"] == "warming"
+
+
+def test_preload_warms_every_step_and_marks_ready(client):
+    warmup.start_warmup(None, mode="preload")
+    state = warmup.get_warmup_state()
+    assert state["ready"] is True
+    assert state["mode"] == "preload"
+    assert set(state["steps"]) == {
+        "fonts",
+        "templates",
+        "commission_rules",
+        "schema_config",
+        "detectors",
+    }
+    assert state["steps"]["schema_config"] == "ok"
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json["status"] == "ready"
+
+
+def test_off_mode_is_ready_immediately():
+    warmup.start_warmup(None, mode="off")
+    assert warmup.is_ready()
+    assert warmup.get_warmup_state()["steps"] == {}
+
+
+def test_failing_step_does_not_block_readiness(monkeypatch):
+    def boom():
+        raise RuntimeError("no rules")
+
+    monkeypatch.setattr(warmup, "_warm_commission_rules", boom)
+    state = warmup.warm_up()
+    assert state["ready"] is True
+    assert state["steps"]["commission_rules"].startswith("error")
+
+
+def test_file_cache_reloads_after_change(tmp_path):
+    clear_file_cache()
+    path = tmp_path / "schema.json"
+    path.write_text('{"a": 1}', encoding="utf-8")
+    first = load_cached_json(path)
+    with pytest.raises(TypeError):
+        first["a"] = 99  # read-only: every caller shares the cached object
+    assert load_cached_json(path) is first and first == {"a": 1}
+
+    path.write_text('{"a": 2}', encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_cached_json(path) == {"a": 2}